@@ -0,0 +1,186 @@
+import math
+import threading
+import time
+
+from flask import g, jsonify, request
+
+from backend.app.auth import request_user_id
+
+# Bu kadar kova birikince dolmuş olanlar atılır
+MAX_BUCKETS = 10000
+
+
+def admission(concurrency: int = None, queue: int = 0, wait: float = 5.0,
+              rate: float = None, burst: int = None):
+    """Pahalı route'lar için eşzamanlılık ve kullanıcı başına hız sınırı tanımlar.
+
+    concurrency aynı anda çalışabilecek istek sayısıdır; fazlası en fazla
+    queue kadar, wait saniye sıra bekler. Sıra doluysa ya da süre dolarsa
+    503 döner. rate/burst kullanıcı başına token kovasıdır (saniyede rate
+    istek, en fazla burst birikir); kova boşsa 429 döner.
+    """
+    def decorator(view):
+        view.admission = {
+            "concurrency": concurrency, "queue": queue, "wait": wait,
+            "rate": rate, "burst": burst or max(1, math.ceil(rate or 1)),
+        }
+        return view
+    return decorator
+
+
+class TokenBuckets:
+    """Anahtar başına token kovası"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key) -> float:
+        """Token alınabildiyse 0, alınamadıysa yeni token'a kalan saniyeyi döndürür"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                if len(self._buckets) > MAX_BUCKETS:
+                    self._purge(now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / self.rate
+
+    def _purge(self, now):
+        self._buckets = {
+            k: (t, u) for k, (t, u) in self._buckets.items()
+            if t + (now - u) * self.rate < self.burst
+        }
+
+
+class EndpointGate:
+    """Route başına eşzamanlılık sınırı ve sınırlı bekleme sırası"""
+
+    def __init__(self, concurrency: int, queue: int, wait: float):
+        self.concurrency = concurrency
+        self.queue = queue
+        self.wait = wait
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> str:
+        """Yer açılırsa None, açılmazsa red nedenini ('queue_full' / 'timeout') döndürür"""
+        with self._cond:
+            if self.active < self.concurrency:
+                self.active += 1
+                return None
+            if self.waiting >= self.queue:
+                return "queue_full"
+            self.waiting += 1
+            try:
+                if not self._cond.wait_for(lambda: self.active < self.concurrency, self.wait):
+                    return "timeout"
+                self.active += 1
+                return None
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+class AdmissionControl:
+    """Route sınırlarını uygular ve sayaçları tutar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._gates = {}
+        self._buckets = {}
+        self._counters = {}
+
+    def reset(self):
+        with self._lock:
+            self._gates.clear()
+            self._buckets.clear()
+            self._counters.clear()
+
+    def _state(self, endpoint, policy):
+        with self._lock:
+            if endpoint not in self._counters:
+                self._counters[endpoint] = {"admitted": 0, "rate_limited": 0, "queue_full": 0, "timeout": 0}
+                if policy["concurrency"]:
+                    self._gates[endpoint] = EndpointGate(policy["concurrency"], policy["queue"], policy["wait"])
+                if policy["rate"]:
+                    self._buckets[endpoint] = TokenBuckets(policy["rate"], policy["burst"])
+            return self._gates.get(endpoint), self._buckets.get(endpoint), self._counters[endpoint]
+
+    def _count(self, counters, name):
+        with self._lock:
+            counters[name] += 1
+
+    def admit(self, endpoint, policy, user_key):
+        """İstek kabul edilirse (gate, None), edilmezse (None, hata yanıtı) döndürür"""
+        gate, buckets, counters = self._state(endpoint, policy)
+        if buckets is not None:
+            retry_after = buckets.take(user_key)
+            if retry_after:
+                self._count(counters, "rate_limited")
+                return None, (jsonify({"error": "Çok fazla istek, lütfen biraz bekleyin!"}), 429,
+                              {"Retry-After": str(math.ceil(retry_after))})
+        if gate is not None:
+            reason = gate.acquire()
+            if reason is not None:
+                self._count(counters, reason)
+                return None, (jsonify({"error": "Sunucu meşgul, lütfen tekrar deneyin!"}), 503,
+                              {"Retry-After": str(max(1, math.ceil(gate.wait)))})
+        self._count(counters, "admitted")
+        return gate, None
+
+    def stats(self) -> dict:
+        with self._lock:
+            result = {}
+            for endpoint, counters in self._counters.items():
+                gate = self._gates.get(endpoint)
+                result[endpoint] = {
+                    **counters,
+                    "active": gate.active if gate else 0,
+                    "queue_depth": gate.waiting if gate else 0,
+                    "concurrency": gate.concurrency if gate else None,
+                    "queue_size": gate.queue if gate else None,
+                }
+            return result
+
+
+def init_admission(app) -> AdmissionControl:
+    """ADMISSION_CONTROL açıkken @admission ile işaretli route'ları sınırlar"""
+    control = AdmissionControl()
+    app.extensions["paytrack_admission"] = control
+
+    @app.before_request
+    def _admit():
+        if not app.config.get("ADMISSION_CONTROL") or request.method == "OPTIONS":
+            return None
+        view = app.view_functions.get(request.endpoint)
+        policy = getattr(view, "admission", None)
+        if policy is None:
+            return None
+        data = request.get_json(silent=True) if request.is_json else None
+        user_key = request_user_id(
+            request.args.get("user_id") or (data.get("user_id") if isinstance(data, dict) else None)
+        ) or request.remote_addr
+        gate, rejected = control.admit(request.endpoint, policy, str(user_key))
+        if rejected is not None:
+            return rejected
+        g.admission_gate = gate
+        return None
+
+    @app.teardown_request
+    def _release(exc=None):
+        gate = g.pop("admission_gate", None)
+        if gate is not None:
+            gate.release()
+
+    return control
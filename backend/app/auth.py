@@ -0,0 +1,130 @@
+import secrets
+import threading
+import time
+
+from flask import g, jsonify, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+
+# Token gerektirmeyen uç noktalar (PDF'ler iframe ile açıldığından başlık gönderilemez)
+PUBLIC_ENDPOINTS = {"home", "create_user", "login", "test_log", "static", "get_pdf"}
+
+
+class TokenStore:
+    """İmzalı oturum token'larını üretir ve O(1) doğrular.
+
+    Token'lar SECRET_KEY ile imzalanır; doğrulanan token'lar bellekte
+    tutulur, böylece tekrar eden isteklerde sadece sözlük araması yapılır.
+    Önbellekte olmayan (örn. başka bir worker'ın ürettiği) token'lar imza
+    ve süre kontrolünden geçirilip önbelleğe eklenir. Sözlükler sınırsız
+    büyümesin diye her purge_every eklemede bir süresi dolanlar atılır.
+    """
+
+    def __init__(self, secret_key: str, ttl: int = 12 * 60 * 60, purge_every: int = 1000):
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._added = 0
+        self._serializer = URLSafeTimedSerializer(secret_key, salt="paytrack-session")
+        self._tokens = {}  # token -> (user_id, expires_at)
+        self._revoked = {}  # token -> expires_at
+        self._lock = threading.Lock()
+
+    def issue(self, user_id: int) -> str:
+        token = self._serializer.dumps({"uid": user_id, "n": secrets.token_hex(8)})
+        with self._lock:
+            self._tokens[token] = (user_id, time.time() + self.ttl)
+            self._count_added()
+        return token
+
+    def verify(self, token: str):
+        """Geçerli token için user_id, aksi halde None döndürür"""
+        now = time.time()
+        entry = self._tokens.get(token)
+        if entry is not None:
+            if entry[1] > now:
+                return entry[0]
+            with self._lock:
+                self._tokens.pop(token, None)
+            return None
+
+        if token in self._revoked:
+            return None
+        try:
+            payload, signed_at = self._serializer.loads(token, max_age=self.ttl, return_timestamp=True)
+        except (SignatureExpired, BadSignature):
+            return None
+        user_id = payload.get("uid")
+        with self._lock:
+            self._tokens[token] = (user_id, signed_at.timestamp() + self.ttl)
+            self._count_added()
+        return user_id
+
+    def revoke(self, token: str):
+        with self._lock:
+            self._tokens.pop(token, None)
+            self._revoked[token] = time.time() + self.ttl
+            self._count_added()
+
+    def purge(self):
+        """Süresi dolmuş kayıtları temizler"""
+        with self._lock:
+            self._purge()
+
+    def _count_added(self):
+        # Kilit altında çağrılır
+        self._added += 1
+        if self._added >= self.purge_every:
+            self._purge()
+
+    def _purge(self):
+        now = time.time()
+        self._added = 0
+        self._tokens = {t: e for t, e in self._tokens.items() if e[1] > now}
+        self._revoked = {t: exp for t, exp in self._revoked.items() if exp > now}
+
+
+def bearer_token():
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return header[len("Bearer "):].strip() or None
+    # EventSource başlık gönderemediği için token sorgu parametresiyle de kabul edilir
+    return request.args.get("access_token") or None
+
+
+def request_user_id(value=None):
+    """Token ile doğrulanmış kullanıcıyı, yoksa istekteki user_id'yi döndürür"""
+    return g.get("user_id") or value
+
+
+def init_auth(app) -> TokenStore:
+    """Token doğrulamasını uygulamaya bağlar.
+
+    AUTH_REQUIRED açıksa herkese açık uç noktalar dışında geçerli bir
+    Bearer token zorunludur. Token ile birlikte farklı bir user_id
+    gönderilirse istek reddedilir.
+    """
+    store = TokenStore(app.config["SECRET_KEY"], app.config.get("SESSION_TOKEN_TTL", 12 * 60 * 60))
+    app.extensions["paytrack_tokens"] = store
+
+    @app.before_request
+    def _authenticate():
+        if request.method == "OPTIONS" or request.endpoint in PUBLIC_ENDPOINTS:
+            return None
+
+        token = bearer_token()
+        if token is None:
+            if app.config.get("AUTH_REQUIRED"):
+                return jsonify({"error": "Oturum gerekli!"}), 401
+            return None
+
+        user_id = store.verify(token)
+        if user_id is None:
+            return jsonify({"error": "Oturum geçersiz veya süresi dolmuş!"}), 401
+
+        data = request.get_json(silent=True) if request.is_json else None
+        claimed = request.args.get("user_id") or (data.get("user_id") if isinstance(data, dict) else None)
+        if claimed is not None and str(claimed) != str(user_id):
+            return jsonify({"error": "Bu kullanıcı için yetkiniz yok!"}), 403
+        g.user_id = user_id
+        return None
+
+    return store
@@ -0,0 +1,62 @@
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli isteğe bağlıdır, yoksa sadece gzip sunulur
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/csv", "text/css", "application/javascript"}
+
+# Sıkıştırılmış gösterimler farklı ETag taşır (strong ETag kuralı)
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+
+def etag_variants(etag: str) -> list:
+    """Bir ETag'in sıkıştırılmış gösterimlerle birlikte tüm biçimlerini döndürür"""
+    return [etag] + [etag + suffix for suffix in ETAG_SUFFIXES.values()]
+
+
+def compress_body(data: bytes, encoding: str, level: int = 6) -> bytes:
+    """level: gzip için 1-9, brotli için 0-11 kalite değeri"""
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+
+def init_compression(app):
+    """Eşik üzerindeki yanıtları Accept-Encoding'e göre br/gzip ile sıkıştırır"""
+    min_size = int(app.config.get("COMPRESS_MIN_SIZE", 1024))
+    levels = {
+        "gzip": int(app.config.get("COMPRESS_LEVEL", 6)),
+        # Brotli 4 kalitesinde gzip-6'dan hem hızlı hem küçük çıktı verir
+        "br": int(app.config.get("COMPRESS_BR_QUALITY", 4)),
+    }
+    offered = (["br"] if brotli is not None else []) + ["gzip"]
+
+    @app.after_request
+    def _compress(response):
+        if not app.config.get("COMPRESS_ENABLED", True):
+            return response
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(offered)
+        if encoding is None or (response.content_length or 0) < min_size:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+        response.set_data(compress_body(data, encoding, levels[encoding]))
+        response.headers["Content-Encoding"] = encoding
+
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(etag + ETAG_SUFFIXES[encoding], weak)
+        return response
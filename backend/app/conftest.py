@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# Testler gerçek paytrack.db yerine geçici bir veritabanı kullanır
+_test_dir = tempfile.mkdtemp(prefix="paytrack-test-")
+os.environ["PAYTRACK_DATABASE_URI"] = f"sqlite:///{os.path.join(_test_dir, 'test.db')}"
+os.environ["PAYTRACK_REPORTS_DIR"] = os.path.join(_test_dir, "reports")
+# Taksit zamanlayıcısı testlerde elle (tick) çalıştırılır
+os.environ["PAYTRACK_INSTALLMENT_SCHEDULER"] = "0"
+os.makedirs(os.environ["PAYTRACK_REPORTS_DIR"], exist_ok=True)
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(project_root)
+
+
+@pytest.fixture
+def app():
+    from backend.app.main import create_app
+    from backend.database.database import db
+
+    flask_app = create_app()
+    flask_app.config["TESTING"] = True
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+    flask_app.extensions["paytrack_read_cache"].clear()
+    flask_app.extensions["paytrack_admission"].reset()
+    if flask_app.extensions["paytrack_ledger_columns"] is not None:
+        flask_app.extensions["paytrack_ledger_columns"].clear()
+    yield flask_app
+    with flask_app.app_context():
+        db.session.remove()
+        # Havuzdaki bağlantılar ekli arşiv dosyalarını taşır; sonraki test
+        # tabloları yeniden oluşturduğunda ada göre eski dosyaya düşmesinler
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def seed_ledger(app):
+    """Verilen ölçekte kullanıcı, müşteri ve işlem oluşturur (her işlem 10₺)"""
+    from werkzeug.security import generate_password_hash
+    from backend.database.database import db
+    from backend.models.user import User
+    from backend.models.customer import Customer, Transaction
+    from backend.models.ledger import chain_rows
+
+    def seed(customers: int = 10, transactions_per_customer: int = 5, user_id: int = 1):
+        start = datetime(2025, 1, 1, 9, 0, 0)
+        with app.app_context():
+            if db.session.get(User, user_id) is None:
+                db.session.execute(User.__table__.insert(), [{
+                    "id": user_id, "username": f"user{user_id}",
+                    "password_hash": generate_password_hash("secret"),
+                }])
+            first_id = (db.session.query(Customer.id).order_by(Customer.id.desc()).limit(1).scalar() or 0) + 1
+            customer_rows, transaction_rows = [], []
+            for offset in range(customers):
+                cid = first_id + offset
+                customer_rows.append({
+                    "id": cid, "user_id": user_id, "name": f"Müşteri {cid}",
+                    "urun": "Ekmek", "borc": 1000 * transactions_per_customer,
+                })
+                for n in range(transactions_per_customer):
+                    transaction_rows.append({
+                        "customer_id": cid, "amount": 1000, "transaction_type": "borc",
+                        "description": "",
+                        "timestamp": (start + timedelta(hours=cid * 24 + n)).strftime("%Y-%m-%d %H:%M:%S"),
+                    })
+            # Satırlar uygulamanın yazdığı gibi hash zincirine bağlanır
+            heads = chain_rows(transaction_rows, {})
+            for row in customer_rows:
+                row["chain_head"] = heads.get(row["id"])
+            if customer_rows:
+                db.session.execute(Customer.__table__.insert(), customer_rows)
+            if transaction_rows:
+                db.session.execute(Transaction.__table__.insert(), transaction_rows)
+            db.session.commit()
+        # Veri doğrudan yazıldığı için önbellek elle temizlenir
+        app.extensions["paytrack_read_cache"].clear()
+        return [row["name"] for row in customer_rows]
+
+    return seed
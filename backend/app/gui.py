@@ -14,6 +14,8 @@ class PayTrackGUI:
         
         # Kullanıcı girişi
         self.user_id = None
+        # Son uygulanan değişiklik numarası (/changes için)
+        self.change_seq = None
         self.setup_user_login()
         
     def setup_user_login(self):
@@ -155,7 +157,7 @@ class PayTrackGUI:
             
             if response.status_code == 200:
                 messagebox.showinfo("Başarılı", "Müşteri eklendi!")
-                self.refresh_customer_list()
+                self.apply_changes()
                 # Form temizleme
                 self.customer_name_entry.delete(0, tk.END)
                 self.product_entry.delete(0, tk.END)
@@ -206,7 +208,7 @@ class PayTrackGUI:
             
             if response.status_code == 200:
                 messagebox.showinfo("Başarılı", data.get("message", "İşlem başarılı!"))
-                self.refresh_customer_list()
+                self.apply_changes()
                 # Form temizleme
                 self.transaction_customer_entry.delete(0, tk.END)
                 self.amount_entry.delete(0, tk.END)
@@ -238,12 +240,48 @@ class PayTrackGUI:
                 for customer_str in data:
                     name, product, debt_str = customer_str.split(" | ")
                     debt = debt_str.replace("Borç: ", "").replace("₺", "")
-                    self.customer_list.insert("", "end", values=(name, product, debt))
+                    self.customer_list.insert("", "end", iid=name, values=(name, product, debt))
+                self.change_seq = int(response.headers.get("X-Change-Seq", 0))
             else:
                 messagebox.showerror("Hata", data.get("error", "Bir hata oluştu!"))
                 
         except requests.exceptions.RequestException as e:
             messagebox.showerror("Hata", f"API'ye bağlanılamadı: {str(e)}")
+            
+    def apply_changes(self):
+        """Son yenilemeden sonraki değişiklikleri listeye uygular"""
+        if self.change_seq is None:
+            # Liste hiç yüklenmediyse tamamını al
+            self.refresh_customer_list()
+            return
+            
+        try:
+            while True:
+                response = requests.get(
+                    f"{self.BASE_URL}/changes",
+                    params={"user_id": self.user_id, "since": self.change_seq}
+                )
+                if response.status_code != 200:
+                    self.refresh_customer_list()
+                    return
+                delta = response.json()
+                
+                for name in delta["deleted"]:
+                    if self.customer_list.exists(name):
+                        self.customer_list.delete(name)
+                for customer in delta["customers"]:
+                    values = (customer["name"], customer["urun"], customer["borc"])
+                    if self.customer_list.exists(customer["name"]):
+                        self.customer_list.item(customer["name"], values=values)
+                    else:
+                        self.customer_list.insert("", "end", iid=customer["name"], values=values)
+                
+                self.change_seq = delta["seq"]
+                if not delta["has_more"]:
+                    break
+                    
+        except requests.exceptions.RequestException as e:
+            messagebox.showerror("Hata", f"API'ye bağlanılamadı: {str(e)}")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from flask import request, make_response
+
+from backend.models.change import Change
+from backend.app.compression import etag_variants
+
+
+def conditional_get(user_id, variant: str, build):
+    """Kullanıcı verisinin sürümüne göre koşullu GET yanıtı üretir.
+
+    ETag ve Last-Modified değişiklik kaydından hesaplanır. İstemcinin
+    elindeki sürüm (If-None-Match) güncelse build hiç çağrılmadan 304 döner;
+    aksi halde build(seq) ile oluşturulan yanıta doğrulayıcılar eklenir.
+    If-Modified-Since dikkate alınmaz: saniye hassasiyetindedir ve okumayla
+    aynı saniyedeki bir yazma bayat bir 304'e yol açar; her yanıtta seq'ten
+    türetilen ETag zaten vardır.
+    """
+    seq, changed_at = Change.version(user_id)
+    etag = f"{variant}-{user_id}-{seq}"
+    last_modified = None
+    if changed_at:
+        # created_at yerel saatle yazılır, HTTP tarihi için UTC'ye çevrilir
+        last_modified = datetime.strptime(changed_at, "%Y-%m-%d %H:%M:%S").astimezone()
+
+    not_modified = False
+    if request.if_none_match:
+        # İstemci sıkıştırılmış gösterimin ETag'ini gönderebilir
+        matched = [v for v in etag_variants(etag) if request.if_none_match.contains_weak(v)]
+        if matched:
+            not_modified = True
+            etag = matched[0]
+
+    if not_modified:
+        response = make_response("", 304)
+    else:
+        response = make_response(build(seq))
+        response.headers["X-Change-Seq"] = str(seq)
+
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    # Tarayıcı her seferinde doğrulasın ama gövdeyi saklasın
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,90 @@
+import hashlib
+import json
+from functools import wraps
+
+from flask import Response, current_app, g, jsonify, make_response, request
+
+from backend.database.database import db
+from backend.models.idempotency import IdempotencyConflict, IdempotencyKey, new_record, store_response
+from backend.app.auth import request_user_id
+
+HEADER = "Idempotency-Key"
+
+
+def _fingerprint() -> str:
+    digest = hashlib.sha256(f"{request.method} {request.full_path}\n".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _replay(stored: IdempotencyKey):
+    return Response(stored.response, status=stored.status_code, mimetype="application/json",
+                    headers={"Idempotent-Replayed": "true"})
+
+
+def idempotent(view):
+    """Idempotency-Key başlığı taşıyan yazma isteklerini tekrar çalıştırmaz.
+
+    Anahtar daha önce görüldüyse saklanan yanıt döner. Görülmediyse view
+    çalışır ve başarılı yanıt remember_response/idempotency_record ile
+    yazmayla aynı işlemde kaydedilir. Aynı anahtarla eşzamanlı gelen
+    ikinci istek işlemini geri alır ve ilkinin yanıtını döndürür.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({"error": f"{HEADER} en fazla 255 karakter olabilir!"}), 400
+
+        data = request.get_json(silent=True) if request.is_json else None
+        user_id = request_user_id(
+            request.args.get("user_id") or (data.get("user_id") if isinstance(data, dict) else None)
+        )
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            # Eksik ya da geçersiz user_id'yi route kendi hata yanıtıyla karşılar
+            return view(*args, **kwargs)
+
+        fingerprint = _fingerprint()
+        stored = IdempotencyKey.lookup(user_id, key)
+        if stored is None:
+            g.idempotency = new_record(
+                user_id, key, request.endpoint, fingerprint, current_app.config.get("IDEMPOTENCY_TTL", 86400)
+            )
+            response = make_response(view(*args, **kwargs))
+            if not g.pop("idempotency_conflict", False):
+                return response
+            db.session.rollback()
+            stored = IdempotencyKey.lookup(user_id, key)
+            if stored is None:
+                return response
+
+        if stored.request_hash != fingerprint:
+            return jsonify({"error": f"Bu {HEADER} farklı bir istek için kullanılmış!"}), 422
+        return _replay(stored)
+
+    return wrapper
+
+
+def idempotency_record(body: dict, status: int = 200):
+    """İstek anahtar taşıyorsa yazmayla birlikte saklanacak kaydı döndürür"""
+    pending = g.get("idempotency")
+    if pending is None:
+        return None
+    return {**pending, "status_code": status, "response": json.dumps(body, ensure_ascii=False)}
+
+
+def remember_response(body: dict, status: int = 200):
+    """Başarılı yanıtı mevcut oturumun işlemine ekler (commit'ten önce çağrılır)"""
+    record = idempotency_record(body, status)
+    if record is None:
+        return
+    try:
+        store_response(record)
+    except IdempotencyConflict:
+        # wrapper işlemi geri alıp ilk isteğin yanıtını döndürür
+        g.idempotency_conflict = True
+        raise
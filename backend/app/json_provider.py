@@ -0,0 +1,46 @@
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # orjson isteğe bağlıdır, yoksa standart kütüphane kullanılır
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """orjson kuruluysa onu kullanan, yoksa Flask'ın varsayılanına düşen JSON sağlayıcı.
+
+    Flask ile aynı çıktı kurallarını korur: anahtarlar sıralanır ve tarih
+    gibi tipler Flask'ın varsayılan dönüştürücüsüyle serileştirilir. Tek
+    fark ASCII dışı karakterlerin kaçışsız UTF-8 olarak yazılmasıdır.
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.use_orjson = orjson is not None and app.config.get("JSON_BACKEND", "auto") != "stdlib"
+
+    def _options(self, indent: bool = False) -> int:
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs) -> str:
+        if not self.use_orjson or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=self._options()).decode()
+
+    def loads(self, s, **kwargs):
+        if not self.use_orjson or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if not self.use_orjson:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # Ara string üretmeden doğrudan bytes ile yanıt oluştur
+        body = orjson.dumps(obj, default=_default, option=self._options(indent)) + b"\n"
+        return self._app.response_class(body, mimetype=self.mimetype)
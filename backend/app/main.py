@@ -6,12 +6,43 @@ import subprocess
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(project_root)
 
-from flask import Flask, request, jsonify, send_from_directory
+import atexit
+import json
+import threading
+import time
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from backend.database.database import db
+from backend.database.migrations import prepare_schema
+from backend.database.sharding import create_shard_router, current_shard
 from backend.models.user import User
-from backend.models.customer import Customer, Transaction
+from backend.models.customer import Customer, Transaction, post_transaction
+from backend.models.customer_import import CHUNK_SIZE as IMPORT_CHUNK_SIZE, ImportUnavailable, import_customers, iter_csv, iter_xlsx
+from backend.models.idempotency import IdempotencyConflict, store_response
+from backend.models.installment import InstallmentPlan, cancel_plan, create_plan, plan_progress
+from backend.models.late_fees import accrue_late_fees
+from backend.models.ledger import ledger_engines, verify_ledger
+from backend.models.purge import CHUNK_SIZE as PURGE_CHUNK_SIZE, delete_customers, purge_archived, purge_customers
+from backend.models.reconciliation import CHUNK_SIZE as STATEMENT_CHUNK_SIZE, OPEN, STATEMENT_ALIASES, ingest_statement, post_approved, review_queue
+from backend.models.change import Change, collect_changes
+from backend.models.reports import aging_report, timeseries_report
+from backend.models import analytics
+from backend.models.money import to_kurus, lira
+from backend.models.archive import transaction_history, history_row_to_dict
 from backend.models.pdf_generator import save_pdf, delete_old_pdfs
+from backend.app.query_budget import charge_chunks, query_budget, init_query_budget
+from backend.app.auth import init_auth, request_user_id, bearer_token
+from backend.app.http_cache import conditional_get
+from backend.app.read_cache import create_read_cache
+from backend.app.json_provider import FastJSONProvider
+from backend.app.compression import init_compression
+from backend.app.write_queue import create_write_queue
+from backend.app.admission import admission, init_admission
+from backend.app.profiling import admin_authorized, init_profiling
+from backend.app.scheduler import BackupScheduler, create_backup_scheduler, create_installment_scheduler
+from backend.app.idempotency import idempotent, idempotency_record, remember_response
+from backend.models.user import HashPoolBusy
+from sqlalchemy import func
 from datetime import datetime
 
 app = Flask(__name__)
@@ -19,28 +50,215 @@ CORS(app, resources={
     r"/*": {
         "origins": ["http://localhost:3000", "http://localhost:5173"],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        "expose_headers": ["Content-Type"],
+        "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key", "X-Profile", "X-Admin-Key"],
+        "expose_headers": [
+            "Content-Type", "X-Change-Seq", "ETag", "Last-Modified", "Idempotent-Replayed", "X-Profile-Id"
+        ],
         "supports_credentials": True
     }
 })
 
 # Absolute path to the database file
 db_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "database", "paytrack.db"))
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+# PAYTRACK_DATABASE_URI ile farklı bir veritabanı (örn. benchmark) kullanılabilir
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("PAYTRACK_DATABASE_URI", f"sqlite:///{db_path}")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# Yazma kilidi için bekleme süresi (saniye); eşzamanlı yazmalar hemen
+# "database is locked" hatası almak yerine sıralarını bekler
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "connect_args": {"timeout": float(os.environ.get("PAYTRACK_DB_BUSY_TIMEOUT", "30"))}
+}
+# İstek başına SQL sorgu sayısını ölç ve route bütçeleriyle karşılaştır
+app.config["QUERY_BUDGET_CHECK"] = os.environ.get("PAYTRACK_QUERY_BUDGET_CHECK") == "1"
+# Oturum token'larını imzalamak için; birden fazla worker varsa ortak olmalı
+app.config["SECRET_KEY"] = os.environ.get("PAYTRACK_SECRET_KEY") or os.urandom(32).hex()
+app.config["SESSION_TOKEN_TTL"] = int(os.environ.get("PAYTRACK_SESSION_TTL", 12 * 60 * 60))
+# Açıkken user_id parametresi yerine Bearer token zorunludur
+app.config["AUTH_REQUIRED"] = os.environ.get("PAYTRACK_AUTH_REQUIRED") == "1"
+# /events akışında değişikliklerin kontrol aralığı (saniye)
+app.config["CHANGE_POLL_INTERVAL"] = float(os.environ.get("PAYTRACK_CHANGE_POLL_INTERVAL", "1"))
+# Okuma önbelleği: memory (süreç içi), sqlite (worker'lar arası paylaşımlı) veya none
+app.config["READ_CACHE_BACKEND"] = os.environ.get("PAYTRACK_READ_CACHE", "memory")
+app.config["READ_CACHE_TTL"] = float(os.environ.get("PAYTRACK_READ_CACHE_TTL", "30"))
+app.config["READ_CACHE_PATH"] = os.environ.get(
+    "PAYTRACK_READ_CACHE_PATH", os.path.join(os.path.dirname(db_path), "read_cache.db")
+)
+# JSON: auto (orjson varsa) veya stdlib; bu boyutun üzerindeki yanıtlar sıkıştırılır
+app.config["JSON_BACKEND"] = os.environ.get("PAYTRACK_JSON_BACKEND", "auto")
+app.config["COMPRESS_MIN_SIZE"] = int(os.environ.get("PAYTRACK_COMPRESS_MIN_SIZE", "1024"))
+# Açıkken defter yazmaları tek bir yazıcı iş parçacığında toplu commit edilir
+app.config["WRITE_QUEUE"] = os.environ.get("PAYTRACK_WRITE_QUEUE") == "1"
+app.config["WRITE_QUEUE_BATCH_MS"] = float(os.environ.get("PAYTRACK_WRITE_QUEUE_BATCH_MS", "5"))
+app.config["WRITE_QUEUE_BATCH_SIZE"] = int(os.environ.get("PAYTRACK_WRITE_QUEUE_BATCH_SIZE", "100"))
+# Pahalı route'lar için @admission ile tanımlanan eşzamanlılık ve hız sınırları
+app.config["ADMISSION_CONTROL"] = os.environ.get("PAYTRACK_ADMISSION_CONTROL", "1") == "1"
+# Idempotency-Key ile saklanan yanıtların geçerlilik süresi (saniye)
+app.config["IDEMPOTENCY_TTL"] = int(os.environ.get("PAYTRACK_IDEMPOTENCY_TTL", 24 * 60 * 60))
+# Boş değilse müşteri verileri kullanıcı bazında ayrı dosyalara yazılır:
+# "user" her kullanıcıya bir dosya, sayı ise o kadar hash kovası demektir
+app.config["SHARDS"] = os.environ.get("PAYTRACK_SHARDS", "")
+app.config["SHARD_DIR"] = os.environ.get("PAYTRACK_SHARD_DIR", os.path.join(os.path.dirname(db_path), "shards"))
+# İstek profili: X-Profile başlığında bu anahtarı taşıyan istekler (ve
+# örnekleme oranı kadar istek) cProfile ile kaydedilir; /admin/profiles
+# uç noktaları aynı anahtarı X-Admin-Key başlığında ister
+app.config["PROFILE_KEY"] = os.environ.get("PAYTRACK_PROFILE_KEY", "")
+app.config["PROFILE_SAMPLE_RATE"] = float(os.environ.get("PAYTRACK_PROFILE_SAMPLE_RATE", "0"))
+app.config["PROFILE_DIR"] = os.environ.get(
+    "PAYTRACK_PROFILE_DIR", os.path.join(os.path.dirname(db_path), "profiles")
+)
+app.config["PROFILE_KEEP"] = int(os.environ.get("PAYTRACK_PROFILE_KEEP", "50"))
+# Vadesi gelen taksitleri yazan zamanlayıcı (create_app ile başlar) ve tur aralığı (saniye)
+app.config["INSTALLMENT_SCHEDULER"] = os.environ.get("PAYTRACK_INSTALLMENT_SCHEDULER", "1") == "1"
+app.config["INSTALLMENT_SCHEDULER_INTERVAL"] = float(os.environ.get("PAYTRACK_INSTALLMENT_SCHEDULER_INTERVAL", "60"))
+app.config["INSTALLMENT_BATCH_SIZE"] = int(os.environ.get("PAYTRACK_INSTALLMENT_BATCH_SIZE", "5000"))
+# Çevrim içi yedek aralığı (saat, 0 kapalı); yedekler sayfa parçaları halinde,
+# adımlar arasında BACKUP_SLEEP_MS beklenerek alınır, en yeni BACKUP_KEEP tanesi saklanır
+app.config["BACKUP_INTERVAL"] = float(os.environ.get("PAYTRACK_BACKUP_INTERVAL", "0"))
+app.config["BACKUP_DIR"] = os.environ.get("PAYTRACK_BACKUP_DIR", os.path.join(os.path.dirname(db_path), "backups"))
+app.config["BACKUP_KEEP"] = int(os.environ.get("PAYTRACK_BACKUP_KEEP", "7"))
+app.config["BACKUP_COMPRESS"] = os.environ.get("PAYTRACK_BACKUP_COMPRESS", "1") == "1"
+app.config["BACKUP_VACUUM"] = os.environ.get("PAYTRACK_BACKUP_VACUUM", "1") == "1"
+app.config["BACKUP_VERIFY"] = os.environ.get("PAYTRACK_BACKUP_VERIFY", "1") == "1"
+app.config["BACKUP_PAGES"] = int(os.environ.get("PAYTRACK_BACKUP_PAGES", "256"))
+app.config["BACKUP_SLEEP_MS"] = float(os.environ.get("PAYTRACK_BACKUP_SLEEP_MS", "5"))
 
 # PDF dosyalarının bulunduğu dizin
-PDF_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports')
+PDF_DIR = os.environ.get("PAYTRACK_REPORTS_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports'))
 
 # Flask-SQLAlchemy'yi başlat
 db.init_app(app)
+# Profil kaydı diğer hook'ları da kapsasın diye ilk sırada
+profile_store = init_profiling(app)
+init_query_budget(app)
+token_store = init_auth(app)
+admission_control = init_admission(app)
+read_cache = create_read_cache(app.config)
+# orjson kuruluysa JSON serileştirme onunla yapılır
+app.json = FastJSONProvider(app)
+init_compression(app)
+app.extensions["paytrack_read_cache"] = read_cache
+# numpy kuruluysa işlem sütunları analizler için bellekte tutulur (numpy ilk
+# analizde yüklenir)
+ledger_columns = analytics.LedgerColumns() if analytics.available() else None
+app.extensions["paytrack_ledger_columns"] = ledger_columns
+# Sharding açıkken her shard dosyasının sütunları ayrı tutulur
+shard_ledger_columns = {}
+app.extensions["paytrack_shards"] = create_shard_router(app.config)
 
-# Veritabanı tablolarını oluştur
-with app.app_context():
-    db.create_all()
+write_queue = create_write_queue(app)
+app.extensions["paytrack_write_queue"] = write_queue
+if write_queue is not None:
+    atexit.register(write_queue.close)
+
+
+_schema_lock = threading.Lock()
+_schema_ready = False
+app.extensions["paytrack_scheduler"] = None
+app.extensions["paytrack_backup"] = None
+
+
+def prepare_database():
+    """Açılış adımı: geçişleri uygular ve eksik tabloları oluşturur.
+
+    Modül import edilirken veritabanına dokunulmaz. Şema parmak izi
+    veritabanında saklandığından değişiklik yoksa tek SELECT ile geçer.
+    """
+    global _schema_ready
+    with _schema_lock:
+        if not _schema_ready:
+            with app.app_context():
+                prepare_schema(db.engine)
+            _schema_ready = True
+
+
+def start_background_jobs():
+    """Taksit zamanlayıcısını ve yedekleme işini (bir kez) başlatır"""
+    with _schema_lock:
+        for key, factory in (("paytrack_scheduler", create_installment_scheduler),
+                             ("paytrack_backup", create_backup_scheduler)):
+            if app.extensions[key] is None:
+                job = factory(app)
+                if job is not None:
+                    app.extensions[key] = job
+                    atexit.register(job.close)
+
+
+def create_app(background_jobs: bool = True):
+    """Uygulama giriş noktası: açılış adımını çalıştırıp uygulamayı döndürür.
+
+    background_jobs açıksa taksit zamanlayıcısı ve yedekleme işi de burada
+    başlatılır. İstekleri karşılamayan süreçler (reloader'ın izleyicisi)
+    False vermelidir; aksi halde işler iki süreçte birden çalışır.
+    """
+    prepare_database()
+    if background_jobs:
+        start_background_jobs()
+    return app
+
+
+@app.before_request
+def ensure_database():
+    """create_app çağrılmadan doğrudan `main:app` ile açılan sunucular için"""
+    if not _schema_ready:
+        prepare_database()
+
+
+@app.before_request
+def route_to_shard():
+    """Sharding açıksa isteğin sorgularını kullanıcının dosyasına yönlendirir"""
+    router = app.extensions["paytrack_shards"]
+    if router is None:
+        return None
+    data = request.get_json(silent=True) if request.is_json else None
+    user_id = request_user_id(
+        request.args.get("user_id") or (data.get("user_id") if isinstance(data, dict) else None)
+    )
+    if user_id:
+        try:
+            g.paytrack_shard = router.shard_for(user_id)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+    return None
+
+
+def current_ledger_columns():
+    key = current_shard()
+    if key is None or ledger_columns is None:
+        return ledger_columns
+    return shard_ledger_columns.setdefault(key, analytics.LedgerColumns())
+
+
+def post_ledger(customer, transaction_type, amount, description='', reply=None):
+    """İşlemi yazar; yazma kuyruğu açıksa yazıcı iş parçacığının commit'ini bekler.
+
+    reply, istek Idempotency-Key taşıyorsa işlemle aynı commit'te saklanacak
+    başarılı yanıt gövdesidir.
+    """
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    record = idempotency_record(reply) if reply is not None else None
+    queue = app.extensions["paytrack_write_queue"]
+    try:
+        if queue is None:
+            if record is None:
+                return customer.add_transaction(transaction_type, amount, timestamp, description)
+            try:
+                transaction_id = post_transaction(customer.id, transaction_type, amount, timestamp, description)[0]
+                store_response(record)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            return transaction_id
+        customer_id = customer.id
+        # Beklerken bağlantıyı tutma; havuz dolarsa yazıcı iş parçacığı bağlantı alamaz
+        db.session.commit()
+        return queue.submit(customer_id, transaction_type, amount, timestamp, description, record).result()
+    except IdempotencyConflict:
+        g.idempotency_conflict = True
+        raise
 
 @app.route("/")
+@query_budget(0)
 def home():
     return jsonify({
         "message": "PayTrack API çalışıyor",
@@ -54,6 +272,7 @@ def home():
     })
 
 @app.route("/users/", methods=["POST"])
+@query_budget(3)
 def create_user():
     data = request.get_json()
     username = data.get("username")
@@ -72,77 +291,151 @@ def create_user():
             "message": "Kullanıcı başarıyla oluşturuldu",
             "user_id": user.id
         })
+    except HashPoolBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Kullanıcı oluşturulurken bir hata oluştu: {str(e)}"}), 500
 
 @app.route("/customers/", methods=["GET", "POST"])
+@query_budget(GET=2, POST=5)
+@idempotent
 def handle_customers():
     if request.method == 'GET':
-        user_id = request.args.get('user_id')
+        user_id = request_user_id(request.args.get('user_id'))
         if not user_id:
             return jsonify({'error': 'user_id gerekli!'}), 400
         
-        try:
+        def load():
             customers = db.session.query(Customer).filter_by(user_id=user_id).all()
-            return jsonify([str(customer) for customer in customers])
+            return [str(customer) for customer in customers]
+        
+        def build(seq):
+            return jsonify(read_cache.get_or_build(user_id, 'customers', load, seq))
+        
+        try:
+            # Veri değişmediyse müşteri tablosuna dokunmadan 304 döner;
+            # X-Change-Seq ile istemci /changes üzerinden delta alabilir
+            return conditional_get(user_id, 'customers', build)
         except Exception as e:
             return jsonify({'error': f'Müşteriler alınırken bir hata oluştu: {str(e)}'}), 500
     
     elif request.method == 'POST':
         data = request.json
-        required_fields = ['user_id', 'name', 'urun', 'borc']
+        required_fields = ['name', 'urun', 'borc']
+        user_id = request_user_id(data.get('user_id'))
         
-        if not all(field in data for field in required_fields):
+        if not user_id or not all(field in data for field in required_fields):
             return jsonify({'error': 'Eksik alanlar var!'}), 400
         
         try:
             customer = Customer(
-                user_id=data['user_id'],
+                user_id=user_id,
                 name=data['name'],
                 urun=data['urun'],
-                borc=float(data['borc'])
+                borc=to_kurus(data['borc'])
             )
             db.session.add(customer)
+            db.session.flush()
+            Change.record(customer, Change.CUSTOMER)
+            message = {'message': 'Müşteri başarıyla eklendi!'}
+            remember_response(message)
             db.session.commit()
-            return jsonify({'message': 'Müşteri başarıyla eklendi!'})
+            read_cache.invalidate(user_id, data['name'])
+            return jsonify(message)
+        except ValueError as e:
+            db.session.rollback()
+            return jsonify({'error': str(e)}), 400
         except Exception as e:
             db.session.rollback()
             return jsonify({'error': f'Müşteri eklenirken bir hata oluştu: {str(e)}'}), 500
 
+@app.route('/customers/import', methods=['POST'])
+# Mevcut adlar için 1 sorgu + 500 satırlık parça başına müşteri ve işlem INSERT'leri (id'leriyle),
+# zincir başı güncellemesi, rollup ve değişiklik INSERT'i
+@query_budget(1, per_chunk=7)
+@admission(concurrency=2, queue=4, wait=10)
+def import_customer_file():
+    """CSV veya XLSX dosyasından toplu müşteri ekler.
+
+    Dosya multipart 'file' alanında ya da ham istek gövdesinde gönderilir;
+    biçim format parametresinden, dosya uzantısından veya Content-Type'tan
+    anlaşılır. Tüm dosya tek işlemde yazılır; aynı dosya tekrar gönderilirse
+    kayıtlı müşteriler atlanır.
+    """
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    filename = (upload.filename if upload else '') or ''
+    file_format = request.args.get('format') or (
+        'xlsx' if filename.lower().endswith('.xlsx') or 'spreadsheetml' in (request.mimetype or '') else 'csv'
+    )
+    if file_format not in ('csv', 'xlsx'):
+        return jsonify({'error': 'format csv veya xlsx olmalı!'}), 400
+    if upload is None and not request.content_length:
+        return jsonify({'error': 'Dosya gerekli!'}), 400
+    
+    try:
+        records = iter_xlsx(stream) if file_format == 'xlsx' else iter_csv(stream)
+        summary = import_customers(user_id, records)
+        charge_chunks(summary['imported'], IMPORT_CHUNK_SIZE)
+        db.session.commit()
+        read_cache.invalidate(user_id)
+        return jsonify(summary)
+    except ImportUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Müşteriler aktarılırken bir hata oluştu: {str(e)}'}), 500
+
 @app.route('/customers/borc-ekle/', methods=['POST'])
+@query_budget(8)
+@idempotent
 def add_debt():
     data = request.json
-    required_fields = ['user_id', 'customer_name', 'amount']
+    required_fields = ['customer_name', 'amount']
+    user_id = request_user_id(data.get('user_id'))
     
-    if not all(field in data for field in required_fields):
+    if not user_id or not all(field in data for field in required_fields):
         return jsonify({'error': 'Eksik alanlar var!'}), 400
     
     try:
         customer = db.session.query(Customer).filter_by(
-            user_id=data['user_id'],
+            user_id=user_id,
             name=data['customer_name']
         ).first()
         
         if not customer:
             return jsonify({'error': 'Müşteri bulunamadı!'}), 404
         
-        amount = float(data['amount'])
+        amount = to_kurus(data['amount'])
         description = data.get('description', '')  # Açıklama alanını al
-        customer.add_transaction('borc', amount, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), description)
+        message = {'message': 'Borç başarıyla eklendi!'}
+        post_ledger(customer, 'borc', amount, description, reply=message)
         db.session.commit()
+        read_cache.invalidate(user_id, data['customer_name'])
         
-        return jsonify({'message': 'Borç başarıyla eklendi!'})
+        return jsonify(message)
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Borç eklenirken bir hata oluştu: {str(e)}'}), 500
 
 @app.route("/customers/odeme-yap/", methods=["POST"])
+@query_budget(8)
+@idempotent
 def make_payment():
     data = request.get_json()
-    user_id = data.get("user_id")
+    user_id = request_user_id(data.get("user_id"))
     customer_name = data.get("customer_name")
     amount = data.get("amount")
     description = data.get("description", "")  # Açıklama alanını al
@@ -151,7 +444,7 @@ def make_payment():
         return jsonify({"error": "user_id, customer_name ve amount alanları gerekli"}), 400
     
     try:
-        amount = float(amount)
+        amount = to_kurus(amount)
         customer = db.session.query(Customer).filter_by(
             user_id=user_id,
             name=customer_name
@@ -160,34 +453,45 @@ def make_payment():
         if not customer:
             return jsonify({"error": "Müşteri bulunamadı"}), 404
         
-        customer.add_transaction('odeme', amount, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), description)
+        message = {"message": "Ödeme başarıyla kaydedildi"}
+        post_ledger(customer, 'odeme', amount, description, reply=message)
         db.session.commit()
+        read_cache.invalidate(user_id, customer_name)
         
-        return jsonify({"message": "Ödeme başarıyla kaydedildi"})
+        return jsonify(message)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Ödeme yapılırken bir hata oluştu: {str(e)}"}), 500
 
 @app.route("/generate-pdf/", methods=["POST"])
+@query_budget(5)
+@admission(concurrency=2, queue=4, wait=10, rate=0.2, burst=3)
 def generate_pdf():
     data = request.json
-    required_fields = ['user_id', 'customer_name']
+    required_fields = ['customer_name']
+    user_id = request_user_id(data.get('user_id'))
     
-    if not all(field in data for field in required_fields):
+    if not user_id or not all(field in data for field in required_fields):
         return jsonify({'error': 'Eksik alanlar var!'}), 400
     
     try:
         customer = db.session.query(Customer).filter_by(
-            user_id=data['user_id'],
+            user_id=user_id,
             name=data['customer_name']
         ).first()
         
         if not customer:
             return jsonify({'error': 'Müşteri bulunamadı!'}), 404
         
-        pdf_path = save_pdf(customer)
+        # Tarih aralığı verilirse gerekirse arşivden okunur
+        transactions = None
+        if data.get('start') or data.get('end'):
+            transactions = transaction_history(customer.id, data.get('start'), data.get('end'))
+        pdf_path = save_pdf(customer, transactions)
         filename = os.path.basename(pdf_path)
         
         return jsonify({
@@ -199,39 +503,48 @@ def generate_pdf():
         return jsonify({'error': f'PDF oluşturulurken bir hata oluştu: {str(e)}'}), 500
 
 @app.route('/dashboard/', methods=['GET'])
+@query_budget(3)
 def get_dashboard_data():
-    user_id = request.args.get('user_id')
+    user_id = request_user_id(request.args.get('user_id'))
     if not user_id:
         return jsonify({'error': 'user_id gerekli!'}), 400
     
-    try:
-        customers = db.session.query(Customer).filter_by(user_id=user_id).all()
-        total_customers = len(customers)
-        total_debt = sum(customer.borc for customer in customers)
+    def load():
+        # Toplamlar tek sorguda, müşteri satırları belleğe alınmadan
+        total_customers, total_debt = db.session.query(
+            func.count(Customer.id),
+            func.coalesce(func.sum(Customer.borc), 0)
+        ).filter(Customer.user_id == user_id).one()
         
-        # Son işlemleri topla
-        recent_transactions = []
-        for customer in customers:
-            recent_transactions.extend(customer.get_recent_transactions())
+        # Son 10 işlem, müşteri adıyla birlikte tek sorguda
+        recent_transactions = db.session.query(Transaction, Customer.name).join(
+            Customer, Transaction.customer_id == Customer.id
+        ).filter(
+            Customer.user_id == user_id
+        ).order_by(Transaction.timestamp.desc(), Transaction.id.desc()).limit(10).all()
         
-        recent_transactions.sort(key=lambda x: x.timestamp, reverse=True)
-        recent_transactions = recent_transactions[:10]  # Son 10 işlem
-        
-        return jsonify({
+        return {
             'totalCustomers': total_customers,
-            'totalDebt': total_debt,
+            'totalDebt': lira(total_debt),
             'recentTransactions': len(recent_transactions),
             'transactions': [{
-                'customerName': t.customer.name,
+                'customerName': customer_name,
                 'type': t.transaction_type,
-                'amount': t.amount,
+                'amount': lira(t.amount),
                 'date': t.timestamp
-            } for t in recent_transactions]
-        })
+            } for t, customer_name in recent_transactions]
+        }
+    
+    def build(seq):
+        return jsonify(read_cache.get_or_build(user_id, 'dashboard', load, seq))
+    
+    try:
+        return conditional_get(user_id, 'dashboard', build)
     except Exception as e:
         return jsonify({'error': f'Veriler alınırken bir hata oluştu: {str(e)}'}), 500
 
 @app.route('/login/', methods=['POST'])
+@query_budget(1)
 def login():
     data = request.json
     username = data.get('username')
@@ -246,24 +559,39 @@ def login():
         if user and user.check_password(password):
             return jsonify({
                 'message': 'Giriş başarılı!',
-                'user_id': user.id
+                'user_id': user.id,
+                'token': token_store.issue(user.id),
+                'expires_in': token_store.ttl
             })
         else:
             return jsonify({'error': 'Geçersiz kullanıcı adı veya şifre!'}), 401
+    except HashPoolBusy as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': f'Giriş yapılırken bir hata oluştu: {str(e)}'}), 500
 
+@app.route('/logout/', methods=['POST'])
+@query_budget(0)
+def logout():
+    """Oturum token'ını iptal eder"""
+    token = bearer_token()
+    if token:
+        token_store.revoke(token)
+    return jsonify({'message': 'Çıkış yapıldı!'})
+
 @app.route('/pdf/<filename>')
+@query_budget(0)
 def get_pdf(filename):
     """PDF dosyasını indir"""
     return send_from_directory(PDF_DIR, filename)
 
 @app.route('/pdf/list/<customer_name>')
+@query_budget(0)
 def list_pdfs(customer_name):
     """Müşteriye ait en son PDF'i listele"""
     try:
         # Reports klasörünü kontrol et
-        reports_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports')
+        reports_dir = PDF_DIR
         
         # Müşterinin tüm PDF'lerini bul ve tarihe göre sırala
         pdfs = sorted(
@@ -297,56 +625,297 @@ def list_pdfs(customer_name):
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/customers/transactions/<customer_name>', methods=['GET'])
+@query_budget(4)
+@admission(concurrency=4, queue=16, wait=5, rate=5, burst=20)
 def get_customer_transactions(customer_name):
-    """Müşterinin işlem geçmişini döndürür"""
+    """Müşterinin işlem geçmişini döndürür.
+
+    start/end (YYYY-MM-DD) verilip aralık arşiv sınırının gerisine uzanırsa
+    arşiv dosyaları da okunur; aksi halde sadece ana tablo kullanılır.
+    """
     try:
-        customer = db.session.query(Customer).filter_by(name=customer_name).first()
+        user_id = request_user_id(request.args.get('user_id'))
+        start = request.args.get('start')
+        end = request.args.get('end')
         
-        if not customer:
+        if start or end:
+            query = db.session.query(Customer.id).filter_by(name=customer_name)
+            if user_id:
+                query = query.filter_by(user_id=user_id)
+            customer_id = query.scalar()
+            if customer_id is None:
+                return jsonify({'error': 'Müşteri bulunamadı!'}), 404
+            rows = transaction_history(customer_id, start, end)
+            return jsonify({
+                'success': True,
+                'transactions': [history_row_to_dict(row) for row in rows]
+            })
+        
+        def load():
+            query = db.session.query(Customer).filter_by(name=customer_name)
+            if user_id:
+                query = query.filter_by(user_id=user_id)
+            customer = query.first()
+            if not customer:
+                return None
+            return [t.to_dict() for t in customer.get_transaction_history()]
+        
+        transactions = read_cache.get_or_build(user_id, 'history', load, customer_name)
+        if transactions is None:
             return jsonify({'error': 'Müşteri bulunamadı!'}), 404
         
-        transactions = customer.get_transaction_history()
         return jsonify({
             'success': True,
-            'transactions': [t.to_dict() for t in transactions]
+            'transactions': transactions
         })
     except Exception as e:
         return jsonify({'error': f'İşlem geçmişi alınırken bir hata oluştu: {str(e)}'}), 500
 
+@app.route('/changes', methods=['GET'])
+@query_budget(3)
+def get_changes():
+    """since numarasından sonraki müşteri ve işlem değişikliklerini döndürür"""
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', 500)), 5000)
+    except ValueError:
+        return jsonify({'error': 'since ve limit sayı olmalı!'}), 400
+    
+    try:
+        return jsonify(collect_changes(user_id, since, limit))
+    except Exception as e:
+        return jsonify({'error': f'Değişiklikler alınırken bir hata oluştu: {str(e)}'}), 500
+
+@app.route('/events', methods=['GET'])
+@query_budget(3)
+def change_events():
+    """Değişiklikleri Server-Sent Events olarak yayınlar"""
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    
+    try:
+        since = int(request.headers.get('Last-Event-ID') or request.args.get('since', 0))
+    except ValueError:
+        return jsonify({'error': 'since sayı olmalı!'}), 400
+    
+    interval = app.config["CHANGE_POLL_INTERVAL"]
+    
+    @stream_with_context
+    def stream(seq):
+        last_sent = time.monotonic()
+        yield 'retry: 3000\n\n'
+        while True:
+            delta = collect_changes(user_id, seq)
+            # Okuma işlemini bitir, bağlantıyı havuza geri ver
+            db.session.rollback()
+            if delta['seq'] != seq:
+                seq = delta['seq']
+                last_sent = time.monotonic()
+                yield f"id: {seq}\nevent: change\ndata: {json.dumps(delta, ensure_ascii=False)}\n\n"
+                if delta['has_more']:
+                    continue
+            elif time.monotonic() - last_sent >= 15:
+                # Proxy'lerin bağlantıyı kapatmaması için yorum satırı
+                last_sent = time.monotonic()
+                yield ': keep-alive\n\n'
+            time.sleep(interval)
+    
+    return Response(stream(since), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/reports/aging', methods=['GET'])
+@query_budget(2)
+@admission(concurrency=4, queue=16, wait=5)
+def get_aging_report():
+    """Açık borçların 0-30/31-60/61-90/90+ gün yaşlandırma raporu"""
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    
+    as_of = request.args.get('as_of') or datetime.now().strftime('%Y-%m-%d')
+    try:
+        datetime.strptime(as_of, '%Y-%m-%d')
+    except ValueError:
+        return jsonify({'error': 'as_of YYYY-MM-DD formatında olmalı!'}), 400
+    
+    try:
+        return conditional_get(user_id, f'aging-{as_of}', lambda seq: jsonify(aging_report(user_id, as_of)))
+    except Exception as e:
+        return jsonify({'error': f'Rapor oluşturulurken bir hata oluştu: {str(e)}'}), 500
+
+@app.route('/reports/timeseries', methods=['GET'])
+@query_budget(2)
+@admission(concurrency=4, queue=16, wait=5)
+def get_timeseries_report():
+    """Günlük borç, ödeme ve alacak toplamları"""
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    
+    start = request.args.get('start', '0000-00-00')
+    end = request.args.get('end', '9999-99-99')
+    try:
+        return conditional_get(
+            user_id, f'timeseries-{start}-{end}',
+            lambda seq: jsonify(timeseries_report(user_id, start, end))
+        )
+    except Exception as e:
+        return jsonify({'error': f'Rapor oluşturulurken bir hata oluştu: {str(e)}'}), 500
+
+@app.route('/reports/analytics', methods=['GET'])
+@query_budget(4)
+@admission(concurrency=2, queue=8, wait=10, rate=1, burst=5)
+def get_analytics_report():
+    """Portföy özeti: bakiye, ödeme hızı, ortalama ödeme süresi ve en borçlu müşteriler"""
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    columns = current_ledger_columns()
+    if columns is None:
+        return jsonify({'error': 'Analiz için numpy kurulu olmalı!'}), 501
+    
+    try:
+        top = int(request.args.get('top', 10))
+        window = int(request.args.get('window_days', 90))
+    except ValueError:
+        return jsonify({'error': 'top ve window_days sayı olmalı!'}), 400
+    if window <= 0:
+        return jsonify({'error': 'window_days 0\'dan büyük olmalı!'}), 400
+    
+    # Ödeme hızı bugüne göre hesaplandığı için ETag güne bağlıdır
+    today = datetime.now().strftime('%Y-%m-%d')
+    try:
+        return conditional_get(
+            user_id, f'analytics-{top}-{window}-{today}',
+            lambda seq: jsonify(analytics.ledger_analytics(columns, user_id, top, window))
+        )
+    except Exception as e:
+        return jsonify({'error': f'Rapor oluşturulurken bir hata oluştu: {str(e)}'}), 500
+
+@app.route('/metrics/cache', methods=['GET'])
+@query_budget(0)
+def cache_metrics():
+    """Okuma önbelleğinin isabet oranını döndürür"""
+    return jsonify(read_cache.stats())
+
+@app.route('/metrics/admission', methods=['GET'])
+@query_budget(0)
+def admission_metrics():
+    """Sınırlı route'ların sıra derinliği ve red sayaçlarını döndürür"""
+    return jsonify({'enabled': app.config["ADMISSION_CONTROL"], 'endpoints': admission_control.stats()})
+
+@app.route('/metrics/writes', methods=['GET'])
+@query_budget(0)
+def write_metrics():
+    """Yazma kuyruğunun toplu commit istatistiklerini döndürür"""
+    queue = app.extensions["paytrack_write_queue"]
+    return jsonify({'enabled': queue is not None, **(queue.stats() if queue else {})})
+
+@app.route('/admin/profiles', methods=['GET'])
+@query_budget(0)
+def list_profiles():
+    """Son istek profillerinin özetleri (en yenisi başta)"""
+    if not admin_authorized(app):
+        return jsonify({'error': 'Yetkiniz yok!'}), 403
+    limit = min(request.args.get('limit', default=50, type=int), 500)
+    return jsonify({'profiles': profile_store.list(limit)})
+
+@app.route('/admin/profiles/<profile_id>', methods=['GET'])
+@query_budget(0)
+def get_profile(profile_id):
+    """Profil ayrıntısı (SQL ifadeleri ve en pahalı fonksiyonlar) ya da ?format=pstats ile .prof dosyası"""
+    if not admin_authorized(app):
+        return jsonify({'error': 'Yetkiniz yok!'}), 403
+    try:
+        summary = profile_store.load(profile_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if summary is None:
+        return jsonify({'error': 'Profil bulunamadı!'}), 404
+    if request.args.get('format') == 'pstats':
+        return send_from_directory(profile_store.directory, f"{profile_id}.prof", as_attachment=True)
+    return jsonify(summary)
+
 @app.route("/test-log")
+@query_budget(0)
 def test_log():
     print("Test log: Backend çalışıyor!")
     return jsonify({"message": "Test başarılı, terminal loglarını kontrol et!"})
 
 @app.route('/customers/<customer_name>', methods=['DELETE'])
+# Müşteri, bağlı her tablo için tek DELETE, changes ve arşiv kataloğu
+@query_budget(14)
+@idempotent
 def delete_customer(customer_name):
-    user_id = request.args.get('user_id')
+    user_id = request_user_id(request.args.get('user_id'))
     
     if not user_id:
         return jsonify({'error': 'user_id gerekli!'}), 400
     
     try:
-        customer = db.session.query(Customer).filter_by(
+        customer_id = db.session.query(Customer.id).filter_by(
             user_id=user_id,
             name=customer_name
-        ).first()
+        ).scalar()
         
-        if not customer:
+        if not customer_id:
             return jsonify({'error': 'Müşteri bulunamadı!'}), 404
         
-        # Müşteriyi sil
-        db.session.delete(customer)
+        # Müşteriyi işlemleri ve bağlı satırlarıyla birlikte sil
+        delete_customers([customer_id])
+        message = {'message': 'Müşteri başarıyla silindi!'}
+        remember_response(message)
         db.session.commit()
+        read_cache.invalidate(user_id, customer_name)
+        purge_archived([customer_id])
         
-        return jsonify({'message': 'Müşteri başarıyla silindi!'})
+        return jsonify(message)
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Müşteri silinirken bir hata oluştu: {str(e)}'}), 500
 
+@app.route('/customers/purge', methods=['POST'])
+# Parça başına bir DELETE ... RETURNING, bağlı tablolar ve arşiv kataloğu
+@query_budget(14)
+@admission(concurrency=1, queue=2, wait=10)
+def purge_inactive_customers():
+    """Bakiyesi sıfır ve uzun süredir hareketsiz müşterileri parça parça siler.
+
+    {user_id, inactive_days (365), max_balance (TL, 0), chunk_size, archive,
+    dry_run}; archive açıksa müşteriler ve işlemleri silinmeden önce arşiv
+    dosyasına kopyalanır.
+    """
+    data = request.get_json(silent=True) or {}
+    user_id = request_user_id(data.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    try:
+        result = purge_customers(
+            user_id, int(data.get('inactive_days', 365)), to_kurus(data.get('max_balance', 0)),
+            int(data.get('chunk_size', PURGE_CHUNK_SIZE)), archive=bool(data.get('archive')),
+            dry_run=bool(data.get('dry_run')),
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Müşteriler silinirken bir hata oluştu: {str(e)}'}), 500
+    if result['customers'] and not result['dry_run']:
+        read_cache.invalidate(user_id)
+    return jsonify(result)
+
 @app.route("/customers/alacak-ekle/", methods=["POST"])
+@query_budget(8)
+@idempotent
 def add_receivable():
     data = request.get_json()
-    user_id = data.get("user_id")
+    user_id = request_user_id(data.get("user_id"))
     customer_name = data.get("customer_name")
     amount = data.get("amount")
     description = data.get("description", "")
@@ -355,7 +924,7 @@ def add_receivable():
         return jsonify({"error": "user_id, customer_name ve amount alanları gerekli"}), 400
     
     try:
-        amount = float(amount)
+        amount = to_kurus(amount)
         customer = db.session.query(Customer).filter_by(
             user_id=user_id,
             name=customer_name
@@ -364,16 +933,253 @@ def add_receivable():
         if not customer:
             return jsonify({"error": "Müşteri bulunamadı"}), 404
         
-        customer.add_transaction('alacak', amount, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), description)
+        message = {"message": "Alacak başarıyla kaydedildi"}
+        post_ledger(customer, 'alacak', amount, description, reply=message)
         db.session.commit()
+        read_cache.invalidate(user_id, customer_name)
         
-        return jsonify({"message": "Alacak başarıyla kaydedildi"})
+        return jsonify(message)
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Alacak eklenirken bir hata oluştu: {str(e)}"}), 500
 
+@app.route('/customers/installments', methods=['GET', 'POST'])
+@query_budget(GET=3, POST=7)
+@idempotent
+def handle_installments():
+    """Müşterinin taksit planlarını listeler ya da yeni plan oluşturur.
+
+    POST: {user_id, customer_name, amount (taksit tutarı), count,
+    interval (daily/weekly/monthly), start (YYYY-AA-GG), description}
+    """
+    data = (request.get_json(silent=True) or {}) if request.method == 'POST' else request.args
+    user_id = request_user_id(data.get('user_id'))
+    customer_name = data.get('customer_name')
+    if not user_id or not customer_name:
+        return jsonify({'error': 'user_id ve customer_name gerekli!'}), 400
+
+    customer = db.session.query(Customer).filter_by(user_id=user_id, name=customer_name).first()
+    if not customer:
+        return jsonify({'error': 'Müşteri bulunamadı!'}), 404
+
+    if request.method == 'GET':
+        plans = db.session.query(InstallmentPlan).filter_by(customer_id=customer.id).order_by(InstallmentPlan.id).all()
+        progress = plan_progress([plan.id for plan in plans])
+        return jsonify({'plans': [plan.to_dict(*progress.get(plan.id, (0, 0))) for plan in plans]})
+
+    if 'amount' not in data or 'count' not in data:
+        return jsonify({'error': 'amount ve count gerekli!'}), 400
+    try:
+        plan = create_plan(
+            customer, to_kurus(data['amount']), data['count'], data.get('interval', 'monthly'),
+            data.get('start'), data.get('description', '')
+        )
+        db.session.flush()
+        body = {'message': 'Taksit planı oluşturuldu!', 'plan': plan.to_dict(pending=plan.count)}
+        remember_response(body)
+        db.session.commit()
+        return jsonify(body)
+    except (ValueError, TypeError) as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Taksit planı oluşturulurken bir hata oluştu: {str(e)}'}), 500
+
+@app.route('/customers/installments/<int:plan_id>', methods=['DELETE'])
+@query_budget(4)
+def cancel_installments(plan_id):
+    """Planın henüz yazılmamış taksitlerini iptal eder; yazılmış borçlar kalır"""
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    plan = db.session.query(InstallmentPlan).filter_by(id=plan_id, user_id=user_id).first()
+    if plan is None:
+        return jsonify({'error': 'Taksit planı bulunamadı!'}), 404
+    cancelled = cancel_plan(plan)
+    db.session.commit()
+    return jsonify({'message': 'Taksit planı iptal edildi!', 'cancelled': cancelled})
+
+@app.route('/customers/late-fees', methods=['POST'])
+# Faiz INSERT ... SELECT + okuma + toplu yazma (post_transactions_bulk, en fazla 8) + faiz satırlarının
+# işlem id'leri; müşteri sayısından bağımsızdır
+@query_budget(11)
+@admission(concurrency=1, queue=4, wait=10)
+def accrue_customer_late_fees():
+    """Kullanıcının gecikmiş bakiyelerine dönemlik gecikme faizi yazar.
+
+    {user_id, rate (aylık %), period (YYYY-AA), grace_days, min_balance (TL),
+    dry_run}; aynı dönem için tekrar çağrılırsa faizi yazılmış müşteriler atlanır.
+    """
+    data = request.get_json(silent=True) or {}
+    user_id = request_user_id(data.get('user_id'))
+    if not user_id or 'rate' not in data:
+        return jsonify({'error': 'user_id ve rate gerekli!'}), 400
+    try:
+        result = accrue_late_fees(
+            data['rate'], data.get('period'), user_id, int(data.get('grace_days', 30)),
+            to_kurus(data.get('min_balance', 0)), dry_run=bool(data.get('dry_run')),
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Gecikme faizi hesaplanırken bir hata oluştu: {str(e)}'}), 500
+    if not result['dry_run']:
+        for fee in result['fees']:
+            read_cache.invalidate(user_id, fee['name'])
+    return jsonify(result)
+
+@app.route('/reconciliation/statements', methods=['POST'])
+# Müşteriler için 1 sorgu + 500 satırlık parça başına parmak izi kontrolü ve toplu INSERT
+@query_budget(1, per_chunk=2)
+@admission(concurrency=2, queue=4, wait=10)
+def upload_statement():
+    """Banka/POS hesap özetini (CSV veya XLSX) yükler ve satırları müşterilerle eşleştirir.
+
+    Dosya /customers/import'taki gibi gönderilir. Kesin eşleşmeler "matched",
+    bulanık eşleşmeler "suggested" olarak inceleme kuyruğuna düşer; hiçbir
+    ödeme onaylanmadan yazılmaz.
+    """
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    filename = (upload.filename if upload else '') or ''
+    file_format = request.args.get('format') or (
+        'xlsx' if filename.lower().endswith('.xlsx') or 'spreadsheetml' in (request.mimetype or '') else 'csv'
+    )
+    if file_format not in ('csv', 'xlsx'):
+        return jsonify({'error': 'format csv veya xlsx olmalı!'}), 400
+    if upload is None and not request.content_length:
+        return jsonify({'error': 'Dosya gerekli!'}), 400
+
+    try:
+        reader = iter_xlsx if file_format == 'xlsx' else iter_csv
+        summary = ingest_statement(user_id, reader(stream, STATEMENT_ALIASES, 'amount'))
+        charge_chunks(summary['new'] + summary['duplicates'], STATEMENT_CHUNK_SIZE)
+        db.session.commit()
+        return jsonify(summary)
+    except ImportUnavailable as e:
+        return jsonify({'error': str(e)}), 501
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Hesap özeti işlenirken bir hata oluştu: {str(e)}'}), 500
+
+@app.route('/reconciliation/queue', methods=['GET'])
+@query_budget(2)
+def reconciliation_queue():
+    """İnceleme bekleyen hesap özeti satırlarını aday müşterileriyle listeler"""
+    user_id = request_user_id(request.args.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    statuses = tuple(request.args.get('status', ','.join(OPEN)).split(','))
+    lines = review_queue(user_id, statuses, min(int(request.args.get('limit', 500)), 5000))
+    return jsonify({'lines': lines})
+
+@app.route('/reconciliation/review', methods=['POST'])
+# Ret + talep + müşteriler + toplu yazma (post_transactions_bulk, en fazla 8) + satır güncellemeleri;
+# onaylanan satır sayısından bağımsızdır
+@query_budget(13)
+@idempotent
+def review_statement_lines():
+    """Eşleşmeleri onaylar/reddeder; onaylananlar tek işlemde ödeme olarak yazılır.
+
+    {user_id, approve: [{line_id, customer_id?}], reject: [line_id],
+    approve_matched: true} — approve_matched tüm kesin eşleşmeleri onaylar.
+    """
+    data = request.get_json(silent=True) or {}
+    user_id = request_user_id(data.get('user_id'))
+    if not user_id:
+        return jsonify({'error': 'user_id gerekli!'}), 400
+    try:
+        approvals = {int(item['line_id']): (int(item['customer_id']) if item.get('customer_id') else None)
+                     for item in data.get('approve', [])}
+        rejections = [int(line_id) for line_id in data.get('reject', [])]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Geçersiz satır listesi!'}), 400
+    if not (approvals or rejections or data.get('approve_matched')):
+        return jsonify({'error': 'Onaylanacak ya da reddedilecek satır yok!'}), 400
+
+    try:
+        result = post_approved(user_id, approvals, rejections, bool(data.get('approve_matched')))
+        remember_response(result)
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': f'Ödemeler yazılırken bir hata oluştu: {str(e)}'}), 500
+    for name in result['customers']:
+        read_cache.invalidate(user_id, name)
+    return jsonify(result)
+
+@app.route('/admin/ledger/verify', methods=['POST'])
+# Doğrulama ham SQLite bağlantılarıyla yapılır
+@query_budget(0)
+@admission(concurrency=1, queue=2, wait=5)
+def verify_ledger_chains():
+    """İşlem defterinin hash zincirlerini doğrular (X-Admin-Key gerekir).
+
+    {full, workers}: full verilmezse yalnızca son doğrulamadan sonra
+    değişen müşteriler kontrol edilir; workers tam doğrulamadaki süreç sayısıdır.
+    """
+    if not admin_authorized(app):
+        return jsonify({'error': 'Yetkiniz yok!'}), 403
+    data = request.get_json(silent=True) or {}
+    try:
+        workers = int(data.get('workers', 1))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'workers sayı olmalı!'}), 400
+    shards = []
+    for key, engine in ledger_engines(app):
+        shards.append({'shard': key, **verify_ledger(engine, bool(data.get('full')), min(max(workers, 1), 16))})
+    return jsonify({'ok': all(shard['ok'] for shard in shards), 'shards': shards})
+
+@app.route('/metrics/installments', methods=['GET'])
+@query_budget(0)
+def installment_metrics():
+    """Taksit zamanlayıcısının tur istatistiklerini döndürür"""
+    scheduler = app.extensions["paytrack_scheduler"]
+    return jsonify({'enabled': scheduler is not None, **(scheduler.stats() if scheduler else {})})
+
+@app.route('/admin/backup', methods=['POST'])
+# Yedek ham SQLite bağlantılarıyla alınır
+@query_budget(0)
+@admission(concurrency=1, queue=0, wait=0)
+def take_backup():
+    """Tüm veritabanı dosyalarının çevrim içi yedeğini hemen alır (X-Admin-Key gerekir)"""
+    if not admin_authorized(app):
+        return jsonify({'error': 'Yetkiniz yok!'}), 403
+    job = app.extensions["paytrack_backup"] or BackupScheduler(
+        app, interval=0, directory=app.config["BACKUP_DIR"], keep=app.config["BACKUP_KEEP"],
+        compress=app.config["BACKUP_COMPRESS"], vacuum=app.config["BACKUP_VACUUM"],
+        verify=app.config["BACKUP_VERIFY"], pages=app.config["BACKUP_PAGES"],
+        sleep=app.config["BACKUP_SLEEP_MS"] / 1000, start=False,
+    )
+    try:
+        job.tick()
+    except Exception as e:
+        return jsonify({'error': f'Yedek alınırken bir hata oluştu: {str(e)}'}), 500
+    return jsonify(job.stats())
+
+@app.route('/metrics/backup', methods=['GET'])
+@query_budget(0)
+def backup_metrics():
+    """Zamanlanmış yedeklerin süre ve kilit istatistiklerini döndürür"""
+    job = app.extensions["paytrack_backup"]
+    return jsonify({'enabled': job is not None, **(job.stats() if job else {})})
+
 if __name__ == "__main__":
     print(f"Database path: {db_path}")
-    app.run(debug=True, host='0.0.0.0')
+    # debug reloader'ı açar; zamanlayıcılar yalnızca istekleri karşılayan alt süreçte başlar
+    create_app(background_jobs=os.environ.get("WERKZEUG_RUN_MAIN") == "true").run(debug=True, host='0.0.0.0')
@@ -0,0 +1,198 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import secrets
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from backend.app.auth import request_user_id
+
+# Profil kimliği: 20250101-093000-a1b2c3
+PROFILE_ID = re.compile(r"^\d{8}-\d{6}-[0-9a-f]{6}$")
+# Kayıtta tutulan en yavaş SQL ifadesi ve fonksiyon sayısı
+TOP_STATEMENTS = 50
+TOP_FUNCTIONS = 30
+
+_listener_installed = False
+
+
+def _sql_start(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "profile_sql" in g:
+        g.profile_sql_started = time.perf_counter()
+
+
+def _sql_end(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "profile_sql" in g and "profile_sql_started" in g:
+        elapsed = time.perf_counter() - g.pop("profile_sql_started")
+        g.profile_sql.append((round(elapsed * 1000, 3), " ".join(statement.split())[:500]))
+
+
+class ProfileStore:
+    """Profilleri dizinde <id>.prof (pstats) ve <id>.json (özet) olarak tutar"""
+
+    def __init__(self, directory: str, keep: int = 50):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def path(self, profile_id: str, suffix: str) -> str:
+        if not PROFILE_ID.match(profile_id or ""):
+            raise ValueError("Geçersiz profil kimliği!")
+        return os.path.join(self.directory, f"{profile_id}.{suffix}")
+
+    def save(self, profile_id: str, profiler, summary: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        profiler.dump_stats(self.path(profile_id, "prof"))
+        with open(self.path(profile_id, "json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False)
+        with self._lock:
+            for old in self.ids()[self.keep:]:
+                for suffix in ("prof", "json"):
+                    try:
+                        os.remove(self.path(old, suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def ids(self) -> list:
+        """Profil kimlikleri, en yenisi başta"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((n[:-5] for n in names if n.endswith(".json") and PROFILE_ID.match(n[:-5])), reverse=True)
+
+    def load(self, profile_id: str):
+        """Profil özetini döndürür, yoksa None"""
+        try:
+            with open(self.path(profile_id, "json"), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def list(self, limit: int = 50) -> list:
+        """Son profillerin özetleri (ayrıntılar olmadan)"""
+        profiles = []
+        for profile_id in self.ids()[:limit]:
+            summary = self.load(profile_id)
+            if summary is not None:
+                profiles.append({k: v for k, v in summary.items() if k not in ("sql_statements", "functions")})
+        return profiles
+
+
+def admin_authorized(app) -> bool:
+    """Profil uç noktaları için X-Admin-Key başlığını PROFILE_KEY ile karşılaştırır"""
+    key = app.config.get("PROFILE_KEY")
+    header = request.headers.get("X-Admin-Key")
+    return bool(key and header and secrets.compare_digest(header, key))
+
+
+def _top_functions(profiler) -> list:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    rows = []
+    for (filename, line, name), (cc, nc, tt, ct, _) in stats.stats.items():
+        rows.append({
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "calls": nc, "self_ms": round(tt * 1000, 3), "cumulative_ms": round(ct * 1000, 3),
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+def init_profiling(app) -> ProfileStore:
+    """İstek bazında isteğe bağlı cProfile kaydı.
+
+    PROFILE_KEY tanımlıysa X-Profile başlığında bu anahtarı taşıyan istek,
+    PROFILE_SAMPLE_RATE > 0 ise isteklerin o oranı profillenir. Kayıtta
+    route, kullanıcı, SQL süreleri ve tracemalloc ile tepe bellek bulunur.
+    Aynı anda tek istek profillenir; meşgulken gelen istek profillenmez.
+    Diğer hook'lardan önce çağrılmalıdır ki kayıt onları da kapsasın.
+    """
+    global _listener_installed
+    store = ProfileStore(app.config["PROFILE_DIR"], app.config.get("PROFILE_KEEP", 50))
+    app.extensions["paytrack_profiles"] = store
+    busy = threading.Lock()
+    if not _listener_installed:
+        event.listen(Engine, "before_cursor_execute", _sql_start)
+        event.listen(Engine, "after_cursor_execute", _sql_end)
+        _listener_installed = True
+
+    def requested() -> bool:
+        key = app.config.get("PROFILE_KEY")
+        header = request.headers.get("X-Profile")
+        if key and header and secrets.compare_digest(header, key):
+            return True
+        rate = app.config.get("PROFILE_SAMPLE_RATE", 0)
+        return rate > 0 and random.random() < rate
+
+    @app.before_request
+    def _start_profile():
+        if request.method == "OPTIONS" or not requested() or not busy.acquire(blocking=False):
+            return None
+        g.profile_sql = []
+        g.profile_started = (time.perf_counter(), datetime.now())
+        g.profile_tracing = tracemalloc.is_tracing()
+        if g.profile_tracing:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+        return None
+
+    def _finish(status_code):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return None
+        try:
+            profiler.disable()
+            peak = tracemalloc.get_traced_memory()[1]
+            if not g.profile_tracing:
+                tracemalloc.stop()
+            started, started_at = g.profile_started
+            statements = g.pop("profile_sql")
+            data = request.get_json(silent=True) if request.is_json else None
+            user_id = request_user_id(
+                request.args.get("user_id") or (data.get("user_id") if isinstance(data, dict) else None)
+            )
+            profile_id = f"{started_at:%Y%m%d-%H%M%S}-{secrets.token_hex(3)}"
+            store.save(profile_id, profiler, {
+                "id": profile_id,
+                "started_at": started_at.strftime("%Y-%m-%d %H:%M:%S"),
+                "endpoint": request.endpoint, "method": request.method, "path": request.path,
+                "user_id": user_id, "status": status_code,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                "peak_memory_kb": round(peak / 1024, 1),
+                "sql_count": len(statements),
+                "sql_ms": round(sum(ms for ms, _ in statements), 3),
+                "sql_statements": [
+                    {"ms": ms, "sql": sql} for ms, sql in sorted(statements, reverse=True)[:TOP_STATEMENTS]
+                ],
+                "functions": _top_functions(profiler),
+            })
+            return profile_id
+        finally:
+            busy.release()
+
+    @app.after_request
+    def _save_profile(response):
+        profile_id = _finish(response.status_code)
+        if profile_id is not None:
+            response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    @app.teardown_request
+    def _abandon_profile(exc=None):
+        # İstek after_request'e ulaşmadan biterse de kilit bırakılır
+        _finish(500)
+
+    return store
@@ -0,0 +1,77 @@
+import logging
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_listener_installed = False
+
+
+def query_budget(limit: int = None, per_chunk: int = 0, **per_method):
+    """Route için izin verilen en fazla SQL sorgu sayısını tanımlar.
+
+    @query_budget(3) tüm metodlar için, @query_budget(GET=1, POST=2) ise
+    metod bazında bütçe tanımlar. Dosyayı parça parça yazan route'lar
+    per_chunk ile parça başına bütçe verir; işlenen parça sayısını view
+    charge_chunks ile bildirir.
+    """
+    def decorator(view):
+        view.query_budget = {"*": limit, **{m.upper(): n for m, n in per_method.items()}}
+        view.query_budget_per_chunk = per_chunk
+        return view
+    return decorator
+
+
+def charge_chunks(rows: int, chunk_size: int):
+    """rows satırın chunk_size'lık parçalarla yazıldığını bütçeye bildirir"""
+    if has_request_context():
+        g.query_chunks = g.get("query_chunks", 0) + -(-rows // chunk_size)
+
+
+def get_query_budget(view, method: str):
+    """View fonksiyonunun verilen metod için bütçesini döndürür (yoksa None)"""
+    budgets = getattr(view, "query_budget", None)
+    if budgets is None:
+        return None
+    return budgets.get(method.upper(), budgets.get("*"))
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and "query_count" in g:
+        g.query_count += 1
+
+
+def init_query_budget(app):
+    """QUERY_BUDGET_CHECK açıkken her isteğin sorgu sayısını sayar.
+
+    Sayım X-Query-Count, bütçe X-Query-Budget başlığında döner; bütçe
+    aşılırsa uyarı loglanır.
+    """
+    global _listener_installed
+    if not _listener_installed:
+        event.listen(Engine, "before_cursor_execute", _count_query)
+        _listener_installed = True
+
+    @app.before_request
+    def _start_query_count():
+        if app.config.get("QUERY_BUDGET_CHECK"):
+            g.query_count = 0
+
+    @app.after_request
+    def _check_query_budget(response):
+        if "query_count" not in g:
+            return response
+        response.headers["X-Query-Count"] = str(g.query_count)
+        view = app.view_functions.get(request.endpoint)
+        budget = get_query_budget(view, request.method) if view else None
+        if budget is not None:
+            budget += getattr(view, "query_budget_per_chunk", 0) * g.get("query_chunks", 0)
+            response.headers["X-Query-Budget"] = str(budget)
+            if g.query_count > budget:
+                logger.warning(
+                    "Sorgu bütçesi aşıldı: %s %s -> %d sorgu (bütçe %d)",
+                    request.method, request.path, g.query_count, budget
+                )
+        return response
@@ -0,0 +1,203 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_MISS = object()
+
+
+class MemoryBackend:
+    """Süreç içi LRU + TTL önbellek"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISS
+            if entry[0] < time.monotonic():
+                del self._data[key]
+                return _MISS
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """Birden fazla worker'ın paylaştığı, yerel SQLite dosyasında tutulan önbellek.
+
+    Değerler JSON olarak saklanır. Bir worker'ın yaptığı geçersiz kılma
+    diğerlerini de etkiler.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return _MISS
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl: float):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value, ensure_ascii=False), time.time() + ttl)
+        )
+        # Tablo büyürse süresi dolanları temizle
+        if conn.total_changes % 256 == 0:
+            conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_entries "
+                "ORDER BY expires_at LIMIT max(0, (SELECT count(*) FROM cache_entries) - ?))",
+                (self.max_entries,)
+            )
+
+    def delete(self, keys):
+        self._conn().executemany("DELETE FROM cache_entries WHERE key = ?", [(k,) for k in keys])
+
+    def delete_prefix(self, prefix: str):
+        # Birincil anahtar indeksini kullanan aralık taraması
+        self._conn().execute(
+            "DELETE FROM cache_entries WHERE key >= ? AND key < ?", (prefix, prefix + "\uffff")
+        )
+
+    def __len__(self):
+        return self._conn().execute("SELECT count(*) FROM cache_entries").fetchone()[0]
+
+
+class ReadCache:
+    """Müşteri listesi, dashboard ve işlem geçmişi için kullanıcı bazlı okuma önbelleği.
+
+    Anahtarlar kullanıcıya göre ayrılır ve yazma yolları sadece etkilenen
+    kullanıcının (ve müşterinin) kayıtlarını geçersiz kılar. Liste ve
+    dashboard anahtarlarına değişiklik numarası da eklenir; böylece başka
+    bir worker'daki yazma, bellek içi önbellekte bile eski veri döndürmez.
+    """
+
+    def __init__(self, backend=None, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @staticmethod
+    def key(user_id, kind: str, extra: str = "") -> str:
+        return f"u:{user_id or '*'}:{kind}:{extra}"
+
+    def get_or_build(self, user_id, kind: str, build, extra: str = ""):
+        """Önbellekteki değeri döndürür; yoksa build() ile üretip saklar"""
+        if self.backend is None:
+            return build()
+
+        key = self.key(user_id, kind, extra)
+        value = self.backend.get(key)
+        if value is not _MISS:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        with self._lock:
+            self.misses += 1
+            generation = self._generation
+        value = build()
+        # Üretim sırasında bir yazma olduysa eski veriyi saklama
+        if generation == self._generation:
+            self.backend.set(key, value, self.ttl)
+        return value
+
+    def invalidate(self, user_id, customer_name: str = None):
+        """Kullanıcının liste/dashboard kayıtlarını ve müşterinin geçmişini siler"""
+        if self.backend is None:
+            return
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+        # Liste ve dashboard anahtarları sürüm numarası içerir, öneke göre silinir
+        self.backend.delete_prefix(self.key(user_id, "customers"))
+        self.backend.delete_prefix(self.key(user_id, "dashboard"))
+        if customer_name is None:
+            self.backend.delete_prefix(self.key(user_id, "history"))
+            self.backend.delete_prefix(self.key(None, "history"))
+            return
+        self.backend.delete([
+            self.key(user_id, "history", customer_name),
+            self.key(None, "history", customer_name),
+        ])
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.delete_prefix("u:")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_read_cache(config) -> ReadCache:
+    """READ_CACHE_BACKEND ayarına göre önbelleği oluşturur (memory, sqlite veya none)"""
+    kind = config.get("READ_CACHE_BACKEND", "memory")
+    ttl = float(config.get("READ_CACHE_TTL", 30))
+    if kind == "none":
+        return ReadCache(None, ttl)
+    if kind == "sqlite":
+        return ReadCache(SQLiteBackend(config["READ_CACHE_PATH"], int(config.get("READ_CACHE_MAX_ENTRIES", 10000))), ttl)
+    return ReadCache(MemoryBackend(int(config.get("READ_CACHE_MAX_ENTRIES", 1024))), ttl)
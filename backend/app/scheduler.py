@@ -0,0 +1,189 @@
+import logging
+import threading
+import time
+
+from backend.database.backup import database_files, snapshot, verify_backup
+from backend.database.database import db
+from backend.database.sharding import shard_scope
+from backend.models.installment import BATCH_SIZE, post_due_installments
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """tick'i interval saniyede bir arka plan iş parçacığında çalıştırır"""
+
+    name = "periodic-job"
+
+    def __init__(self, app, interval: float, start: bool = True):
+        self.app = app
+        self.interval = interval
+        self.ticks = 0
+        self.last_tick_ms = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        if start:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def tick(self):
+        raise NotImplementedError
+
+    def close(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("%s turu başarısız", self.name)
+            if self._stop.wait(self.interval):
+                return
+
+
+class InstallmentScheduler(PeriodicJob):
+    """Vadesi gelen taksitleri arka planda periyodik olarak yazan iş parçacığı.
+
+    Her turda vadesi gelmiş taksitler batch_size'lık parçalar halinde
+    yazılır; kesinti sonrası biriken taksitler aynı turda, parça parça
+    bitene kadar yazılır. Sharding açıksa her shard dosyası sırayla işlenir.
+    """
+
+    name = "installment-scheduler"
+
+    def __init__(self, app, interval: float = 60.0, batch_size: int = BATCH_SIZE, start: bool = True):
+        self.batch_size = batch_size
+        self.posted = 0
+        self.batches = 0
+        super().__init__(app, interval, start)
+
+    def tick(self, now: str = None) -> int:
+        """Vadesi gelen tüm taksitleri yazar; yazılan taksit sayısını döndürür"""
+        router = self.app.extensions.get("paytrack_shards")
+        started = time.perf_counter()
+        posted = 0
+        # Aynı süreçte iki tur (ör. elle çağrılan tick) üst üste binmesin
+        with self._lock, self.app.app_context():
+            try:
+                for key in router.keys() if router is not None else [None]:
+                    with shard_scope(key):
+                        posted += self._drain(now)
+            finally:
+                db.session.remove()
+            self.ticks += 1
+            self.posted += posted
+            self.last_tick_ms = round((time.perf_counter() - started) * 1000, 3)
+        return posted
+
+    def _drain(self, now) -> int:
+        posted = 0
+        read_cache = self.app.extensions["paytrack_read_cache"]
+        while True:
+            result = post_due_installments(now, self.batch_size)
+            if not result["claimed"]:
+                return posted
+            self.batches += 1
+            posted += result["posted"]
+            for user_id, name in result["customers"]:
+                read_cache.invalidate(user_id, name)
+            if result["claimed"] < self.batch_size:
+                return posted
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "ticks": self.ticks,
+            "batches": self.batches,
+            "posted": self.posted,
+            "last_tick_ms": self.last_tick_ms,
+        }
+
+
+class BackupScheduler(PeriodicJob):
+    """Veritabanı dosyalarının (ve shard'ların) periyodik çevrim içi yedeği.
+
+    İlk yedek bir aralık sonra alınır; açılış yavaşlamaz. verify açıksa
+    her yedek geçici bir dosyaya açılıp doğrulanır.
+    """
+
+    name = "backup-scheduler"
+
+    def __init__(self, app, interval: float, directory: str, keep: int, compress: bool = True,
+                 vacuum: bool = True, verify: bool = True, pages: int = 256, sleep: float = 0.005,
+                 start: bool = True):
+        self.directory = directory
+        self.options = {"keep": keep, "compress": compress, "vacuum": vacuum, "pages": pages, "sleep": sleep}
+        self.verify = verify
+        self.last = []
+        self.failures = 0
+        super().__init__(app, interval, start)
+
+    def tick(self) -> list:
+        """Tüm veritabanı dosyalarını yedekler; sonuçları döndürür"""
+        started = time.perf_counter()
+        results = []
+        with self._lock:
+            for source in database_files(self.app):
+                result = snapshot(source, self.directory, **self.options)
+                if self.verify:
+                    result["verified"] = verify_backup(result["path"])["ok"]
+                    if not result["verified"]:
+                        self.failures += 1
+                        logger.error("Yedek doğrulanamadı: %s", result["path"])
+                results.append(result)
+            self.ticks += 1
+            self.last = results
+            self.last_tick_ms = round((time.perf_counter() - started) * 1000, 3)
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "interval": self.interval,
+            "ticks": self.ticks,
+            "failures": self.failures,
+            "last_tick_ms": self.last_tick_ms,
+            "last": [{
+                key: result.get(key) for key in (
+                    "source", "path", "bytes", "seconds", "steps", "restarts", "max_step_ms", "locked_ms",
+                    "fallback", "vacuum_ms", "compress_ms", "verified",
+                )
+            } for result in self.last],
+        }
+
+    def _run(self):
+        # İlk yedek açılışta değil bir aralık sonra
+        if not self._stop.wait(self.interval):
+            super()._run()
+
+
+def create_backup_scheduler(app):
+    """BACKUP_INTERVAL (saat) sıfırdan büyükse yedekleme işini başlatır, değilse None döndürür"""
+    hours = float(app.config.get("BACKUP_INTERVAL", 0))
+    if hours <= 0:
+        return None
+    return BackupScheduler(
+        app,
+        interval=hours * 3600,
+        directory=app.config["BACKUP_DIR"],
+        keep=int(app.config.get("BACKUP_KEEP", 7)),
+        compress=bool(app.config.get("BACKUP_COMPRESS", True)),
+        vacuum=bool(app.config.get("BACKUP_VACUUM", True)),
+        verify=bool(app.config.get("BACKUP_VERIFY", True)),
+        pages=int(app.config.get("BACKUP_PAGES", 256)),
+        sleep=float(app.config.get("BACKUP_SLEEP_MS", 5)) / 1000,
+    )
+
+
+def create_installment_scheduler(app):
+    """INSTALLMENT_SCHEDULER açıksa zamanlayıcıyı başlatır, değilse None döndürür"""
+    if not app.config.get("INSTALLMENT_SCHEDULER"):
+        return None
+    return InstallmentScheduler(
+        app,
+        interval=float(app.config.get("INSTALLMENT_SCHEDULER_INTERVAL", 60)),
+        batch_size=int(app.config.get("INSTALLMENT_BATCH_SIZE", BATCH_SIZE)),
+    )
@@ -0,0 +1,76 @@
+import threading
+import time
+from urllib.parse import quote
+
+
+def test_history_is_rate_limited_per_user(client, seed_ledger):
+    name = seed_ledger(customers=1, transactions_per_customer=1)[0]
+    url = f"/customers/transactions/{quote(name)}?user_id="
+
+    # Kova 20 isteğe kadar birikir, sonra saniyede 5 token dolar
+    assert all(client.get(url + "1").status_code == 200 for _ in range(20))
+    limited = client.get(url + "1")
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "1"
+    # Başka kullanıcının kovası ayrıdır
+    assert client.get(url + "2").status_code == 404
+
+    stats = client.get("/metrics/admission").get_json()["endpoints"]["get_customer_transactions"]
+    assert stats["rate_limited"] == 1
+    assert stats["admitted"] == 21
+    assert stats["active"] == 0
+
+
+def test_gate_queues_then_rejects(app):
+    from backend.app.admission import AdmissionControl, admission
+
+    control = AdmissionControl()
+    policy = admission(concurrency=1, queue=1, wait=2)(lambda: None).admission
+    with app.test_request_context():
+        first, _ = control.admit("pdf", policy, "u1")
+        assert first is not None
+
+        # İkinci istek sıraya girer ve ilk istek bitince çalışır
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(control.admit("pdf", policy, "u2")[0]))
+        waiter.start()
+        while control.stats()["pdf"]["queue_depth"] == 0:
+            time.sleep(0.001)
+
+        # Sıra dolu: üçüncü istek beklemeden reddedilir
+        _, (body, status, headers) = control.admit("pdf", policy, "u3")
+        assert status == 503
+        assert headers["Retry-After"] == "2"
+
+        first.release()
+        waiter.join()
+        assert admitted[0] is first
+        first.release()
+
+    stats = control.stats()["pdf"]
+    assert stats["queue_full"] == 1
+    assert stats["admitted"] == 2
+    assert stats["active"] == 0
+
+
+def test_gate_times_out(app):
+    from backend.app.admission import AdmissionControl, admission
+
+    control = AdmissionControl()
+    policy = admission(concurrency=1, queue=4, wait=0.05)(lambda: None).admission
+    with app.test_request_context():
+        gate, _ = control.admit("pdf", policy, "u1")
+        _, (body, status, headers) = control.admit("pdf", policy, "u2")
+        assert status == 503
+        gate.release()
+    assert control.stats()["pdf"]["timeout"] == 1
+
+
+def test_admission_can_be_disabled(app, client, seed_ledger):
+    name = seed_ledger(customers=1, transactions_per_customer=1)[0]
+    app.config["ADMISSION_CONTROL"] = False
+    try:
+        statuses = {client.get(f"/customers/transactions/{quote(name)}?user_id=1").status_code for _ in range(25)}
+    finally:
+        app.config["ADMISSION_CONTROL"] = True
+    assert statuses == {200}
@@ -0,0 +1,152 @@
+import calendar
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+AS_OF = datetime(2025, 6, 30, 12, 0, 0)
+
+
+@pytest.fixture
+def post(app, seed_ledger):
+    """Belirli tarihli işlemleri Customer.add_transaction ile yazar"""
+    from backend.database.database import db
+    from backend.models.customer import Customer
+    from backend.models.money import to_kurus
+
+    seed_ledger(customers=0)
+
+    def post(name, transaction_type, amount, days_ago, opening=0.0):
+        with app.app_context():
+            customer = db.session.query(Customer).filter_by(user_id=1, name=name).first()
+            if customer is None:
+                customer = Customer(name=name, urun="Ekmek", borc=to_kurus(opening), user_id=1)
+                db.session.add(customer)
+                db.session.commit()
+            timestamp = (AS_OF - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+            customer.add_transaction(transaction_type, to_kurus(amount), timestamp)
+
+    return post
+
+
+def analytics(app, top=10, window_days=90):
+    from backend.models.analytics import ledger_analytics
+
+    with app.app_context():
+        return ledger_analytics(
+            app.extensions["paytrack_ledger_columns"], 1, top, window_days,
+            as_of=calendar.timegm(AS_OF.timetuple())
+        )
+
+
+def reference_days_to_pay(opening, events):
+    """FIFO ile her borcun kapandığı ödemeyi Python döngüsüyle bulur"""
+    open_charges = [[None, opening]] if opening else []
+    settled, weighted = 0.0, 0.0
+    for day, kind, amount in sorted(events, key=lambda e: e[0]):
+        if kind != "odeme":
+            open_charges.append([day, amount])
+            continue
+        while amount > 1e-9 and open_charges:
+            charge = open_charges[0]
+            used = min(charge[1], amount)
+            charge[1] -= used
+            amount -= used
+            if charge[1] <= 1e-9:
+                open_charges.pop(0)
+                if charge[0] is not None:
+                    original = next(a for d, k, a in events if d == charge[0] and k != "odeme")
+                    settled += original
+                    weighted += (day - charge[0]) * original
+    return round(weighted / settled, 2) if settled else None
+
+
+def test_fifo_days_to_pay_and_velocity(app, post):
+    post("Ali", "borc", 100, 100)
+    post("Ali", "borc", 50, 45)
+    post("Ali", "odeme", 120, 10)   # ilk borç 90 günde kapanır
+    post("Ali", "alacak", 30, 5)
+    post("Ali", "odeme", 60, 1)     # ikinci borç 44, alacak 4 günde kapanır
+    post("Veli", "borc", 40, 70)
+
+    report = analytics(app)
+    by_name = {c["name"]: c for c in report["top_debtors"]}
+    assert "Ali" not in by_name or by_name["Ali"]["borc"] == 0
+    veli = by_name["Veli"]
+    assert veli["computed_balance"] == 40
+    assert veli["avg_days_to_pay"] is None
+
+    assert report["portfolio"]["payments"] == 180
+    # 90 günlük pencerede 180₺ ödeme -> 30 günde 60₺
+    assert report["portfolio"]["payment_velocity_30d"] == 60
+    assert report["portfolio"]["avg_days_to_pay"] == round((90 * 100 + 44 * 50 + 4 * 30) / 180, 2)
+
+
+def test_payments_close_untracked_opening_balance_first(app, post):
+    post("Ayşe", "borc", 50, 30, opening=20)
+    post("Ayşe", "odeme", 30, 20)   # 20 açılış + 10 borç
+    post("Ayşe", "odeme", 40, 10)   # borcun kalanı burada kapanır
+
+    report = analytics(app)
+    assert report["portfolio"]["untracked_opening"] == 20
+    assert report["portfolio"]["avg_days_to_pay"] == 20
+
+
+def test_matches_python_reference_on_random_ledger(app, post):
+    rng = random.Random(7)
+    expected = {}
+    for n in range(6):
+        name, opening, balance, events = f"Müşteri {n}", rng.choice([0, 25]), 0.0, []
+        balance += opening
+        for day in sorted(rng.sample(range(1, 200), 15), reverse=True):
+            if balance > 0 and rng.random() < 0.4:
+                kind, amount = "odeme", float(rng.randint(1, int(balance)))
+                balance -= amount
+            else:
+                kind, amount = rng.choice(["borc", "alacak"]), float(rng.randint(5, 80))
+                balance += amount
+            post(name, kind, amount, day, opening=opening)
+            events.append((-day, kind, amount))
+        expected[name] = (balance, reference_days_to_pay(opening, events))
+
+    report = analytics(app, top=10)
+    for customer in report["top_debtors"]:
+        balance, days = expected.pop(customer["name"])
+        assert customer["borc"] == pytest.approx(balance)
+        assert customer["avg_days_to_pay"] == days
+    assert all(balance == 0 for balance, _ in expected.values())
+
+
+def test_columns_load_incrementally_and_reload_after_delete(app, client, post):
+    from backend.database.database import db
+
+    columns = app.extensions["paytrack_ledger_columns"]
+    post("Ali", "borc", 10, 3)
+    analytics(app)
+    assert (columns.full_loads, len(columns.data)) == (1, 1)
+
+    post("Ali", "borc", 20, 2)
+    analytics(app)
+    assert (columns.full_loads, columns.incremental_loads, len(columns.data)) == (1, 1, 2)
+
+    with app.app_context():
+        db.session.execute(db.text("DELETE FROM transactions WHERE id = 1"))
+        db.session.commit()
+    analytics(app)
+    assert columns.full_loads == 2
+    assert columns.data["id"].tolist() == [2]
+
+
+def test_analytics_route(client, seed_ledger):
+    seed_ledger(customers=3, transactions_per_customer=2)
+    response = client.get("/reports/analytics?user_id=1&top=2")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["portfolio"]["transactions"] == 6
+    assert len(body["top_debtors"]) == 2
+    assert client.get("/reports/analytics?user_id=1&top=2", headers={
+        "If-None-Match": response.headers["ETag"]
+    }).status_code == 304
+    assert client.get("/reports/analytics?user_id=1&window_days=0").status_code == 400
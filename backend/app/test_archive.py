@@ -0,0 +1,138 @@
+import os
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def ledger(app, seed_ledger):
+    """İki yıla yayılan işlemler: Ali 2023-2025, Veli sadece 2025"""
+    from backend.database.database import db
+    from backend.models.customer import Customer
+    from backend.models.money import to_kurus
+
+    seed_ledger(customers=0)
+    entries = [
+        ("Ali", "borc", 100, "2023-03-01 10:00:00"),
+        ("Ali", "odeme", 40, "2023-11-15 10:00:00"),
+        ("Ali", "borc", 50, "2024-06-01 10:00:00"),
+        ("Ali", "alacak", 5, "2024-12-31 23:59:59"),
+        ("Ali", "odeme", 20, "2025-02-01 10:00:00"),
+        ("Veli", "borc", 30, "2025-01-10 10:00:00"),
+    ]
+    with app.app_context():
+        for name in ("Ali", "Veli"):
+            db.session.add(Customer(name=name, urun="Ekmek", borc=to_kurus(10), user_id=1))
+        db.session.commit()
+        for name, kind, amount, timestamp in entries:
+            customer = db.session.query(Customer).filter_by(name=name).one()
+            customer.add_transaction(kind, to_kurus(amount), timestamp)
+    return entries
+
+
+@pytest.fixture
+def archive(app, tmp_path):
+    from backend.database.database import db
+    from backend.models.archive import archive_transactions
+
+    def run(cutoff):
+        with app.app_context():
+            return archive_transactions(db.engine, cutoff, str(tmp_path))
+    return run
+
+
+def history(client, **params):
+    query = "&".join(f"{k}={v}" for k, v in params.items())
+    return client.get(f"/customers/transactions/Ali?user_id=1&{query}").get_json()["transactions"]
+
+
+def test_archive_moves_old_rows_and_leaves_opening_balance(app, client, ledger, archive, tmp_path):
+    from backend.database.database import db
+    from backend.models.customer import Customer, Transaction
+
+    result = archive("2025-01-01")
+    assert result["moved"] == {2023: 2, 2024: 2}
+    assert result["customers"] == 1
+
+    with sqlite3.connect(os.path.join(tmp_path, "transactions_2024.db")) as conn:
+        assert conn.execute("SELECT SUM(amount) FROM transactions").fetchone() == (5500,)
+
+    with app.app_context():
+        ali = db.session.query(Customer).filter_by(name="Ali").one()
+        # 10 açılış + 100 - 40 + 50 + 5 = 125; sonra 20 ödeme
+        assert ali.borc == 10500
+        hot = db.session.query(Transaction).filter_by(customer_id=ali.id).order_by(Transaction.timestamp).all()
+        assert [(t.transaction_type, t.amount) for t in hot] == [("devir", 12500), ("odeme", 2000)]
+
+    # Varsayılan geçmiş ana tablodan gelir ve devirle başlar
+    assert [t["transaction_type"] for t in history(client)] == ["devir", "odeme"]
+
+
+def test_history_unions_archives_only_for_old_ranges(client, ledger, archive):
+    archive("2025-01-01")
+
+    full = history(client, start="2023-01-01")
+    assert [(t["transaction_type"], t["amount"]) for t in full] == [
+        ("borc", 100), ("odeme", 40), ("borc", 50), ("alacak", 5), ("odeme", 20)
+    ]
+    assert [t["timestamp"][:4] for t in history(client, start="2024-01-01", end="2025-01-01")] == ["2024", "2024"]
+    assert [t["transaction_type"] for t in history(client, start="2025-01-01")] == ["odeme"]
+
+
+def test_rearchiving_replaces_previous_opening_row(app, client, ledger, archive):
+    from backend.database.database import db
+    from backend.models.archive import ArchiveFile
+    from backend.models.customer import Transaction
+
+    archive("2025-01-01")
+    result = archive("2025-03-01")
+    assert result["moved"] == {2025: 2}
+
+    with app.app_context():
+        devir = db.session.query(Transaction).filter_by(transaction_type="devir").order_by(Transaction.customer_id).all()
+        assert [t.amount for t in devir] == [10500, 4000]
+        assert db.session.query(Transaction).filter(Transaction.transaction_type != "devir").count() == 0
+        assert db.session.get(ArchiveFile, 2025).cutoff == "2025-03-01 00:00:00"
+
+    assert len(history(client, start="2023-01-01")) == 5
+
+
+def test_archive_is_published_to_change_feed_and_pdf(client, ledger, archive):
+    seq = client.get("/changes?user_id=1&since=0").get_json()["seq"]
+    archive("2025-01-01")
+    delta = client.get(f"/changes?user_id=1&since={seq}").get_json()
+    assert [c["name"] for c in delta["customers"]] == ["Ali"]
+
+    response = client.post("/generate-pdf/", json={"user_id": 1, "customer_name": "Ali", "start": "2023-01-01"})
+    assert response.status_code == 200
+
+
+def test_more_years_than_attach_limit_are_archived_in_batches(app, client, seed_ledger, archive, tmp_path):
+    from sqlalchemy import text
+
+    from backend.database.database import db
+    from backend.models.archive import MAX_ATTACHED
+    from backend.models.customer import Customer
+
+    seed_ledger(customers=0)
+    years = list(range(2010, 2011 + MAX_ATTACHED))
+    with app.app_context():
+        db.session.add(Customer(name="Ali", urun="Ekmek", borc=0, user_id=1))
+        db.session.commit()
+        ali = db.session.query(Customer).filter_by(name="Ali").one()
+        for year in years:
+            ali.add_transaction("borc", 100, f"{year}-06-01 10:00:00")
+        # Bozuk zincir son işlemde fark edilir; önceki gruplara kopyalananlar geri alınır
+        db.session.execute(text("UPDATE transactions SET amount = 1 WHERE id = 1"))
+        db.session.commit()
+
+    with pytest.raises(ValueError):
+        archive("2025-01-01")
+    with sqlite3.connect(os.path.join(tmp_path, "transactions_2010.db")) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone() == (0,)
+
+    with app.app_context():
+        db.session.execute(text("UPDATE transactions SET amount = 100 WHERE id = 1"))
+        db.session.commit()
+    assert archive("2025-01-01")["moved"] == {year: 1 for year in years}
+    assert [t["timestamp"][:4] for t in history(client, start="2010-01-01")] == [str(year) for year in years]
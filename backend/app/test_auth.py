@@ -0,0 +1,70 @@
+def login(client, username="user1", password="secret"):
+    return client.post("/login/", json={"username": username, "password": password})
+
+
+def test_login_issues_token_usable_without_user_id(client, seed_ledger):
+    seed_ledger(customers=2, transactions_per_customer=1)
+    response = login(client)
+    assert response.status_code == 200
+    token = response.get_json()["token"]
+
+    customers = client.get("/customers/", headers={"Authorization": f"Bearer {token}"})
+    assert customers.status_code == 200
+    assert len(customers.get_json()) == 2
+
+
+def test_token_cannot_access_another_users_data(client, seed_ledger):
+    seed_ledger(customers=1, transactions_per_customer=1)
+    token = login(client).get_json()["token"]
+    response = client.get("/dashboard/?user_id=2", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 403
+
+
+def test_invalid_and_revoked_tokens_are_rejected(client, seed_ledger):
+    seed_ledger(customers=1, transactions_per_customer=1)
+    token = login(client).get_json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/customers/", headers={"Authorization": "Bearer bozuk"}).status_code == 401
+    assert client.post("/logout/", headers=headers).status_code == 200
+    assert client.get("/customers/", headers=headers).status_code == 401
+
+
+def test_auth_required_mode(app, client, seed_ledger):
+    seed_ledger(customers=1, transactions_per_customer=1)
+    app.config["AUTH_REQUIRED"] = True
+    try:
+        assert client.get("/customers/?user_id=1").status_code == 401
+        token = login(client).get_json()["token"]
+        assert client.get("/customers/", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+    finally:
+        app.config["AUTH_REQUIRED"] = False
+
+
+def test_token_verification_does_not_rehash(app, client, seed_ledger, monkeypatch):
+    from backend.models import user as user_module
+
+    seed_ledger(customers=1, transactions_per_customer=1)
+    token = login(client).get_json()["token"]
+
+    calls = []
+    monkeypatch.setattr(user_module, "check_password_hash", lambda *a: calls.append(a) or True)
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(50):
+        assert client.get("/dashboard/", headers=headers).status_code == 200
+    assert calls == []
+
+
+def test_expired_tokens_are_purged_while_issuing(monkeypatch):
+    from backend.app import auth
+
+    clock = [1000.0]
+    monkeypatch.setattr(auth.time, "time", lambda: clock[0])
+    store = auth.TokenStore("gizli", ttl=10, purge_every=4)
+    store.issue(1)
+    store.revoke(store.issue(1))
+    assert (len(store._tokens), len(store._revoked)) == (1, 1)
+
+    clock[0] += 20
+    fresh = store.issue(2)
+    assert list(store._tokens) == [fresh] and store._revoked == {}
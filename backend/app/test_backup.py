@@ -0,0 +1,112 @@
+import gzip
+import os
+import shutil
+import sqlite3
+
+
+def database_path(app):
+    from backend.database.database import db
+
+    with app.app_context():
+        db.session.remove()
+        return db.engine.url.database
+
+
+def test_snapshot_is_chunked_compressed_rotated_and_verified(app, seed_ledger, tmp_path):
+    from backend.database.backup import snapshot, verify_backup
+
+    seed_ledger(customers=50, transactions_per_customer=20)
+    source = database_path(app)
+    results = [snapshot(source, str(tmp_path), keep=2, pages=4, sleep=0) for _ in range(3)]
+
+    first = results[0]
+    assert first["steps"] > 1 and first["restarts"] == 0 and not first["fallback"]
+    assert first["max_step_ms"] <= first["locked_ms"]
+    assert first["path"].endswith(".db.gz")
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(r["path"]) for r in results[1:])
+    assert results[2]["removed"] == [os.path.basename(first["path"])]
+
+    check = verify_backup(results[2]["path"])
+    assert check["ok"] and check["integrity"] == ["ok"] and check["ledger"] == "checked"
+    assert (check["tables"]["customers"], check["tables"]["transactions"]) == (50, 1000)
+
+
+def test_backup_falls_back_to_one_step_when_source_keeps_changing(app, seed_ledger, tmp_path, monkeypatch):
+    from backend.database import backup
+
+    seed_ledger(customers=20, transactions_per_customer=10)
+    # Paylaşılan test veritabanı önceki testlerden boş sayfalar taşır; küçük bir kopya üzerinde çalışılır
+    source = str(tmp_path / "source.db")
+    compact = sqlite3.connect(database_path(app))
+    compact.execute("VACUUM INTO ?", (source,))
+    compact.close()
+    writer = sqlite3.connect(source)
+
+    def write_between_steps(seconds):
+        # Adımlar arasında başka bir bağlantı yazar; SQLite kopyayı baştan alır
+        writer.execute("UPDATE customers SET urun = urun || '.' WHERE id = 1")
+        writer.commit()
+
+    monkeypatch.setattr(backup.time, "sleep", write_between_steps)
+    try:
+        result = backup.backup_database(source, str(tmp_path / "copy.db"), pages=2, max_restarts=2)
+    finally:
+        writer.close()
+    assert result["restarts"] == 3 and result["fallback"] is True
+    copy = sqlite3.connect(tmp_path / "copy.db")
+    assert copy.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 200
+    assert copy.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    copy.close()
+
+
+def test_restore_verify_rejects_tampered_backups(app, seed_ledger, tmp_path):
+    import pytest
+
+    from backend.database.backup import restore_database, snapshot, verify_backup
+
+    seed_ledger(customers=5, transactions_per_customer=4)
+    good = snapshot(database_path(app), str(tmp_path / "backups"))["path"]
+
+    tampered = str(tmp_path / "tampered.db")
+    with gzip.open(good, "rb") as packed, open(tampered, "wb") as raw:
+        shutil.copyfileobj(packed, raw)
+    conn = sqlite3.connect(tampered)
+    conn.execute("UPDATE transactions SET amount = 1 WHERE id = 3")
+    conn.commit()
+    conn.close()
+    check = verify_backup(tampered)
+    assert check["ok"] is False and check["broken"][0]["error"] == "Kayıt değiştirilmiş"
+    with pytest.raises(ValueError):
+        restore_database(tampered, str(tmp_path / "restored.db"))
+
+    target = str(tmp_path / "restored.db")
+    first = restore_database(good, target)
+    assert first["previous"] is None and first["tables"]["transactions"] == 20
+    second = restore_database(good, target)
+    assert os.path.exists(second["previous"])
+    assert verify_backup(target)["ok"]
+
+
+def test_admin_backup_route_and_create_tables_keeps_existing_file(app, client, seed_ledger, tmp_path):
+    from backend.database.create_tables import create_tables
+
+    seed_ledger(customers=2, transactions_per_customer=1)
+    assert client.get("/metrics/backup").get_json() == {"enabled": False}
+    assert client.post("/admin/backup").status_code == 403
+
+    app.config.update(PROFILE_KEY="gizli", BACKUP_DIR=str(tmp_path / "backups"))
+    try:
+        stats = client.post("/admin/backup", headers={"X-Admin-Key": "gizli"}).get_json()
+    finally:
+        app.config["PROFILE_KEY"] = ""
+    assert stats["ticks"] == 1 and stats["last"][0]["verified"] is True
+    assert len(os.listdir(tmp_path / "backups")) == 1
+
+    path = str(tmp_path / "fresh.db")
+    assert create_tables(path) is True
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO users (username, password_hash) VALUES ('a', 'b')")
+    conn.commit()
+    conn.close()
+    assert create_tables(path) is False
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
@@ -0,0 +1,53 @@
+import json
+
+
+def test_changes_return_only_deltas(client, seed_ledger):
+    names = seed_ledger(customers=20, transactions_per_customer=1)
+    listing = client.get("/customers/?user_id=1")
+    seq = int(listing.headers["X-Change-Seq"])
+
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[3], "amount": 7})
+    client.post("/customers/", json={"user_id": 1, "name": "Yeni", "urun": "Süt", "borc": 0})
+
+    delta = client.get(f"/changes?user_id=1&since={seq}").get_json()
+    assert sorted(c["name"] for c in delta["customers"]) == sorted([names[3], "Yeni"])
+    assert [t["customer_name"] for t in delta["transactions"]] == [names[3]]
+    assert delta["transactions"][0]["amount"] == 7
+    assert delta["seq"] > seq
+
+    client.delete("/customers/Yeni?user_id=1")
+    delta = client.get(f"/changes?user_id=1&since={delta['seq']}").get_json()
+    assert delta["deleted"] == ["Yeni"]
+    assert delta["customers"] == []
+
+
+def test_changes_are_paged(client, seed_ledger):
+    names = seed_ledger(customers=1, transactions_per_customer=0)
+    for _ in range(5):
+        client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 1})
+
+    first = client.get("/changes?user_id=1&since=0&limit=3").get_json()
+    assert first["has_more"] is True
+    assert len(first["transactions"]) == 3
+    rest = client.get(f"/changes?user_id=1&since={first['seq']}&limit=3").get_json()
+    assert rest["has_more"] is False
+    assert len(rest["transactions"]) == 2
+
+
+def test_event_stream_pushes_changes(app, client, seed_ledger):
+    names = seed_ledger(customers=2, transactions_per_customer=0)
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 1})
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[1], "amount": 4})
+
+    response = client.get("/events?user_id=1&since=0", buffered=False)
+    assert response.mimetype == "text/event-stream"
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b"retry:")
+    event = next(chunks).decode()
+    response.close()
+
+    lines = dict(line.split(": ", 1) for line in event.strip().split("\n"))
+    assert lines["event"] == "change"
+    payload = json.loads(lines["data"])
+    assert [t["customer_name"] for t in payload["transactions"]] == [names[0], names[1]]
+    assert int(lines["id"]) == payload["seq"]
@@ -0,0 +1,52 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+PAYMENTS = 2400
+WORKERS = 16
+
+
+def test_concurrent_payments_never_overdraw(app, client, seed_ledger):
+    """Binlerce eşzamanlı ödeme; bakiyeyi aşanlar reddedilir, hiçbiri kaybolmaz"""
+    from backend.database.database import db
+    from backend.models.customer import Customer, Transaction
+    from backend.models.rollup import DailyRollup
+
+    # 4 müşteri x 30 işlem x 10₺ = 300₺ borç; her müşteriye 600 kez 1₺ ödenmeye çalışılır
+    names = seed_ledger(customers=4, transactions_per_customer=30)
+    targets = [name for name in names for _ in range(PAYMENTS // len(names))]
+    random.Random(1).shuffle(targets)
+
+    def pay(name):
+        return client.post("/customers/odeme-yap/", json={
+            "user_id": 1, "customer_name": name, "amount": 1
+        }).status_code
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        statuses = list(pool.map(pay, targets))
+
+    assert set(statuses) <= {200, 400}
+    assert statuses.count(200) == 4 * 300
+    assert statuses.count(400) == PAYMENTS - 4 * 300
+
+    with app.app_context():
+        assert [c.borc for c in db.session.query(Customer).all()] == [0, 0, 0, 0]
+        payments = db.session.query(Transaction).filter_by(transaction_type="odeme").count()
+        assert payments == 4 * 300
+        # Rollup da her başarılı ödemeyi bir kez saydı
+        paid = db.session.query(db.func.sum(DailyRollup.odeme_total)).scalar()
+        assert paid == 4 * 300 * 100
+
+
+def test_rejected_payment_leaves_no_partial_rows(app, client, seed_ledger):
+    from backend.database.database import db
+    from backend.models.change import Change
+    from backend.models.customer import Customer, Transaction
+
+    name = seed_ledger(customers=1, transactions_per_customer=1)[0]
+    response = client.post("/customers/odeme-yap/", json={"user_id": 1, "customer_name": name, "amount": 10.01})
+    assert response.status_code == 400
+
+    with app.app_context():
+        assert db.session.query(Customer).one().borc == 1000
+        assert db.session.query(Transaction).count() == 1
+        assert db.session.query(Change).count() == 0
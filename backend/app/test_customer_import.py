@@ -0,0 +1,88 @@
+import importlib.util
+import io
+
+
+def upload(client, content: bytes, filename="musteriler.csv", user_id=1):
+    return client.post(
+        f"/customers/import?user_id={user_id}",
+        data={"file": (io.BytesIO(content), filename)},
+        content_type="multipart/form-data",
+    )
+
+
+def test_csv_import_with_turkish_headers_and_row_errors(app, client, seed_ledger):
+    from backend.database.database import db
+    from backend.models.customer import Customer, Transaction
+    from backend.models.rollup import DailyRollup
+
+    existing = seed_ledger(customers=1, transactions_per_customer=1)[0]
+    content = (
+        "Müşteri Adı;Ürün;Borç\n"
+        "Ayşe Yılmaz;Ekmek;12,50\n"
+        "Mehmet Öz;Süt;\n"
+        f"{existing};Ekmek;5\n"
+        ";Ekmek;3\n"
+        "Ayşe Yılmaz;Süt;1\n"
+        "Can;Peynir;abc\n"
+    ).encode("utf-8-sig")
+
+    response = upload(client, content)
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert (summary["rows"], summary["imported"], summary["duplicates"], summary["invalid"]) == (6, 2, 2, 2)
+    assert [e["row"] for e in summary["errors"]] == [4, 5, 6, 7]
+
+    with app.app_context():
+        ayse = db.session.query(Customer).filter_by(name="Ayşe Yılmaz").one()
+        assert (ayse.urun, ayse.borc) == ("Ekmek", 1250)
+        opening = db.session.query(Transaction).filter_by(customer_id=ayse.id).one()
+        assert (opening.transaction_type, opening.amount) == ("borc", 1250)
+        assert db.session.query(DailyRollup).filter_by(customer_id=ayse.id).one().borc_total == 1250
+        mehmet = db.session.query(Customer).filter_by(name="Mehmet Öz").one()
+        assert mehmet.borc == 0 and not mehmet.transactions
+
+    assert "Ayşe Yılmaz | Ekmek | Borç: 12.5₺" in client.get("/customers/?user_id=1").get_json()
+    delta = client.get("/changes?user_id=1&since=0").get_json()
+    assert {"Ayşe Yılmaz", "Mehmet Öz"} <= {c["name"] for c in delta["customers"]}
+
+    # Aynı dosya tekrar gönderilirse hiçbir şey eklenmez
+    again = upload(client, content).get_json()
+    assert again["imported"] == 0 and again["duplicates"] == 4
+
+
+def test_large_raw_csv_is_written_in_chunks(app, client):
+    from backend.database.database import db
+    from backend.models.customer import Customer, Transaction
+
+    rows = "\n".join(f"Müşteri {i},Ürün,{i}" for i in range(1, 1201))
+    response = client.post(
+        "/customers/import?user_id=1", data=f"name,urun,borc\n{rows}\n".encode(), content_type="text/csv"
+    )
+    assert response.get_json()["imported"] == 1200
+
+    with app.app_context():
+        mismatched = db.session.query(Customer).join(Transaction).filter(Customer.borc != Transaction.amount).count()
+        assert mismatched == 0
+        assert db.session.query(Customer).filter_by(name="Müşteri 777").one().borc == 77700
+
+
+def test_missing_name_column_is_rejected(client):
+    response = upload(client, b"urun,borc\nEkmek,5\n")
+    assert response.status_code == 400
+    assert upload(client, b"").status_code == 400
+
+
+def test_xlsx_import(app, client):
+    if importlib.util.find_spec("openpyxl") is None:
+        assert upload(client, b"PK", "musteriler.xlsx").status_code == 501
+        return
+
+    import openpyxl
+
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["Ad", "Ürün", "Bakiye"])
+    workbook.active.append(["Zeynep", "Su", 7.25])
+    content = io.BytesIO()
+    workbook.save(content)
+    summary = upload(client, content.getvalue(), "musteriler.xlsx").get_json()
+    assert summary["imported"] == 1
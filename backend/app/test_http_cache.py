@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import event
+
+
+@pytest.fixture
+def statements(app):
+    from backend.database.database import db
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", capture)
+    yield captured
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.parametrize("path", ["/customers/?user_id=1", "/dashboard/?user_id=1"])
+def test_unchanged_data_returns_304_without_touching_ledger_tables(client, seed_ledger, statements, path):
+    names = seed_ledger(customers=5, transactions_per_customer=2)
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 3})
+
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert not etag.startswith("W/")
+
+    statements.clear()
+    second = client.get(path, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.get_data() == b""
+    assert second.headers["ETag"] == etag
+    assert statements and all("FROM changes" in s and "JOIN" not in s for s in statements)
+
+
+def test_writes_change_the_etag(client, seed_ledger):
+    names = seed_ledger(customers=2, transactions_per_customer=1)
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 3})
+    etag = client.get("/dashboard/?user_id=1").headers["ETag"]
+
+    client.post("/customers/odeme-yap/", json={"user_id": 1, "customer_name": names[0], "amount": 1})
+    response = client.get("/dashboard/?user_id=1", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_if_modified_since_is_ignored_for_same_second_writes(client, seed_ledger):
+    names = seed_ledger(customers=1, transactions_per_customer=1)
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 3})
+    first = client.get("/customers/?user_id=1")
+    # Okumayla aynı saniyedeki yazma Last-Modified'ı değiştirmez, ETag'i değiştirir
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 1})
+    response = client.get("/customers/?user_id=1", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != first.headers["ETag"]
+    assert client.get("/customers/?user_id=1", headers={
+        "If-Modified-Since": first.headers["Last-Modified"], "If-None-Match": response.headers["ETag"],
+    }).status_code == 304
+
+
+def test_large_responses_are_compressed_and_revalidate(client, seed_ledger):
+    import gzip
+
+    names = seed_ledger(customers=1, transactions_per_customer=200)
+    path = f"/customers/transactions/{names[0]}"
+    plain = client.get(path)
+    assert "Content-Encoding" not in plain.headers
+
+    packed = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in packed.headers["Vary"]
+    assert gzip.decompress(packed.get_data()) == plain.get_data()
+
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 1})
+    listing = client.get("/customers/?user_id=1", headers={"Accept-Encoding": "gzip"})
+    small = client.get("/dashboard/?user_id=1", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in listing.headers
+    assert small.status_code == 200
+    etag = small.get_etag()[0]
+    assert client.get("/dashboard/?user_id=1", headers={"If-None-Match": f'"{etag}-gz"'}).status_code == 304
+
+
+def test_json_provider_matches_stdlib_output(app):
+    from flask.json.provider import DefaultJSONProvider
+
+    payload = {"b": [1, 2.5, None], "a": "Müşteri ₺", "c": {"z": True, "y": "x"}}
+    with app.app_context():
+        assert app.json.loads(app.json.dumps(payload)) == payload
+        assert app.json.dumps(payload).startswith('{"a":')
+        assert DefaultJSONProvider(app).loads(app.json.response(payload).get_data()) == payload
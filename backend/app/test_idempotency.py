@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def pay(client, name, amount, key, user_id=1):
+    return client.post("/customers/odeme-yap/", json={
+        "user_id": user_id, "customer_name": name, "amount": amount
+    }, headers={"Idempotency-Key": key})
+
+
+def payments(app):
+    from backend.database.database import db
+    from backend.models.customer import Transaction
+
+    with app.app_context():
+        return db.session.query(Transaction).filter_by(transaction_type="odeme").count()
+
+
+def test_retried_payment_is_replayed_not_reapplied(app, client, seed_ledger):
+    name = seed_ledger(customers=1, transactions_per_customer=2)[0]
+
+    first = pay(client, name, 5, "pos-1")
+    retry = pay(client, name, 5, "pos-1")
+    assert first.status_code == retry.status_code == 200
+    assert retry.get_json() == first.get_json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert payments(app) == 1
+    assert f"{name} | Ekmek | Borç: 15.0₺" in client.get("/customers/?user_id=1").get_json()
+
+    # Aynı anahtar farklı bir istekle kullanılamaz
+    assert pay(client, name, 6, "pos-1").status_code == 422
+
+
+def test_failed_write_is_not_stored(app, client, seed_ledger):
+    name = seed_ledger(customers=1, transactions_per_customer=1)[0]
+
+    assert pay(client, name, 50, "pos-2").status_code == 400
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": name, "amount": 50})
+    # Reddedilen istek kaydedilmediği için aynı anahtarla yeniden denenebilir
+    assert pay(client, name, 50, "pos-2").status_code == 200
+    assert payments(app) == 1
+
+
+def test_invalid_user_id_gets_the_routes_own_error(client, seed_ledger):
+    name = seed_ledger(customers=1, transactions_per_customer=1)[0]
+    plain = client.post("/customers/borc-ekle/", json={"user_id": "abc", "customer_name": name, "amount": 5})
+    keyed = client.post("/customers/borc-ekle/", json={"user_id": "abc", "customer_name": name, "amount": 5},
+                        headers={"Idempotency-Key": "pos-3"})
+    assert keyed.status_code == plain.status_code == 404
+    assert keyed.get_json() == plain.get_json()
+
+
+def test_expired_keys_are_evicted_and_reusable(app, client, seed_ledger):
+    from backend.database.database import db
+    from backend.models.idempotency import IdempotencyKey
+
+    name = seed_ledger(customers=1, transactions_per_customer=2)[0]
+    assert pay(client, name, 1, "old").status_code == 200
+    with app.app_context():
+        db.session.query(IdempotencyKey).update({IdempotencyKey.expires_at: "2000-01-01 00:00:00"})
+        db.session.commit()
+
+    response = pay(client, name, 1, "old")
+    assert "Idempotent-Replayed" not in response.headers
+    assert payments(app) == 2
+    with app.app_context():
+        assert db.session.query(IdempotencyKey).count() == 1
+
+
+@pytest.mark.parametrize("queued", [False, True])
+def test_concurrent_retries_write_once(app, client, seed_ledger, queued):
+    from backend.app.write_queue import WriteQueue
+
+    name = seed_ledger(customers=1, transactions_per_customer=2)[0]
+    queue = WriteQueue(app, max_batch=10, max_delay=0.02) if queued else None
+    app.extensions["paytrack_write_queue"] = queue
+    try:
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            responses = list(pool.map(lambda _: pay(client, name, 3, "retry-storm"), range(6)))
+    finally:
+        if queue is not None:
+            queue.close()
+        app.extensions["paytrack_write_queue"] = None
+
+    assert [r.status_code for r in responses] == [200] * 6
+    assert payments(app) == 1
+    assert f"{name} | Ekmek | Borç: 17.0₺" in client.get("/customers/?user_id=1").get_json()
@@ -0,0 +1,100 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def create(client, name, **fields):
+    return client.post("/customers/installments", json={"user_id": 1, "customer_name": name, **fields})
+
+
+def test_due_installments_are_posted_once(app, client, seed_ledger):
+    from backend.app.scheduler import InstallmentScheduler
+    from backend.database.database import db
+    from backend.models.customer import Transaction
+    from backend.models.rollup import DailyRollup
+
+    name = seed_ledger(customers=1, transactions_per_customer=1)[0]
+    response = create(client, name, amount="100,50", count=3, interval="monthly",
+                      start="2025-01-31", description="Buzdolabı")
+    assert response.status_code == 200
+    plan_id = response.get_json()["plan"]["id"]
+
+    scheduler = InstallmentScheduler(app, start=False)
+    # İlk iki taksitin vadesi geldi (31 Ocak, 28 Şubat)
+    assert scheduler.tick("2025-03-01 00:00:00") == 2
+    assert scheduler.tick("2025-03-01 00:00:00") == 0
+    assert f"{name} | Ekmek | Borç: 211.0₺" in client.get("/customers/?user_id=1").get_json()
+
+    with app.app_context():
+        posted = db.session.query(Transaction).filter(Transaction.description.like("Taksit%")).order_by(Transaction.id).all()
+        assert [(t.timestamp, t.amount, t.description) for t in posted] == [
+            ("2025-01-31 00:00:00", 10050, "Taksit 1/3 - Buzdolabı"),
+            ("2025-02-28 00:00:00", 10050, "Taksit 2/3 - Buzdolabı"),
+        ]
+        feb = db.session.get(DailyRollup, (posted[1].customer_id, "2025-02-28"))
+        assert (feb.borc_total, feb.tx_count) == (10050, 1)
+
+    plans = client.get(f"/customers/installments?user_id=1&customer_name={name}").get_json()["plans"]
+    assert (plans[0]["posted"], plans[0]["pending"]) == (2, 1)
+    delta = client.get("/changes?user_id=1&since=0").get_json()
+    assert len([t for t in delta["transactions"] if t["description"].startswith("Taksit")]) == 2
+
+    # İptal kalan taksiti siler, yazılmış borçlar kalır
+    cancelled = client.delete(f"/customers/installments/{plan_id}?user_id=1").get_json()
+    assert cancelled["cancelled"] == 1
+    assert scheduler.tick("2030-01-01 00:00:00") == 0
+
+
+def test_catch_up_in_batches_and_concurrent_ticks(app, client, seed_ledger):
+    from backend.app.scheduler import InstallmentScheduler
+    from backend.database.database import db
+    from backend.models.customer import Customer, Transaction
+
+    names = seed_ledger(customers=5, transactions_per_customer=0)
+    for name in names:
+        assert create(client, name, amount=1, count=30, interval="daily", start="2025-01-01").status_code == 200
+
+    schedulers = [InstallmentScheduler(app, batch_size=40, start=False) for _ in range(3)]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        counts = list(pool.map(lambda s: s.tick("2025-02-01 00:00:00"), schedulers))
+    assert sum(counts) == 150
+    assert sum(s.batches for s in schedulers) >= 4
+
+    with app.app_context():
+        assert db.session.query(Transaction).count() == 150
+        assert {c.borc for c in db.session.query(Customer)} == {3000}
+
+
+def test_negative_opening_balance_does_not_block_the_batch(app, client, seed_ledger):
+    import pytest
+
+    from backend.app.scheduler import InstallmentScheduler
+    from backend.database.database import db
+    from backend.models.customer import BalanceError, Customer, Transaction, post_transactions_bulk
+
+    name = seed_ledger(customers=1, transactions_per_customer=0)[0]
+    # Alacaklı açılan müşteri (negatif bakiye) taksit borcunu sorunsuz almalı
+    assert client.post("/customers/", json={"user_id": 1, "name": "Alacaklı", "urun": "Süt", "borc": -5}).status_code == 200
+    for customer in (name, "Alacaklı"):
+        assert create(client, customer, amount=2, count=2, interval="daily", start="2025-01-01").status_code == 200
+
+    assert InstallmentScheduler(app, start=False).tick("2025-02-01 00:00:00") == 4
+    with app.app_context():
+        balances = {c.name: c.borc for c in db.session.query(Customer)}
+        assert (balances[name], balances["Alacaklı"]) == (400, -100)
+
+        # Borcu aşan ödeme hiçbir şey yazmadan müşteri id'siyle reddedilir
+        customer = db.session.query(Customer).filter_by(name="Alacaklı").one()
+        with pytest.raises(BalanceError) as error:
+            post_transactions_bulk([{"customer_id": customer.id, "user_id": 1, "name": customer.name, "amount": 100,
+                                     "transaction_type": "odeme", "timestamp": "2025-02-01 00:00:00"}])
+        assert error.value.customer_ids == [customer.id]
+        db.session.rollback()
+        assert db.session.query(Transaction).count() == 4
+
+
+def test_invalid_plans_are_rejected(client, seed_ledger):
+    name = seed_ledger(customers=1, transactions_per_customer=1)[0]
+    assert create(client, name, amount=10, count=0).status_code == 400
+    assert create(client, name, amount=10, count=3, interval="yearly").status_code == 400
+    assert create(client, name, amount=10, count=3, start="31/01/2025").status_code == 400
+    assert create(client, name, amount=-5, count=3).status_code == 400
+    assert create(client, "Yok", amount=10, count=3).status_code == 404
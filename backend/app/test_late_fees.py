@@ -0,0 +1,66 @@
+def accrue(client, **fields):
+    return client.post("/customers/late-fees", json={"user_id": 1, "rate": "2,5", "period": "2025-06", **fields})
+
+
+def test_late_fees_are_charged_once_per_period(app, client, seed_ledger):
+    from backend.database.database import db
+    from backend.models.customer import Transaction
+    from backend.models.rollup import DailyRollup, rebuild_daily_rollup
+
+    names = seed_ledger(customers=3, transactions_per_customer=5)
+    with app.app_context():
+        rebuild_daily_rollup()
+    # Yeni ödeme yapan müşteri gecikmiş sayılmaz
+    client.post("/customers/odeme-yap/", json={"user_id": 1, "customer_name": names[1], "amount": 10})
+
+    preview = accrue(client, dry_run=True).get_json()
+    assert preview["dry_run"] is True
+    assert [(f["name"], f["amount"], f["balance"]) for f in preview["fees"]] == [
+        (names[0], 1.25, 50.0), (names[2], 1.25, 50.0),
+    ]
+    with app.app_context():
+        assert db.session.query(Transaction).filter_by(transaction_type="alacak").count() == 0
+
+    result = accrue(client).get_json()
+    assert (result["customers"], result["total"]) == (2, 2.5)
+    assert f"{names[0]} | Ekmek | Borç: 51.25₺" in client.get("/customers/?user_id=1").get_json()
+
+    # Aynı dönem tekrar çalıştırılırsa kimse yeniden faizlenmez
+    assert accrue(client).get_json()["customers"] == 0
+    assert accrue(client, period="2025-07").get_json()["customers"] == 2
+
+    with app.app_context():
+        fees = db.session.query(Transaction).filter_by(transaction_type="alacak").all()
+        assert len(fees) == 4
+        assert fees[0].description == "Gecikme faizi 2025-06 (%2.5)"
+        rollup = db.session.query(DailyRollup).filter(DailyRollup.alacak_total > 0).all()
+        assert sum(r.alacak_total for r in rollup) == 125 + 125 + 128 + 128
+
+    history = client.get(f"/customers/transactions/{names[0]}?user_id=1").get_json()
+    assert any(t["description"].startswith("Gecikme faizi") for t in history["transactions"])
+
+
+def test_all_users_and_thresholds(app, seed_ledger):
+    from datetime import datetime
+
+    from backend.models.late_fees import accrue_late_fees
+    from backend.models.rollup import rebuild_daily_rollup
+
+    seed_ledger(customers=2, transactions_per_customer=1, user_id=1)
+    seed_ledger(customers=2, transactions_per_customer=10, user_id=2)
+    with app.app_context():
+        rebuild_daily_rollup()
+        as_of = datetime(2025, 3, 1)
+        # Hareketleri son 30 günde olan müşteriler ve alt sınırın altındakiler atlanır
+        assert accrue_late_fees(2, as_of=as_of, min_balance=5000, dry_run=True)["customers"] == 2
+        assert accrue_late_fees(2, as_of=as_of, grace_days=365, dry_run=True)["customers"] == 0
+        result = accrue_late_fees(2, as_of=as_of)
+        assert {f["user_id"] for f in result["fees"]} == {1, 2}
+        assert result["customers"] == 4
+
+
+def test_invalid_requests(client):
+    assert accrue(client, rate="abc").status_code == 400
+    assert accrue(client, rate=0).status_code == 400
+    assert accrue(client, period="2025-13").status_code == 400
+    assert client.post("/customers/late-fees", json={"user_id": 1}).status_code == 400
@@ -0,0 +1,98 @@
+def test_writes_extend_the_chain_and_incremental_verify_only_reads_new_rows(app, client, seed_ledger):
+    from backend.database.database import db
+    from backend.models.ledger import verify_ledger
+
+    names = seed_ledger(customers=5, transactions_per_customer=3)
+    with app.app_context():
+        first = verify_ledger(db.engine)
+    assert (first["ok"], first["customers"], first["rows"]) == (True, 5, 15)
+
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 5})
+    client.post("/customers/odeme-yap/", json={"user_id": 1, "customer_name": names[0], "amount": 2})
+    client.post("/customers/alacak-ekle/", json={"user_id": 1, "customer_name": names[1], "amount": 1})
+    client.post("/customers/import?user_id=1", data="ad;borc\nYeni;7\n".encode(), content_type="text/csv")
+    client.post("/customers/late-fees", json={"user_id": 1, "rate": 1, "grace_days": 0})
+
+    with app.app_context():
+        second = verify_ledger(db.engine)
+        assert second["ok"], second["broken"]
+        # Yalnızca yeni satırları olan müşterilerin kontrol noktasından sonrası okunur
+        assert second["rows"] < first["rows"]
+        idle = verify_ledger(db.engine)
+        assert (idle["customers"], idle["rows"]) == (0, 0)
+        full = verify_ledger(db.engine, full=True)
+        assert full["ok"] and full["rows"] == first["rows"] + second["rows"]
+
+
+def test_tampering_is_detected(app, seed_ledger):
+    from backend.database.database import db
+    from backend.models.ledger import verify_ledger
+    from sqlalchemy import text
+
+    seed_ledger(customers=4, transactions_per_customer=3)
+    with app.app_context():
+        assert verify_ledger(db.engine)["ok"]
+        # Kontrol noktasından önceki değişiklikleri artımlı doğrulama görmez, tam doğrulama görür
+        db.session.execute(text("UPDATE transactions SET amount = 1 WHERE id = 2"))
+        db.session.execute(text("DELETE FROM transactions WHERE id = 5"))
+        db.session.execute(text("DELETE FROM transactions WHERE id = 9"))
+        db.session.execute(text("DELETE FROM customers WHERE id = 4"))
+        db.session.commit()
+        assert verify_ledger(db.engine)["ok"]
+
+        full = verify_ledger(db.engine, full=True, workers=2)
+        assert {(b["customer_id"], b["error"]) for b in full["broken"]} == {
+            (1, "Kayıt değiştirilmiş"),
+            (2, "Zincir kopuk: kayıt silinmiş ya da araya eklenmiş"),
+            (3, "Zincirin son kayıtları eksik"),
+            (4, "Müşterisi olmayan işlem"),
+        }
+        assert full["broken"][0]["transaction_id"] == 2
+        # Bozuk zincirler düzeltilene kadar artımlı doğrulamada da raporlanır
+        assert len(verify_ledger(db.engine)["broken"]) == 4
+
+
+def test_ids_are_not_reused_after_deleting_the_newest_rows(app, client, seed_ledger):
+    from sqlalchemy import text
+
+    from backend.database.database import db
+    from backend.models.ledger import verify_ledger
+
+    names = seed_ledger(customers=2, transactions_per_customer=2)
+    with app.app_context():
+        assert verify_ledger(db.engine)["watermark"] == 4
+    # En büyük id'li satırlar müşteriyle birlikte silinir; yeni satır filigranın altına düşmemeli
+    client.delete(f"/customers/{names[1]}?user_id=1")
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[0], "amount": 5})
+    with app.app_context():
+        new_id = db.session.execute(text("SELECT MAX(id) FROM transactions")).scalar()
+        assert new_id == 5
+        db.session.execute(text("UPDATE transactions SET amount = 1 WHERE id = :id"), {"id": new_id})
+        db.session.commit()
+        broken = verify_ledger(db.engine)["broken"]
+    assert [(b["transaction_id"], b["error"]) for b in broken] == [(5, "Kayıt değiştirilmiş")]
+
+
+def test_archive_reseals_remaining_rows_and_admin_route(app, client, seed_ledger, tmp_path):
+    from backend.database.database import db
+    from backend.models.archive import archive_transactions
+    from backend.models.ledger import verify_ledger
+
+    names = seed_ledger(customers=3, transactions_per_customer=4)
+    client.post("/customers/odeme-yap/", json={"user_id": 1, "customer_name": names[0], "amount": 3})
+    with app.app_context():
+        assert verify_ledger(db.engine)["ok"]
+        db.session.remove()
+        result = archive_transactions(db.engine, "2025-01-03", str(tmp_path))
+        assert result["customers"] >= 1
+        assert verify_ledger(db.engine)["ok"]
+        assert verify_ledger(db.engine, full=True)["ok"]
+
+    assert client.post("/admin/ledger/verify", json={}).status_code == 403
+    app.config["PROFILE_KEY"] = "gizli"
+    try:
+        response = client.post("/admin/ledger/verify", json={"full": True}, headers={"X-Admin-Key": "gizli"})
+    finally:
+        app.config["PROFILE_KEY"] = ""
+    assert response.get_json()["ok"] is True
+    assert response.get_json()["shards"][0]["mode"] == "full"
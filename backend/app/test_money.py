@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+
+def test_to_kurus_parses_decimal_text_exactly():
+    from backend.models.money import to_kurus, format_lira, lira
+
+    assert to_kurus(0.1) == 10
+    assert to_kurus("12,345") == 1235
+    assert to_kurus(19.99) == 1999
+    assert format_lira(-1205) == "-12.05"
+    assert lira(150000) == 1500.0
+    for value in ("abc", None, True, float("nan")):
+        with pytest.raises(ValueError):
+            to_kurus(value)
+
+
+def test_small_amounts_sum_exactly(client, seed_ledger):
+    seed_ledger(customers=0)
+    for name in ("A", "B", "C"):
+        client.post("/customers/", json={"user_id": 1, "name": name, "urun": "Süt", "borc": 0.1})
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": "A", "amount": 0.2})
+
+    dashboard = client.get("/dashboard/?user_id=1").get_json()
+    assert dashboard["totalDebt"] == 0.5
+    assert dashboard["transactions"][0]["amount"] == 0.2
+
+    # 0.1 + 0.2 float'ta 0.30000000000000004 eder; kuruşta ödeme tam kapanır
+    response = client.post("/customers/odeme-yap/", json={"user_id": 1, "customer_name": "A", "amount": 0.3})
+    assert response.status_code == 200
+    customers = client.get("/customers/?user_id=1").get_json()
+    assert "A | Süt | Borç: 0.0₺" in customers
+    assert client.post("/customers/odeme-yap/", json={
+        "user_id": 1, "customer_name": "B", "amount": 0.11
+    }).status_code == 400
+
+
+def test_migration_converts_legacy_real_columns(tmp_path):
+    from backend.database.migrations import migrate, SCHEMA_VERSION
+
+    path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE customers (id INTEGER PRIMARY KEY, name VARCHAR(100), urun VARCHAR(100),
+                                borc FLOAT, user_id INTEGER);
+        CREATE TABLE transactions (id INTEGER PRIMARY KEY, timestamp VARCHAR(50), amount FLOAT,
+                                   transaction_type VARCHAR(20), description VARCHAR(200),
+                                   customer_id INTEGER REFERENCES customers (id));
+        INSERT INTO customers VALUES (1, 'Ali', 'Ekmek', 30.3, 1);
+        INSERT INTO transactions VALUES (1, '2025-01-01 10:00:00', 10.1, 'borc', '', 1);
+        INSERT INTO transactions VALUES (2, '2025-01-02 10:00:00', 20.2, 'borc', '', 1);
+    """)
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    assert migrate(engine) == SCHEMA_VERSION
+    # İkinci çalıştırma bir şey yapmaz
+    assert migrate(engine) == SCHEMA_VERSION
+    engine.dispose()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT borc, typeof(borc) FROM customers").fetchone() == (3030, "integer")
+    assert conn.execute("SELECT SUM(amount) FROM transactions").fetchone() == (3030,)
+    indexes = {row[1] for row in conn.execute("PRAGMA index_list(customers)")}
+    assert "ix_customers_name" in indexes
+    assert conn.execute("PRAGMA user_version").fetchone() == (SCHEMA_VERSION,)
+    # İşlem id'leri yeniden kullanılmaz; sayaç mevcut en büyük id'den devam eder
+    assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'transactions'").fetchone() == (2,)
+    conn.close()
@@ -0,0 +1,61 @@
+import pstats
+from urllib.parse import quote
+
+import pytest
+
+
+@pytest.fixture
+def profiling(app, tmp_path):
+    store = app.extensions["paytrack_profiles"]
+    directory = store.directory
+    store.directory = str(tmp_path)
+    app.config["PROFILE_KEY"] = "gizli"
+    yield store
+    store.directory = directory
+    app.config["PROFILE_KEY"] = ""
+    app.config["PROFILE_SAMPLE_RATE"] = 0
+
+
+def test_profile_header_records_request(client, seed_ledger, profiling):
+    name = seed_ledger(customers=1, transactions_per_customer=3)[0]
+    url = f"/customers/transactions/{quote(name)}?user_id=1"
+
+    response = client.get(url, headers={"X-Profile": "gizli"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert "X-Profile-Id" not in client.get(url).headers
+    assert "X-Profile-Id" not in client.get(url, headers={"X-Profile": "yanlis"}).headers
+
+    listed = client.get("/admin/profiles", headers={"X-Admin-Key": "gizli"}).get_json()["profiles"]
+    assert [p["id"] for p in listed] == [profile_id]
+    summary = listed[0]
+    assert (summary["endpoint"], summary["user_id"], summary["status"]) == ("get_customer_transactions", "1", 200)
+    assert summary["sql_count"] >= 1 and summary["peak_memory_kb"] > 0
+
+    detail = client.get(f"/admin/profiles/{profile_id}", headers={"X-Admin-Key": "gizli"}).get_json()
+    assert any("transactions" in s["sql"] for s in detail["sql_statements"])
+    assert detail["functions"]
+
+    download = client.get(f"/admin/profiles/{profile_id}?format=pstats", headers={"X-Admin-Key": "gizli"})
+    assert download.status_code == 200
+    path = profiling.path(profile_id, "prof")
+    assert pstats.Stats(path).total_calls > 0
+
+
+def test_admin_endpoints_require_key(client, profiling):
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Key": "yanlis"}).status_code == 403
+    assert client.get("/admin/profiles/../../etc", headers={"X-Admin-Key": "gizli"}).status_code == 404
+    assert client.get("/admin/profiles/x", headers={"X-Admin-Key": "gizli"}).status_code == 400
+    assert client.get("/admin/profiles/20250101-000000-abcdef", headers={"X-Admin-Key": "gizli"}).status_code == 404
+
+
+def test_sampling_and_retention(app, client, profiling):
+    app.config["PROFILE_SAMPLE_RATE"] = 1.0
+    profiling.keep = 3
+    try:
+        ids = {client.get("/").headers["X-Profile-Id"] for _ in range(5)}
+    finally:
+        profiling.keep = 50
+    assert len(ids) == 5
+    assert len(profiling.ids()) == 3
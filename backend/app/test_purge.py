@@ -0,0 +1,150 @@
+import io
+import sqlite3
+
+
+def customer_rows(app, customer_id):
+    from sqlalchemy import text
+
+    from backend.database.database import db
+    from backend.models.purge import CASCADE
+
+    with app.app_context():
+        return {
+            table: db.session.execute(text(f"SELECT COUNT(*) FROM {table} WHERE customer_id = :id"), {"id": customer_id}).scalar()
+            for table in CASCADE + ("statement_lines",)
+        }
+
+
+def test_delete_cascades_to_every_table_and_archive(app, client, seed_ledger, tmp_path):
+    from backend.database.database import db
+    from backend.models.archive import archive_transactions
+    from backend.models.customer import Customer
+    from backend.models.installment import create_plan
+    from backend.models.late_fees import accrue_late_fees
+    from backend.models.ledger import verify_ledger
+    from backend.models.rollup import rebuild_daily_rollup
+
+    names = seed_ledger(customers=3, transactions_per_customer=4)
+    with app.app_context():
+        rebuild_daily_rollup()
+        create_plan(db.session.get(Customer, 1), 500, 3, "monthly", "2030-01-01", "Taksit")
+        db.session.commit()
+        accrue_late_fees(2, "2025-06", user_id=1)
+        verify_ledger(db.engine)
+        db.session.remove()
+        archive_transactions(db.engine, "2025-01-03", str(tmp_path))
+    client.post(
+        "/reconciliation/statements?user_id=1",
+        data={"file": (io.BytesIO(f"tarih;tutar;gonderen\n2025-06-01;5;{names[0]}\n".encode()), "ozet.csv")},
+        content_type="multipart/form-data",
+    )
+    before = customer_rows(app, 1)
+    assert all(before[table] for table in ("transactions", "installments", "late_fees", "statement_lines"))
+
+    response = client.delete(f"/customers/{names[0]}?user_id=1")
+    assert response.get_json() == {"message": "Müşteri başarıyla silindi!"}
+    assert set(customer_rows(app, 1).values()) == {0}
+    assert customer_rows(app, 2)["transactions"] > 0
+
+    archived = sqlite3.connect(tmp_path / "transactions_2025.db")
+    assert archived.execute("SELECT COUNT(*) FROM transactions WHERE customer_id = 1").fetchone()[0] == 0
+    archived.close()
+    # Banka satırı kalır, yeniden eşleşmeyi bekler
+    line = client.get("/reconciliation/queue?user_id=1").get_json()["lines"][0]
+    assert (line["status"], line["customer"]) == ("unmatched", None)
+    assert names[0] in client.get("/changes?user_id=1&since=0").get_json()["deleted"]
+    with app.app_context():
+        assert verify_ledger(db.engine, full=True)["ok"]
+
+
+def test_bulk_purge_runs_in_chunks_and_keeps_active_customers(app, client, seed_ledger):
+    from sqlalchemy import text
+
+    from backend.database.database import db
+    from backend.models.customer import Customer
+    from backend.models.installment import create_plan
+    from backend.models.ledger import verify_ledger
+    from backend.models.rollup import rebuild_daily_rollup
+
+    names = seed_ledger(customers=7, transactions_per_customer=2)
+    with app.app_context():
+        rebuild_daily_rollup()
+        db.session.execute(text("UPDATE customers SET borc = 0 WHERE id IN (1, 2, 3, 5)"))
+        # Bekleyen taksiti olan müşteri silinmez
+        create_plan(db.session.get(Customer, 5), 500, 2, "monthly", "2030-01-01")
+        db.session.commit()
+    # Bakiyesi sıfırlanan ama yakın zamanda ödeme yapan müşteri de kalır
+    client.post("/customers/odeme-yap/", json={"user_id": 1, "customer_name": names[3], "amount": 20})
+
+    dry = client.post("/customers/purge", json={"user_id": 1, "dry_run": True}).get_json()
+    assert (dry["customers"], dry["names"]) == (3, names[:3])
+    result = client.post("/customers/purge", json={"user_id": 1, "chunk_size": 2}).get_json()
+    assert (result["customers"], result["chunks"]) == (3, 2)
+    assert result["rows"]["transactions"] == 6 and result["rows"]["daily_rollup"] == 3
+    assert result["max_chunk_ms"] > 0
+
+    with app.app_context():
+        assert [c.name for c in db.session.query(Customer).order_by(Customer.id)] == names[3:]
+        assert verify_ledger(db.engine, full=True)["ok"]
+    assert "Müşteri 1" not in client.get("/customers/?user_id=1").get_json()
+    assert client.post("/customers/purge", json={"user_id": 1}).get_json()["customers"] == 0
+    assert client.post("/customers/purge", json={"user_id": 1, "chunk_size": 0}).status_code == 400
+    assert client.post("/customers/purge", json={}).status_code == 400
+
+
+def test_archive_mode_copies_customers_and_all_history(app, seed_ledger, tmp_path):
+    from sqlalchemy import text
+
+    from backend.database.database import db
+    from backend.models.archive import archive_transactions
+    from backend.models.purge import purge_customers
+    from backend.models.rollup import rebuild_daily_rollup
+
+    seed_ledger(customers=4, transactions_per_customer=3)
+    with app.app_context():
+        rebuild_daily_rollup()
+        db.session.execute(text("UPDATE customers SET borc = 0 WHERE id IN (1, 2)"))
+        db.session.commit()
+        db.session.remove()
+        archive_transactions(db.engine, "2025-01-03", str(tmp_path / "years"))
+        result = purge_customers(1, archive=True, archive_dir=str(tmp_path))
+
+    assert result["customers"] == 2 and result["archive"].endswith("customers_archive.db")
+    assert (result["archived"], result["rows"]["archive_2025"]) == (4, 3)
+    copy = sqlite3.connect(result["archive"])
+    assert [row[0] for row in copy.execute("SELECT name FROM customers ORDER BY id")] == ["Müşteri 1", "Müşteri 2"]
+    # Ana tablodaki işlemler, devir satırı ve yıllık arşivdeki işlemler birlikte taşınır
+    assert copy.execute("SELECT COUNT(*) FROM transactions WHERE transaction_type = 'borc'").fetchone()[0] == 6
+    copy.close()
+    years = sqlite3.connect(tmp_path / "years" / "transactions_2025.db")
+    assert years.execute("SELECT COUNT(*) FROM transactions WHERE customer_id IN (1, 2)").fetchone()[0] == 0
+    years.close()
+
+
+def test_failed_chunk_leaves_archive_empty(app, seed_ledger, tmp_path, monkeypatch):
+    import pytest
+    from sqlalchemy import text
+
+    from backend.database.database import db
+    from backend.models import purge
+    from backend.models.rollup import rebuild_daily_rollup
+
+    seed_ledger(customers=2, transactions_per_customer=2)
+    with app.app_context():
+        rebuild_daily_rollup()
+        db.session.execute(text("UPDATE customers SET borc = 0"))
+        db.session.commit()
+
+        def fail(deleted):
+            raise RuntimeError("kaskad başarısız")
+
+        monkeypatch.setattr(purge, "_cascade", fail)
+        with pytest.raises(RuntimeError):
+            purge.purge_customers(1, archive=True, archive_dir=str(tmp_path))
+        assert db.session.execute(text("SELECT COUNT(*) FROM customers")).scalar() == 2
+
+    # Kaynak commit edilmediği için arşive hiçbir satır geçmez
+    copy = sqlite3.connect(tmp_path / "customers_archive.db")
+    tables = [row[0] for row in copy.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+    assert [copy.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables] == [0] * len(tables)
+    copy.close()
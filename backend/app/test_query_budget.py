@@ -0,0 +1,115 @@
+from urllib.parse import quote
+
+import pytest
+from flask import Flask, jsonify
+
+from backend.app.query_budget import get_query_budget, init_query_budget, query_budget
+
+
+@pytest.fixture
+def budget_client(app):
+    app.config["QUERY_BUDGET_CHECK"] = True
+    yield app.test_client()
+    app.config["QUERY_BUDGET_CHECK"] = False
+
+
+def assert_within_budget(response):
+    count = int(response.headers["X-Query-Count"])
+    budget = int(response.headers["X-Query-Budget"])
+    assert count <= budget, f"{count} sorgu çalıştı, bütçe {budget}"
+    return count
+
+
+def test_every_route_declares_a_budget(app):
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint == "static":
+            continue
+        view = app.view_functions[rule.endpoint]
+        for method in rule.methods - {"HEAD", "OPTIONS"}:
+            assert get_query_budget(view, method) is not None, f"{rule.rule} {method} bütçesiz"
+
+
+@pytest.mark.parametrize("scale", [5, 50])
+def test_routes_stay_within_budget(budget_client, seed_ledger, scale):
+    names = seed_ledger(customers=scale, transactions_per_customer=4)
+    name = names[0]
+
+    calls = [
+        budget_client.get("/"),
+        budget_client.get("/customers/?user_id=1"),
+        budget_client.get("/dashboard/?user_id=1"),
+        budget_client.get(f"/customers/transactions/{quote(name)}"),
+        budget_client.post("/customers/", json={"user_id": 1, "name": "Yeni", "urun": "Süt", "borc": 5}),
+        budget_client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": name, "amount": 5}),
+        budget_client.post("/customers/odeme-yap/", json={"user_id": 1, "customer_name": name, "amount": 5}),
+        budget_client.post("/customers/alacak-ekle/", json={"user_id": 1, "customer_name": name, "amount": 5}),
+        budget_client.post("/customers/import?user_id=1", data="ad;urun;borc\nİthal;Süt;7\n", content_type="text/csv"),
+        budget_client.post("/reconciliation/statements?user_id=1", data=f"tarih;tutar;gonderen\n2025-03-01;5;{name}\n",
+                           content_type="text/csv"),
+        budget_client.post("/reconciliation/review", json={"user_id": 1, "approve_matched": True}),
+        budget_client.post("/customers/late-fees", json={"user_id": 1, "rate": 2, "period": "2025-06"}),
+        budget_client.post("/customers/installments", json={"user_id": 1, "customer_name": name, "amount": 5, "count": 3}),
+        budget_client.get(f"/customers/installments?user_id=1&customer_name={quote(name)}"),
+        budget_client.post("/login/", json={"username": "user1", "password": "secret"}),
+        budget_client.delete("/customers/Yeni?user_id=1"),
+        budget_client.post("/customers/purge", json={"user_id": 1, "max_balance": 1000}),
+    ]
+    for response in calls:
+        assert response.status_code == 200, response.get_json()
+        assert_within_budget(response)
+
+
+def test_chunked_routes_scale_with_chunks_not_rows(budget_client, seed_ledger):
+    from backend.models.customer_import import CHUNK_SIZE
+
+    names = seed_ledger(customers=50, transactions_per_customer=4)
+    rows = 2 * CHUNK_SIZE + 1
+
+    customers = "".join(f"Toplu {i};Süt;{i % 3}\n" for i in range(rows))
+    response = budget_client.post("/customers/import?user_id=1", data="ad;urun;borc\n" + customers,
+                                  content_type="text/csv")
+    assert response.get_json()["imported"] == rows
+    assert assert_within_budget(response) < 30
+
+    lines = "".join(f"2025-03-01;1;{names[i % len(names)]}\n" for i in range(rows))
+    response = budget_client.post("/reconciliation/statements?user_id=1", data="tarih;tutar;gonderen\n" + lines,
+                                  content_type="text/csv")
+    assert response.get_json()["matched"] == rows
+    assert assert_within_budget(response) < 10
+
+    # Onaylanan tüm satırlar tek toplu yazmayla ödenir
+    response = budget_client.post("/reconciliation/review", json={"user_id": 1, "approve_matched": True})
+    assert response.get_json()["posted"] == rows
+    assert_within_budget(response)
+
+
+def test_dashboard_query_count_is_independent_of_customer_count(budget_client, seed_ledger):
+    seed_ledger(customers=3, transactions_per_customer=2)
+    small = assert_within_budget(budget_client.get("/dashboard/?user_id=1"))
+    seed_ledger(customers=200, transactions_per_customer=3)
+    large = assert_within_budget(budget_client.get("/dashboard/?user_id=1"))
+    assert small == large
+
+
+def test_harness_reports_exceeded_budget(app, seed_ledger):
+    from backend.database.database import db
+    from backend.models.customer import Customer
+
+    seed_ledger(customers=5, transactions_per_customer=2)
+
+    # Ana uygulama ilk istekten sonra yeni route kabul etmez, aynı veritabanına bağlı ayrı bir uygulama kullanılır
+    probe = Flask(__name__)
+    probe.config.update(app.config, QUERY_BUDGET_CHECK=True)
+    db.init_app(probe)
+    init_query_budget(probe)
+
+    @probe.route("/n-plus-one")
+    @query_budget(1)
+    def n_plus_one():
+        customers = db.session.query(Customer).all()
+        return jsonify([len(c.transactions) for c in customers])
+
+    response = probe.test_client().get("/n-plus-one")
+    assert int(response.headers["X-Query-Count"]) == 6
+    with pytest.raises(AssertionError):
+        assert_within_budget(response)
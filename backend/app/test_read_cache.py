@@ -0,0 +1,57 @@
+from urllib.parse import quote
+
+import pytest
+
+from backend.app.read_cache import MemoryBackend, ReadCache, SQLiteBackend
+
+
+def test_history_is_served_from_cache_until_a_write(app, client, seed_ledger):
+    cache = app.extensions["paytrack_read_cache"]
+    name = seed_ledger(customers=3, transactions_per_customer=2)[0]
+    path = f"/customers/transactions/{quote(name)}?user_id=1"
+
+    assert len(client.get(path).get_json()["transactions"]) == 2
+    hits = cache.hits
+    assert len(client.get(path).get_json()["transactions"]) == 2
+    assert cache.hits == hits + 1
+
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": name, "amount": 4})
+    assert len(client.get(path).get_json()["transactions"]) == 3
+
+
+def test_dashboard_and_list_reflect_writes(client, seed_ledger):
+    names = seed_ledger(customers=2, transactions_per_customer=1)
+    assert client.get("/dashboard/?user_id=1").get_json()["totalDebt"] == 20
+    client.get("/customers/?user_id=1")
+
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": names[1], "amount": 5})
+    assert client.get("/dashboard/?user_id=1").get_json()["totalDebt"] == 25
+    assert f"{names[1]} | Ekmek | Borç: 15.0₺" in client.get("/customers/?user_id=1").get_json()
+
+    stats = client.get("/metrics/cache").get_json()
+    assert stats["invalidations"] >= 1
+    assert 0 <= stats["hit_ratio"] <= 1
+
+
+def test_invalidation_only_touches_the_written_user(client, seed_ledger, app):
+    cache = app.extensions["paytrack_read_cache"]
+    first = seed_ledger(customers=1, transactions_per_customer=1, user_id=1)[0]
+    seed_ledger(customers=1, transactions_per_customer=1, user_id=2)
+    client.get("/dashboard/?user_id=1")
+    client.get("/dashboard/?user_id=2")
+
+    client.post("/customers/borc-ekle/", json={"user_id": 1, "customer_name": first, "amount": 1})
+    hits = cache.hits
+    client.get("/dashboard/?user_id=2")
+    assert cache.hits == hits + 1
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_backends(tmp_path, backend):
+    store = MemoryBackend(max_entries=2) if backend == "memory" else SQLiteBackend(str(tmp_path / "c.db"))
+    cache = ReadCache(store, ttl=60)
+    assert cache.get_or_build(1, "dashboard", lambda: {"v": 1}, 7) == {"v": 1}
+    assert cache.get_or_build(1, "dashboard", lambda: {"v": 2}, 7) == {"v": 1}
+    cache.invalidate(1, "Ali")
+    assert cache.get_or_build(1, "dashboard", lambda: {"v": 3}, 7) == {"v": 3}
+    assert cache.stats()["hit_ratio"] == pytest.approx(1 / 3, abs=1e-3)
@@ -0,0 +1,100 @@
+import io
+
+
+def upload(client, content: str, user_id=1):
+    return client.post(
+        f"/reconciliation/statements?user_id={user_id}",
+        data={"file": (io.BytesIO(content.encode("utf-8-sig")), "ozet.csv")},
+        content_type="multipart/form-data",
+    )
+
+
+def add_customers(client, *customers):
+    rows = "".join(f"{name};Ekmek;{amount}\n" for name, amount in customers)
+    client.post("/customers/import?user_id=1", data=f"ad;urun;borc\n{rows}".encode(), content_type="text/csv")
+
+
+def test_statement_lines_are_matched_reviewed_and_posted_in_one_write(app, client):
+    from backend.database.database import db
+    from backend.models.customer import Customer, Transaction
+
+    add_customers(client, ("Ayşe Yılmaz", 100), ("Mehmet Öztürk", 80), ("Ali Can", 30), ("Ali Cem", 45))
+    content = (
+        "İşlem Tarihi;Açıklama;Gönderen;Tutar;Dekont No\n"
+        "01.06.2025;EFT;YILMAZ AYŞE;1.000,00;R1\n"
+        "01.06.2025;EFT;AYSE YILMAZ;40,00;R2\n"
+        "02.06.2025;FAST;MEHMET OZTURKK;25,50;R3\n"
+        "02.06.2025;Havale;ALI C;45;R4\n"
+        "03.06.2025;Kira;Bilinmeyen Firma;10;R5\n"
+        "03.06.2025;Giden;Ayşe Yılmaz;-5;R6\n"
+    )
+    summary = upload(client, content).get_json()
+    assert (summary["new"], summary["matched"], summary["suggested"], summary["unmatched"], summary["invalid"]) \
+        == (5, 1, 3, 1, 1)
+
+    lines = {line["reference"]: line for line in client.get("/reconciliation/queue?user_id=1").get_json()["lines"]}
+    # Sıralı kelimeler kesin anahtardır; tutar bakiyeyi aşarsa satır incelemeye düşer
+    assert (lines["R1"]["status"], lines["R1"]["customer"]) == ("suggested", "Ayşe Yılmaz")
+    assert lines["R1"]["note"] == "Tutar müşterinin borcundan büyük"
+    assert (lines["R2"]["status"], lines["R2"]["method"]) == ("matched", "exact")
+    assert (lines["R3"]["method"], lines["R3"]["customer"]) == ("fuzzy", "Mehmet Öztürk")
+    # Benzer iki aday arasında tutarı açık bakiyeye eşit olan seçilir
+    assert (lines["R4"]["method"], lines["R4"]["customer"]) == ("amount", "Ali Cem")
+    assert lines["R5"]["customer"] is None
+
+    with app.app_context():
+        before = db.session.query(Transaction).count()
+    result = client.post("/reconciliation/review", json={
+        "user_id": 1, "approve_matched": True,
+        "approve": [{"line_id": lines["R3"]["id"]}, {"line_id": lines["R4"]["id"]}, {"line_id": lines["R1"]["id"]}],
+        "reject": [lines["R5"]["id"]],
+    }).get_json()
+    assert (result["posted"], result["total"], result["rejected"]) == (3, 110.5, 1)
+    assert result["errors"] == [{"line_id": lines["R1"]["id"], "error": "Tutar müşterinin borcundan büyük"}]
+
+    with app.app_context():
+        assert db.session.query(Transaction).count() == before + 3
+        balances = dict(db.session.query(Customer.name, Customer.borc).all())
+        assert balances == {"Ayşe Yılmaz": 6000, "Mehmet Öztürk": 5450, "Ali Can": 3000, "Ali Cem": 0}
+    assert "Ayşe Yılmaz | Ekmek | Borç: 60.0₺" in client.get("/customers/?user_id=1").get_json()
+
+    queue = client.get("/reconciliation/queue?user_id=1").get_json()["lines"]
+    assert [line["reference"] for line in queue] == ["R1"]
+    # Yazılmış satır tekrar onaylanamaz
+    again = client.post("/reconciliation/review", json={"user_id": 1, "approve_matched": True}).get_json()
+    assert again["posted"] == 0
+
+
+def test_reuploaded_statement_is_deduplicated(client):
+    add_customers(client, ("Ayşe Yılmaz", 100))
+    content = (
+        "tarih,tutar,gonderen,aciklama\n"
+        "2025-06-01,10,Ayşe Yılmaz,\n"
+        "2025-06-01,10,Ayşe Yılmaz,\n"
+        "2025-06-02,15.5,,Ayse Yilmaz odemesi\n"
+    )
+    first = upload(client, content).get_json()
+    # Açıklamadaki ad yalnızca öneri olur
+    assert (first["new"], first["matched"], first["suggested"], first["duplicates"]) == (3, 2, 1, 0)
+    second = upload(client, content).get_json()
+    assert (second["new"], second["duplicates"]) == (0, 3)
+
+
+def test_name_index_and_amount_parsing():
+    import pytest
+
+    from backend.models.reconciliation import NameIndex, parse_statement_amount
+
+    index = NameIndex([(1, "Şükrü Işık"), (2, "İsmail Çelik"), (3, "Ismail Celikkol")])
+    assert index.match("ISIK SUKRU") == ("exact", [(1, 1.0)])
+    method, scored = index.match("ismail celk")
+    assert method == "fuzzy" and scored[0][0] == 2
+    method, scored = index.match("Kira bedeli - İsmail Çelik", containment=True)
+    assert scored[0] == (2, 1.0)
+    assert index.match("  ") == (None, [])
+
+    assert parse_statement_amount("1.234,56") == 123456
+    assert parse_statement_amount("1,234.56") == 123456
+    assert parse_statement_amount("250 TL") == 25000
+    with pytest.raises(ValueError):
+        parse_statement_amount("abc")
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def post(app, seed_ledger):
+    """Belirli tarihli işlemleri Customer.add_transaction ile yazar"""
+    from backend.database.database import db
+    from backend.models.customer import Customer
+    from backend.models.money import to_kurus
+
+    seed_ledger(customers=0)
+    as_of = datetime(2025, 6, 30, 12, 0, 0)
+
+    def post(name, transaction_type, amount, days_ago):
+        with app.app_context():
+            customer = db.session.query(Customer).filter_by(user_id=1, name=name).first()
+            if customer is None:
+                customer = Customer(name=name, urun="Ekmek", borc=0, user_id=1)
+                db.session.add(customer)
+                db.session.commit()
+            timestamp = (as_of - timedelta(days=days_ago)).strftime("%Y-%m-%d %H:%M:%S")
+            customer.add_transaction(transaction_type, to_kurus(amount), timestamp)
+
+    return post
+
+
+def test_aging_allocates_payments_fifo(client, post):
+    post("Ali", "borc", 100, 100)
+    post("Ali", "borc", 50, 45)
+    post("Ali", "odeme", 120, 10)
+    post("Ali", "alacak", 30, 5)
+    post("Veli", "borc", 40, 70)
+
+    report = client.get("/reports/aging?user_id=1&as_of=2025-06-30").get_json()
+    by_name = {c["name"]: c["buckets"] for c in report["customers"]}
+    assert by_name["Ali"] == {"0-30": 30, "31-60": 30, "61-90": 0, "90+": 0}
+    assert by_name["Veli"] == {"0-30": 0, "31-60": 0, "61-90": 40, "90+": 0}
+    assert report["totals"] == {"0-30": 30, "31-60": 30, "61-90": 40, "90+": 0}
+
+
+def test_aging_as_of_past_date_ignores_later_activity(client, post):
+    post("Ali", "borc", 100, 100)
+    post("Ali", "borc", 50, 45)
+    post("Ali", "odeme", 120, 10)
+    post("Ali", "alacak", 30, 5)
+    post("Veli", "borc", 40, 70)
+
+    # 20 Mayıs'ta ödeme ve alacak henüz yok: borç 150, ikisi de açık
+    report = client.get("/reports/aging?user_id=1&as_of=2025-05-20").get_json()
+    assert [(c["name"], c["borc"], c["buckets"]) for c in report["customers"]] == [
+        ("Ali", 150, {"0-30": 50, "31-60": 100, "61-90": 0, "90+": 0}),
+        ("Veli", 40, {"0-30": 40, "31-60": 0, "61-90": 0, "90+": 0}),
+    ]
+    # Veli henüz yoktu
+    report = client.get("/reports/aging?user_id=1&as_of=2025-04-01").get_json()
+    assert [(c["name"], c["borc"]) for c in report["customers"]] == [("Ali", 100)]
+
+
+def test_aging_dates_opening_balance_from_customer_creation(app, client, seed_ledger):
+    from backend.database.database import db
+    from backend.models.customer import Customer
+
+    client.post("/customers/", json={"user_id": 1, "name": "Açılış", "urun": "Süt", "borc": 25})
+    with app.app_context():
+        # Değişiklik kaydı olmayan eski müşterinin açılış borcu en eski kovaya düşer
+        db.session.add(Customer(name="Eski", urun="Süt", borc=1000, user_id=1))
+        db.session.commit()
+    report = client.get("/reports/aging?user_id=1").get_json()
+    by_name = {c["name"]: c["buckets"] for c in report["customers"]}
+    assert by_name["Açılış"] == {"0-30": 25, "31-60": 0, "61-90": 0, "90+": 0}
+    assert by_name["Eski"]["90+"] == 10
+
+
+def test_timeseries_reads_incremental_rollup(app, client, post):
+    from backend.database.database import db
+    from backend.models.rollup import rebuild_daily_rollup
+    from backend.models.reports import timeseries_report
+
+    post("Ali", "borc", 100, 3)
+    post("Ali", "borc", 20, 3)
+    post("Ali", "odeme", 50, 1)
+    post("Veli", "alacak", 5, 1)
+
+    days = client.get("/reports/timeseries?user_id=1&start=2025-06-01").get_json()["days"]
+    assert days == [
+        {"day": "2025-06-27", "borc": 120, "odeme": 0, "alacak": 0, "transactions": 2},
+        {"day": "2025-06-29", "borc": 0, "odeme": 50, "alacak": 5, "transactions": 2},
+    ]
+
+    # Artımlı güncelleme ile baştan hesaplama aynı sonucu vermeli
+    with app.app_context():
+        rebuild_daily_rollup(db.session)
+        assert timeseries_report(1, "2025-06-01")["days"] == days
@@ -0,0 +1,148 @@
+import os
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def shards(app, tmp_path):
+    from backend.database.sharding import ShardRouter
+
+    router = ShardRouter(str(tmp_path), "user")
+    app.extensions["paytrack_shards"] = router
+    yield router
+    app.extensions["paytrack_shards"] = None
+    router.dispose()
+
+
+def count(path, table):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_tenant_data_goes_to_users_own_file(app, client, shards):
+    from backend.database.database import db
+
+    user_ids = [
+        client.post("/users/", json={"username": name, "password": "secret"}).get_json()["user_id"]
+        for name in ("dukkan1", "dukkan2")
+    ]
+    for user_id in user_ids:
+        assert client.post("/customers/", json={
+            "user_id": user_id, "name": "Ali", "urun": "Ekmek", "borc": 10
+        }).status_code == 200
+        assert client.post("/customers/borc-ekle/", json={
+            "user_id": user_id, "customer_name": "Ali", "amount": user_id
+        }).status_code == 200
+
+    # Kullanıcılar merkezi katalogda, müşteriler sadece kendi dosyalarında
+    with app.app_context():
+        central = db.engine.url.database
+    assert count(central, "users") == 2
+    assert count(central, "customers") == 0
+    for user_id in user_ids:
+        path = shards.path(shards.shard_for(user_id))
+        assert count(path, "customers") == 1
+        assert count(path, "changes") == 2
+        assert client.get(f"/customers/?user_id={user_id}").get_json() == [f"Ali | Ekmek | Borç: {10.0 + user_id}₺"]
+
+    response = client.post("/login/", json={"username": "dukkan2", "password": "secret"})
+    assert response.status_code == 200
+
+
+def test_hash_buckets_are_stable(tmp_path):
+    from backend.database.sharding import ShardRouter
+
+    router = ShardRouter(str(tmp_path), 4)
+    keys = {router.shard_for(user_id) for user_id in range(1, 200)}
+    assert keys == {"shard_000", "shard_001", "shard_002", "shard_003"}
+    assert router.shard_for(42) == ShardRouter(str(tmp_path), "4").shard_for("42")
+    with pytest.raises(ValueError):
+        router.shard_for("abc")
+
+
+def test_invalid_user_id_is_rejected_before_routing(client, shards):
+    assert client.get("/customers/?user_id=abc").status_code == 400
+    assert client.post("/customers/", json={"user_id": "abc", "name": "Ali", "urun": "Ekmek", "borc": 1}).status_code == 400
+    assert client.get("/customers/?user_id=0").status_code == 400
+
+
+def test_split_existing_database(app, client, seed_ledger, shards):
+    from backend.database.database import db
+    from backend.database.sharding import split_database
+
+    seed_ledger(customers=3, transactions_per_customer=2, user_id=1)
+    names = seed_ledger(customers=2, transactions_per_customer=1, user_id=2)
+    with app.app_context():
+        result = split_database(db.engine.url.database, shards)
+    assert result == {
+        "user_1": {"users": 1, "customers": 3, "transactions": 6},
+        "user_2": {"users": 1, "customers": 2, "transactions": 2},
+    }
+    assert os.path.exists(shards.path("user_2"))
+
+    # id'ler korunduğu için yazmalar kaldığı yerden devam eder
+    response = client.post("/customers/odeme-yap/", json={"user_id": 2, "customer_name": names[0], "amount": 4})
+    assert response.status_code == 200
+    assert f"{names[0]} | Ekmek | Borç: 6.0₺" in client.get("/customers/?user_id=2").get_json()
+    history = client.get(f"/customers/transactions/{names[0]}?user_id=2").get_json()["transactions"]
+    assert [t["transaction_type"] for t in history] == ["borc", "odeme"]
+
+    with pytest.raises(ValueError):
+        with app.app_context():
+            split_database(db.engine.url.database, shards)
+
+
+def test_archives_stay_per_shard_with_overlapping_customer_ids(app, client, seed_ledger, shards, tmp_path):
+    from backend.database.database import db
+    from backend.database.sharding import shard_scope, split_database
+    from backend.models.archive import archive_shards, archive_transactions
+    from backend.models.customer import Customer
+
+    archive_dir = str(tmp_path / "archive")
+
+    def archived(key):
+        with sqlite3.connect(os.path.join(archive_dir, key, "transactions_2025.db")) as conn:
+            return conn.execute("SELECT customer_id, COUNT(*) FROM transactions GROUP BY customer_id").fetchall()
+
+    seed_ledger(customers=1, transactions_per_customer=2, user_id=1)
+    veli = seed_ledger(customers=1, transactions_per_customer=2, user_id=2)[0]
+    with app.app_context():
+        archive_transactions(db.engine, "2025-02-01", archive_dir)
+        split_database(db.engine.url.database, shards, archive_dir)
+    # Bölme yalnızca shard'ın kendi müşterilerinin arşivini taşır
+    assert (archived("user_1"), archived("user_2")) == ([(1, 2)], [(2, 2)])
+
+    # Bölmeden sonra shard'lar id'leri ayrı üretir: kullanıcı 1'in yeni müşterisi de 2 numaralı
+    client.post("/customers/", json={"user_id": 1, "name": "Yeni", "urun": "Süt", "borc": 0})
+    with app.app_context(), shard_scope("user_1"):
+        yeni = db.session.query(Customer).filter_by(name="Yeni").one()
+        assert yeni.id == 2
+        yeni.add_transaction("borc", 700, "2025-01-20 10:00:00")
+    archive_shards(app, "2025-02-01", archive_dir)
+    assert (archived("user_1"), archived("user_2")) == ([(1, 2), (2, 1)], [(2, 2)])
+
+    history = client.get(f"/customers/transactions/{veli}?user_id=2&start=2025-01-01").get_json()["transactions"]
+    assert [t["amount"] for t in history] == [10, 10]
+    assert client.delete("/customers/Yeni?user_id=1").status_code == 200
+    assert (archived("user_1"), archived("user_2")) == ([(1, 2)], [(2, 2)])
+
+
+def test_write_queue_writes_to_callers_shard(app, client, shards):
+    from backend.app.write_queue import WriteQueue
+
+    queue = WriteQueue(app, max_batch=10, max_delay=0.01)
+    app.extensions["paytrack_write_queue"] = queue
+    try:
+        for user_id in (1, 2):
+            client.post("/customers/", json={"user_id": user_id, "name": "Ali", "urun": "Ekmek", "borc": 0})
+            assert client.post("/customers/borc-ekle/", json={
+                "user_id": user_id, "customer_name": "Ali", "amount": 5 * user_id
+            }).status_code == 200
+    finally:
+        queue.close()
+        app.extensions["paytrack_write_queue"] = None
+
+    for user_id in (1, 2):
+        with sqlite3.connect(shards.path(shards.shard_for(user_id))) as conn:
+            assert conn.execute("SELECT amount FROM transactions").fetchall() == [(500 * user_id,)]
@@ -0,0 +1,67 @@
+import subprocess
+import sys
+
+
+def test_import_does_not_load_reportlab_numpy_openpyxl_or_touch_the_database(tmp_path):
+    from backend.benchmarks.startup import _environment, import_profile
+
+    env = _environment(str(tmp_path))
+    profile = import_profile("backend.app.main", env)
+    assert "backend.app.main" in profile
+    assert not [name for name in profile if name.startswith(("reportlab", "numpy", "openpyxl"))]
+    # Import sırasında veritabanı dosyası oluşturulmaz
+    assert not (tmp_path / "startup.db").exists()
+
+
+def test_prepared_schema_is_not_rebuilt(tmp_path):
+    from backend.benchmarks.startup import PROJECT_ROOT, _environment
+
+    script = (
+        "from sqlalchemy import event\n"
+        "from backend.app.main import app, create_app\n"
+        "from backend.database.database import db\n"
+        "from backend.database.migrations import prepare_schema\n"
+        "create_app()\n"
+        "statements = []\n"
+        "with app.app_context():\n"
+        "    event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(a[2]))\n"
+        "    print(prepare_schema(db.engine), len(statements))\n"
+    )
+    env = _environment(str(tmp_path))
+    run = lambda: subprocess.run(  # noqa: E731
+        [sys.executable, "-c", script], env=env, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()
+    # İlk açılış şemayı kurar, sonraki açılışlar yalnızca parmak izini okur
+    assert run() == ["False", "1"]
+    assert run() == ["False", "1"]
+
+
+def test_fingerprint_change_reprepares(app):
+    from backend.database.database import db
+    from backend.database.migrations import prepare_schema
+
+    with app.app_context():
+        assert prepare_schema(db.engine) is True
+        assert prepare_schema(db.engine) is False
+        db.session.execute(db.text("UPDATE schema_state SET fingerprint = 'eski'"))
+        db.session.commit()
+        assert prepare_schema(db.engine) is True
+
+
+def test_reloader_watcher_starts_no_background_jobs(tmp_path):
+    from backend.benchmarks.startup import PROJECT_ROOT, _environment
+
+    script = (
+        "import threading\n"
+        "from backend.app.main import app, create_app, start_background_jobs\n"
+        "before = threading.active_count()\n"
+        "create_app(background_jobs=False)\n"
+        "print(app.extensions['paytrack_scheduler'] is None, threading.active_count() == before)\n"
+        "start_background_jobs()\n"
+        "print(app.extensions['paytrack_scheduler'] is None)\n"
+    )
+    env = {**_environment(str(tmp_path)), "PAYTRACK_INSTALLMENT_SCHEDULER": "1"}
+    out = subprocess.run(
+        [sys.executable, "-c", script], env=env, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()
+    assert out == ["True", "True", "False"]
@@ -0,0 +1,63 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+@pytest.fixture
+def write_queue(app):
+    from backend.app.write_queue import WriteQueue
+
+    # Toplanma penceresi geniş tutulur ki eşzamanlı istekler aynı commit'e düşsün
+    queue = WriteQueue(app, max_batch=50, max_delay=0.05)
+    app.extensions["paytrack_write_queue"] = queue
+    yield queue
+    queue.close()
+    app.extensions["paytrack_write_queue"] = None
+
+
+def test_concurrent_writes_share_commits(app, client, seed_ledger, write_queue):
+    from backend.database.database import db
+    from backend.models.customer import Customer, Transaction
+
+    names = seed_ledger(customers=2, transactions_per_customer=1)
+
+    def pay(args):
+        name, amount = args
+        return client.post("/customers/odeme-yap/", json={
+            "user_id": 1, "customer_name": name, "amount": amount
+        }).status_code
+
+    # Her müşterinin 10₺ borcu var: 4 x 2₺ geçer, 11₺'lik ödeme reddedilir
+    calls = [(name, 2) for name in names for _ in range(4)] + [(names[0], 11)]
+    with ThreadPoolExecutor(max_workers=9) as pool:
+        statuses = list(pool.map(pay, calls))
+
+    assert statuses.count(200) == 8
+    assert statuses[-1] == 400
+
+    stats = write_queue.stats()
+    assert stats["operations"] == 9
+    assert stats["batches"] < stats["operations"]
+
+    with app.app_context():
+        assert [c.borc for c in db.session.query(Customer).all()] == [200, 200]
+        assert db.session.query(Transaction).filter_by(transaction_type="odeme").count() == 8
+
+    # Yanıt döndüğünde commit yapılmış ve önbellek geçersiz kılınmış olmalı
+    assert f"{names[0]} | Ekmek | Borç: 2.0₺" in client.get("/customers/?user_id=1").get_json()
+
+
+def test_failing_batch_is_retried_one_by_one(app, seed_ledger, write_queue):
+    from backend.database.database import db
+    from backend.models.customer import Customer
+
+    seed_ledger(customers=1, transactions_per_customer=1)
+    before = write_queue.submit(1, "borc", 100, "2025-01-01 10:00:00")
+    broken = write_queue.submit(1, "borc", None, "2025-01-01 10:00:00")
+    after = write_queue.submit(1, "borc", 100, "2025-01-01 10:00:00")
+    assert before.result(timeout=5) and after.result(timeout=5)
+    with pytest.raises(TypeError):
+        broken.result(timeout=5)
+
+    with app.app_context():
+        assert db.session.query(Customer).one().borc == 1200
@@ -0,0 +1,152 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from backend.database.database import db
+from backend.database.sharding import current_shard, shard_scope
+from backend.models.customer import post_transaction
+from backend.models.idempotency import store_response
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Defter yazmalarını tek bir yazıcı iş parçacığında toplu commit eden kuyruk.
+
+    SQLite aynı anda tek yazıcıya izin verir; her isteğin kendi işlemini
+    açıp diske yazması yerine istekler işlemi kuyruğa bırakır. Yazıcı
+    max_delay saniye boyunca ya da max_batch işleme ulaşana kadar biriktirip
+    hepsini tek bir commit ile yazar. Her isteğin Future'ı kendi sonucuyla
+    (işlem id'si veya doğrulama hatası) tamamlanır.
+    """
+
+    def __init__(self, app, max_batch: int = 100, max_delay: float = 0.005, max_pending: int = 10000):
+        self.app = app
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.batches = 0
+        self.operations = 0
+        self.largest_batch = 0
+        self._thread = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, customer_id, transaction_type, amount, timestamp, description='',
+               idempotency: dict = None) -> Future:
+        """İşlemi kuyruğa ekler; kuyruk doluysa yer açılana kadar bekler.
+
+        Sharding açıksa işlem çağıranın shard'ına yazılır. idempotency
+        verilirse saklanacak yanıt işlemle aynı commit'te yazılır.
+        """
+        future = Future()
+        args = (customer_id, transaction_type, amount, timestamp, description)
+        self._queue.put((future, current_shard(), args, idempotency))
+        return future
+
+    def close(self, timeout: float = 5.0):
+        """Kuyruktaki işlemleri yazıp yazıcıyı durdurur"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "operations": self.operations,
+            "avg_batch": round(self.operations / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+    def _collect(self, first) -> tuple:
+        """İlk işlemden sonra süre ya da adet dolana kadar gelenleri toplar"""
+        batch, stop = [first], False
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+        return batch, stop
+
+    def _run(self):
+        with self.app.app_context():
+            while True:
+                first = self._queue.get()
+                if first is _STOP:
+                    return
+                batch, stop = self._collect(first)
+                batch = [item for item in batch if item[0].set_running_or_notify_cancel()]
+                if batch:
+                    self._write(batch)
+                db.session.remove()
+                if stop:
+                    return
+
+    @staticmethod
+    def _post(args, idempotency):
+        transaction_id = post_transaction(*args)[0]
+        if idempotency is not None:
+            store_response(idempotency)
+        return transaction_id
+
+    def _write(self, batch):
+        results = []
+        try:
+            for future, shard, args, idempotency in batch:
+                try:
+                    with shard_scope(shard):
+                        results.append((future, self._post(args, idempotency), None))
+                except (ValueError, LookupError) as e:
+                    # Koşullu UPDATE satır değiştirmedi; toplu işlemi bozmaz
+                    results.append((future, None, e))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Toplu yazma başarısız, işlemler tek tek deneniyor")
+            self._write_one_by_one(batch)
+            return
+
+        self.batches += 1
+        self.operations += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        for future, transaction_id, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(transaction_id)
+
+    def _write_one_by_one(self, batch):
+        # Hatalı işlem diğerlerini de düşürmesin
+        for future, shard, args, idempotency in batch:
+            try:
+                with shard_scope(shard):
+                    transaction_id = self._post(args, idempotency)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                future.set_exception(e)
+            else:
+                self.batches += 1
+                self.operations += 1
+                future.set_result(transaction_id)
+
+
+def create_write_queue(app):
+    """WRITE_QUEUE açıksa yazıcı iş parçacığını başlatır, değilse None döndürür"""
+    if not app.config.get("WRITE_QUEUE"):
+        return None
+    return WriteQueue(
+        app,
+        max_batch=int(app.config.get("WRITE_QUEUE_BATCH_SIZE", 100)),
+        max_delay=float(app.config.get("WRITE_QUEUE_BATCH_MS", 5)) / 1000.0,
+        max_pending=int(app.config.get("WRITE_QUEUE_MAX_PENDING", 10000)),
+    )
@@ -0,0 +1,9 @@
+"""PayTrack benchmark paketi.
+
+Sentetik defter verisi üretir ve API uç noktalarını ölçer:
+
+    python -m backend.benchmarks --users 5 --customers 500 --transactions 50000
+
+Sonuçlar JSON olarak yazılır, böylece farklı commit'lerin çalıştırmaları
+karşılaştırılabilir.
+"""
@@ -0,0 +1,3 @@
+from backend.benchmarks.runner import main
+
+main()
@@ -0,0 +1,99 @@
+"""Çevrim içi yedek sırasında yazma gecikmesi ölçümü.
+
+    python -m backend.benchmarks.backup --transactions 500000
+
+Ayrı bir iş parçacığı yedek boyunca kısa aralıklarla tek satırlık yazıp
+commit eder ve her commit'in süresini kaydeder. Aynı veritabanı önce tek
+adımda (pages=-1, kaynak baştan sona kilitli), sonra küçük parçalar halinde
+(backup.PAGES) yedeklenir; iki durumda yazıcının gördüğü en uzun bekleme
+karşılaştırılır.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from backend.benchmarks.datagen import generate_ledger
+from backend.database import backup
+
+
+def _percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 3)
+
+
+def _measure(db_path, destination, pages, sleep, interval):
+    latencies = []
+    done = threading.Event()
+
+    def write():
+        conn = sqlite3.connect(db_path, timeout=60)
+        try:
+            while not done.is_set():
+                t0 = time.perf_counter()
+                conn.execute("UPDATE customers SET urun = urun WHERE id = 1")
+                conn.commit()
+                latencies.append((time.perf_counter() - t0) * 1000)
+                time.sleep(interval)
+        finally:
+            conn.close()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    time.sleep(0.05)
+    try:
+        result = backup.backup_database(db_path, destination, pages=pages, sleep=sleep, max_restarts=1000)
+    finally:
+        done.set()
+        writer.join()
+    os.remove(destination)
+    return {
+        "pages": pages,
+        "seconds": result["seconds"],
+        "steps": result["steps"],
+        "restarts": result["restarts"],
+        "max_step_ms": result["max_step_ms"],
+        "writes": len(latencies),
+        "write_p50_ms": _percentile(latencies, 0.5),
+        "write_p99_ms": _percentile(latencies, 0.99),
+        "write_max_ms": round(max(latencies), 3) if latencies else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack çevrim içi yedek benchmark'ı")
+    parser.add_argument("--customers", type=int, default=5000)
+    parser.add_argument("--transactions", type=int, default=500000)
+    parser.add_argument("--pages", type=int, default=backup.PAGES)
+    parser.add_argument("--sleep-ms", type=float, default=backup.SLEEP * 1000)
+    parser.add_argument("--interval-ms", type=float, default=2.0, help="Yazıcının commit'ler arası beklemesi")
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="paytrack-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    generate_ledger(db_path, users=5, customers=args.customers, transactions=args.transactions)
+    destination = os.path.join(workdir, "copy.db")
+    interval = args.interval_ms / 1000
+
+    results = {
+        "transactions": args.transactions,
+        "bytes": os.path.getsize(db_path),
+        "one_step": _measure(db_path, destination, -1, 0, interval),
+        "chunked": _measure(db_path, destination, args.pages, args.sleep_ms / 1000, interval),
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+import os
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from werkzeug.security import generate_password_hash
+
+from backend.database.database import Base, DB_PATH
+from backend.models.user import User
+from backend.models.customer import Customer, Transaction
+
+# Benchmark kullanıcılarının ortak şifresi
+BENCH_PASSWORD = "bench"
+
+NAMES = [
+    "Ahmet", "Mehmet", "Ayşe", "Fatma", "Mustafa", "Emine", "Ali", "Hatice",
+    "Hüseyin", "Zeynep", "Hasan", "Elif", "İbrahim", "Meryem", "Murat", "Şerife",
+    "Ömer", "Sultan", "Yusuf", "Özlem", "Kemal", "Gül", "Çağlar", "Ümran",
+]
+SURNAMES = [
+    "Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Yıldırım", "Öztürk",
+    "Aydın", "Özdemir", "Arslan", "Doğan", "Kılıç", "Aslan", "Çetin", "Kara",
+]
+PRODUCTS = ["Ekmek", "Süt", "Sigara", "Gazete", "Market", "Manav", "Kasap", "Tüp", "Su"]
+
+# İşlem tipi ağırlıkları: borc, odeme, alacak
+TYPE_WEIGHTS = (0.55, 0.35, 0.10)
+
+
+def _amount(rng: random.Random, median: float) -> int:
+    """Log-normal dağılımlı, 0.5₺'ye yuvarlanmış tutarı kuruş olarak üretir"""
+    value = rng.lognormvariate(0, 0.9) * median
+    return max(50, round(value * 2) * 50)
+
+
+def _timestamp(rng: random.Random, start: datetime, days: int) -> datetime:
+    """Mesai saatlerine yoğunlaşan rastgele bir zaman damgası üretir"""
+    day = start + timedelta(days=rng.randrange(days))
+    hour = min(22, max(7, int(rng.gauss(14, 3))))
+    return day.replace(hour=hour, minute=rng.randrange(60), second=rng.randrange(60))
+
+
+def generate_ledger(db_path, users: int = 5, customers: int = 200, transactions: int = 20000,
+                    seed: int = 42, days: int = 365, end: datetime = None) -> dict:
+    """Verilen SQLite dosyasına sentetik kullanıcı, müşteri ve işlem yazar.
+
+    Dosya varsa silinip baştan oluşturulur. Aynı seed her zaman aynı veriyi
+    üretir. Müşteri bakiyeleri işlemlerle tutarlıdır; ödemeler hiçbir zaman
+    o anki borcu aşmaz.
+    """
+    db_path = os.path.abspath(db_path)
+    if db_path == os.path.abspath(DB_PATH):
+        raise ValueError("Benchmark verisi ana veritabanına yazılamaz!")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    rng = random.Random(seed)
+    end = end or datetime(2025, 7, 1)
+    start = end - timedelta(days=days)
+
+    # Şemayı modellerden oluştur
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine, tables=[User.__table__, Customer.__table__, Transaction.__table__])
+    engine.dispose()
+
+    password_hash = generate_password_hash(BENCH_PASSWORD)
+    user_rows = [(uid, f"bench_user_{uid}", password_hash) for uid in range(1, users + 1)]
+
+    customer_rows = []
+    seen = set()
+    for cid in range(1, customers + 1):
+        user_id = rng.randint(1, users)
+        name = f"{rng.choice(NAMES)} {rng.choice(SURNAMES)}"
+        while (user_id, name) in seen:
+            name = f"{name} {rng.randint(2, 99)}"
+        seen.add((user_id, name))
+        customer_rows.append([cid, user_id, name, rng.choice(PRODUCTS), 0])
+
+    # Bazı müşteriler çok daha aktif olsun (Pareto dağılımı)
+    weights = [rng.paretovariate(1.2) for _ in customer_rows]
+    picked = rng.choices(range(customers), weights=weights, k=transactions) if customers else []
+    events = sorted(
+        (_timestamp(rng, start, days), idx) for idx in picked
+    )
+
+    transaction_rows = []
+    for tid, (ts, idx) in enumerate(events, start=1):
+        customer = customer_rows[idx]
+        balance = customer[4]
+        transaction_type = rng.choices(("borc", "odeme", "alacak"), weights=TYPE_WEIGHTS)[0]
+        if transaction_type == "odeme":
+            if balance <= 0:
+                transaction_type = "borc"
+                amount = _amount(rng, 40)
+            else:
+                amount = min(balance, _amount(rng, 60))
+        else:
+            amount = _amount(rng, 40 if transaction_type == "borc" else 25)
+
+        customer[4] = balance - amount if transaction_type == "odeme" else balance + amount
+        transaction_rows.append((
+            tid, customer[0], amount, transaction_type,
+            "" if rng.random() < 0.7 else f"Fiş #{rng.randint(1000, 9999)}",
+            ts.strftime("%Y-%m-%d %H:%M:%S"),
+        ))
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany("INSERT INTO users (id, username, password_hash) VALUES (?, ?, ?)", user_rows)
+        conn.executemany(
+            "INSERT INTO customers (id, user_id, name, urun, borc) VALUES (?, ?, ?, ?, ?)",
+            [tuple(row) for row in customer_rows]
+        )
+        conn.executemany(
+            "INSERT INTO transactions (id, customer_id, amount, transaction_type, description, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            transaction_rows
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    return {
+        "db_path": db_path,
+        "seed": seed,
+        "users": [{"id": row[0], "username": row[1]} for row in user_rows],
+        "customers": [{"id": row[0], "user_id": row[1], "name": row[2]} for row in customer_rows],
+        "transactions": len(transaction_rows),
+    }
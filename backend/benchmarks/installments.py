@@ -0,0 +1,92 @@
+"""Vadesi gelmiş taksitlerin toplu yazılması ölçümü.
+
+    python -m backend.benchmarks.installments --installments 100000
+
+Her müşteriye geçmiş tarihli aylık bir taksit planı açılır; böylece tüm
+taksitlerin vadesi gelmiş olur (uzun bir kesinti sonrası durum). Ardından
+zamanlayıcının tek bir turda hepsini kaç saniyede yazdığı ölçülür.
+Karşılaştırma için aynı sayıda taksitin bir kısmı, borc-ekle'deki gibi
+işlem başına ayrı commit ile (Customer.add_transaction) yazılır.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from backend.benchmarks.datagen import generate_ledger
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack taksit zamanlayıcısı benchmark'ı")
+    parser.add_argument("--installments", type=int, default=100000)
+    parser.add_argument("--per-plan", type=int, default=12)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--baseline", type=int, default=2000, help="Tek tek yazılacak taksit sayısı")
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    args = parser.parse_args(argv)
+
+    plans = -(-args.installments // args.per_plan)
+    workdir = tempfile.mkdtemp(prefix="paytrack-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    generate_ledger(db_path, users=5, customers=plans, transactions=plans)
+
+    os.environ["PAYTRACK_DATABASE_URI"] = f"sqlite:///{db_path}"
+    os.environ["PAYTRACK_REPORTS_DIR"] = os.path.join(workdir, "reports")
+    os.environ["PAYTRACK_INSTALLMENT_SCHEDULER"] = "0"
+    from backend.app.main import create_app
+    from backend.app.scheduler import InstallmentScheduler
+    from backend.database.database import db
+    from backend.models.customer import Customer
+    from backend.models.installment import create_plan
+    app = create_app()
+
+    results = {"installments": 0, "plans": plans}
+    with app.app_context():
+        t0 = time.perf_counter()
+        remaining = args.installments
+        for customer in db.session.query(Customer).order_by(Customer.id).limit(plans):
+            count = min(args.per_plan, remaining)
+            create_plan(customer, 10000, count, "monthly", "2020-01-01", "Benchmark")
+            remaining -= count
+        db.session.commit()
+        results["installments"] = args.installments
+        results["create_plans_s"] = round(time.perf_counter() - t0, 3)
+
+        # Karşılaştırma: işlem başına bir commit
+        customers = db.session.query(Customer).order_by(Customer.id).limit(args.baseline).all()
+        t0 = time.perf_counter()
+        for customer in customers:
+            customer.add_transaction("borc", 10000, "2020-01-01 00:00:00", "Tek tek")
+        elapsed = time.perf_counter() - t0
+        results["one_by_one"] = {
+            "posted": len(customers),
+            "seconds": round(elapsed, 3),
+            "per_second": round(len(customers) / elapsed, 1) if elapsed else None,
+        }
+        db.session.remove()
+
+    scheduler = InstallmentScheduler(app, batch_size=args.batch_size, start=False)
+    t0 = time.perf_counter()
+    posted = scheduler.tick()
+    elapsed = time.perf_counter() - t0
+    results["scheduler"] = {
+        "posted": posted,
+        "batches": scheduler.batches,
+        "seconds": round(elapsed, 3),
+        "per_second": round(posted / elapsed, 1) if elapsed else None,
+    }
+    # Bekleyen taksit kalmadığında tur yalnızca boş bir indeks okumasıdır
+    t0 = time.perf_counter()
+    scheduler.tick()
+    results["scheduler"]["idle_tick_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Eşzamanlı giriş yükü altında giriş ve defter yazma gecikmelerini ölçer.
+
+    python -m backend.benchmarks.login_burst --logins 200 --concurrency 16
+
+Önce borc-ekle tek başına ölçülür, sonra aynı yazmalar bir giriş fırtınası
+ile birlikte çalıştırılır. Hash havuzu sınırlı olduğundan yazma
+gecikmesinin büyük ölçüde korunması beklenir.
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+
+from backend.benchmarks.datagen import generate_ledger
+from backend.benchmarks.runner import build_scenarios, run_http, start_server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack giriş yükü benchmark'ı")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="paytrack-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    ledger = generate_ledger(db_path, args.users, args.customers, args.transactions, args.seed)
+
+    os.environ["PAYTRACK_DATABASE_URI"] = f"sqlite:///{db_path}"
+    os.environ["PAYTRACK_REPORTS_DIR"] = os.path.join(workdir, "reports")
+    from backend.app.main import create_app
+    from backend.models.user import HASH_WORKERS
+    app = create_app()
+
+    scenarios = build_scenarios(ledger)
+    server, base_url = start_server(app)
+    results = {"hash_workers": HASH_WORKERS}
+    try:
+        results["writes_alone"] = run_http(base_url, scenarios["borc-ekle"], args.writes, 4, args.seed)
+        results["logins_alone"] = run_http(base_url, scenarios["login"], args.logins, args.concurrency, args.seed)
+
+        burst = {}
+        login_thread = threading.Thread(target=lambda: burst.update(
+            logins=run_http(base_url, scenarios["login"], args.logins, args.concurrency, args.seed + 1)
+        ))
+        login_thread.start()
+        burst["writes"] = run_http(base_url, scenarios["borc-ekle"], args.writes, 4, args.seed + 1)
+        login_thread.join()
+        results["writes_during_login_burst"] = burst["writes"]
+        results["logins_during_burst"] = burst["logins"]
+    finally:
+        server.shutdown()
+
+    for name, stats in results.items():
+        if isinstance(stats, dict):
+            print(f"{name:<28} rps={stats['throughput_rps']:<9} p50={stats['p50_ms']:<9} "
+                  f"p95={stats['p95_ms']:<9} p99={stats['p99_ms']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
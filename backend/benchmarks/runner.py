@@ -0,0 +1,274 @@
+import argparse
+import json
+import logging
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from backend.benchmarks.datagen import BENCH_PASSWORD, generate_ledger
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Sıralı listede nearest-rank yüzdelik değeri döndürür"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: list, statuses: dict, elapsed: float) -> dict:
+    """Gecikme listesinden throughput ve p50/p95/p99 tablosu üretir"""
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": sum(n for code, n in statuses.items() if int(code) >= 500 or int(code) == 0),
+        "status_codes": statuses,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def build_scenarios(ledger: dict) -> dict:
+    """Her senaryo için (method, path, json) üreten fonksiyonları döndürür"""
+    customers = ledger["customers"]
+    users = ledger["users"]
+
+    def pick(rng):
+        return rng.choice(customers)
+
+    def customers_list(rng):
+        return "GET", f"/customers/?user_id={pick(rng)['user_id']}", None
+
+    def dashboard(rng):
+        return "GET", f"/dashboard/?user_id={pick(rng)['user_id']}", None
+
+    def add_debt(rng):
+        c = pick(rng)
+        return "POST", "/customers/borc-ekle/", {
+            "user_id": c["user_id"], "customer_name": c["name"],
+            "amount": round(rng.uniform(1, 50), 2), "description": "bench"
+        }
+
+    def make_payment(rng):
+        c = pick(rng)
+        return "POST", "/customers/odeme-yap/", {
+            "user_id": c["user_id"], "customer_name": c["name"],
+            "amount": round(rng.uniform(0.5, 5), 2), "description": "bench"
+        }
+
+    def history(rng):
+        c = pick(rng)
+        return "GET", f"/customers/transactions/{urllib.parse.quote(c['name'])}", None
+
+    def generate_pdf(rng):
+        c = pick(rng)
+        return "POST", "/generate-pdf/", {"user_id": c["user_id"], "customer_name": c["name"]}
+
+    def aging(rng):
+        return "GET", f"/reports/aging?user_id={pick(rng)['user_id']}", None
+
+    def timeseries(rng):
+        return "GET", f"/reports/timeseries?user_id={pick(rng)['user_id']}", None
+
+    def analytics(rng):
+        return "GET", f"/reports/analytics?user_id={pick(rng)['user_id']}", None
+
+    def login(rng):
+        return "POST", "/login/", {"username": rng.choice(users)["username"], "password": BENCH_PASSWORD}
+
+    return {
+        "login": login,
+        "customers": customers_list,
+        "dashboard": dashboard,
+        "borc-ekle": add_debt,
+        "odeme-yap": make_payment,
+        "history": history,
+        "generate-pdf": generate_pdf,
+        "aging": aging,
+        "timeseries": timeseries,
+        "analytics": analytics,
+    }
+
+
+def run_client(app, scenario, requests: int, seed: int) -> dict:
+    """Senaryoyu Flask test client ile sırayla çalıştırır"""
+    rng = random.Random(seed)
+    client = app.test_client()
+    latencies, statuses = [], {}
+    started = time.perf_counter()
+    for _ in range(requests):
+        method, path, payload = scenario(rng)
+        t0 = time.perf_counter()
+        response = client.open(path, method=method, json=payload)
+        response.get_data()
+        latencies.append(time.perf_counter() - t0)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def _http_call(base_url: str, method: str, path: str, payload) -> int:
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method)
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(req, timeout=60) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code
+    except OSError:
+        return 0
+
+
+def run_http(base_url: str, scenario, requests: int, concurrency: int, seed: int) -> dict:
+    """Senaryoyu gerçek HTTP üzerinden eşzamanlı olarak çalıştırır"""
+    rng = random.Random(seed)
+    calls = [scenario(rng) for _ in range(requests)]
+    lock = threading.Lock()
+    latencies, statuses = [], {}
+
+    def worker(call):
+        t0 = time.perf_counter()
+        code = _http_call(base_url, *call)
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies.append(elapsed)
+            statuses[str(code)] = statuses.get(str(code), 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, calls))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+def start_server(app):
+    """Uygulamayı arka planda çok iş parçacıklı bir sunucuda başlatır"""
+    from werkzeug.serving import make_server
+
+    # İstek başına erişim logu ölçümü bozmasın
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_table(results: dict):
+    header = f"{'mod':<8}{'senaryo':<15}{'istek':>7}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'hata':>6}"
+    print(header)
+    print("-" * len(header))
+    for mode, scenarios in results.items():
+        for name, stats in scenarios.items():
+            print(f"{mode:<8}{name:<15}{stats['requests']:>7}{stats['throughput_rps']:>10}"
+                  f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>6}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack API benchmark")
+    parser.add_argument("--db", help="Benchmark veritabanı yolu (varsayılan: geçici dosya)")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--requests", type=int, default=200, help="Senaryo başına istek sayısı")
+    parser.add_argument("--pdf-requests", type=int, default=10, help="PDF senaryosu için istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mode", choices=["client", "http", "both"], default="both")
+    parser.add_argument("--scenario", action="append", help="Sadece verilen senaryoları çalıştır")
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    parser.add_argument("--admission", action="store_true",
+                        help="Route hız/eşzamanlılık sınırlarını açık bırak (varsayılan: kapalı)")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="paytrack-bench-")
+    db_path = os.path.abspath(args.db or os.path.join(workdir, "bench.db"))
+
+    t0 = time.perf_counter()
+    ledger = generate_ledger(db_path, args.users, args.customers, args.transactions, args.seed)
+    datagen_s = time.perf_counter() - t0
+    print(f"Veri üretildi: {db_path} ({datagen_s:.2f}s)")
+
+    # Uygulama, benchmark veritabanını ve geçici rapor dizinini kullanacak şekilde yüklenir
+    os.environ["PAYTRACK_DATABASE_URI"] = f"sqlite:///{db_path}"
+    os.environ["PAYTRACK_REPORTS_DIR"] = os.path.join(workdir, "reports")
+    os.makedirs(os.environ["PAYTRACK_REPORTS_DIR"], exist_ok=True)
+    # Az sayıda kullanıcıyla yapılan ölçümde hız sınırı 429 döndürüp sonucu bozar
+    os.environ["PAYTRACK_ADMISSION_CONTROL"] = "1" if args.admission else "0"
+    from backend.app.main import create_app
+    app = create_app()
+
+    scenarios = build_scenarios(ledger)
+    selected = args.scenario or list(scenarios)
+    modes = ["client", "http"] if args.mode == "both" else [args.mode]
+
+    results = {}
+    for mode in modes:
+        results[mode] = {}
+        server = None
+        if mode == "http":
+            server, base_url = start_server(app)
+        try:
+            for name in selected:
+                count = args.pdf_requests if name == "generate-pdf" else args.requests
+                if mode == "client":
+                    results[mode][name] = run_client(app, scenarios[name], count, args.seed)
+                else:
+                    results[mode][name] = run_http(base_url, scenarios[name], count, args.concurrency, args.seed)
+        finally:
+            if server is not None:
+                server.shutdown()
+
+    report = {
+        "meta": {
+            "git_revision": git_revision(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "users": args.users,
+            "customers": args.customers,
+            "transactions": args.transactions,
+            "concurrency": args.concurrency,
+            "datagen_s": round(datagen_s, 3),
+        },
+        "results": results,
+    }
+
+    print_table(results)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nSonuçlar kaydedildi: {args.output}")
+    return report
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
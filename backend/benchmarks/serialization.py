@@ -0,0 +1,109 @@
+"""10k satırlık işlem geçmişi için JSON serileştirme ve sıkıştırma ölçümü.
+
+    python -m backend.benchmarks.serialization --rows 10000
+
+stdlib json ile orjson'u, ardından gzip/brotli seviyelerinin kablo üzerindeki
+boyutunu ve süresini karşılaştırır. Son olarak geçmiş uç noktasını uçtan uca
+ölçer.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import urllib.parse
+
+from backend.benchmarks.datagen import generate_ledger
+from backend.benchmarks.runner import percentile
+
+
+def timed(func, repeat: int) -> float:
+    """Fonksiyonun medyan süresini milisaniye olarak döndürür"""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t0)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack serileştirme benchmark'ı")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="paytrack-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    ledger = generate_ledger(db_path, users=1, customers=1, transactions=args.rows)
+    customer = ledger["customers"][0]
+
+    os.environ["PAYTRACK_DATABASE_URI"] = f"sqlite:///{db_path}"
+    os.environ["PAYTRACK_REPORTS_DIR"] = os.path.join(workdir, "reports")
+    # Her istek gerçekten serileştirilsin
+    os.environ["PAYTRACK_READ_CACHE"] = "none"
+    from flask.json.provider import DefaultJSONProvider
+    from backend.app.main import create_app
+    from backend.app import compression
+    app = create_app()
+
+    path = f"/customers/transactions/{urllib.parse.quote(customer['name'])}?user_id={customer['user_id']}"
+    client = app.test_client()
+    payload = client.get(path).get_json()
+    results = {"rows": len(payload["transactions"])}
+
+    stdlib = DefaultJSONProvider(app)
+    with app.app_context():
+        results["serialize_ms"] = {
+            "stdlib": timed(lambda: stdlib.response(payload), args.repeat),
+        }
+        if app.json.use_orjson:
+            results["serialize_ms"]["orjson"] = timed(lambda: app.json.response(payload), args.repeat)
+        body = app.json.response(payload).get_data()
+
+    sizes = {"identity": {"bytes": len(body), "ms": 0.0}}
+    levels = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+    if compression.brotli is not None:
+        levels += [("br", 4), ("br", 11)]
+    for encoding, level in levels:
+        data = compression.compress_body(body, encoding, level)
+        sizes[f"{encoding}-{level}"] = {
+            "bytes": len(data),
+            "ratio": round(len(body) / len(data), 2),
+            "ms": timed(lambda: compression.compress_body(body, encoding, level), max(3, args.repeat // 4)),
+        }
+    results["wire"] = sizes
+
+    end_to_end = {}
+    variants = [("stdlib", "identity"), ("stdlib", "gzip")]
+    if app.json.use_orjson:
+        variants += [("orjson", "identity"), ("orjson", "gzip")]
+        if compression.brotli is not None:
+            variants.append(("orjson", "br"))
+    for provider, encoding in variants:
+        app.json.use_orjson = provider == "orjson"
+        latencies, size = [], 0
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            response = client.get(path, headers={"Accept-Encoding": encoding})
+            size = len(response.get_data())
+            latencies.append(time.perf_counter() - t0)
+        latencies.sort()
+        end_to_end[f"{provider}+{encoding}"] = {
+            "bytes": size,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        }
+    results["end_to_end"] = end_to_end
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
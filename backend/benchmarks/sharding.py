@@ -0,0 +1,86 @@
+"""Tek dosya ile kullanıcı bazında shard dosyalarının yazma karşılaştırması.
+
+    python -m backend.benchmarks.sharding --tenants 1,2,4,8 --writes 1000 --concurrency 16
+
+Her kiracı (kullanıcı) sayısı için aynı borc-ekle/odeme-yap karışımı,
+önce tüm kullanıcıların tek bir dosyayı paylaştığı düzende (1 hash
+kovası), sonra her kullanıcının kendi dosyası olduğu düzende gerçek HTTP
+ile gönderilir. Shard'lı düzende saniyedeki yazma sayısının kiracı
+sayısıyla artması beklenir.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from backend.benchmarks.datagen import generate_ledger
+from backend.benchmarks.runner import build_scenarios, run_http, start_server
+from backend.benchmarks.write_queue import mixed_writes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack sharding benchmark'ı")
+    parser.add_argument("--tenants", default="1,2,4,8", help="Virgülle ayrılmış kiracı sayıları")
+    parser.add_argument("--customers-per-tenant", type=int, default=25)
+    parser.add_argument("--transactions-per-tenant", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--writes", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    args = parser.parse_args(argv)
+
+    tenant_counts = [int(n) for n in args.tenants.split(",")]
+    most = max(tenant_counts)
+    workdir = tempfile.mkdtemp(prefix="paytrack-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    ledger = generate_ledger(
+        db_path, most, args.customers_per_tenant * most, args.transactions_per_tenant * most, args.seed
+    )
+
+    os.environ["PAYTRACK_DATABASE_URI"] = f"sqlite:///{db_path}"
+    os.environ["PAYTRACK_REPORTS_DIR"] = os.path.join(workdir, "reports")
+    from backend.app.main import create_app
+    from backend.database.sharding import ShardRouter, split_database
+    app = create_app(background_jobs=False)
+
+    server, base_url = start_server(app)
+    results = {}
+    try:
+        for tenants in tenant_counts:
+            subset = {
+                "users": [u for u in ledger["users"] if u["id"] <= tenants],
+                "customers": [c for c in ledger["customers"] if c["user_id"] <= tenants],
+            }
+            scenario = mixed_writes(build_scenarios(subset))
+            results[tenants] = {}
+            for layout, shards in (("single", 1), ("sharded", "user")):
+                # Her düzen bölünmüş verinin temiz bir kopyasıyla başlar
+                router = ShardRouter(
+                    os.path.join(workdir, f"{layout}-{tenants}"), shards, app.config["SQLALCHEMY_ENGINE_OPTIONS"]
+                )
+                with app.app_context():
+                    split_database(db_path, router)
+                app.extensions["paytrack_shards"] = router
+                try:
+                    results[tenants][layout] = run_http(
+                        base_url, scenario, args.writes, args.concurrency, args.seed + tenants
+                    )
+                finally:
+                    app.extensions["paytrack_shards"] = None
+                    router.dispose()
+    finally:
+        server.shutdown()
+
+    print(f"{'kiracı':<8}{'düzen':<10}{'writes/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'hata':>6}")
+    for tenants, layouts in results.items():
+        for layout, stats in layouts.items():
+            print(f"{tenants:<8}{layout:<10}{stats['throughput_rps']:>10}{stats['p50_ms']:>10}"
+                  f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>6}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Açılış süresi ölçümü.
+
+    python -m backend.benchmarks.startup --repeat 5
+
+backend.app.main'i her seferinde yeni bir yorumlayıcıda `python -X importtime`
+ile import eder; toplam import süresini ve en pahalı modülleri raporlar.
+Ardından create_app() süresini boş bir veritabanında (tablolar oluşturulur)
+ve hazırlanmış bir veritabanında (parmak izi eşleşir) ölçer.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CREATE_APP = (
+    "import time; t0 = time.perf_counter(); "
+    "from backend.app.main import create_app; t1 = time.perf_counter(); create_app(); "
+    "print(round((t1 - t0) * 1000, 3), round((time.perf_counter() - t1) * 1000, 3))"
+)
+
+
+def _environment(workdir: str) -> dict:
+    env = dict(os.environ)
+    env["PAYTRACK_DATABASE_URI"] = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+    env["PAYTRACK_REPORTS_DIR"] = os.path.join(workdir, "reports")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_profile(module: str, env: dict) -> dict:
+    """Modülü yeni bir yorumlayıcıda import eder; modül -> (öz, kümülatif) µs"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        # "import time:       412 |       1290 |     backend.models.money"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us), int(cumulative_us))
+    return profile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack açılış benchmark'ı")
+    parser.add_argument("--module", default="backend.app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="paytrack-bench-")
+    env = _environment(workdir)
+
+    profiles = [import_profile(args.module, env) for _ in range(args.repeat)]
+    totals = [p[args.module][1] for p in profiles]
+    # En pahalı üst düzey paketler (öz süreler paket altında toplanır)
+    packages = {}
+    for name, (self_us, _) in profiles[totals.index(sorted(totals)[len(totals) // 2])].items():
+        root = ".".join(name.lstrip().split(".")[:3 if name.startswith("backend.") else 1])
+        packages[root] = packages.get(root, 0) + self_us
+    heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    def create_app_ms():
+        out = subprocess.run(
+            [sys.executable, "-c", CREATE_APP], env=env, cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        return float(out[0]), float(out[1])
+
+    cold = create_app_ms()
+    warm = [create_app_ms() for _ in range(args.repeat)]
+
+    results = {
+        "import_ms": {
+            "median": round(statistics.median(totals) / 1000, 3),
+            "min": round(min(totals) / 1000, 3),
+        },
+        "heaviest_packages_ms": {name: round(us / 1000, 3) for name, us in heaviest},
+        "reportlab_imported": any(name.startswith("reportlab") for name in profiles[0]),
+        "numpy_imported": any(name.startswith("numpy") for name in profiles[0]),
+        "create_app_ms": {
+            "empty_database": cold[1],
+            "prepared_database": round(statistics.median(w[1] for w in warm), 3),
+        },
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
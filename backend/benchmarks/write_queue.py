@@ -0,0 +1,77 @@
+"""Doğrudan commit ile toplu commit (yazma kuyruğu) karşılaştırması.
+
+    python -m backend.benchmarks.write_queue --writes 2000 --concurrency 32
+
+Aynı borc-ekle/odeme-yap karışımı önce her isteğin kendi commit'iyle,
+sonra yazma kuyruğu üzerinden gerçek HTTP ile gönderilir. Saniyedeki
+yazma sayısı, p50/p95/p99 gecikme ve kuyrukta commit başına düşen işlem
+sayısı raporlanır.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+
+from backend.benchmarks.datagen import generate_ledger
+from backend.benchmarks.runner import build_scenarios, run_http, start_server
+
+
+def mixed_writes(scenarios: dict):
+    """Yazmaların %60'ı borç ekleme, %40'ı ödeme"""
+    def scenario(rng: random.Random):
+        return scenarios["borc-ekle" if rng.random() < 0.6 else "odeme-yap"](rng)
+    return scenario
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack yazma kuyruğu benchmark'ı")
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--customers", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--writes", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-ms", type=float, default=5)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--output", help="Sonuç JSON dosyası")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="paytrack-bench-")
+    db_path = os.path.join(workdir, "bench.db")
+    ledger = generate_ledger(db_path, args.users, args.customers, args.transactions, args.seed)
+
+    os.environ["PAYTRACK_DATABASE_URI"] = f"sqlite:///{db_path}"
+    os.environ["PAYTRACK_REPORTS_DIR"] = os.path.join(workdir, "reports")
+    from backend.app.main import create_app
+    from backend.app.write_queue import WriteQueue
+    app = create_app()
+
+    scenario = mixed_writes(build_scenarios(ledger))
+    server, base_url = start_server(app)
+    results = {}
+    try:
+        app.extensions["paytrack_write_queue"] = None
+        results["direct"] = run_http(base_url, scenario, args.writes, args.concurrency, args.seed)
+
+        queue = WriteQueue(app, max_batch=args.batch_size, max_delay=args.batch_ms / 1000.0)
+        app.extensions["paytrack_write_queue"] = queue
+        results["write_queue"] = run_http(base_url, scenario, args.writes, args.concurrency, args.seed + 1)
+        results["write_queue"]["queue"] = queue.stats()
+        queue.close()
+        app.extensions["paytrack_write_queue"] = None
+    finally:
+        server.shutdown()
+
+    for name, stats in results.items():
+        print(f"{name:<12} writes/s={stats['throughput_rps']:<9} p50={stats['p50_ms']:<9} "
+              f"p95={stats['p95_ms']:<9} p99={stats['p99_ms']:<9} hata={stats['errors']}")
+    print(f"commit başına ortalama işlem: {results['write_queue']['queue']['avg_batch']}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""SQLite dosyalarının sunucu durdurulmadan yedeklenmesi.
+
+Yedek, SQLite'ın çevrim içi yedekleme API'siyle sayfa parçaları halinde
+alınır; her adım kaynağı yalnızca o parçayı kopyalarken kilitler ve
+adımlar arasında beklenir, böylece yazmalar uzun süre beklemez. Her adımın
+süresi ölçülür; en uzun adım, yedeğin bir yazmayı bekletebileceği en uzun
+süredir. Kopyalama sırasında başka bir bağlantı veritabanını değiştirirse
+SQLite yedeği baştan alır; bu çok tekrarlanırsa kalan kopya tek adımda
+alınır.
+
+Anlık görüntüler (snapshot) yedeğin kendisi üzerinde VACUUM INTO ile
+sıkıştırılır (canlı veritabanı kilitlenmez), gzip'lenir ve her dosya için
+en yeni KEEP tanesi saklanır. verify_backup yedeği geçici bir dosyaya açıp
+bütünlük kontrolü ve işlem defterinin hash zinciri doğrulamasını yapar.
+
+    python -m backend.database.backup snapshot [--db paytrack.db] [--dir backups] [--keep 7]
+    python -m backend.database.backup verify backups/paytrack-20250601-030000-000.db.gz
+    python -m backend.database.backup restore backups/...db.gz --db paytrack.db
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+# Adım başına kopyalanan sayfa sayısı ve adımlar arası bekleme (saniye)
+PAGES = 256
+SLEEP = 0.005
+# Kaynak bu kadar çok değişip yedek baştan başlarsa kalan kopya tek adımda alınır
+MAX_RESTARTS = 3
+KEEP = 7
+
+DEFAULT_DB = os.path.join(os.path.dirname(__file__), "paytrack.db")
+DEFAULT_DIR = os.path.join(os.path.dirname(__file__), "backups")
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def backup_database(source: str, destination: str, pages: int = PAGES, sleep: float = SLEEP,
+                    max_restarts: int = MAX_RESTARTS) -> dict:
+    """source'u çevrim içi yedekleme API'siyle destination'a kopyalar.
+
+    Kopya önce geçici bir dosyaya alınır ve tamamlanınca yerine taşınır.
+    Süre, adım sayısı, baştan başlama sayısı ve adımların kaynağı kilitli
+    tuttuğu en uzun/toplam süre (ms) döner.
+    """
+    started = time.perf_counter()
+    partial = f"{destination}.part"
+    if os.path.exists(partial):
+        os.remove(partial)
+    stats = {"steps": 0, "restarts": 0, "pages": 0, "max_step_ms": 0.0, "locked_ms": 0.0, "fallback": False}
+    state = {"mark": time.perf_counter(), "remaining": None}
+
+    def progress(status, remaining, total):
+        step_ms = (time.perf_counter() - state["mark"]) * 1000
+        stats["steps"] += 1
+        stats["pages"] = total
+        stats["locked_ms"] += step_ms
+        stats["max_step_ms"] = max(stats["max_step_ms"], step_ms)
+        if state["remaining"] is not None and remaining > state["remaining"]:
+            # Kaynak başka bir bağlantıdan değişti, SQLite kopyayı baştan alıyor
+            stats["restarts"] += 1
+            if stats["restarts"] > max_restarts:
+                raise _TooManyRestarts()
+        state["remaining"] = remaining
+        if remaining:
+            time.sleep(sleep)
+        state["mark"] = time.perf_counter()
+
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True, timeout=30)
+    try:
+        dst = sqlite3.connect(partial)
+        try:
+            try:
+                src.backup(dst, pages=pages, progress=progress, sleep=sleep)
+            except _TooManyRestarts:
+                stats["fallback"] = True
+                state["mark"] = time.perf_counter()
+                src.backup(dst, pages=-1)
+                step_ms = (time.perf_counter() - state["mark"]) * 1000
+                stats["steps"] += 1
+                stats["locked_ms"] += step_ms
+                stats["max_step_ms"] = max(stats["max_step_ms"], step_ms)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    os.replace(partial, destination)
+
+    return {
+        "source": source,
+        "path": destination,
+        "bytes": os.path.getsize(destination),
+        "seconds": round(time.perf_counter() - started, 3),
+        **stats,
+        "max_step_ms": round(stats["max_step_ms"], 3),
+        "locked_ms": round(stats["locked_ms"], 3),
+    }
+
+
+def _snapshots(directory: str, stem: str) -> list:
+    prefix = f"{stem}-"
+    return sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(prefix) and name.endswith((".db", ".db.gz")) and name[len(prefix):][:1].isdigit()
+    )
+
+
+def rotate(directory: str, stem: str, keep: int = KEEP) -> list:
+    """stem'e ait en yeni keep anlık görüntü dışındakileri siler; silinenleri döndürür"""
+    names = _snapshots(directory, stem)
+    removed = names[:-keep] if keep > 0 else names
+    for name in removed:
+        os.remove(os.path.join(directory, name))
+    return removed
+
+
+def snapshot(source: str, directory: str = DEFAULT_DIR, keep: int = KEEP, compress: bool = True,
+             vacuum: bool = True, pages: int = PAGES, sleep: float = SLEEP) -> dict:
+    """Çevrim içi yedek alır; isteğe bağlı VACUUM INTO ile küçültüp gzip'ler ve eski kopyaları siler"""
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(source))[0]
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")[:-3]
+    path = os.path.join(directory, f"{stem}-{stamp}.db")
+    copy = f"{path}.copy"
+
+    result = backup_database(source, copy, pages, sleep)
+    t0 = time.perf_counter()
+    if vacuum:
+        # Canlı veritabanı değil özel kopya küçültülür; yazmalar etkilenmez
+        conn = sqlite3.connect(copy)
+        try:
+            conn.execute("VACUUM INTO ?", (path,))
+        finally:
+            conn.close()
+        os.remove(copy)
+    else:
+        os.replace(copy, path)
+    result["vacuum_ms"] = round((time.perf_counter() - t0) * 1000, 3) if vacuum else None
+
+    t0 = time.perf_counter()
+    if compress:
+        with open(path, "rb") as raw, gzip.open(f"{path}.gz", "wb", compresslevel=6) as packed:
+            shutil.copyfileobj(raw, packed, 1024 * 1024)
+        os.remove(path)
+        path = f"{path}.gz"
+    result["compress_ms"] = round((time.perf_counter() - t0) * 1000, 3) if compress else None
+
+    result.update(path=path, bytes=os.path.getsize(path), removed=rotate(directory, stem, keep))
+    result["seconds"] = round(result["seconds"] + (result["vacuum_ms"] or 0) / 1000
+                              + (result["compress_ms"] or 0) / 1000, 3)
+    return result
+
+
+def _unpack(path: str, directory: str) -> str:
+    """gzip'li yedeği directory altına açar; düz dosyayı olduğu gibi döndürür"""
+    if not path.endswith(".gz"):
+        return path
+    target = os.path.join(directory, os.path.basename(path)[:-3])
+    with gzip.open(path, "rb") as packed, open(target, "wb") as raw:
+        shutil.copyfileobj(packed, raw, 1024 * 1024)
+    return target
+
+
+def _check(path: str) -> dict:
+    from ..models.ledger import verify_file
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        integrity = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )]
+        tables = {name: conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] for name in names}
+        chained = "transactions" in tables and "ledger_checkpoints" in tables and "row_hash" in {
+            row[1] for row in conn.execute("PRAGMA table_info(transactions)")
+        }
+    finally:
+        conn.close()
+    broken = verify_file(path) if chained and integrity == ["ok"] else []
+    return {
+        "ok": integrity == ["ok"] and not broken,
+        "integrity": integrity[:10],
+        "tables": tables,
+        "ledger": "checked" if chained else "missing",
+        "broken": broken[:100],
+    }
+
+
+def verify_backup(path: str) -> dict:
+    """Yedeği geçici bir dosyaya açıp bütünlüğünü ve hash zincirlerini doğrular"""
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="paytrack-restore-") as directory:
+        result = _check(_unpack(path, directory))
+    return {"path": path, **result, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def restore_database(path: str, target: str) -> dict:
+    """Doğrulanan yedeği target'a geri yükler; doğrulama başarısızsa ValueError fırlatır.
+
+    Yükleme yedekleme API'siyle tek adımda yapılır; hedefe açık bağlantılar
+    yeni içeriği görür. Hedef dosya varsa önce .before-restore kopyası alınır.
+    """
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="paytrack-restore-") as directory:
+        source = _unpack(path, directory)
+        check = _check(source)
+        if not check["ok"]:
+            raise ValueError(f"Yedek doğrulanamadı, geri yükleme yapılmadı: {path}")
+        previous = None
+        if os.path.exists(target):
+            previous = backup_database(target, f"{target}.before-restore")["path"]
+        src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+        try:
+            dst = sqlite3.connect(target, timeout=30)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+        finally:
+            src.close()
+    return {
+        "path": path, "target": target, "previous": previous, "tables": check["tables"],
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def database_files(app) -> list:
+    """Uygulamanın SQLite dosyaları: ana veritabanı ve varsa shard dosyaları"""
+    from .database import db
+
+    with app.app_context():
+        files = [db.engine.url.database]
+    router = app.extensions.get("paytrack_shards")
+    if router is not None:
+        files += [router.path(key) for key in router.keys()]
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PayTrack veritabanı yedekleme")
+    commands = parser.add_subparsers(dest="command", required=True)
+    take = commands.add_parser("snapshot", help="Çevrim içi yedek al")
+    take.add_argument("--db", help="Yedeklenecek dosya (varsayılan: uygulamanın tüm veritabanları)")
+    take.add_argument("--dir", default=DEFAULT_DIR)
+    take.add_argument("--keep", type=int, default=KEEP)
+    take.add_argument("--pages", type=int, default=PAGES)
+    take.add_argument("--sleep-ms", type=float, default=SLEEP * 1000)
+    take.add_argument("--no-vacuum", action="store_true")
+    take.add_argument("--no-compress", action="store_true")
+    take.add_argument("--verify", action="store_true", help="Alınan yedeği geri yükleyip doğrula")
+    check = commands.add_parser("verify", help="Yedeği geçici bir dosyaya açıp doğrula")
+    check.add_argument("path")
+    restore = commands.add_parser("restore", help="Yedeği doğrulayıp geri yükle (sunucu durdurulmalı)")
+    restore.add_argument("path")
+    restore.add_argument("--db", default=DEFAULT_DB)
+    args = parser.parse_args(argv)
+
+    if args.command == "verify":
+        result = verify_backup(args.path)
+        print(f"{args.path}: {'sağlam' if result['ok'] else 'BOZUK'} ({result['seconds']} sn), "
+              f"bütünlük: {result['integrity'][0]}, defter: {result['ledger']}, {len(result['broken'])} bozuk zincir")
+        return result
+    if args.command == "restore":
+        result = restore_database(args.path, args.db)
+        print(f"{args.path} -> {args.db} geri yüklendi ({result['seconds']} sn), önceki dosya: {result['previous']}")
+        return result
+
+    if args.db:
+        files = [args.db]
+    else:
+        from ..app.main import create_app
+        files = database_files(create_app(background_jobs=False))
+    results = []
+    for source in files:
+        result = snapshot(source, args.dir, args.keep, not args.no_compress, not args.no_vacuum,
+                          args.pages, args.sleep_ms / 1000)
+        if args.verify:
+            result["verified"] = verify_backup(result["path"])["ok"]
+        results.append(result)
+        print(f"{source} -> {result['path']}: {result['bytes']} bayt, {result['seconds']} sn, "
+              f"{result['steps']} adım, en uzun kilit {result['max_step_ms']} ms, "
+              f"{result['restarts']} kez baştan" + (", tek adımda tamamlandı" if result["fallback"] else ""))
+    return results
+
+
+if __name__ == "__main__":
+    main()
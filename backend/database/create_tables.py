@@ -1,12 +1,25 @@
+import argparse
 import sqlite3
 import os
+from datetime import datetime
 
-def create_tables():
+try:
+    from .backup import backup_database
+except ImportError:  # betik olarak çalıştırıldığında
+    from backup import backup_database
+
+def create_tables(db_path=None, force=False):
     # Veritabanı dosyasının yolu
-    db_path = os.path.join(os.path.dirname(__file__), 'paytrack.db')
+    db_path = db_path or os.path.join(os.path.dirname(__file__), 'paytrack.db')
     
-    # Eğer veritabanı dosyası varsa sil
+    # Mevcut veritabanı sessizce silinmez; --force ile önce yedeği alınır
     if os.path.exists(db_path):
+        if not force:
+            print(f"{db_path} zaten var, hiçbir şey yapılmadı. Yeniden oluşturmak için --force kullanın "
+                  f"(önce yedek alınır).")
+            return False
+        backup = backup_database(db_path, f"{db_path}.{datetime.now():%Y%m%d-%H%M%S}.bak")
+        print(f"Mevcut veritabanı yedeklendi: {backup['path']}")
         os.remove(db_path)
     
     # Veritabanına bağlan
@@ -29,7 +42,7 @@ def create_tables():
         user_id INTEGER NOT NULL,
         name TEXT NOT NULL,
         urun TEXT NOT NULL,
-        borc REAL NOT NULL DEFAULT 0,
+        borc INTEGER NOT NULL DEFAULT 0,  -- kuruş
         FOREIGN KEY (user_id) REFERENCES users (id)
     )
     ''')
@@ -39,7 +52,7 @@ def create_tables():
     CREATE TABLE transactions (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         customer_id INTEGER NOT NULL,
-        amount REAL NOT NULL,
+        amount INTEGER NOT NULL,  -- kuruş
         transaction_type TEXT NOT NULL,
         description TEXT,
         timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -52,6 +65,11 @@ def create_tables():
     conn.close()
     
     print("Veritabanı tabloları başarıyla oluşturuldu!")
+    return True
 
 if __name__ == "__main__":
-    create_tables() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Boş PayTrack veritabanı oluşturur")
+    parser.add_argument("--db", help="Veritabanı dosyası (varsayılan: paytrack.db)")
+    parser.add_argument("--force", action="store_true", help="Dosya varsa yedeğini alıp yeniden oluştur")
+    args = parser.parse_args()
+    create_tables(args.db, args.force)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy import create_engine
 import sqlite3
 from pathlib import Path
+from .sharding import RoutingSession
 
 class Base(DeclarativeBase):
     pass
@@ -13,7 +14,8 @@ SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_PATH}'
 
 # SQLAlchemy engine ve session oluştur
 engine = create_engine(SQLALCHEMY_DATABASE_URI)
-db = SQLAlchemy(model_class=Base)
+# Sharding açıksa oturum müşteri tablolarını kullanıcının dosyasına yönlendirir
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
 
 # Database bağlantısı için dependency
 def get_db():
@@ -0,0 +1,239 @@
+"""Mevcut veritabanları için şema geçişleri.
+
+Uygulanan son geçiş PRAGMA user_version'da tutulur; her adım bir kez,
+tek bir işlem içinde çalışır. Yeni oluşturulan veritabanlarında tablolar
+zaten güncel tanımla kurulduğundan adımlar bir şey yapmadan geçer.
+
+prepare_schema açılışta çağrılan tek adımdır: geçişleri, eksik tabloları ve
+rollup doldurmayı çalıştırır, sonra şemanın parmak izini schema_state
+tablosuna yazar. Modeller ve geçişler değişmediyse sonraki açılışlar tek
+bir SELECT ile geçer.
+"""
+import hashlib
+import re
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Table, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from .database import Base
+
+# Son başarılı şema hazırlığının parmak izi (tek satır)
+schema_state = Table(
+    "schema_state", Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("fingerprint", String(40), nullable=False),
+    Column("prepared_at", String(19), nullable=False),
+)
+
+# Tablo ve kuruşa çevrilecek sütunları
+MONEY_COLUMNS = (
+    ("customers", ("borc",)),
+    ("transactions", ("amount",)),
+)
+
+
+def _columns(conn, table_name: str) -> dict:
+    """Sütun adı -> tanımlı tip"""
+    return {row[1]: (row[2] or "").upper() for row in conn.execute(f"PRAGMA table_info({table_name})")}
+
+
+def money_to_kurus(conn, dialect):
+    """REAL TL tutarlarını INTEGER kuruşa çevirir.
+
+    SQLite sütun tipini değiştiremediği için tablo, mevcut CREATE ifadesinde
+    sadece tutar sütunlarının tipi değiştirilerek yeniden oluşturulur;
+    veriler kopyalanır, eski tablo silinir ve indeksleri geri kurulur.
+    Günlük rollup türetilmiş veri olduğundan silinir; açılışta işlemlerden
+    yeniden hesaplanır.
+    """
+    from ..models.customer import Customer, Transaction  # noqa: F401 - tabloları metadata'ya ekler
+
+    for table_name, money_columns in MONEY_COLUMNS:
+        existing = _columns(conn, table_name)
+        if not existing or all(existing.get(c) == "INTEGER" for c in money_columns):
+            continue
+
+        create_sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).fetchone()[0]
+        index_sql = [row[0] for row in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table_name,)
+        )]
+
+        create_sql = re.sub(r"^CREATE TABLE\s+[\"`]?\w+[\"`]?", f"CREATE TABLE {table_name}_kurus", create_sql)
+        for column in money_columns:
+            create_sql = re.sub(
+                rf"([\"`]?\b{column}\b[\"`]?\s+)(REAL|FLOAT|DOUBLE PRECISION|DOUBLE|NUMERIC)\b",
+                r"\1INTEGER", create_sql, count=1, flags=re.IGNORECASE
+            )
+        columns = ", ".join(existing)
+        select = ", ".join(
+            f"CAST(ROUND({c} * 100) AS INTEGER)" if c in money_columns else c for c in existing
+        )
+        conn.execute(create_sql)
+        conn.execute(f"INSERT INTO {table_name}_kurus ({columns}) SELECT {select} FROM {table_name}")
+        conn.execute(f"DROP TABLE {table_name}")
+        conn.execute(f"ALTER TABLE {table_name}_kurus RENAME TO {table_name}")
+        for sql in index_sql:
+            conn.execute(sql)
+        # Eski şemada olmayan model indeksleri
+        for index in Base.metadata.tables[table_name].indexes:
+            conn.execute(str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect)))
+
+    rollup = _columns(conn, "daily_rollup")
+    if rollup and rollup.get("borc_total") != "INTEGER":
+        conn.execute("DROP TABLE daily_rollup")
+
+
+def ledger_hash_chain(conn, dialect):
+    """İşlemlere hash zinciri sütunlarını ekler ve mevcut satırları mühürler.
+
+    Geçişten önceki satırların kaynağı doğrulanamaz; zincir bu andaki
+    içerikten kurulur ve sonraki değişiklikler buna göre yakalanır.
+    """
+    from ..models.ledger import rechain
+
+    if not _columns(conn, "transactions"):
+        return
+    for table_name, column in (("transactions", "prev_hash"), ("transactions", "row_hash"), ("customers", "chain_head")):
+        if column not in _columns(conn, table_name):
+            conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} VARCHAR(64)")
+    rechain(conn)
+
+
+def customer_indexes(conn, dialect):
+    """İşlem ve değişiklik tablolarına müşteri indekslerini ekler (küme tabanlı silme için)"""
+    from ..models.change import Change
+    from ..models.customer import Transaction
+
+    for table in (Transaction.__table__, Change.__table__):
+        if not _columns(conn, table.name):
+            continue
+        for index in table.indexes:
+            conn.execute(str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect)))
+
+
+def transactions_autoincrement(conn, dialect):
+    """İşlem tablosunu AUTOINCREMENT ile yeniden kurar.
+
+    Aksi halde en büyük id'li satırlar silindiğinde (müşteri temizliği) id'ler
+    yeniden kullanılır ve artımlı defter doğrulamasının filigranının altında
+    kalan yeni satırlar atlanır. Sayaç, o ana kadar görülmüş en büyük id'den
+    (son doğrulama filigranı dahil) devam eder.
+    """
+    from ..models.customer import Transaction
+
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transactions'").fetchone()
+    if row is None or "AUTOINCREMENT" in row[0].upper():
+        return
+    table = Transaction.__table__
+    existing = _columns(conn, table.name)
+    index_sql = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table.name,)
+    )]
+    create_sql = str(CreateTable(table).compile(dialect=dialect)).strip()
+    conn.execute(re.sub(r"^CREATE TABLE\s+[\"`]?\w+[\"`]?", f"CREATE TABLE {table.name}_seq", create_sql))
+    # Modelde olmayan eski sütunlar da korunur
+    for column, kind in existing.items():
+        if column not in table.c:
+            conn.execute(f"ALTER TABLE {table.name}_seq ADD COLUMN {column} {kind}")
+    columns = ", ".join(existing)
+    conn.execute(f"INSERT INTO {table.name}_seq ({columns}) SELECT {columns} FROM {table.name}")
+    last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table.name}").fetchone()[0]
+    if _columns(conn, "ledger_verifications"):
+        last_id = max(last_id, conn.execute("SELECT COALESCE(MAX(watermark), 0) FROM ledger_verifications").fetchone()[0])
+    conn.execute(f"DROP TABLE {table.name}")
+    conn.execute(f"ALTER TABLE {table.name}_seq RENAME TO {table.name}")
+    conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table.name,))
+    conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (table.name, last_id))
+    for sql in index_sql:
+        conn.execute(sql)
+    for index in table.indexes:
+        conn.execute(str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect)))
+
+
+MIGRATIONS = [
+    (1, money_to_kurus),
+    (2, ledger_hash_chain),
+    (3, customer_indexes),
+    (4, transactions_autoincrement),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def migrate(engine) -> int:
+    """Bekleyen geçişleri uygular ve güncel şema sürümünü döndürür"""
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        pending = [(target, step) for target, step in MIGRATIONS if target > version]
+        if not pending:
+            return version
+
+        # DDL'in de geri alınabilmesi için işlem elle yönetilir
+        isolation_level = conn.isolation_level
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for target, step in pending:
+                    step(conn, engine.dialect)
+                    conn.execute(f"PRAGMA user_version = {target}")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.isolation_level = isolation_level
+        return pending[-1][0]
+    finally:
+        raw.close()
+
+
+def schema_fingerprint(tables, dialect) -> str:
+    """Şema sürümü ve tabloların DDL'inden türetilen özet"""
+    digest = hashlib.sha1(f"v{SCHEMA_VERSION}".encode())
+    for table in sorted(tables, key=lambda t: t.name):
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def prepare_schema(engine, tables=None) -> bool:
+    """Veritabanını güncel şemaya getirir; bir şey yapıldıysa True döner.
+
+    tables verilmezse tüm model tabloları kullanılır (shard'lar yalnızca
+    kendi tablolarını verir).
+    """
+    from .. import models  # noqa: F401 - tüm modellerin metadata'ya eklenmesi için
+    from ..models.rollup import ensure_daily_rollup
+
+    tables = list(tables) if tables is not None else list(Base.metadata.sorted_tables)
+    fingerprint = schema_fingerprint(tables, engine.dialect)
+    with engine.connect() as conn:
+        try:
+            stored = conn.execute(text("SELECT fingerprint FROM schema_state WHERE id = 1")).scalar()
+        except OperationalError:
+            # Tablo yok: yeni ya da bu adımdan önceki bir veritabanı
+            stored = None
+    if stored == fingerprint:
+        return False
+
+    # Eski veritabanlarındaki TL tutarları kuruşa çevrilir
+    migrate(engine)
+    Base.metadata.create_all(engine, tables=tables)
+    with Session(engine) as session:
+        ensure_daily_rollup(session)
+        session.execute(text(
+            "INSERT INTO schema_state (id, fingerprint, prepared_at) VALUES (1, :fingerprint, :now) "
+            "ON CONFLICT (id) DO UPDATE SET fingerprint = excluded.fingerprint, prepared_at = excluded.prepared_at"
+        ), {"fingerprint": fingerprint, "now": datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        session.commit()
+    return True
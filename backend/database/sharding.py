@@ -0,0 +1,314 @@
+"""Kullanıcı bazında SQLite dosyalarına bölme (sharding).
+
+Açıkken kullanıcılar (giriş/kayıt) merkezi veritabanında kalır; müşteri,
+işlem, değişiklik ve rapor tabloları her kullanıcının (ya da kullanıcı
+hash kovasının) kendi dosyasına yazılır. Böylece bir dükkanın yazma kilidi
+diğerlerini bekletmez. Oturum, istek başında seçilen shard'a göre motoru
+get_bind içinde seçer.
+
+    PAYTRACK_SHARDS=user   -> her kullanıcıya bir dosya (user_<id>.db)
+    PAYTRACK_SHARDS=16     -> 16 hash kovası (shard_000.db ... shard_015.db)
+
+Kova sayısı sonradan değiştirilirse kullanıcılar başka dosyalara düşer;
+önce veriler yeniden bölünmelidir. Mevcut bir veritabanı şu komutla
+bölünür (kaynak dosya merkezi katalog olarak kalır, içindeki müşteri
+verileri yedek olarak bırakılır):
+
+    python -m backend.database.sharding --source paytrack.db --shard-dir shards --shards user
+"""
+import argparse
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+
+import sqlalchemy as sa
+from flask import current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine
+
+# Merkezi katalogda kalan tablolar
+CENTRAL_TABLES = frozenset({"users"})
+
+
+def _table_name(mapper=None, clause=None):
+    if mapper is not None:
+        return sa.inspect(mapper).local_table.name
+    if isinstance(clause, sa.Table):
+        return clause.name
+    if isinstance(clause, sa.UpdateBase) and isinstance(clause.table, sa.Table):
+        return clause.table.name
+    return None
+
+
+class RoutingSession(Session):
+    """Shard seçiliyse kullanıcı tabloları dışındaki her sorguyu o dosyaya yönlendirir.
+
+    Tablo bilgisi olmayan ham SQL de (raporlar, rollup) shard'a gider.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            key = g.get("paytrack_shard")
+            router = current_app.extensions.get("paytrack_shards")
+            if key is not None and router is not None and _table_name(mapper, clause) not in CENTRAL_TABLES:
+                return router.engine(key)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def current_shard():
+    """İçinde bulunulan uygulama bağlamının shard anahtarı (yoksa None)"""
+    return g.get("paytrack_shard") if has_app_context() else None
+
+
+@contextmanager
+def shard_scope(key):
+    """İstek dışındaki kodun (yazma kuyruğu, betikler) sorgularını shard'a yönlendirir"""
+    previous = g.get("paytrack_shard")
+    g.paytrack_shard = key
+    try:
+        yield
+    finally:
+        g.paytrack_shard = previous
+
+
+def tenant_tables():
+    """Shard dosyalarında tutulan tablolar"""
+    from . import database
+    from .. import models  # noqa: F401 - tüm modellerin metadata'ya eklenmesi için
+
+    return [t for t in database.Base.metadata.sorted_tables if t.name not in CENTRAL_TABLES]
+
+
+def prepare_shard(engine):
+    """Shard dosyasında geçişleri uygular ve eksik tabloları oluşturur"""
+    from .migrations import prepare_schema
+
+    prepare_schema(engine, tenant_tables())
+
+
+class ShardRouter:
+    """user_id -> shard anahtarı -> SQLAlchemy motoru eşlemesi.
+
+    Motorlar ilk kullanımda oluşturulur ve şeması hazırlanır.
+    """
+
+    def __init__(self, shard_dir: str, shards="user", engine_options: dict = None):
+        self.shard_dir = os.path.abspath(shard_dir)
+        self.per_user = str(shards) == "user"
+        self.buckets = None if self.per_user else int(shards)
+        if self.buckets is not None and self.buckets < 1:
+            raise ValueError("Shard sayısı en az 1 olmalı!")
+        self.engine_options = engine_options or {}
+        self._engines = {}
+        self._lock = threading.Lock()
+
+    def shard_for(self, user_id) -> str:
+        """Geçersiz (sayı olmayan ya da pozitif olmayan) user_id için ValueError"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            raise ValueError("user_id sayı olmalı!") from None
+        if user_id < 1:
+            raise ValueError("user_id sayı olmalı!")
+        if self.per_user:
+            return f"user_{user_id}"
+        # Süreçler arasında aynı sonucu vermesi için hash() yerine crc32
+        return f"shard_{zlib.crc32(str(user_id).encode()) % self.buckets:03d}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.shard_dir, f"{key}.db")
+
+    def engine(self, key: str):
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                os.makedirs(self.shard_dir, exist_ok=True)
+                engine = create_engine(f"sqlite:///{self.path(key)}", **self.engine_options)
+                prepare_shard(engine)
+                self._engines[key] = engine
+        return engine
+
+    def engine_for(self, user_id):
+        return self.engine(self.shard_for(user_id))
+
+    def keys(self) -> list:
+        """Diskte bulunan shard anahtarları"""
+        try:
+            names = os.listdir(self.shard_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-3] for name in names if name.endswith(".db") and name.startswith(("user_", "shard_")))
+
+    def dispose(self):
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines.clear()
+
+
+def create_shard_router(config):
+    """SHARDS ayarı boşsa None, değilse yönlendiriciyi döndürür"""
+    shards = config.get("SHARDS")
+    if not shards:
+        return None
+    return ShardRouter(config["SHARD_DIR"], shards, config.get("SQLALCHEMY_ENGINE_OPTIONS"))
+
+
+def _copy_columns(conn, table: str) -> str:
+    main = [row[1] for row in conn.execute(f"PRAGMA main.table_info({table})")]
+    source = {row[1] for row in conn.execute(f"PRAGMA src.table_info({table})")}
+    return ", ".join(c for c in main if c in source)
+
+
+def _split_archive(source_file: str, target_file: str, shard_path: str) -> int:
+    """Yıl arşivinden yalnızca shard'ın müşterilerine ait satırları shard'ın arşiv dosyasına kopyalar"""
+    import re
+    import sqlite3
+
+    out = sqlite3.connect(target_file)
+    try:
+        out.execute("ATTACH DATABASE ? AS yr", (source_file,))
+        out.execute("ATTACH DATABASE ? AS shard", (shard_path,))
+        create_sql = out.execute(
+            "SELECT sql FROM yr.sqlite_master WHERE type = 'table' AND name = 'transactions'"
+        ).fetchone()[0]
+        with out:
+            out.execute(re.sub(
+                r"^CREATE TABLE\s+[\"`]?\w+[\"`]?", "CREATE TABLE IF NOT EXISTS main.transactions", create_sql
+            ))
+            out.execute("CREATE INDEX IF NOT EXISTS main.ix_transactions_customer_time ON transactions (customer_id, timestamp)")
+            count = out.execute(
+                "INSERT OR REPLACE INTO main.transactions SELECT * FROM yr.transactions "
+                "WHERE customer_id IN (SELECT id FROM shard.customers)"
+            ).rowcount
+        out.execute("DETACH DATABASE yr")
+        out.execute("DETACH DATABASE shard")
+    finally:
+        out.close()
+    return count
+
+
+def split_database(source_path: str, router: ShardRouter, archive_dir: str = None) -> dict:
+    """Tek dosyalı veritabanındaki kullanıcı verilerini shard dosyalarına kopyalar.
+
+    id'ler korunur; böylece istemcilerin değişiklik numaraları ve müşteri
+    id'leri geçerli kalır. Dolu bir shard dosyasına yazılmaz. Yıllık
+    arşivlerden shard'ın müşterilerine ait satırlar shard'ın kendi arşiv
+    dizinine kopyalanır ve kataloğu buna göre yazılır. Döndürülen sözlük
+    shard anahtarı -> {kullanıcı, müşteri, işlem} sayılarıdır.
+    """
+    import sqlite3
+
+    from ..models.archive import ARCHIVE_DIR, shard_archive_dir
+
+    archive_dir = archive_dir or ARCHIVE_DIR
+    source_path = os.path.abspath(source_path)
+    src = sqlite3.connect(source_path)
+    try:
+        user_ids = sorted({row[0] for row in src.execute(
+            "SELECT id FROM users UNION SELECT DISTINCT user_id FROM customers"
+        )})
+        catalog = []
+        if src.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archive_files'").fetchone():
+            catalog = src.execute("SELECT year, path, cutoff, archived_at FROM archive_files ORDER BY year").fetchall()
+    finally:
+        src.close()
+
+    groups = {}
+    for user_id in user_ids:
+        groups.setdefault(router.shard_for(user_id), []).append(user_id)
+
+    result = {}
+    for key, users in groups.items():
+        raw = router.engine(key).raw_connection()
+        conn = raw.driver_connection
+        isolation_level = conn.isolation_level
+        conn.isolation_level = None
+        try:
+            if conn.execute("SELECT 1 FROM customers LIMIT 1").fetchone():
+                raise ValueError(f"{router.path(key)} zaten veri içeriyor!")
+            conn.execute("ATTACH DATABASE ? AS src", (source_path,))
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    marks = ", ".join("?" * len(users))
+                    customers = _copy_columns(conn, "customers")
+                    conn.execute(
+                        f"INSERT INTO main.customers ({customers}) SELECT {customers} "
+                        f"FROM src.customers WHERE user_id IN ({marks})", users
+                    )
+                    transactions = _copy_columns(conn, "transactions")
+                    moved = conn.execute(
+                        f"INSERT INTO main.transactions ({transactions}) SELECT {transactions} "
+                        f"FROM src.transactions WHERE customer_id IN (SELECT id FROM main.customers)"
+                    ).rowcount
+                    # Arşivlenmiş zincirler kontrol noktasındaki anchor'dan başlar
+                    checkpoints = _copy_columns(conn, "ledger_checkpoints")
+                    if checkpoints:
+                        conn.execute(
+                            f"INSERT INTO main.ledger_checkpoints ({checkpoints}) SELECT {checkpoints} "
+                            f"FROM src.ledger_checkpoints WHERE customer_id IN (SELECT id FROM main.customers)"
+                        )
+                    for table in ("changes", "daily_rollup"):
+                        columns = _copy_columns(conn, table)
+                        if columns:
+                            conn.execute(
+                                f"INSERT INTO main.{table} ({columns}) SELECT {columns} "
+                                f"FROM src.{table} WHERE user_id IN ({marks})", users
+                            )
+                    result[key] = {
+                        "users": len(users),
+                        "customers": conn.execute("SELECT COUNT(*) FROM main.customers").fetchone()[0],
+                        "transactions": moved,
+                    }
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.execute("DETACH DATABASE src")
+            # Shard'lar müşteri id'lerini ayrı ürettiğinden yıl dosyaları paylaşılmaz
+            target_dir = shard_archive_dir(archive_dir, key)
+            entries = []
+            for year, path, cutoff, archived_at in catalog:
+                if not os.path.exists(path):
+                    continue
+                os.makedirs(target_dir, exist_ok=True)
+                target = os.path.abspath(os.path.join(target_dir, f"transactions_{year}.db"))
+                entries.append((year, target, _split_archive(path, target, router.path(key)), cutoff, archived_at))
+            if entries:
+                conn.executemany(
+                    "INSERT INTO archive_files (year, path, row_count, cutoff, archived_at) VALUES (?, ?, ?, ?, ?)",
+                    entries
+                )
+        finally:
+            conn.isolation_level = isolation_level
+            raw.close()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Veritabanını kullanıcı bazında shard dosyalarına böler")
+    parser.add_argument("--source", required=True, help="Bölünecek SQLite dosyası (merkezi katalog olarak kalır)")
+    parser.add_argument("--shard-dir", required=True)
+    parser.add_argument("--shards", default="user", help="'user' ya da hash kovası sayısı")
+    parser.add_argument("--archive-dir", help="Yıllık arşivlerin kök dizini; shard'lar alt dizinlere bölünür")
+    args = parser.parse_args(argv)
+
+    router = ShardRouter(args.shard_dir, args.shards)
+    try:
+        result = split_database(args.source, router, args.archive_dir)
+    finally:
+        router.dispose()
+    for key, counts in sorted(result.items()):
+        print(f"{router.path(key)}: {counts['users']} kullanıcı, {counts['customers']} müşteri, "
+              f"{counts['transactions']} işlem")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,12 @@
 from .user import User
 from .customer import Customer
+from .change import Change
+from .rollup import DailyRollup
+from .archive import ArchiveFile
+from .idempotency import IdempotencyKey
+from .installment import InstallmentPlan, Installment
+from .late_fees import LateFee
+from .reconciliation import StatementLine
+from .ledger import LedgerCheckpoint, LedgerVerification
 
-__all__ = ['User', 'Customer'] 
\ No newline at end of file
+__all__ = ['User', 'Customer', 'Change', 'DailyRollup', 'ArchiveFile', 'IdempotencyKey', 'InstallmentPlan', 'Installment', 'LateFee', 'StatementLine', 'LedgerCheckpoint', 'LedgerVerification'] 
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""İşlem tablosu üzerinde NumPy ile vektörel portföy analizleri.
+
+İşlem sütunları (müşteri id, epoch zaman damgası, kuruş cinsinden işaretli
+tutar, tip kodu)
+SQLite'tan doğrudan NumPy dizilerine yüklenir ve süreç içinde saklanır.
+Sonraki çağrılarda sadece son görülen işlem id'sinden sonraki satırlar
+okunur. Metrikler ORM nesneleri üzerinde dönmek yerine bincount, cumsum
+ve anahtara göre sıralama ile hesaplanır.
+"""
+import calendar
+import importlib.util
+import threading
+from datetime import datetime
+
+from ..database.database import db
+from .money import KURUS
+
+# numpy isteğe bağlıdır ve açılışı yavaşlatmaması için ilk analizde yüklenir
+np = None
+
+# İşlem tipi kodları; devir (arşiv açılış bakiyesi) borç gibi sayılır
+BORC, ODEME, ALACAK, DEVIR = 0, 1, 2, 3
+
+DAY = 86400.0
+
+COLUMNS_SQL = """
+    SELECT id, customer_id,
+           COALESCE(CAST(strftime('%s', timestamp) AS INTEGER), 0),
+           CASE transaction_type WHEN 'odeme' THEN -amount ELSE amount END,
+           CASE transaction_type WHEN 'borc' THEN 0 WHEN 'odeme' THEN 1 WHEN 'alacak' THEN 2 ELSE 3 END
+    FROM transactions
+    WHERE id > ?
+    ORDER BY id
+"""
+
+# Daha önce yüklenen aralıkta silme olup olmadığını anlamak için
+SNAPSHOT_SQL = "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM transactions WHERE id <= ?"
+
+
+class AnalyticsUnavailable(RuntimeError):
+    """numpy kurulu değilse fırlatılır"""
+
+
+def available() -> bool:
+    """numpy kurulu mu (modülü yüklemeden bakar)"""
+    return np is not None or importlib.util.find_spec("numpy") is not None
+
+
+def _require_numpy():
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise AnalyticsUnavailable("Analiz modülü için numpy gerekli (pip install numpy)") from None
+        np = numpy
+
+
+class LedgerColumns:
+    """transactions tablosunun sütunlarını NumPy dizileri olarak tutan önbellek.
+
+    Diziler id sırasındadır. refresh() sadece last_id'den sonraki satırları
+    ekler; önceden yüklenen aralıkta satır sayısı değişmişse (silme,
+    arşivleme) diziler baştan yüklenir.
+    """
+
+    DTYPE = [("id", "i8"), ("customer_id", "i8"), ("ts", "i8"), ("amount", "i8"), ("code", "i1")]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self._reset()
+        self.full_loads = 0
+        self.incremental_loads = 0
+
+    def _reset(self):
+        # Diziler ilk refresh'te oluşturulur; numpy o ana kadar yüklenmez
+        self.data = None
+        self.last_id = 0
+
+    def _load(self, connection, after_id: int):
+        result = connection.exec_driver_sql(COLUMNS_SQL, (after_id,))
+        try:
+            # Row nesneleri yerine DBAPI imlecinden doğrudan okunur
+            return np.fromiter(result.cursor, dtype=self.DTYPE)
+        finally:
+            result.close()
+
+    def refresh(self, session=None):
+        """Yeni işlemleri dizilere ekler ve güncel diziyi döndürür"""
+        _require_numpy()
+        session = session or db.session
+        connection = session.connection()
+        with self._lock:
+            if self.last_id:
+                count, max_id = connection.exec_driver_sql(SNAPSHOT_SQL, (self.last_id,)).one()
+                if count != len(self.data) or max_id != self.last_id:
+                    self._reset()
+
+            if self.last_id:
+                rows = self._load(connection, self.last_id)
+                if len(rows):
+                    self.data = np.concatenate([self.data, rows])
+                self.incremental_loads += 1
+            else:
+                self.data = self._load(connection, 0)
+                self.full_loads += 1
+
+            if len(self.data):
+                self.last_id = int(self.data["id"][-1])
+            return self.data
+
+
+def _grouped_start(totals):
+    """Gruplara göre sıralı dizide her grubun öncesindeki kümülatif toplam"""
+    return np.cumsum(totals) - totals
+
+
+def compute_metrics(data, customer_ids, borc, as_of: float, window_days: int = 90) -> dict:
+    """Verilen müşteriler için vektörel metrikleri hesaplar.
+
+    customer_ids ve borc aynı sıradaki müşteri dizileridir. Dönen dizilerin
+    hepsi bu sırayla hizalıdır.
+    """
+    _require_numpy()
+    n = len(customer_ids)
+    if n == 0:
+        empty = np.zeros(0)
+        return {
+            "balance": empty, "opening": empty, "payments": empty, "payment_count": empty,
+            "velocity": empty, "days_to_pay": empty, "settled": empty, "transactions": 0,
+        }
+
+    # Müşteri id'lerini 0..n-1 aralığına eşle; başka kullanıcıların işlemleri elenir
+    size = int(max(customer_ids.max(), data["customer_id"].max() if len(data) else 0)) + 1
+    position = np.full(size, -1, dtype=np.int64)
+    position[customer_ids] = np.arange(n)
+    local = position[data["customer_id"]]
+    rows = data[local >= 0]
+    local = local[local >= 0]
+
+    # Müşteri, zaman ve id sırasına diz
+    order = np.lexsort((rows["id"], rows["ts"], local))
+    cust = local[order]
+    ts = rows["ts"][order].astype(np.float64)
+    # Kuruşlar 2^53'e kadar float64'te kesin; bincount ağırlıkları float ister
+    amount = rows["amount"][order].astype(np.float64)
+    is_payment = rows["code"][order] == ODEME
+
+    balance = np.bincount(cust, weights=amount, minlength=n)
+    # İşlemi olmayan açılış borcu; ödemeler önce bunu kapatır
+    opening = np.clip(borc - balance, 0, None)
+
+    c_cust, c_ts, c_amt = cust[~is_payment], ts[~is_payment], amount[~is_payment]
+    p_cust, p_ts, p_amt = cust[is_payment], ts[is_payment], -amount[is_payment]
+
+    charge_totals = np.bincount(c_cust, weights=c_amt, minlength=n)
+    paid_totals = np.bincount(p_cust, weights=p_amt, minlength=n)
+
+    # Her borcun müşteri içindeki kümülatif toplamı; FIFO'da bu borç, müşterinin
+    # kümülatif ödemesi (açılış + bu toplam) seviyesine ulaştığında kapanır.
+    # Gruplar sıralı olduğundan global kümülatif ödeme dizisinde tek bir
+    # searchsorted tüm müşteriler için kapanış ödemesini bulur.
+    charge_cum = np.cumsum(c_amt) - _grouped_start(charge_totals)[c_cust]
+    paid_cum = np.cumsum(p_amt)
+    target = _grouped_start(paid_totals)[c_cust] + opening[c_cust] + charge_cum
+    closing = np.searchsorted(paid_cum, target - 0.5, side="left")
+    settled = closing < len(paid_cum)
+    settled[settled] = p_cust[closing[settled]] == c_cust[settled]
+
+    settled_cust = c_cust[settled]
+    days = np.clip(p_ts[closing[settled]] - c_ts[settled], 0, None) / DAY
+    weight = c_amt[settled]
+    settled_amount = np.bincount(settled_cust, weights=weight, minlength=n)
+    weighted_days = np.bincount(settled_cust, weights=days * weight, minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        days_to_pay = np.where(settled_amount > 0, weighted_days / settled_amount, np.nan)
+
+    # Son window_days gün içindeki ödemeler, 30 günlük hıza çevrilir
+    recent = p_ts >= as_of - window_days * DAY
+    recent_paid = np.bincount(p_cust[recent], weights=p_amt[recent], minlength=n)
+    velocity = recent_paid * 30.0 / window_days
+
+    return {
+        "balance": balance,
+        "opening": opening,
+        "payments": paid_totals,
+        "payment_count": np.bincount(p_cust, minlength=n),
+        "velocity": velocity,
+        "days_to_pay": days_to_pay,
+        "settled": settled_amount,
+        "transactions": int(len(cust)),
+    }
+
+
+def _round(value):
+    value = float(value)
+    return None if value != value else round(value, 2)
+
+
+def _money(kurus):
+    return round(float(kurus) / KURUS, 2)
+
+
+def ledger_analytics(columns: LedgerColumns, user_id, top: int = 10, window_days: int = 90,
+                     as_of: float = None) -> dict:
+    """Kullanıcının portföy özetini ve en borçlu müşterilerini döndürür"""
+    _require_numpy()
+    data = columns.refresh()
+    rows = db.session.connection().exec_driver_sql(
+        "SELECT id, name, borc FROM customers WHERE user_id = ? ORDER BY id", (int(user_id),)
+    ).all()
+
+    customer_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+    borc = np.fromiter((r[2] or 0 for r in rows), dtype=np.float64, count=len(rows))
+    # Zaman damgaları yerel saatle yazılır, strftime('%s') bunları UTC sayar
+    as_of = calendar.timegm(datetime.now().timetuple()) if as_of is None else as_of
+    metrics = compute_metrics(data, customer_ids, borc, as_of, window_days)
+
+    settled_total = metrics["settled"].sum()
+    portfolio = {
+        "customers": len(rows),
+        "transactions": metrics["transactions"],
+        "borc": _money(borc.sum()),
+        "computed_balance": _money(metrics["balance"].sum()),
+        "untracked_opening": _money(metrics["opening"].sum()),
+        "payments": _money(metrics["payments"].sum()),
+        "payment_velocity_30d": _money(metrics["velocity"].sum()),
+        "avg_days_to_pay": _round(
+            np.nansum(metrics["days_to_pay"] * metrics["settled"]) / settled_total
+        ) if settled_total else None,
+    }
+
+    # En borçlu müşteriler; eşitlikte id sırası korunur
+    ranking = np.argsort(-borc, kind="stable")[:max(0, top)]
+    top_debtors = [{
+        "id": rows[i][0],
+        "name": rows[i][1],
+        "borc": _money(borc[i]),
+        "computed_balance": _money(metrics["balance"][i]),
+        "payments": _money(metrics["payments"][i]),
+        "payment_count": int(metrics["payment_count"][i]),
+        "payment_velocity_30d": _money(metrics["velocity"][i]),
+        "avg_days_to_pay": _round(metrics["days_to_pay"][i]),
+    } for i in ranking if borc[i] > 0]
+
+    return {
+        "window_days": window_days,
+        "portfolio": portfolio,
+        "top_debtors": top_debtors,
+    }
@@ -0,0 +1,347 @@
+"""Eski işlemlerin yıllık SQLite arşiv dosyalarına taşınması.
+
+Kesim tarihinden eski işlemler archive_dir altındaki transactions_YYYY.db
+dosyalarına taşınır ve ana tablodan silinir. Etkilenen her müşteri için
+ana tabloya kesim anındaki bakiyeyi taşıyan tek bir "devir" satırı
+eklenir; böylece günlük yollar (dashboard, geçmiş, PDF) küçük bir tabloya
+bakar ve bakiyeler tutarlı kalır. İstenen tarih aralığı kesimden önceye
+uzanıyorsa geçmiş sorgusu gerekli yılları ATTACH edip UNION ALL ile okur.
+Sharding açıksa her shard'ın kendi arşiv dizini ve kataloğu vardır
+(shard'lar müşteri id'lerini bağımsız ürettiğinden id'ler çakışır).
+Taşınan müşterilerin hash zinciri önce doğrulanır; kalan satırlar eski
+zincirin son hash'inden başlayarak yeniden mühürlenir (bkz. ledger.py).
+
+    python -m backend.models.archive --cutoff 2024-01-01
+"""
+import argparse
+import os
+import re
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import String, create_engine
+from sqlalchemy.orm import Mapped, mapped_column
+from ..database.database import Base, db
+from ..database.sharding import current_shard
+from .ledger import LedgerCheckpoint, ledger_engines, reseal, verify_customers
+from .money import lira
+
+ARCHIVE_DIR = os.environ.get(
+    "PAYTRACK_ARCHIVE_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "database", "archive")
+)
+
+# Devir satırlarının işlem tipi
+DEVIR = "devir"
+
+# SQLite varsayılan olarak en fazla 10 ek veritabanına izin verir
+MAX_ATTACHED = 8
+
+HISTORY_COLUMNS = "id, timestamp, amount, transaction_type, description"
+
+
+class ArchiveFile(Base):
+    """Arşivlenmiş yıl dosyalarının kataloğu"""
+    __tablename__ = "archive_files"
+
+    year: Mapped[int] = mapped_column(primary_key=True)
+    path: Mapped[str] = mapped_column(String(500))
+    row_count: Mapped[int] = mapped_column(default=0)
+    # Bu tarihten önceki işlemler ana tabloda değil, arşivdedir
+    cutoff: Mapped[str] = mapped_column(String(19))
+    archived_at: Mapped[Optional[str]] = mapped_column(String(19), default=None)
+
+
+def shard_archive_dir(archive_dir: str = ARCHIVE_DIR, key: str = None) -> str:
+    """Shard'ın arşiv dizini (key verilmezse içinde bulunulan shard); sharding kapalıysa archive_dir"""
+    key = key if key is not None else current_shard()
+    return os.path.join(archive_dir, key) if key else archive_dir
+
+
+def _schema(year: int) -> str:
+    return f"archive_{int(year)}"
+
+
+def _attach(execute, year: int, path: str, attached: dict, keep=()) -> str:
+    """Arşiv dosyasını bağlantıya ekler (işlem dışında çağrılmalıdır).
+
+    attached, bağlantıya ekli şema -> dosya eşlemesidir ve havuzdaki
+    bağlantının info sözlüğünde saklanır. Yer açmak için keep'teki
+    (aynı işlemde kullanılacak) şemalar çıkarılmaz.
+    """
+    schema = _schema(year)
+    if attached.get(schema) == path:
+        return schema
+    if schema in attached:
+        execute(f"DETACH DATABASE {schema}")
+        del attached[schema]
+    elif len(attached) >= MAX_ATTACHED:
+        oldest = next(name for name in attached if name not in keep)
+        execute(f"DETACH DATABASE {oldest}")
+        del attached[oldest]
+    execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+    attached[schema] = path
+    return schema
+
+
+def _attached(connection) -> dict:
+    return connection.info.setdefault("paytrack_archives", {})
+
+
+def _batches(items, size: int = MAX_ATTACHED) -> list:
+    """Aynı anda ekli olabilecek kadar yıllık gruplar"""
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _prepare_years(conn, years, paths: dict, attached: dict, create_sql: str):
+    """Yıl dosyalarını ekler ve tablolarını hazırlar (işlem dışında)"""
+    keep = {_schema(year) for year in years}
+    for year in years:
+        schema = _attach(conn.execute, year, paths[year], attached, keep)
+        conn.execute(re.sub(
+            r"^CREATE TABLE\s+[\"`]?\w+[\"`]?", f"CREATE TABLE IF NOT EXISTS {schema}.transactions", create_sql
+        ))
+        # Hash zincirinden önce oluşturulmuş arşiv dosyaları
+        archived_columns = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(transactions)")}
+        for column in ("prev_hash", "row_hash"):
+            if column not in archived_columns:
+                conn.execute(f"ALTER TABLE {schema}.transactions ADD COLUMN {column} VARCHAR(64)")
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {schema}.ix_transactions_customer_time "
+            f"ON transactions (customer_id, timestamp)"
+        )
+
+
+def _copy_years(conn, years, cutoff: str, last_id: int, replace: bool = False) -> dict:
+    """Eklenmiş yıl dosyalarına taşınacak satırları kopyalar (işlem çağırana ait)"""
+    verb = "INSERT OR REPLACE" if replace else "INSERT"
+    return {year: conn.execute(f"""
+        {verb} INTO {_schema(year)}.transactions
+        SELECT * FROM main.transactions
+        WHERE timestamp < ? AND substr(timestamp, 1, 4) = ? AND transaction_type != ? AND id <= ?
+    """, (cutoff, str(year), DEVIR, last_id)).rowcount for year in years}
+
+
+def archive_transactions(engine, cutoff: str, archive_dir: str = ARCHIVE_DIR) -> dict:
+    """cutoff'tan (YYYY-MM-DD) eski işlemleri yıllık arşiv dosyalarına taşır.
+
+    Taşıma, devir satırları ve değişiklik kayıtları tek bir işlemde yapılır;
+    SQLite ek veritabanlarıyla birlikte atomik commit eder. Eski devir
+    satırları arşive taşınmaz, yeni devir onların yerini alır. MAX_ATTACHED'dan
+    fazla yıl varsa önceki yıl grupları ayrı işlemlerde kopyalanır; son işlem
+    başarısız olursa bu kopyalar geri silinir.
+    """
+    from .change import Change
+
+    cutoff = datetime.strptime(cutoff, "%Y-%m-%d").strftime("%Y-%m-%d %H:%M:%S")
+    os.makedirs(archive_dir, exist_ok=True)
+    Base.metadata.create_all(engine, tables=[ArchiveFile.__table__, LedgerCheckpoint.__table__])
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    isolation_level = conn.isolation_level
+    # ATTACH işlem içinde yapılamaz; işlem elle yönetilir
+    conn.isolation_level = None
+    attached = _attached(raw)
+    try:
+        years = sorted(int(row[0]) for row in conn.execute(
+            "SELECT DISTINCT substr(timestamp, 1, 4) FROM transactions WHERE timestamp < ? AND transaction_type != ?",
+            (cutoff, DEVIR)
+        ))
+        create_sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'transactions'"
+        ).fetchone()[0]
+        paths = {year: os.path.abspath(os.path.join(archive_dir, f"transactions_{year}.db")) for year in years}
+        # Yalnızca bu andan önce yazılmış satırlar taşınır ve silinir; gruplar
+        # arasında geriye tarihli eklenen bir satır sonraki çalıştırmaya kalır
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+        batches = _batches(years) or [[]]
+
+        moved, copied = {}, []
+        try:
+            for batch in batches[:-1]:
+                _prepare_years(conn, batch, paths, attached, create_sql)
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    moved.update(_copy_years(conn, batch, cutoff, last_id, replace=True))
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+                copied.append(batch)
+
+            _prepare_years(conn, batches[-1], paths, attached, create_sql)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DROP TABLE IF EXISTS temp.archived_customers")
+                conn.execute("""
+                    CREATE TEMP TABLE archived_customers AS
+                    SELECT customer_id, MAX(timestamp) AS last_ts
+                    FROM transactions WHERE timestamp < ? AND id <= ?
+                    GROUP BY customer_id
+                """, (cutoff, last_id))
+                customer_ids = [row[0] for row in conn.execute("SELECT customer_id FROM archived_customers")]
+                # Bozuk bir zincir yeniden mühürlenip aklanmasın
+                broken = verify_customers(conn, customer_ids)
+                if broken:
+                    raise ValueError(
+                        f"{len(broken)} müşterinin işlem zinciri bozuk, arşivleme yapılmadı "
+                        f"(müşteri {broken[0]['customer_id']}: {broken[0]['error']})"
+                    )
+                anchors = dict(conn.execute(
+                    "SELECT id, chain_head FROM customers WHERE id IN (SELECT customer_id FROM archived_customers)"
+                ))
+                moved.update(_copy_years(conn, batches[-1], cutoff, last_id))
+
+                # Devir = güncel bakiye - kesimden sonraki işlemlerin etkisi. Yeni
+                # satırlar silmeden önce eklenir ki id'leri arşivdekilerle çakışmasın.
+                conn.execute("""
+                    INSERT INTO transactions (customer_id, amount, transaction_type, description, timestamp)
+                    SELECT c.id,
+                           c.borc - COALESCE((
+                               SELECT SUM(CASE WHEN t.transaction_type = 'odeme' THEN -t.amount ELSE t.amount END)
+                               FROM transactions t
+                               WHERE t.customer_id = c.id AND (t.timestamp >= ? OR t.id > ?)
+                           ), 0),
+                           ?, ?, a.last_ts
+                    FROM archived_customers a
+                    JOIN customers c ON c.id = a.customer_id
+                """, (cutoff, last_id, DEVIR, f"Devir ({cutoff[:10]} öncesi)"))
+                conn.execute("DELETE FROM transactions WHERE timestamp < ? AND id <= ?", (cutoff, last_id))
+                reseal(conn, customer_ids, anchors, now)
+
+                # İstemcilerin müşteri satırını ve geçmişini yeniden çekmesi için
+                conn.execute("""
+                    INSERT INTO changes (user_id, customer_id, customer_name, kind, created_at)
+                    SELECT c.user_id, c.id, c.name, ?, ?
+                    FROM archived_customers a JOIN customers c ON c.id = a.customer_id
+                """, (Change.CUSTOMER, now))
+                for year, count in moved.items():
+                    conn.execute("""
+                        INSERT INTO archive_files (year, path, row_count, cutoff, archived_at)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (year) DO UPDATE SET
+                            row_count = row_count + excluded.row_count,
+                            cutoff = max(cutoff, excluded.cutoff),
+                            archived_at = excluded.archived_at
+                    """, (year, paths[year], count, cutoff, now))
+                customers = conn.execute("SELECT COUNT(*) FROM archived_customers").fetchone()[0]
+                conn.execute("DROP TABLE temp.archived_customers")
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except BaseException:
+            # Önceki gruplarda kopyalanan satırlar ana tabloda duruyor; arşivden geri alınır
+            for batch in copied:
+                _prepare_years(conn, batch, paths, attached, create_sql)
+                with_ids = "SELECT id FROM main.transactions WHERE timestamp < ? AND id <= ?"
+                conn.execute("BEGIN IMMEDIATE")
+                for year in batch:
+                    conn.execute(f"DELETE FROM {_schema(year)}.transactions WHERE id IN ({with_ids})", (cutoff, last_id))
+                conn.execute("COMMIT")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+        raw.close()
+
+    return {"cutoff": cutoff, "customers": customers, "moved": moved}
+
+
+def archive_horizon(session=None) -> Optional[str]:
+    """Bu tarihten eski işlemler arşivdedir; arşiv yoksa None"""
+    session = session or db.session
+    return session.query(db.func.max(ArchiveFile.cutoff)).scalar()
+
+
+def transaction_history(customer_id: int, start: str = None, end: str = None) -> list:
+    """Müşterinin işlemlerini [start, end) aralığında, zaman sırasıyla döndürür.
+
+    Satırlar Transaction gibi öznitelikle okunabilir; tutarlar kuruştur.
+
+    start verilmezse ya da arşiv sınırının gerisine uzanmıyorsa sadece ana
+    tablo okunur (eski işlemler devir satırında özetlenir). Uzanıyorsa
+    ilgili yılların dosyaları bağlanıp UNION ALL ile birleştirilir; arşivdeki
+    ayrıntılı satırlar gösterildiği için devir satırı bu durumda atlanır.
+    """
+    end = end or "9999"
+    params = [customer_id, start or "", end]
+    archives = []
+    if start is not None and start < (archive_horizon() or ""):
+        archives = db.session.query(ArchiveFile).filter(
+            ArchiveFile.year >= int(start[:4]),
+            ArchiveFile.year <= int(end[:4])
+        ).order_by(ArchiveFile.year).all()
+
+    connection = db.session.connection()
+    main_part = (
+        f"SELECT {HISTORY_COLUMNS} FROM main.transactions "
+        f"WHERE customer_id = ? AND timestamp >= ? AND timestamp < ?"
+        + (" AND transaction_type != ?" if archives else "")
+    )
+    if not archives:
+        return connection.exec_driver_sql(main_part + " ORDER BY timestamp, id", tuple(params)).all()
+
+    params.append(DEVIR)
+    # Bağlantı havuzda kaldıkça ekli dosyalar da kalır; MAX_ATTACHED'dan
+    # fazla yıl gruplar halinde okunup birleştirilir
+    attached = _attached(connection)
+    archives = [archive for archive in archives if os.path.exists(archive.path)]
+    rows = []
+    for n, batch in enumerate(_batches(archives) or [[]]):
+        parts, batch_params = ([main_part], list(params)) if n == 0 else ([], [])
+        keep = {_schema(archive.year) for archive in batch}
+        for archive in batch:
+            schema = _attach(connection.exec_driver_sql, archive.year, archive.path, attached, keep)
+            parts.append(
+                f"SELECT {HISTORY_COLUMNS} FROM {schema}.transactions "
+                f"WHERE customer_id = ? AND timestamp >= ? AND timestamp < ?"
+            )
+            batch_params += [customer_id, start, end]
+        rows += connection.exec_driver_sql(" UNION ALL ".join(parts), tuple(batch_params)).all()
+    return sorted(rows, key=lambda row: (row.timestamp, row.id))
+
+
+def history_row_to_dict(row) -> dict:
+    """transaction_history satırını Transaction.to_dict biçimine çevirir"""
+    return {
+        "id": row.id,
+        "amount": lira(row.amount),
+        "transaction_type": row.transaction_type,
+        "description": row.description,
+        "timestamp": row.timestamp,
+    }
+
+
+def archive_shards(app, cutoff: str, archive_dir: str = ARCHIVE_DIR) -> dict:
+    """Her shard'ı (sharding kapalıysa tek veritabanını) kendi arşiv dizinine arşivler; anahtar -> sonuç"""
+    results = {}
+    with app.app_context():
+        for key, engine in ledger_engines(app):
+            results[key] = archive_transactions(engine, cutoff, shard_archive_dir(archive_dir, key))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eski işlemleri yıllık arşiv dosyalarına taşır")
+    parser.add_argument("--cutoff", required=True, help="Bu tarihten (YYYY-MM-DD) eski işlemler taşınır")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--db", help="Tek bir veritabanı URI'si (verilmezse uygulamanın veritabanı ya da shard'ları)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        results = {None: archive_transactions(create_engine(args.db), args.cutoff, args.archive_dir)}
+    else:
+        # Sharding ayarları uygulamanınkiyle aynı olsun
+        from ..app.main import create_app
+
+        results = archive_shards(create_app(background_jobs=False), args.cutoff, args.archive_dir)
+    for key, result in results.items():
+        print(f"{key or 'paytrack.db'}: {result['customers']} müşteri, {sum(result['moved'].values())} işlem "
+              f"arşivlendi: {result['moved']}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
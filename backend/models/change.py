@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Index, insert
+from sqlalchemy.orm import Mapped, mapped_column
+from ..database.database import Base, db
+
+
+class Change(Base):
+    """Kullanıcı verisindeki her değişikliğin sıralı kaydı.
+
+    İstemciler son gördükleri seq değerini göndererek sadece değişen
+    müşteri satırlarını ve yeni işlemleri alır.
+    """
+    __tablename__ = "changes"
+    __table_args__ = (
+        Index("ix_changes_user_seq", "user_id", "seq"),
+        # Müşterinin son değişikliği (hareketsiz müşteri temizliği)
+        Index("ix_changes_customer_seq", "customer_id", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+    # Değişiklik tipleri
+    CUSTOMER = "customer"
+    CUSTOMER_DELETED = "customer_deleted"
+    TRANSACTION = "transaction"
+
+    seq: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column()
+    customer_id: Mapped[int] = mapped_column()
+    customer_name: Mapped[str] = mapped_column(String(100))
+    kind: Mapped[str] = mapped_column(String(20))
+    transaction_id: Mapped[Optional[int]] = mapped_column(default=None)
+    created_at: Mapped[str] = mapped_column(
+        String(50),
+        default=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
+
+    @classmethod
+    def record(cls, customer, kind: str, transaction_id: Optional[int] = None) -> "Change":
+        """Değişikliği oturuma ekler; commit çağıranın işlemiyle birlikte yapılır"""
+        change = cls(
+            user_id=customer.user_id,
+            customer_id=customer.id,
+            customer_name=customer.name,
+            kind=kind,
+            transaction_id=transaction_id
+        )
+        db.session.add(change)
+        return change
+
+    @classmethod
+    def record_row(cls, user_id, customer_id, customer_name: str, kind: str,
+                   transaction_id: Optional[int] = None):
+        """record() ile aynı, ORM nesnesi olmadan tek bir INSERT olarak"""
+        db.session.execute(insert(cls).values(
+            user_id=user_id,
+            customer_id=customer_id,
+            customer_name=customer_name,
+            kind=kind,
+            transaction_id=transaction_id
+        ))
+
+    @classmethod
+    def version(cls, user_id):
+        """Kullanıcı verisinin sürümünü (seq, değişiklik zamanı) döndürür.
+
+        Her yazma yeni bir seq ürettiği için bu değer ucuz bir sürüm
+        damgasıdır; müşteri ve işlem tablolarına hiç dokunmaz.
+        """
+        row = db.session.query(cls.seq, cls.created_at).filter(
+            cls.user_id == user_id
+        ).order_by(cls.seq.desc()).limit(1).first()
+        return (row.seq, row.created_at) if row else (0, None)
+
+
+def collect_changes(user_id, since: int, limit: int = 500) -> dict:
+    """since'ten sonraki değişiklikleri istemcinin uygulayabileceği delta olarak döndürür"""
+    from .customer import Customer, Transaction
+
+    changes = db.session.query(Change).filter(
+        Change.user_id == user_id,
+        Change.seq > since
+    ).order_by(Change.seq).limit(limit + 1).all()
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    deleted = {}
+    customer_ids = set()
+    transaction_ids = []
+    for change in changes:
+        if change.kind == Change.CUSTOMER_DELETED:
+            deleted[change.customer_id] = change.customer_name
+            customer_ids.discard(change.customer_id)
+        else:
+            customer_ids.add(change.customer_id)
+            deleted.pop(change.customer_id, None)
+        if change.transaction_id is not None:
+            transaction_ids.append(change.transaction_id)
+
+    customers = db.session.query(Customer).filter(Customer.id.in_(customer_ids)).all() if customer_ids else []
+    transactions = []
+    if transaction_ids:
+        transactions = db.session.query(Transaction, Customer.name).join(
+            Customer, Transaction.customer_id == Customer.id
+        ).filter(Transaction.id.in_(transaction_ids)).order_by(Transaction.id).all()
+
+    return {
+        "seq": changes[-1].seq if changes else since,
+        "has_more": has_more,
+        "customers": [c.to_dict() for c in customers],
+        "deleted": list(deleted.values()),
+        "transactions": [{**t.to_dict(), "customer_name": name} for t, name in transactions],
+    }
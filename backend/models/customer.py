@@ -1,8 +1,13 @@
 from datetime import datetime
-from sqlalchemy import String, Float, ForeignKey
+from sqlalchemy import String, ForeignKey, bindparam, func, insert, select, update
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
 from ..database.database import Base, db
+from .change import Change
+from .rollup import DailyRollup
+from .ledger import chain_rows
+from .money import lira
 import random
 
 class Customer(Base):
@@ -11,14 +16,16 @@ class Customer(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100), index=True)
     urun: Mapped[str] = mapped_column(String(100))
-    borc: Mapped[float] = mapped_column(Float, default=0.0)
+    borc: Mapped[int] = mapped_column(default=0)  # kuruş
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    # İşlem zincirinin son hash'i (bkz. ledger.py)
+    chain_head: Mapped[Optional[str]] = mapped_column(String(64), default=None)
     
     # İlişkiler
     transactions: Mapped[List["Transaction"]] = relationship(back_populates="customer")
     user: Mapped["User"] = relationship(back_populates="customers")
     
-    def __init__(self, name: str, urun: str, borc: float, user_id: int):
+    def __init__(self, name: str, urun: str, borc: int, user_id: int):
         self.name = name
         self.urun = urun
         self.borc = borc
@@ -26,33 +33,16 @@ class Customer(Base):
         self.transactions = []  # [{type: 'borc'|'odeme', amount: float, date: str}]
 
     def add_transaction(self, transaction_type, amount, timestamp, description=''):
-        if transaction_type not in ['borc', 'odeme', 'alacak']:
-            raise ValueError('Geçersiz işlem tipi!')
-        
-        if amount <= 0:
-            raise ValueError('Tutar 0\'dan büyük olmalı!')
-        
-        # Yeni işlem oluştur
-        transaction = Transaction(
-            customer_id=self.id,
-            amount=amount,
-            transaction_type=transaction_type,
-            description=description,
-            timestamp=datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-        )
-        
-        # İşlemi veritabanına ekle
-        db.session.add(transaction)
-        
-        # Borç tutarını güncelle
-        if transaction_type == 'borc' or transaction_type == 'alacak':
-            self.borc += amount
-        else:  # odeme
-            if amount > self.borc:
-                raise ValueError('Ödeme tutarı mevcut borçtan büyük olamaz!')
-            self.borc -= amount
-        
+        """amount kuruş cinsinden tam sayıdır"""
+        try:
+            transaction_id, borc = post_transaction(self.id, transaction_type, amount, timestamp, description)
+        except ValueError:
+            db.session.rollback()
+            raise
+        # Bakiye veritabanında güncellendi; nesnedeki eski değer geri yazılmasın
+        set_committed_value(self, 'borc', borc)
         db.session.commit()
+        return transaction_id
 
     def get_recent_transactions(self, limit: int = 5) -> list:
         """Son işlemleri döndürür"""
@@ -63,15 +53,24 @@ class Customer(Base):
         )[:limit]
 
     def get_total_debt(self) -> float:
-        """Toplam borç miktarını döndürür"""
-        return self.borc
+        """Toplam borç miktarını TL olarak döndürür"""
+        return lira(self.borc)
 
     def get_transaction_history(self) -> list:
         """Tüm işlem geçmişini döndürür"""
         return sorted([t for t in self.transactions], key=lambda x: x.timestamp)
 
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'name': self.name,
+            'urun': self.urun,
+            'borc': lira(self.borc),
+            'display': str(self)
+        }
+
     def __str__(self) -> str:
-        return f"{self.name} | {self.urun} | Borç: {self.borc}₺"
+        return f"{self.name} | {self.urun} | Borç: {lira(self.borc)}₺"
 
     def customer_id(self) -> str:
         """Her müşteri için benzersiz bir id oluşturur"""
@@ -83,16 +82,21 @@ class Customer(Base):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Silinen satırların id'leri yeniden kullanılmaz (artımlı defter doğrulamasının filigranı için)
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Mapped[int] = mapped_column(primary_key=True)
     timestamp: Mapped[str] = mapped_column(
         String(50), 
         default=lambda: datetime.now().strftime("%Y-%m-%d %H:%M")
     )
-    amount: Mapped[float] = mapped_column(Float)
+    amount: Mapped[int] = mapped_column()  # kuruş
     transaction_type: Mapped[str] = mapped_column(String(20))  # "borc" veya "odeme"
     description: Mapped[str] = mapped_column(String(200), default="")
-    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"))
+    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), index=True)
+    # Müşteri başına hash zinciri: önceki satırın hash'i ve bu satırınki
+    prev_hash: Mapped[Optional[str]] = mapped_column(String(64), default=None)
+    row_hash: Mapped[Optional[str]] = mapped_column(String(64), default=None)
 
     # İlişkiler
     customer: Mapped["Customer"] = relationship(back_populates="transactions")
@@ -100,8 +104,166 @@ class Transaction(Base):
     def to_dict(self):
         return {
             'id': self.id,
-            'amount': self.amount,
+            'amount': lira(self.amount),
             'transaction_type': self.transaction_type,
             'description': self.description,
             'timestamp': self.timestamp
-        }
\ No newline at end of file
+        }
+
+def post_transaction(customer_id, transaction_type, amount, timestamp, description=''):
+    """İşlemi bakiyeyle birlikte atomik olarak yazar; commit çağırana aittir.
+
+    Bakiye Python'da okunup geri yazılmaz. Tek bir koşullu UPDATE hem
+    bakiyeyi değiştirir hem de ödemenin borcu aşmadığını kontrol eder;
+    böylece eşzamanlı ödemeler aynı bakiyeyi görüp ikisi birden geçemez.
+    İşlem, değişiklik ve rollup satırları aynı veritabanı işlemi içinde
+    eklenir; işlem müşterinin hash zincirine bağlanır (UPDATE'in tuttuğu
+    yazma kilidi altında). (işlem id, yeni bakiye) döndürür.
+    """
+    if transaction_type not in ['borc', 'odeme', 'alacak']:
+        raise ValueError('Geçersiz işlem tipi!')
+
+    if amount <= 0:
+        raise ValueError('Tutar 0\'dan büyük olmalı!')
+
+    timestamp = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S')
+
+    customers = Customer.__table__
+    if transaction_type == 'odeme':
+        stmt = update(customers).where(
+            customers.c.id == customer_id,
+            customers.c.borc >= amount
+        ).values(borc=customers.c.borc - amount)
+    else:
+        stmt = update(customers).where(
+            customers.c.id == customer_id
+        ).values(borc=customers.c.borc + amount)
+    result = db.session.execute(
+        stmt.returning(customers.c.borc, customers.c.user_id, customers.c.name, customers.c.chain_head)
+    )
+    row = result.first()
+    if row is None:
+        # Koşul tutmadı: ya müşteri yok ya da ödeme borcu aşıyor
+        exists = db.session.execute(
+            select(customers.c.id).where(customers.c.id == customer_id)
+        ).first()
+        if exists is None:
+            raise LookupError('Müşteri bulunamadı!')
+        raise ValueError('Ödeme tutarı mevcut borçtan büyük olamaz!')
+    borc, user_id, name, head = row
+
+    values = {
+        'customer_id': customer_id,
+        'amount': amount,
+        'transaction_type': transaction_type,
+        'description': description,
+        'timestamp': timestamp,
+    }
+    heads = chain_rows([values], {customer_id: head})
+    transaction_id = db.session.execute(insert(Transaction.__table__).values(**values)).inserted_primary_key[0]
+    db.session.execute(update(customers).where(customers.c.id == customer_id).values(chain_head=heads[customer_id]))
+    Change.record_row(user_id, customer_id, name, Change.TRANSACTION, transaction_id)
+    DailyRollup.apply(user_id, customer_id, timestamp, transaction_type, amount)
+    return transaction_id, borc
+
+
+def insert_with_ids(table, rows) -> list:
+    """rows'u tek executemany ile ekler, id'lerini rows sırasıyla döndürür.
+
+    SQLite'ta RETURNING ile sıralı id istemek satır başına bir INSERT'e
+    düşer. executemany boyunca yazma kilidi bizde olduğundan rowid'ler art
+    arda verilir; son satırın id'si last_insert_rowid() ile okunur.
+    """
+    db.session.execute(insert(table), rows)
+    last = db.session.execute(select(func.last_insert_rowid())).scalar_one()
+    return list(range(last - len(rows) + 1, last + 1))
+
+
+class BalanceError(ValueError):
+    """Ödemeleri borcunu aşan müşteriler (customer_ids) yüzünden toplu yazma yapılamadı"""
+
+    def __init__(self, customer_ids):
+        super().__init__('Ödeme tutarı mevcut borçtan büyük olamaz!')
+        self.customer_ids = list(customer_ids)
+
+
+def post_transactions_bulk(rows) -> list:
+    """post_transaction'ın toplu hali; commit çağırana aittir.
+
+    rows: customer_id, user_id, name, amount, transaction_type, timestamp
+    ve description anahtarlı sözlükler. Bakiyeler müşteri başına tek
+    koşullu UPDATE ile (net değişim), işlem, değişiklik ve rollup satırları
+    executemany ile yazılır. Ödemeler sonucunda bir müşterinin bakiyesi
+    negatife düşecekse hiçbir şey yazılmadan BalanceError fırlatılır; hata
+    o müşterilerin id'lerini taşır, çağıran onları çıkarıp tekrar deneyebilir.
+    İşlemler rows sırasıyla müşterilerin hash zincirlerine eklenir. İşlem
+    id'leri rows sırasıyla döner.
+    """
+    if not rows:
+        return []
+    for row in rows:
+        if row['transaction_type'] not in ('borc', 'odeme', 'alacak'):
+            raise ValueError('Geçersiz işlem tipi!')
+        if row['amount'] <= 0:
+            raise ValueError('Tutar 0\'dan büyük olmalı!')
+
+    customers = Customer.__table__
+    totals = {}
+    for row in rows:
+        delta = -row['amount'] if row['transaction_type'] == 'odeme' else row['amount']
+        totals[row['customer_id']] = totals.get(row['customer_id'], 0) + delta
+    # Yalnızca net etkisi ödeme olan müşteriler borcu aşmama koşuluna tabidir;
+    # açılış bakiyesi negatif olan bir müşteriye borç yazmak engellenmez
+    payments = {cid: delta for cid, delta in totals.items() if delta < 0}
+    if payments:
+        short = sorted(cid for cid, borc in db.session.execute(
+            select(customers.c.id, customers.c.borc).where(customers.c.id.in_(list(payments)))
+        ) if borc + payments[cid] < 0)
+        if short:
+            raise BalanceError(short)
+    increases = [{'cid': cid, 'delta': delta} for cid, delta in totals.items() if delta >= 0]
+    updated = 0
+    if increases:
+        updated += db.session.execute(
+            update(customers).where(customers.c.id == bindparam('cid'))
+            .values(borc=customers.c.borc + bindparam('delta')),
+            increases
+        ).rowcount
+    if payments:
+        updated += db.session.execute(
+            update(customers)
+            .where(customers.c.id == bindparam('cid'), customers.c.borc + bindparam('delta') >= 0)
+            .values(borc=customers.c.borc + bindparam('delta')),
+            [{'cid': cid, 'delta': delta} for cid, delta in payments.items()]
+        ).rowcount
+    if updated != len(totals):
+        raise ValueError('Ödeme tutarı mevcut borçtan büyük olamaz!')
+
+    values = [{
+        'customer_id': row['customer_id'], 'amount': row['amount'],
+        'transaction_type': row['transaction_type'], 'timestamp': row['timestamp'],
+        'description': row.get('description', ''),
+    } for row in rows]
+    heads = chain_rows(values, dict(db.session.execute(
+        select(customers.c.id, customers.c.chain_head).where(customers.c.id.in_(list(totals)))
+    ).all()))
+    transaction_ids = insert_with_ids(Transaction.__table__, values)
+    db.session.execute(
+        update(customers).where(customers.c.id == bindparam('cid')).values(chain_head=bindparam('head')),
+        [{'cid': cid, 'head': head} for cid, head in heads.items()]
+    )
+    db.session.execute(insert(Change.__table__), [{
+        'user_id': row['user_id'], 'customer_id': row['customer_id'], 'customer_name': row['name'],
+        'kind': Change.TRANSACTION, 'transaction_id': tid,
+    } for row, tid in zip(rows, transaction_ids)])
+
+    days = {}
+    for row in rows:
+        day = days.setdefault((row['customer_id'], row['timestamp'][:10]), {
+            'customer_id': row['customer_id'], 'day': row['timestamp'][:10], 'user_id': row['user_id'],
+            'borc_total': 0, 'odeme_total': 0, 'alacak_total': 0, 'tx_count': 0,
+        })
+        day[f"{row['transaction_type']}_total"] += row['amount']
+        day['tx_count'] += 1
+    DailyRollup.apply_totals(list(days.values()))
+    return transaction_ids
@@ -0,0 +1,173 @@
+"""CSV/XLSX dosyasından toplu müşteri aktarımı.
+
+Dosya satır satır okunur; geçerli satırlar parçalar halinde, tek bir
+veritabanı işlemi içinde toplu INSERT ile yazılır. Açılış borcu olan her
+müşteri için bir "borc" işlemi, değişiklik kaydı ve rollup satırı da aynı
+işlemde eklenir. Hatalı ya da zaten kayıtlı satırlar atlanır ve özette
+satır numarasıyla raporlanır.
+"""
+import codecs
+import csv
+import itertools
+from datetime import datetime
+
+from sqlalchemy import bindparam, insert, select, update
+from ..database.database import db
+from .change import Change
+from .customer import Customer, Transaction, insert_with_ids
+from .ledger import chain_rows
+from .money import to_kurus
+from .rollup import DailyRollup
+from .text import fold
+
+CHUNK_SIZE = 500
+# Özette gösterilecek en fazla hata satırı
+MAX_ERRORS = 1000
+
+OPENING_DESCRIPTION = "Açılış bakiyesi"
+
+# Başlık adı (Türkçe karakterler sadeleştirilmiş) -> alan
+HEADER_ALIASES = {
+    "name": "name", "ad": "name", "isim": "name", "musteri": "name",
+    "musteri adi": "name", "ad soyad": "name",
+    "urun": "urun", "product": "urun",
+    "borc": "borc", "bakiye": "borc", "balance": "borc", "acilis borcu": "borc",
+}
+
+# Zorunlu sütun bulunamadığında verilen hata
+MISSING_COLUMN = {
+    "name": "Dosyada müşteri adı sütunu bulunamadı!",
+    "amount": "Dosyada tutar sütunu bulunamadı!",
+}
+
+
+class ImportUnavailable(RuntimeError):
+    """XLSX için openpyxl kurulu değilse fırlatılır"""
+
+
+def _normalize(header) -> str:
+    return " ".join(fold(header).replace("_", " ").split())
+
+
+def _records(rows, aliases=HEADER_ALIASES, required="name"):
+    """İlk satırı başlık kabul edip (satır no, {alan: değer}) üretir"""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    fields = [aliases.get(_normalize(h)) for h in header]
+    if required not in fields:
+        raise ValueError(MISSING_COLUMN.get(required, f"Dosyada {required} sütunu bulunamadı!"))
+    for line, row in enumerate(rows, start=2):
+        if not any(str(v or "").strip() for v in row):
+            continue
+        yield line, {f: v for f, v in zip(fields, row) if f is not None}
+
+
+def iter_csv(stream, aliases=HEADER_ALIASES, required="name"):
+    """İkili CSV akışını satır satır okur; ayırıcı (, ; veya tab) başlıktan bulunur.
+
+    Başlıklar aliases ile alan adlarına çevrilir; required sütunu zorunludur.
+    """
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+    first = next(lines, "")
+    delimiter = max(",;\t", key=first.count)
+    return _records(csv.reader(itertools.chain([first], lines), delimiter=delimiter), aliases, required)
+
+
+def iter_xlsx(stream, aliases=HEADER_ALIASES, required="name"):
+    """İlk çalışma sayfasını salt okunur modda satır satır okur"""
+    # openpyxl isteğe bağlı ve ağırdır; uygulama açılışında değil ilk XLSX dosyasında yüklenir
+    try:
+        import openpyxl
+    except ImportError:
+        raise ImportUnavailable("XLSX aktarımı için openpyxl gerekli (pip install openpyxl)") from None
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        yield from _records(workbook.worksheets[0].iter_rows(values_only=True), aliases, required)
+    finally:
+        workbook.close()
+
+
+def _flush(user_id, chunk, timestamp):
+    """Bir parça müşteriyi ve açılış işlemlerini toplu olarak ekler (commit yok)"""
+    customer_ids = insert_with_ids(
+        Customer.__table__,
+        [{"user_id": user_id, "name": name, "urun": urun, "borc": borc} for name, urun, borc in chunk]
+    )
+
+    openings = [(cid, name, borc) for cid, (name, _, borc) in zip(customer_ids, chunk) if borc > 0]
+    transaction_ids = {}
+    if openings:
+        values = [{
+            "customer_id": cid, "amount": borc, "transaction_type": "borc",
+            "description": OPENING_DESCRIPTION, "timestamp": timestamp,
+        } for cid, _, borc in openings]
+        heads = chain_rows(values, {})
+        ids = insert_with_ids(Transaction.__table__, values)
+        transaction_ids = {cid: tid for (cid, _, _), tid in zip(openings, ids)}
+        customers = Customer.__table__
+        db.session.execute(
+            update(customers).where(customers.c.id == bindparam("cid")).values(chain_head=bindparam("head")),
+            [{"cid": cid, "head": head} for cid, head in heads.items()]
+        )
+        db.session.execute(insert(DailyRollup), [{
+            "customer_id": cid, "day": timestamp[:10], "user_id": user_id,
+            "borc_total": borc, "odeme_total": 0, "alacak_total": 0, "tx_count": 1,
+        } for cid, _, borc in openings])
+
+    db.session.execute(insert(Change.__table__), [{
+        "user_id": user_id, "customer_id": cid, "customer_name": name,
+        "kind": Change.TRANSACTION if cid in transaction_ids else Change.CUSTOMER,
+        "transaction_id": transaction_ids.get(cid),
+    } for cid, (name, _, _) in zip(customer_ids, chunk)])
+
+
+def import_customers(user_id, records, chunk_size: int = CHUNK_SIZE) -> dict:
+    """records'taki müşterileri ekler ve özet döndürür; commit çağırana aittir.
+
+    Kullanıcının mevcut müşteri adları tek sorguyla okunur; aynı ad hem
+    veritabanına hem dosyanın kendisine karşı tekrar sayılır.
+    """
+    user_id = int(user_id)
+    seen = set(db.session.execute(select(Customer.name).where(Customer.user_id == user_id)).scalars())
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    summary = {"rows": 0, "imported": 0, "duplicates": 0, "invalid": 0, "errors": []}
+
+    def reject(line, error, counter):
+        summary[counter] += 1
+        if len(summary["errors"]) < MAX_ERRORS:
+            summary["errors"].append({"row": line, "error": error})
+
+    chunk = []
+    for line, record in records:
+        summary["rows"] += 1
+        name = str(record.get("name") or "").strip()
+        urun = str(record.get("urun") or "").strip()
+        if not name or not urun:
+            reject(line, "Müşteri adı ve ürün gerekli!", "invalid")
+            continue
+        if len(name) > 100 or len(urun) > 100:
+            reject(line, "Ad ve ürün en fazla 100 karakter olabilir!", "invalid")
+            continue
+        try:
+            borc = to_kurus(record.get("borc") if record.get("borc") not in (None, "") else 0)
+        except ValueError as e:
+            reject(line, str(e), "invalid")
+            continue
+        if borc < 0:
+            reject(line, "Açılış borcu negatif olamaz!", "invalid")
+            continue
+        if name in seen:
+            reject(line, f"{name} zaten kayıtlı!", "duplicates")
+            continue
+        seen.add(name)
+        chunk.append((name, urun, borc))
+        if len(chunk) >= chunk_size:
+            _flush(user_id, chunk, timestamp)
+            summary["imported"] += len(chunk)
+            chunk = []
+    if chunk:
+        _flush(user_id, chunk, timestamp)
+        summary["imported"] += len(chunk)
+    return summary
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import String, Text, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+from ..database.database import Base, db
+
+# Her kayıtta silinecek en fazla süresi dolmuş anahtar
+EVICT_BATCH = 100
+
+
+class IdempotencyConflict(Exception):
+    """Aynı anahtarla eşzamanlı gelen istek yanıtını zaten kaydetti"""
+
+
+class IdempotencyKey(Base):
+    """Idempotency-Key ile gelen yazma isteklerinin kaydedilmiş yanıtları.
+
+    Kayıt, yazmayla aynı veritabanı işleminde eklenir; tekrar gelen istek
+    tek bir birincil anahtar okumasıyla saklanan yanıtı alır.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id: Mapped[int] = mapped_column(primary_key=True)
+    key: Mapped[str] = mapped_column(String(255), primary_key=True)
+    endpoint: Mapped[str] = mapped_column(String(100))
+    # İstek gövdesinin özeti; aynı anahtar başka bir istekle kullanılamaz
+    request_hash: Mapped[str] = mapped_column(String(64))
+    status_code: Mapped[int] = mapped_column()
+    response: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[str] = mapped_column(String(19))
+    expires_at: Mapped[str] = mapped_column(String(19), index=True)
+
+    @classmethod
+    def lookup(cls, user_id, key: str) -> Optional["IdempotencyKey"]:
+        """Süresi dolmamış kaydı döndürür"""
+        stored = db.session.get(cls, (int(user_id), key))
+        if stored is None or stored.expires_at < datetime.now().strftime("%Y-%m-%d %H:%M:%S"):
+            return None
+        return stored
+
+
+def new_record(user_id, key: str, endpoint: str, request_hash: str, ttl: int) -> dict:
+    now = datetime.now()
+    return {
+        "user_id": int(user_id),
+        "key": key,
+        "endpoint": endpoint,
+        "request_hash": request_hash,
+        "created_at": now.strftime("%Y-%m-%d %H:%M:%S"),
+        "expires_at": (now + timedelta(seconds=ttl)).strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def store_response(record: dict):
+    """Yanıtı çağıranın işlemine ekler; commit çağırana aittir.
+
+    Süresi dolmuş kayıtlar indeks üzerinden küçük parçalar halinde silinir.
+    Anahtar başka bir istek tarafından canlı olarak kaydedilmişse
+    IdempotencyConflict fırlatılır ve çağıran işlemi geri almalıdır.
+    """
+    db.session.execute(text(
+        "DELETE FROM idempotency_keys WHERE rowid IN ("
+        "SELECT rowid FROM idempotency_keys WHERE expires_at < :now ORDER BY expires_at LIMIT :n)"
+    ), {"now": record["created_at"], "n": EVICT_BATCH})
+    stmt = insert(IdempotencyKey).values(**record)
+    # Süresi dolmuş ama henüz silinmemiş aynı anahtarın üzerine yazılır
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={column: stmt.excluded[column] for column in record if column not in ("user_id", "key")},
+        where=IdempotencyKey.expires_at < stmt.excluded.created_at
+    )
+    if db.session.execute(stmt).rowcount == 0:
+        raise IdempotencyConflict("Bu istek zaten işlendi!")
@@ -0,0 +1,218 @@
+"""Taksitli satış planları ve vadesi gelen taksitlerin toplu yazılması.
+
+Plan oluşturulurken tüm taksitler vade tarihleriyle installments tablosuna
+yazılır. Zamanlayıcı her turda vadesi gelmiş taksitleri (posted_at boş,
+due_at <= şimdi) kısmi indeks üzerinden okur ve hepsini tek bir veritabanı
+işleminde "borc" işlemi olarak yazar: bakiye güncellemesi, işlem, değişiklik
+ve rollup satırları post_transaction ile aynıdır, yalnızca satır satır
+değil toplu çalışır (post_transactions_bulk).
+
+Taksit önce posted_at ile sahiplenilir; aynı anda çalışan ikinci bir
+zamanlayıcı (başka bir worker) sahiplenilmiş taksiti yazmaz. Kesinti
+sonrası birikmiş taksitler kendi vade zamanlarıyla yazılır.
+"""
+import calendar
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import ForeignKey, Index, String, UniqueConstraint, bindparam, func, insert, select, text, update
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database.database import Base, db
+from .customer import BalanceError, Customer, post_transactions_bulk
+from .money import lira
+
+INTERVALS = ("daily", "weekly", "monthly")
+MAX_INSTALLMENTS = 360
+# Bir turda yazılan en fazla taksit
+BATCH_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+class InstallmentPlan(Base):
+    __tablename__ = "installment_plans"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column()
+    customer_id: Mapped[int] = mapped_column(ForeignKey("customers.id"), index=True)
+    amount: Mapped[int] = mapped_column()  # taksit başına kuruş
+    count: Mapped[int] = mapped_column()
+    interval: Mapped[str] = mapped_column(String(10))
+    start_at: Mapped[str] = mapped_column(String(19))
+    description: Mapped[str] = mapped_column(String(200), default="")
+    created_at: Mapped[str] = mapped_column(
+        String(19), default=lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    )
+    cancelled_at: Mapped[Optional[str]] = mapped_column(String(19), default=None)
+
+    def to_dict(self, posted: int = 0, pending: int = 0) -> dict:
+        return {
+            "id": self.id,
+            "amount": lira(self.amount),
+            "count": self.count,
+            "interval": self.interval,
+            "start_at": self.start_at,
+            "description": self.description,
+            "cancelled": self.cancelled_at is not None,
+            "posted": posted,
+            "pending": pending,
+        }
+
+
+class Installment(Base):
+    __tablename__ = "installments"
+    __table_args__ = (
+        UniqueConstraint("plan_id", "seq"),
+        # Sadece bekleyen taksitler indekslenir; yazılmışlar taramaya girmez
+        Index("ix_installments_due", "due_at", sqlite_where=text("posted_at IS NULL")),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    plan_id: Mapped[int] = mapped_column(ForeignKey("installment_plans.id"))
+    customer_id: Mapped[int] = mapped_column(index=True)
+    seq: Mapped[int] = mapped_column()
+    amount: Mapped[int] = mapped_column()  # kuruş
+    due_at: Mapped[str] = mapped_column(String(19))
+    posted_at: Mapped[Optional[str]] = mapped_column(String(19), default=None)
+    transaction_id: Mapped[Optional[int]] = mapped_column(default=None)
+
+
+def _add_months(moment: datetime, months: int) -> datetime:
+    # 31 Ocak + 1 ay -> 28/29 Şubat
+    month = moment.month - 1 + months
+    year, month = moment.year + month // 12, month % 12 + 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
+
+
+def due_dates(start: datetime, count: int, interval: str) -> list:
+    if interval == "monthly":
+        return [_add_months(start, n) for n in range(count)]
+    step = timedelta(days=7 if interval == "weekly" else 1)
+    return [start + step * n for n in range(count)]
+
+
+def _parse_start(value) -> datetime:
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(str(value), fmt)
+        except ValueError:
+            continue
+    raise ValueError("Başlangıç tarihi YYYY-AA-GG biçiminde olmalı!")
+
+
+def create_plan(customer, amount: int, count, interval: str = "monthly", start=None,
+                description: str = "") -> InstallmentPlan:
+    """Plan ve tüm taksitlerini oturuma ekler; commit çağırana aittir"""
+    count = int(count)
+    if amount <= 0:
+        raise ValueError("Taksit tutarı 0'dan büyük olmalı!")
+    if not 1 <= count <= MAX_INSTALLMENTS:
+        raise ValueError(f"Taksit sayısı 1 ile {MAX_INSTALLMENTS} arasında olmalı!")
+    if interval not in INTERVALS:
+        raise ValueError("Taksit aralığı daily, weekly veya monthly olmalı!")
+    start = _parse_start(start) if start else datetime.now().replace(microsecond=0)
+
+    plan = InstallmentPlan(
+        user_id=customer.user_id, customer_id=customer.id, amount=amount, count=count,
+        interval=interval, start_at=start.strftime("%Y-%m-%d %H:%M:%S"), description=description or "",
+    )
+    db.session.add(plan)
+    db.session.flush()
+    db.session.execute(insert(Installment), [{
+        "plan_id": plan.id, "customer_id": customer.id, "seq": seq, "amount": amount,
+        "due_at": due.strftime("%Y-%m-%d %H:%M:%S"),
+    } for seq, due in enumerate(due_dates(start, count, interval), start=1)])
+    return plan
+
+
+def cancel_plan(plan: InstallmentPlan) -> int:
+    """Henüz yazılmamış taksitleri siler; silinen taksit sayısını döndürür"""
+    plan.cancelled_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return db.session.execute(Installment.__table__.delete().where(
+        Installment.plan_id == plan.id, Installment.posted_at.is_(None)
+    )).rowcount
+
+
+def plan_progress(plan_ids) -> dict:
+    """plan id -> (yazılan, bekleyen) taksit sayısı"""
+    if not plan_ids:
+        return {}
+    rows = db.session.execute(
+        select(Installment.plan_id, func.count(Installment.posted_at), func.count() - func.count(Installment.posted_at))
+        .where(Installment.plan_id.in_(plan_ids))
+        .group_by(Installment.plan_id)
+    )
+    return {plan_id: (posted, pending) for plan_id, posted, pending in rows}
+
+
+def post_due_installments(now: str = None, limit: int = BATCH_SIZE) -> dict:
+    """Vadesi gelmiş en fazla limit taksiti yazar ve commit eder.
+
+    {claimed, posted, customers: [(user_id, müşteri adı)]} döndürür;
+    claimed == limit ise bekleyen taksit kalmış olabilir.
+    """
+    now = now or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    installments, plans, customers = Installment.__table__, InstallmentPlan.__table__, Customer.__table__
+    try:
+        # İlk ifade yazmadır (sahiplenme): işlem baştan yazma kilidiyle başlar,
+        # başka bir zamanlayıcının aldığı taksitler burada düşer
+        due_ids = (
+            select(installments.c.id)
+            .where(installments.c.posted_at.is_(None), installments.c.due_at <= now)
+            .order_by(installments.c.due_at, installments.c.id)
+            .limit(limit)
+        )
+        claimed = db.session.execute(
+            update(installments).where(installments.c.id.in_(due_ids)).values(posted_at=now)
+            .returning(installments.c.id)
+        ).scalars().all()
+        if not claimed:
+            db.session.rollback()
+            return {"claimed": 0, "posted": 0, "customers": []}
+        # Silinmiş müşterilerin taksitleri sahiplenilir ama yazılmaz
+        due = db.session.execute(
+            select(
+                installments.c.id, installments.c.customer_id, installments.c.amount, installments.c.due_at,
+                installments.c.seq, plans.c.count, plans.c.description, customers.c.user_id, customers.c.name,
+            )
+            .join(plans, plans.c.id == installments.c.plan_id)
+            .join(customers, customers.c.id == installments.c.customer_id)
+            .where(installments.c.id.in_(claimed))
+            .order_by(installments.c.due_at, installments.c.id)
+        ).all()
+        if not due:
+            db.session.commit()
+            return {"claimed": len(claimed), "posted": 0, "customers": []}
+
+        while True:
+            try:
+                transaction_ids = post_transactions_bulk([{
+                    "customer_id": row.customer_id, "user_id": row.user_id, "name": row.name,
+                    "amount": row.amount, "transaction_type": "borc", "timestamp": row.due_at,
+                    "description": f"Taksit {row.seq}/{row.count}" + (f" - {row.description}" if row.description else ""),
+                } for row in due])
+                break
+            except BalanceError as e:
+                # Hata hiçbir şey yazmadan döner: yalnızca bu müşterilerin
+                # taksitleri bırakılır, turun geri kalanı yazılır
+                failed = set(e.customer_ids)
+                released = [row.id for row in due if row.customer_id in failed]
+                db.session.execute(
+                    update(installments).where(installments.c.id.in_(released)).values(posted_at=None)
+                )
+                logger.warning("Taksitler yazılamadı (müşteri %s), sonraki tura bırakıldı", sorted(failed))
+                due = [row for row in due if row.customer_id not in failed]
+                if not due:
+                    db.session.commit()
+                    return {"claimed": len(claimed), "posted": 0, "customers": []}
+        db.session.execute(
+            update(installments).where(installments.c.id == bindparam("iid")).values(transaction_id=bindparam("tid")),
+            [{"iid": row.id, "tid": tid} for row, tid in zip(due, transaction_ids)]
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return {"claimed": len(claimed), "posted": len(due), "customers": sorted({(row.user_id, row.name) for row in due})}
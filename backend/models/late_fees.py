@@ -0,0 +1,202 @@
+"""Gecikmiş bakiyelere aylık gecikme faizi (alacak) tahakkuku.
+
+Bir dönem (YYYY-AA) için bakiyesi min_balance'tan az olmayan ve son
+ödemesi (hiç ödeme yoksa ilk hareketi) grace_days günden eski olan
+müşterilerin faizi tek bir INSERT ... SELECT ile hesaplanır. Son ödeme
+tarihleri daily_rollup'tan okunur; işlem tablosu taranmaz. Faizler
+post_transactions_bulk ile aynı veritabanı işleminde "alacak" olarak
+yazılır.
+
+late_fees tablosunun (müşteri, dönem) birincil anahtarı idempotency
+sağlar: aynı dönem için tekrar çalıştırılan iş, faizi yazılmış
+müşterileri atlar.
+
+    python -m backend.models.late_fees --rate 2.5 [--period 2025-06] [--user-id 1] [--dry-run]
+"""
+import argparse
+import re
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+from sqlalchemy import String, bindparam, text, update
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database.database import Base, db
+from .customer import post_transactions_bulk
+from .money import lira
+
+PERIOD = re.compile(r"^\d{4}-(0[1-9]|1[0-2])$")
+
+# {user_filter} ve {customer_filter} kullanıcıya göre doldurulur
+CANDIDATES = """
+SELECT c.id AS customer_id, c.user_id AS user_id, c.name AS name,
+       (c.borc * :bp + 5000) / 10000 AS amount, c.borc AS balance,
+       COALESCE(r.last_payment, r.first_day) AS last_activity
+FROM customers c
+JOIN (
+    SELECT customer_id,
+           MAX(CASE WHEN odeme_total > 0 THEN day END) AS last_payment,
+           MIN(day) AS first_day
+    FROM daily_rollup {user_filter}
+    GROUP BY customer_id
+) r ON r.customer_id = c.id
+WHERE c.borc >= :min_balance
+  AND (c.borc * :bp + 5000) / 10000 > 0
+  AND COALESCE(r.last_payment, r.first_day) < :cutoff
+  {customer_filter}
+  AND NOT EXISTS (SELECT 1 FROM late_fees f WHERE f.customer_id = c.id AND f.period = :period)
+"""
+
+
+class LateFee(Base):
+    """Dönem başına müşteriye yazılmış gecikme faizi"""
+    __tablename__ = "late_fees"
+
+    customer_id: Mapped[int] = mapped_column(primary_key=True)
+    period: Mapped[str] = mapped_column(String(7), primary_key=True)  # YYYY-AA
+    user_id: Mapped[int] = mapped_column(index=True)
+    amount: Mapped[int] = mapped_column()  # kuruş
+    balance: Mapped[int] = mapped_column()  # faizin hesaplandığı bakiye
+    last_activity: Mapped[str] = mapped_column(String(10))
+    transaction_id: Mapped[Optional[int]] = mapped_column(default=None)
+    created_at: Mapped[str] = mapped_column(String(19))
+
+
+def _basis_points(rate) -> int:
+    try:
+        bp = int((Decimal(str(rate).replace(",", ".")) * 100).to_integral_value())
+    except InvalidOperation:
+        raise ValueError("Geçersiz faiz oranı!")
+    if not 0 < bp <= 10000:
+        raise ValueError("Faiz oranı 0 ile 100 arasında olmalı!")
+    return bp
+
+
+def accrue_late_fees(rate, period: str = None, user_id=None, grace_days: int = 30,
+                     min_balance: int = 0, as_of: datetime = None, dry_run: bool = False) -> dict:
+    """Gecikme faizlerini hesaplar ve (dry_run değilse) yazıp commit eder.
+
+    rate aylık yüzdedir (2.5 -> bakiyenin %2.5'i, kuruşa yuvarlanır).
+    user_id verilmezse tüm kullanıcılar işlenir. Özet ve yazılan faizleri
+    döndürür.
+    """
+    started = time.perf_counter()
+    bp = _basis_points(rate)
+    as_of = as_of or datetime.now().replace(microsecond=0)
+    period = period or as_of.strftime("%Y-%m")
+    if not PERIOD.match(str(period)):
+        raise ValueError("Dönem YYYY-AA biçiminde olmalı!")
+    if int(grace_days) < 0 or int(min_balance) < 0:
+        raise ValueError("Süre ve alt sınır negatif olamaz!")
+
+    params = {
+        "bp": bp, "period": period, "min_balance": int(min_balance),
+        "cutoff": (as_of - timedelta(days=int(grace_days))).strftime("%Y-%m-%d"),
+    }
+    filters = {"user_filter": "", "customer_filter": ""}
+    if user_id is not None:
+        params["user_id"] = int(user_id)
+        filters = {"user_filter": "WHERE user_id = :user_id", "customer_filter": "AND c.user_id = :user_id"}
+    candidates = CANDIDATES.format(**filters)
+
+    try:
+        if dry_run:
+            fees = db.session.execute(text(candidates + " ORDER BY c.id"), params).mappings().all()
+            db.session.rollback()
+        else:
+            # İlk ifade yazmadır: aynı dönemi eşzamanlı işleyen ikinci iş bekler
+            # ve commit'ten sonra NOT EXISTS ile aynı müşterileri atlar
+            db.session.execute(text(
+                "INSERT INTO late_fees (customer_id, period, user_id, amount, balance, last_activity, created_at) "
+                f"SELECT customer_id, :period, user_id, amount, balance, last_activity, :now FROM ({candidates}) "
+                "WHERE 1 ON CONFLICT DO NOTHING"
+            ), {**params, "now": as_of.strftime("%Y-%m-%d %H:%M:%S")})
+            fees = db.session.execute(text(
+                "SELECT f.customer_id, f.user_id, c.name, f.amount, f.balance, f.last_activity "
+                "FROM late_fees f JOIN customers c ON c.id = f.customer_id "
+                "WHERE f.period = :period AND f.transaction_id IS NULL ORDER BY f.customer_id"
+            ), {"period": period}).mappings().all()
+            timestamp = as_of.strftime("%Y-%m-%d %H:%M:%S")
+            description = f"Gecikme faizi {period} (%{Decimal(bp) / 100})"
+            transaction_ids = post_transactions_bulk([{
+                "customer_id": fee["customer_id"], "user_id": fee["user_id"], "name": fee["name"],
+                "amount": fee["amount"], "transaction_type": "alacak", "timestamp": timestamp,
+                "description": description,
+            } for fee in fees])
+            if fees:
+                late_fees = LateFee.__table__
+                db.session.execute(
+                    update(late_fees)
+                    .where(late_fees.c.customer_id == bindparam("cid"), late_fees.c.period == period)
+                    .values(transaction_id=bindparam("tid")),
+                    [{"cid": fee["customer_id"], "tid": tid} for fee, tid in zip(fees, transaction_ids)]
+                )
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    elapsed = time.perf_counter() - started
+    return {
+        "period": period,
+        "rate": float(Decimal(bp) / 100),
+        "dry_run": dry_run,
+        "customers": len(fees),
+        "total": lira(sum(fee["amount"] for fee in fees)),
+        "seconds": round(elapsed, 3),
+        "customers_per_second": round(len(fees) / elapsed, 1) if elapsed else None,
+        "fees": [{
+            "customer_id": fee["customer_id"], "user_id": fee["user_id"], "name": fee["name"],
+            "amount": lira(fee["amount"]), "balance": lira(fee["balance"]), "last_activity": fee["last_activity"],
+        } for fee in fees],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gecikmiş bakiyelere aylık gecikme faizi yazar")
+    parser.add_argument("--rate", required=True, help="Aylık faiz yüzdesi (örn. 2.5)")
+    parser.add_argument("--period", help="Dönem (YYYY-AA), varsayılan bu ay")
+    parser.add_argument("--user-id", type=int, help="Verilmezse tüm kullanıcılar")
+    parser.add_argument("--grace-days", type=int, default=30)
+    parser.add_argument("--min-balance", default="0", help="TL cinsinden alt bakiye")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    # Sharding ve önbellek ayarları uygulamanınkiyle aynı olsun
+    from ..app.main import create_app
+    from ..database.sharding import shard_scope
+    from .money import to_kurus
+
+    app = create_app(background_jobs=False)
+    router = app.extensions["paytrack_shards"]
+    if router is None:
+        keys = [None]
+    elif args.user_id is not None:
+        try:
+            keys = [router.shard_for(args.user_id)]
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        keys = router.keys()
+    results = []
+    with app.app_context():
+        for key in keys:
+            with shard_scope(key):
+                result = accrue_late_fees(
+                    args.rate, args.period, args.user_id, args.grace_days, to_kurus(args.min_balance),
+                    dry_run=args.dry_run,
+                )
+            if not args.dry_run:
+                for fee in result["fees"]:
+                    app.extensions["paytrack_read_cache"].invalidate(fee["user_id"], fee["name"])
+            results.append(result)
+            print(f"{key or 'paytrack.db'}: {result['customers']} müşteri, toplam {result['total']}₺, "
+                  f"{result['seconds']} sn ({result['customers_per_second']} müşteri/sn)"
+                  + (" [deneme]" if args.dry_run else ""))
+    return results
+
+
+if __name__ == "__main__":
+    main()
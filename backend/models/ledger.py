@@ -0,0 +1,439 @@
+"""İşlemler için müşteri başına hash zinciri ve bütünlük doğrulaması.
+
+Her işlem satırı müşterinin bir önceki satırının hash'ini (prev_hash) ve
+bu değerle kendi alanlarından türetilen row_hash'i taşır; zincirin son
+hash'i customers.chain_head'de tutulur. Bir satırın değiştirilmesi kendi
+hash'ini, silinmesi ya da araya satır eklenmesi sonraki satırın
+prev_hash'ini, sondaki satırların silinmesi chain_head'i tutarsız yapar.
+
+Doğrulama iki şekilde çalışır:
+
+- Artımlı (varsayılan): son çalıştırmanın filigranından (watermark) sonra
+  satırı eklenen müşterilerin zinciri (işlem id'leri AUTOINCREMENT ile
+  yeniden kullanılmaz), müşterinin kontrol noktasından
+  (ledger_checkpoints) devam ettirilir; maliyet defterin toplam boyutuyla
+  değil yeni satır sayısıyla büyür. Kontrol noktasından önceki satırlardaki
+  değişiklikleri yalnızca tam doğrulama yakalar.
+- Tam: tüm zincirler baştan doğrulanır; müşteri id aralıkları bir süreç
+  havuzunda paralel işlenir.
+
+Okumalar tek bir SQLite okuma işleminde (anlık görüntü) yapılır; eşzamanlı
+yazmalar yarım okunmuş bir zincir gibi görünmez. Arşivleme eski satırları
+taşıdığında kalan satırlar eski zincirin son hash'inden (anchor) başlayarak
+yeniden mühürlenir.
+
+    python -m backend.models.ledger [--full] [--workers 4]
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import groupby
+from operator import itemgetter
+
+from sqlalchemy import Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database.database import Base
+
+# Zincirin ilk satırının prev_hash'i
+GENESIS = "0" * 64
+
+# Kontrol noktası durumları
+OK = "ok"
+BROKEN = "broken"
+
+CHUNK_SIZE = 500
+ROW_COLUMNS = "t.customer_id, t.id, t.prev_hash, t.row_hash, t.timestamp, t.transaction_type, t.amount, t.description"
+
+
+class LedgerCheckpoint(Base):
+    """Müşteri zincirinin en son doğrulanmış noktası"""
+    __tablename__ = "ledger_checkpoints"
+
+    customer_id: Mapped[int] = mapped_column(primary_key=True)
+    # Zincirin ilk prev_hash'i: GENESIS ya da arşivlenen zincirin son hash'i
+    anchor_hash: Mapped[str] = mapped_column(String(64), default=GENESIS)
+    last_id: Mapped[int] = mapped_column(default=0)
+    last_hash: Mapped[str] = mapped_column(String(64), default=GENESIS)
+    status: Mapped[str] = mapped_column(String(10), default=OK)
+    error: Mapped[str] = mapped_column(String(200), default="")
+    verified_at: Mapped[str] = mapped_column(String(19))
+
+
+class LedgerVerification(Base):
+    """Doğrulama çalıştırmaları; artımlı doğrulama son filigrandan devam eder"""
+    __tablename__ = "ledger_verifications"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    mode: Mapped[str] = mapped_column(String(11))  # incremental / full
+    watermark: Mapped[int] = mapped_column()  # doğrulanan en büyük işlem id'si
+    customers: Mapped[int] = mapped_column()
+    rows: Mapped[int] = mapped_column()
+    broken: Mapped[int] = mapped_column()
+    started_at: Mapped[str] = mapped_column(String(19))
+    seconds: Mapped[float] = mapped_column(Float)
+
+
+def chain_hash(prev_hash, customer_id, timestamp, transaction_type, amount, description) -> str:
+    payload = "\x1f".join((
+        prev_hash, str(customer_id), timestamp, transaction_type, str(amount), description or "",
+    ))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chain_rows(rows, heads: dict) -> dict:
+    """Yazılacak işlem sözlüklerine (yazılış sırasıyla) prev_hash ve row_hash ekler.
+
+    heads müşteri id -> zincirin son hash'idir (chain_head) ve yerinde
+    güncellenir; yeni değerler customers.chain_head'e yazılmalıdır.
+    """
+    for row in rows:
+        customer_id = row["customer_id"]
+        prev_hash = heads.get(customer_id) or GENESIS
+        row["prev_hash"] = prev_hash
+        row["row_hash"] = heads[customer_id] = chain_hash(
+            prev_hash, customer_id, row["timestamp"], row["transaction_type"], row["amount"],
+            row.get("description", ""),
+        )
+    return heads
+
+
+def _walk(rows, starts: dict, heads: dict) -> dict:
+    """Müşteri ve id sırasıyla gelen satırların zincirini doğrular.
+
+    starts müşteri -> (son id, son hash) başlangıç noktası, heads müşteri ->
+    chain_head'dir (müşteri yoksa anahtar da yoktur). Müşteri -> sonuç döner.
+    """
+    results = {}
+    for customer_id, group in groupby(rows, key=itemgetter(0)):
+        last_id, running = starts.get(customer_id, (0, GENESIS))
+        count, error, bad_id = 0, None, None
+        for _, transaction_id, prev_hash, row_hash, timestamp, transaction_type, amount, description in group:
+            count += 1
+            if error is not None:
+                continue
+            if customer_id not in heads:
+                error, bad_id = "Müşterisi olmayan işlem", transaction_id
+            elif prev_hash != running:
+                error, bad_id = "Zincir kopuk: kayıt silinmiş ya da araya eklenmiş", transaction_id
+            elif row_hash != chain_hash(prev_hash, customer_id, timestamp, transaction_type, amount, description):
+                error, bad_id = "Kayıt değiştirilmiş", transaction_id
+            else:
+                last_id, running = transaction_id, row_hash
+        results[customer_id] = {
+            "last_id": last_id, "last_hash": running, "rows": count, "error": error, "transaction_id": bad_id,
+        }
+
+    for customer_id, head in heads.items():
+        result = results.get(customer_id)
+        if result is None:
+            last_id, running = starts.get(customer_id, (0, GENESIS))
+            result = {"last_id": last_id, "last_hash": running, "rows": 0, "error": None, "transaction_id": None}
+        if result["error"] is None and result["last_hash"] != (head or GENESIS):
+            result["error"] = "Zincirin son kayıtları eksik"
+        if result["rows"] or result["error"] is not None:
+            results[customer_id] = result
+    return results
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _placeholders(items) -> str:
+    return ", ".join("?" * len(items))
+
+
+def _verify_range(conn, low: int, high: int) -> dict:
+    """[low, high] aralığındaki müşterilerin zincirlerini baştan doğrular"""
+    heads = dict(conn.execute("SELECT id, chain_head FROM customers WHERE id BETWEEN ? AND ?", (low, high)))
+    starts = {customer_id: (0, anchor) for customer_id, anchor in conn.execute(
+        "SELECT customer_id, anchor_hash FROM ledger_checkpoints WHERE customer_id BETWEEN ? AND ?", (low, high)
+    )}
+    rows = conn.execute(
+        f"SELECT {ROW_COLUMNS} FROM transactions t WHERE t.customer_id BETWEEN ? AND ? ORDER BY t.customer_id, t.id",
+        (low, high)
+    )
+    return _walk(rows, starts, heads)
+
+
+def _open_snapshot(path: str):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, isolation_level=None)
+    conn.execute("BEGIN")
+    return conn
+
+
+def _verify_range_file(path: str, low: int, high: int) -> dict:
+    """Süreç havuzunda çalışan parça: kendi salt okunur bağlantısını açar"""
+    conn = _open_snapshot(path)
+    try:
+        return _verify_range(conn, low, high)
+    finally:
+        conn.close()
+
+
+def _ranges(conn, parts: int) -> list:
+    """Müşteri id'lerini yaklaşık eşit büyüklükte aralıklara böler.
+
+    İlk ve son aralık açık uçludur; müşterisi silinmiş işlemler de bir
+    aralığa düşer.
+    """
+    ids = [row[0] for row in conn.execute("SELECT id FROM customers ORDER BY id")]
+    low, bounds = -(2 ** 63), []
+    step = max(1, -(-len(ids) // parts))
+    for i in range(step, len(ids), step):
+        bounds.append((low, ids[i] - 1))
+        low = ids[i]
+    bounds.append((low, 2 ** 63 - 1))
+    return bounds
+
+
+def _incremental(conn) -> tuple:
+    watermark = conn.execute("SELECT COALESCE(MAX(watermark), 0) FROM ledger_verifications").fetchone()[0]
+    # Yeni satırı olanlar ve önceki çalıştırmada bozuk bulunanlar
+    customer_ids = [row[0] for row in conn.execute(
+        "SELECT DISTINCT customer_id FROM transactions WHERE id > ? "
+        "UNION SELECT customer_id FROM ledger_checkpoints WHERE status != ?",
+        (watermark, OK)
+    )]
+    results, anchors = {}, {}
+    for chunk in _chunks(customer_ids):
+        marks = _placeholders(chunk)
+        heads = dict(conn.execute(f"SELECT id, chain_head FROM customers WHERE id IN ({marks})", chunk))
+        starts = {}
+        for customer_id, anchor, last_id, last_hash in conn.execute(
+            f"SELECT customer_id, anchor_hash, last_id, last_hash FROM ledger_checkpoints WHERE customer_id IN ({marks})",
+            chunk
+        ):
+            starts[customer_id] = (last_id, last_hash)
+            anchors[customer_id] = anchor
+        rows = conn.execute(
+            f"SELECT {ROW_COLUMNS} FROM transactions t "
+            f"LEFT JOIN ledger_checkpoints k ON k.customer_id = t.customer_id "
+            f"WHERE t.customer_id IN ({marks}) AND t.id > COALESCE(k.last_id, 0) ORDER BY t.customer_id, t.id",
+            chunk
+        )
+        results.update(_walk(rows, starts, heads))
+    return results, anchors
+
+
+def _full(path: str, ranges, workers: int) -> dict:
+    """Aralıkları (her biri kendi kısa okuma işleminde) doğrular"""
+    results = {}
+    if workers > 1:
+        # İstek iş parçacığından fork edilen çocuk, kopyalanan kilitler ve
+        # bağlantı havuzuyla kilitlenebilir; çocuklar temiz bir süreçte başlar
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(_verify_range_file, path, low, high) for low, high in ranges]
+            for future in futures:
+                results.update(future.result())
+    else:
+        for low, high in ranges:
+            results.update(_verify_range_file(path, low, high))
+    return results
+
+
+def _broken(results: dict) -> list:
+    return [
+        {"customer_id": customer_id, "transaction_id": result["transaction_id"], "error": result["error"]}
+        for customer_id, result in sorted(results.items()) if result["error"] is not None
+    ]
+
+
+def verify_file(path: str, workers: int = 1) -> list:
+    """Veritabanı dosyasındaki tüm zincirleri kontrol noktası yazmadan doğrular (yedekler için); bozukları döndürür"""
+    conn = _open_snapshot(path)
+    try:
+        ranges = _ranges(conn, max(1, workers) * 4)
+    finally:
+        conn.close()
+    return _broken(_full(path, ranges, max(1, workers)))
+
+
+def verify_ledger(engine, full: bool = False, workers: int = 1) -> dict:
+    """Defter zincirlerini doğrular, kontrol noktalarını ve çalıştırma kaydını yazar.
+
+    full=False iken yalnızca son çalıştırmadan sonra değişen müşteriler
+    doğrulanır. Tam doğrulama müşteri aralıklarına bölünür ve workers > 1
+    ise süreç havuzunda yapılır; WAL kapalıyken okuma işlemi süresince
+    yazmalar beklediğinden her aralık ayrı, kısa bir işlemde okunur.
+    """
+    from .. import models  # noqa: F401 - tabloların metadata'ya eklenmesi için
+
+    Base.metadata.create_all(engine, tables=[LedgerCheckpoint.__table__, LedgerVerification.__table__])
+    started = time.perf_counter()
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    mode = "full" if full else "incremental"
+
+    raw = engine.raw_connection()
+    conn = raw.driver_connection
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        # Okumalar tek bir anlık görüntüde
+        conn.execute("BEGIN")
+        try:
+            watermark = conn.execute("SELECT COALESCE(MAX(id), 0) FROM transactions").fetchone()[0]
+            if full:
+                anchors = dict(conn.execute("SELECT customer_id, anchor_hash FROM ledger_checkpoints"))
+                workers = max(1, int(workers))
+                ranges = _ranges(conn, workers * 4)
+            else:
+                results, anchors = _incremental(conn)
+        finally:
+            conn.execute("COMMIT")
+        if full:
+            results = _full(engine.url.database, ranges, workers)
+
+        elapsed = time.perf_counter() - started
+        rows = sum(result["rows"] for result in results.values())
+        broken = _broken(results)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Arada arşivleme zinciri yeniden mühürlediyse (anchor değiştiyse) kontrol noktası ezilmez
+            conn.executemany("""
+                INSERT INTO ledger_checkpoints (customer_id, anchor_hash, last_id, last_hash, status, error, verified_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (customer_id) DO UPDATE SET
+                    last_id = excluded.last_id, last_hash = excluded.last_hash, status = excluded.status,
+                    error = excluded.error, verified_at = excluded.verified_at
+                WHERE ledger_checkpoints.anchor_hash = excluded.anchor_hash
+            """, [(
+                customer_id, anchors.get(customer_id, GENESIS), result["last_id"], result["last_hash"],
+                OK if result["error"] is None else BROKEN, result["error"] or "", now,
+            ) for customer_id, result in results.items()])
+            conn.execute(
+                "INSERT INTO ledger_verifications (mode, watermark, customers, rows, broken, started_at, seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (mode, watermark, len(results), rows, len(broken), now, round(elapsed, 3))
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+        raw.close()
+
+    return {
+        "mode": mode,
+        "watermark": watermark,
+        "customers": len(results),
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed, 1) if elapsed else None,
+        "ok": not broken,
+        "broken": broken,
+    }
+
+
+def rechain(conn, customer_ids=None, anchors: dict = None) -> dict:
+    """Müşterilerin zincirini id sırasıyla yeniden hesaplayıp yazar (DB-API bağlantısı, işlem çağırana ait).
+
+    customer_ids verilmezse tüm işlemler mühürlenir (eski veritabanları
+    için). anchors müşteri -> zincirin ilk prev_hash'idir (yoksa GENESIS).
+    Yeni chain_head değerlerini döndürür.
+    """
+    anchors = anchors or {}
+    heads = {}
+    groups = [None] if customer_ids is None else list(_chunks(customer_ids))
+    for chunk in groups:
+        where = "" if chunk is None else f"WHERE customer_id IN ({_placeholders(chunk)})"
+        rows = conn.execute(
+            f"SELECT customer_id, id, timestamp, transaction_type, amount, description "
+            f"FROM transactions {where} ORDER BY customer_id, id", chunk or ()
+        ).fetchall()
+        updates = []
+        for customer_id, transaction_id, timestamp, transaction_type, amount, description in rows:
+            prev_hash = heads.get(customer_id) or anchors.get(customer_id) or GENESIS
+            heads[customer_id] = chain_hash(prev_hash, customer_id, timestamp, transaction_type, amount, description)
+            updates.append((prev_hash, heads[customer_id], transaction_id))
+        conn.executemany("UPDATE transactions SET prev_hash = ?, row_hash = ? WHERE id = ?", updates)
+    for customer_id in customer_ids or ():
+        # Satırı kalmayan müşterinin zinciri anchor'da biter
+        heads.setdefault(customer_id, anchors.get(customer_id) or GENESIS)
+    conn.executemany("UPDATE customers SET chain_head = ? WHERE id = ?", [
+        (head, customer_id) for customer_id, head in heads.items()
+    ])
+    return heads
+
+
+def verify_customers(conn, customer_ids) -> list:
+    """Verilen müşterilerin zincirlerini baştan doğrular (DB-API bağlantısı); bozuk olanları döndürür"""
+    broken = []
+    for chunk in _chunks(customer_ids):
+        marks = _placeholders(chunk)
+        heads = dict(conn.execute(f"SELECT id, chain_head FROM customers WHERE id IN ({marks})", chunk))
+        starts = {customer_id: (0, anchor) for customer_id, anchor in conn.execute(
+            f"SELECT customer_id, anchor_hash FROM ledger_checkpoints WHERE customer_id IN ({marks})", chunk
+        )}
+        rows = conn.execute(
+            f"SELECT {ROW_COLUMNS} FROM transactions t WHERE t.customer_id IN ({marks}) ORDER BY t.customer_id, t.id",
+            chunk
+        )
+        broken += _broken(_walk(rows, starts, heads))
+    return broken
+
+
+def reseal(conn, customer_ids, anchors: dict, now: str):
+    """Arşivlemeden sonra kalan satırları anchor'dan başlayarak yeniden mühürler ve kontrol noktalarını yazar"""
+    heads = rechain(conn, customer_ids, anchors)
+    last_ids = dict(conn.execute(
+        f"SELECT customer_id, MAX(id) FROM transactions WHERE customer_id IN ({_placeholders(customer_ids)}) "
+        f"GROUP BY customer_id", list(customer_ids)
+    )) if customer_ids else {}
+    conn.executemany("""
+        INSERT INTO ledger_checkpoints (customer_id, anchor_hash, last_id, last_hash, status, error, verified_at)
+        VALUES (?, ?, ?, ?, ?, '', ?)
+        ON CONFLICT (customer_id) DO UPDATE SET
+            anchor_hash = excluded.anchor_hash, last_id = excluded.last_id, last_hash = excluded.last_hash,
+            status = excluded.status, error = '', verified_at = excluded.verified_at
+    """, [(
+        customer_id, anchors.get(customer_id) or GENESIS, last_ids.get(customer_id, 0), heads[customer_id], OK, now,
+    ) for customer_id in customer_ids])
+
+
+def ledger_engines(app):
+    """(shard anahtarı, motor) çiftleri; sharding kapalıysa tek motor (uygulama bağlamında çağrılır)"""
+    from ..database.database import db
+    from ..database.sharding import shard_scope
+    from .customer import Transaction
+
+    router = app.extensions["paytrack_shards"]
+    for key in router.keys() if router is not None else [None]:
+        with shard_scope(key):
+            yield key, db.session.get_bind(clause=Transaction.__table__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İşlem defterinin hash zincirini doğrular")
+    parser.add_argument("--full", action="store_true", help="Kontrol noktalarını yok sayıp tüm zincirleri doğrula")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Tam doğrulamada süreç sayısı")
+    args = parser.parse_args(argv)
+
+    # Sharding ayarları uygulamanınkiyle aynı olsun
+    from ..app.main import create_app
+
+    app = create_app(background_jobs=False)
+    results = []
+    with app.app_context():
+        for key, engine in ledger_engines(app):
+            result = verify_ledger(engine, full=args.full, workers=args.workers)
+            results.append(result)
+            print(f"{key or 'paytrack.db'}: {result['mode']}, {result['customers']} müşteri, {result['rows']} işlem, "
+                  f"{result['seconds']} sn ({result['rows_per_second']} işlem/sn), "
+                  + ("zincir sağlam" if result["ok"] else f"{len(result['broken'])} bozuk zincir"))
+            for item in result["broken"]:
+                print(f"  müşteri {item['customer_id']}, işlem {item['transaction_id']}: {item['error']}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Para tutarları veritabanında tam sayı kuruş olarak saklanır.
+
+Girişte (istek gövdesi, CSV vb.) TL tutarı to_kurus ile kuruşa çevrilir;
+yanıt, PDF ve ekran çıktısında lira/format_lira ile TL'ye döndürülür.
+Böylece SUM gibi toplamlar SQLite içinde kesin hesaplanır.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+KURUS = 100
+
+_CENT = Decimal("0.01")
+
+
+def to_kurus(value) -> int:
+    """TL tutarını (sayı veya metin) en yakın kuruşa yuvarlayarak tam sayıya çevirir"""
+    if isinstance(value, bool):
+        raise ValueError("Geçersiz tutar!")
+    if isinstance(value, str):
+        value = value.strip().replace(",", ".")
+    try:
+        # float'ın ikili gösterimi yerine yazıldığı haliyle yorumlanır (0.1 -> 10 kuruş)
+        amount = Decimal(str(value)).quantize(_CENT, rounding=ROUND_HALF_UP)
+    except (InvalidOperation, ValueError, TypeError):
+        raise ValueError("Geçersiz tutar!")
+    if not amount.is_finite():
+        raise ValueError("Geçersiz tutar!")
+    return int(amount * KURUS)
+
+
+def lira(kurus) -> float:
+    """Kuruş tutarını JSON yanıtları için TL'ye çevirir"""
+    return (kurus or 0) / KURUS
+
+
+def format_lira(kurus) -> str:
+    """Kuruş tutarını iki ondalıklı TL metnine çevirir (örn. 1250 -> '12.50')"""
+    kurus = int(kurus or 0)
+    sign = "-" if kurus < 0 else ""
+    return f"{sign}{abs(kurus) // KURUS}.{abs(kurus) % KURUS:02d}"
@@ -1,18 +1,14 @@
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import mm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 import os
 import glob
 import shutil
 from datetime import datetime
 import logging
+from .money import format_lira
 
 logger = logging.getLogger(__name__)
 
 # PDF dosyalarının bulunduğu dizin
-PDF_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports')
+PDF_DIR = os.environ.get('PAYTRACK_REPORTS_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'reports'))
 
 def delete_old_pdfs():
     """24 saatten eski PDF dosyalarını siler"""
@@ -41,13 +37,23 @@ def parse_timestamp(timestamp_str):
             logger.error(f"Timestamp ayrıştırma hatası: {str(e)}")
             raise
 
-def save_pdf(customer):
-    """Müşteri bilgilerini PDF olarak kaydeder"""
+def save_pdf(customer, transactions=None):
+    """Müşteri bilgilerini PDF olarak kaydeder.
+
+    transactions verilmezse müşterinin ana tablodaki işlemleri kullanılır;
+    tarih aralığı için archive.transaction_history satırları verilebilir.
+    """
+    # ReportLab ağırdır; uygulama açılışında değil ilk raporda yüklenir
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import mm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
     logger.info("\n=== PDF OLUŞTURMA BAŞLADI ===")
     try:
         # Reports klasörünü oluştur
-        reports_dir = os.path.join(os.path.dirname(__file__), '..', 'reports')
-        reports_dir = os.path.abspath(reports_dir)
+        reports_dir = os.path.abspath(PDF_DIR)
         os.makedirs(reports_dir, exist_ok=True)
         logger.info(f"PDF raporları dizini: {reports_dir}")
         
@@ -107,7 +113,7 @@ def save_pdf(customer):
         # Müşteri bilgileri
         elements.append(Paragraph(f'Müşteri: {customer.name}', heading_style))
         elements.append(Paragraph(f'Ürün: {customer.urun}', heading_style))
-        elements.append(Paragraph(f'Güncel Borç: {customer.borc:.2f} ₺', heading_style))
+        elements.append(Paragraph(f'Güncel Borç: {format_lira(customer.borc)} ₺', heading_style))
         elements.append(Spacer(1, 10*mm))
 
         # İşlem geçmişi başlığı
@@ -119,7 +125,7 @@ def save_pdf(customer):
         
         # İşlemleri tarihe göre sırala
         sorted_transactions = sorted(
-            customer.transactions,
+            customer.transactions if transactions is None else transactions,
             key=lambda x: parse_timestamp(x.timestamp),
             reverse=True
         )
@@ -129,6 +135,8 @@ def save_pdf(customer):
                 islem_tipi = 'Borç Ekleme'
             elif transaction.transaction_type == 'odeme':
                 islem_tipi = 'Ödeme'
+            elif transaction.transaction_type == 'devir':
+                islem_tipi = 'Devir'
             else:  # alacak
                 islem_tipi = 'Alacak'
             
@@ -137,7 +145,7 @@ def save_pdf(customer):
             table_data.append([
                 tarih,
                 islem_tipi,
-                f'{transaction.amount:.2f} ₺',
+                f'{format_lira(transaction.amount)} ₺',
                 transaction.description or '-'
             ])
 
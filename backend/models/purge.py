@@ -0,0 +1,353 @@
+"""Müşterilerin bağlı satırlarıyla birlikte küme tabanlı silinmesi.
+
+Bir müşteri silinirken işlemleri, taksit planları, gecikme faizleri,
+rollup satırları ve zincir kontrol noktası da silinir. Her tablo için tek
+bir DELETE ... WHERE customer_id IN (...) çalışır; ORM kaskadındaki gibi
+satırlar belleğe yüklenmez. SQLite'ta yabancı anahtar denetimi kapalıdır
+ve mevcut tablolara ON DELETE CASCADE sonradan eklenemez; bu yüzden kaskad
+burada, aynı veritabanı işlemi içinde yapılır.
+
+Hesap özeti satırları banka kaydı olduğu için silinmez, müşteriyle bağı
+koparılır (açık satırlar yeniden eşleşmeyi bekler). changes tablosuna
+"customer_deleted" yazılır; eski değişiklik kayıtları istemcilerin
+senkronizasyonu için kalır.
+
+Toplu temizlik (bakiyesi sıfır ve uzun süredir hareketsiz müşteriler)
+chunk_size müşterilik parçalarla çalışır; her parça kendi işleminde commit
+edilir, böylece yazma kilidi hiçbir zaman bir parçadan uzun tutulmaz.
+archive açıksa silinen müşteriler ve tüm işlemleri aynı parçada,
+oturumun kendi bağlantısından okunup customers_archive.db dosyasına
+yazılır; arşiv ancak kaynaktaki silme commit edildikten sonra commit
+edilir.
+
+    python -m backend.models.purge --user-id 1 --inactive-days 365 [--archive] [--dry-run]
+"""
+import argparse
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, insert, text
+
+from ..database.database import Base, db
+from .archive import ARCHIVE_DIR, ArchiveFile, shard_archive_dir
+from .change import Change
+from .money import lira
+from .reconciliation import OPEN, UNMATCHED
+
+# Parça başına müşteri; kilit süresi parçadaki işlem sayısıyla orantılıdır
+CHUNK_SIZE = 200
+# Parçalar arasında bekleyen yazıcılara kilidi alma fırsatı verilir
+PAUSE = 0.005
+ARCHIVE_NAME = "customers_archive.db"
+
+# customer_id sütunuyla müşteriye bağlı tablolar; taksitler planlardan önce silinir
+CASCADE = (
+    "installments", "installment_plans", "late_fees", "ledger_checkpoints", "daily_rollup", "transactions",
+)
+
+# Bakiyesi |max_balance|'ı aşmayan, son hareketi cutoff'tan eski ve bekleyen
+# taksiti olmayan müşteriler. Son hareket daily_rollup'tan, hiç işlemi yoksa
+# müşterinin değişiklik kayıtlarından okunur.
+CANDIDATES = """
+SELECT c.id FROM customers c
+WHERE c.user_id = :user_id AND c.id > :after AND ABS(c.borc) <= :max_balance
+  AND COALESCE(
+      (SELECT MAX(r.day) FROM daily_rollup r WHERE r.customer_id = c.id),
+      (SELECT substr(h.created_at, 1, 10) FROM changes h WHERE h.customer_id = c.id ORDER BY h.seq DESC LIMIT 1),
+      ''
+  ) < :cutoff
+  AND NOT EXISTS (
+      SELECT 1 FROM installments i JOIN installment_plans p ON p.id = i.plan_id
+      WHERE i.customer_id = c.id AND i.posted_at IS NULL AND p.cancelled_at IS NULL
+  )
+ORDER BY c.id LIMIT :limit
+"""
+
+
+def _cascade(deleted) -> dict:
+    """Silinen müşteri satırlarının (id, user_id, name) bağlı satırlarını siler; tablo -> satır sayısı"""
+    ids = [row[0] for row in deleted]
+    if not ids:
+        return {}
+    counts = {}
+    for name in CASCADE:
+        table = Base.metadata.tables[name]
+        counts[name] = db.session.execute(table.delete().where(table.c.customer_id.in_(ids))).rowcount
+    lines = Base.metadata.tables["statement_lines"]
+    # user_id koşulu satırların (user_id, status) indeksinden bulunmasını sağlar
+    owned = lines.c.user_id.in_({row[1] for row in deleted}) & lines.c.customer_id.in_(ids)
+    db.session.execute(
+        lines.update().where(owned, lines.c.status.in_(OPEN))
+        .values(status=UNMATCHED, method=None, score=None, candidates="[]")
+    )
+    counts["statement_lines"] = db.session.execute(
+        lines.update().where(owned).values(customer_id=None)
+    ).rowcount
+    db.session.execute(insert(Change), [{
+        "user_id": user_id, "customer_id": customer_id, "customer_name": name, "kind": Change.CUSTOMER_DELETED,
+    } for customer_id, user_id, name in deleted])
+    return counts
+
+
+def delete_customers(customer_ids) -> dict:
+    """Müşterileri bağlı satırlarıyla siler; commit çağırana aittir.
+
+    {"customers": [(id, user_id, ad), ...], "rows": tablo -> silinen satır}
+    döndürür. Arşiv dosyalarındaki işlemler commit'ten sonra
+    purge_archived ile silinir.
+    """
+    customers = Base.metadata.tables["customers"]
+    deleted = db.session.execute(
+        customers.delete().where(customers.c.id.in_(list(customer_ids)))
+        .returning(customers.c.id, customers.c.user_id, customers.c.name)
+    ).all()
+    return {"customers": [tuple(row) for row in deleted], "rows": _cascade(deleted)}
+
+
+def _archive_paths() -> list:
+    return [(year, path) for year, path in db.session.query(ArchiveFile.year, ArchiveFile.path).order_by(ArchiveFile.year)
+            if os.path.exists(path)]
+
+
+def _columns(conn, schema: str, table: str) -> dict:
+    return {row[1]: row[2] for row in conn.execute(f"PRAGMA {schema}.table_info({table})")}
+
+
+def _ensure_table(conn, table: str, create_sql: str, source: dict):
+    """Arşiv dosyasında tabloyu oluşturur ya da eksik sütunları ekler"""
+    target = _columns(conn, "main", table)
+    if not target:
+        conn.execute(re.sub(r"^CREATE TABLE\s+[\"`]?\w+[\"`]?", f"CREATE TABLE main.{table}", create_sql))
+        target = source
+    for column, kind in source.items():
+        if column not in target:
+            conn.execute(f"ALTER TABLE main.{table} ADD COLUMN {column} {kind}")
+
+
+def _copy(conn, schema: str, table: str, key: str, ids) -> int:
+    """schema.table'daki satırları dışa aktarım dosyasının aynı tablosuna kopyalar"""
+    source = _columns(conn, schema, table)
+    create_sql = conn.execute(
+        f"SELECT sql FROM {schema}.sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0]
+    _ensure_table(conn, table, create_sql, source)
+    columns = ", ".join(source)
+    marks = ", ".join("?" * len(ids))
+    return conn.execute(
+        f"INSERT OR REPLACE INTO main.{table} ({columns}) SELECT {columns} FROM {schema}.{table} "
+        f"WHERE {key} IN ({marks})", ids
+    ).rowcount
+
+
+def _export(conn, table: str, rows) -> int:
+    """Oturumun bağlantısından okunmuş satırları arşiv dosyasına yazar; commit çağırana aittir.
+
+    Kaynak ayrı bir bağlantıdan okunmaz: silme işleminin tuttuğu yazma
+    kilidiyle çakışmaz ve henüz commit edilmemiş silme görülmez.
+    """
+    create_sql = db.session.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": table}
+    ).scalar()
+    source = {row[1]: row[2] for row in db.session.execute(text(f"PRAGMA table_info({table})"))}
+    _ensure_table(conn, table, create_sql, source)
+    if not rows:
+        return 0
+    columns = list(rows[0].keys())
+    conn.executemany(
+        f"INSERT OR REPLACE INTO main.{table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [tuple(row[column] for column in columns) for row in rows]
+    )
+    return len(rows)
+
+
+def purge_archived(customer_ids, archive_path: str = None) -> dict:
+    """Silinmiş müşterilerin yıllık arşiv dosyalarındaki işlemlerini siler.
+
+    archive_path verilirse satırlar önce oraya kopyalanır. Kopya ve silme
+    her yıl dosyası için tek bir işlemdir. Yıl -> silinen satır döndürür.
+    """
+    ids = list(customer_ids)
+    removed = {}
+    if not ids:
+        return removed
+    marks = ", ".join("?" * len(ids))
+    for year, path in _archive_paths():
+        conn = sqlite3.connect(archive_path or path, timeout=30)
+        try:
+            schema = "main"
+            if archive_path:
+                schema = "yr"
+                conn.execute("ATTACH DATABASE ? AS yr", (path,))
+            with conn:
+                if archive_path:
+                    _copy(conn, schema, "transactions", "customer_id", ids)
+                count = conn.execute(
+                    f"DELETE FROM {schema}.transactions WHERE customer_id IN ({marks})", ids
+                ).rowcount
+            if archive_path:
+                conn.execute("DETACH DATABASE yr")
+        finally:
+            conn.close()
+        if count:
+            removed[year] = count
+    if removed:
+        db.session.execute(
+            text("UPDATE archive_files SET row_count = MAX(row_count - :count, 0) WHERE year = :year"),
+            [{"year": year, "count": count} for year, count in removed.items()]
+        )
+        db.session.commit()
+    return removed
+
+
+def purge_customers(user_id, inactive_days: int = 365, max_balance: int = 0, chunk_size: int = CHUNK_SIZE,
+                    archive: bool = False, archive_dir: str = None, dry_run: bool = False,
+                    as_of: datetime = None, pause: float = PAUSE) -> dict:
+    """Kullanıcının hareketsiz müşterilerini parça parça siler (ya da arşivleyip siler).
+
+    Her parça tek bir DELETE ... RETURNING ile seçilip silinir; ölçütler
+    yazma kilidi altında yeniden değerlendirildiği için arada işlem görmüş
+    bir müşteri silinmez. max_balance kuruştur. Özet döndürür.
+    """
+    started = time.perf_counter()
+    if int(inactive_days) < 0 or int(max_balance) < 0:
+        raise ValueError("Süre ve bakiye sınırı negatif olamaz!")
+    if int(chunk_size) <= 0:
+        raise ValueError("chunk_size 0'dan büyük olmalı!")
+    as_of = as_of or datetime.now().replace(microsecond=0)
+    params = {
+        "user_id": int(user_id), "max_balance": int(max_balance), "limit": int(chunk_size), "after": 0,
+        "cutoff": (as_of - timedelta(days=int(inactive_days))).strftime("%Y-%m-%d"),
+    }
+
+    archive_path = archive_conn = None
+    if archive and not dry_run:
+        # Varsayılan: shard'ın kendi arşiv dizini
+        archive_dir = archive_dir or shard_archive_dir()
+        os.makedirs(archive_dir, exist_ok=True)
+        archive_path = os.path.abspath(os.path.join(archive_dir, ARCHIVE_NAME))
+        archive_conn = sqlite3.connect(archive_path, timeout=30)
+    history = text("SELECT * FROM transactions WHERE customer_id IN :ids").bindparams(bindparam("ids", expanding=True))
+
+    customers, rows, archived, chunks, max_chunk_ms = [], {}, 0, 0, 0.0
+    try:
+        while True:
+            chunk_started = time.perf_counter()
+            try:
+                if dry_run:
+                    found = db.session.execute(text(
+                        "SELECT id, user_id, name FROM customers WHERE id IN (" + CANDIDATES + ") ORDER BY id"
+                    ), params).mappings().all()
+                    db.session.rollback()
+                else:
+                    # İlk ifade yazmadır: kilit alınır ve ölçütler o anki veriye göre uygulanır
+                    found = db.session.execute(text(
+                        "DELETE FROM customers WHERE id IN (" + CANDIDATES + ") RETURNING *"
+                    ), params).mappings().all()
+                deleted = sorted((row["id"], row["user_id"], row["name"]) for row in found)
+                exported = 0
+                if deleted and archive_conn:
+                    # Arşiv aynı verinin kaynaktaki (commit edilmemiş) halini alır;
+                    # arşiv işlemi ancak kaynak commit edildikten sonra commit edilir
+                    _export(archive_conn, "customers", found)
+                    exported = _export(archive_conn, "transactions", db.session.execute(
+                        history, {"ids": [row[0] for row in deleted]}
+                    ).mappings().all())
+                if not dry_run:
+                    for table, count in _cascade(deleted).items():
+                        rows[table] = rows.get(table, 0) + count
+                    db.session.commit()
+            except Exception:
+                db.session.rollback()
+                if archive_conn:
+                    archive_conn.rollback()
+                raise
+            if archive_conn:
+                archive_conn.commit()
+                archived += exported
+            if not deleted:
+                break
+            chunks += 1
+            max_chunk_ms = max(max_chunk_ms, (time.perf_counter() - chunk_started) * 1000)
+            customers += deleted
+            params["after"] = deleted[-1][0]
+            if not dry_run:
+                for year, count in purge_archived([row[0] for row in deleted], archive_path).items():
+                    rows[f"archive_{year}"] = rows.get(f"archive_{year}", 0) + count
+            if len(deleted) < params["limit"]:
+                break
+            time.sleep(pause)
+    finally:
+        if archive_conn:
+            archive_conn.close()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "user_id": int(user_id),
+        "dry_run": dry_run,
+        "cutoff": params["cutoff"],
+        "max_balance": lira(params["max_balance"]),
+        "customers": len(customers),
+        "chunks": chunks,
+        "rows": rows,
+        "archive": archive_path,
+        # Ana tablodan arşiv dosyasına kopyalanan işlemler (yıllık arşivdekiler rows'ta)
+        "archived": archived,
+        "seconds": round(elapsed, 3),
+        "max_chunk_ms": round(max_chunk_ms, 3),
+        "names": [name for _, _, name in customers],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hareketsiz müşterileri parça parça siler ya da arşivler")
+    parser.add_argument("--user-id", type=int, help="Verilmezse tüm shard'lardaki tüm kullanıcılar")
+    parser.add_argument("--inactive-days", type=int, default=365)
+    parser.add_argument("--max-balance", default="0", help="TL cinsinden bakiye sınırı")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--archive", action="store_true", help=f"Silmeden önce {ARCHIVE_NAME} dosyasına kopyala")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR, help="Sharding açıksa shard başına alt dizin kullanılır")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    from ..app.main import create_app
+    from ..database.sharding import shard_scope
+    from .money import to_kurus
+
+    app = create_app(background_jobs=False)
+    router = app.extensions["paytrack_shards"]
+    if router is None:
+        keys = [None]
+    elif args.user_id is not None:
+        try:
+            keys = [router.shard_for(args.user_id)]
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        keys = router.keys()
+    results = []
+    with app.app_context():
+        for key in keys:
+            with shard_scope(key):
+                user_ids = [args.user_id] if args.user_id is not None else [
+                    row[0] for row in db.session.execute(text("SELECT DISTINCT user_id FROM customers ORDER BY user_id"))
+                ]
+                for user_id in user_ids:
+                    result = purge_customers(
+                        user_id, args.inactive_days, to_kurus(args.max_balance), args.chunk_size,
+                        archive=args.archive, archive_dir=shard_archive_dir(args.archive_dir, key),
+                        dry_run=args.dry_run,
+                    )
+                    if not args.dry_run:
+                        app.extensions["paytrack_read_cache"].invalidate(user_id)
+                    results.append(result)
+                    print(f"{key or 'paytrack.db'} kullanıcı {user_id}: {result['customers']} müşteri, "
+                          f"{result['chunks']} parça, {result['seconds']} sn (en uzun parça {result['max_chunk_ms']} ms)"
+                          + (" [deneme]" if args.dry_run else ""))
+    return results
+
+
+if __name__ == "__main__":
+    main()
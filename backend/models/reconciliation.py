@@ -0,0 +1,402 @@
+"""Banka/POS hesap özeti satırlarının müşteri ödemeleriyle eşleştirilmesi.
+
+Hesap özeti (CSV/XLSX) satır satır okunur. Gönderen adı (yoksa açıklama)
+Türkçe karakterleri sadeleştirilerek normalize edilir ve önce kesin
+anahtarlarla (ad ve sıralı kelimeleri: "YILMAZ AYŞE" = "Ayşe Yılmaz")
+sözlükte aranır. Bulunamazsa müşteri adlarının trigram ters indeksinden
+adaylar toplanıp benzerlik puanı hesaplanır. İndeks bir kez kurulur; her
+satır yalnızca kendi trigramlarının listelerine bakar, satır × müşteri
+karşılaştırması yapılmaz. Puanları yakın adaylar arasında tutarı açık
+bakiyeye eşit olan tercih edilir.
+
+Sonuçlar statement_lines tablosuna inceleme kuyruğu olarak yazılır; aynı
+özet tekrar yüklenirse satırlar parmak iziyle atlanır. Onaylanan satırlar
+tek bir veritabanı işleminde "odeme" olarak yazılır (post_transactions_bulk).
+"""
+import hashlib
+import json
+from collections import Counter
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Optional
+
+from sqlalchemy import Float, Index, String, Text, UniqueConstraint, bindparam, or_, select, update
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ..database.database import Base, db
+from .customer import Customer, post_transactions_bulk
+from .customer_import import MAX_ERRORS
+from .money import KURUS, lira
+from .text import fold, normalize_name
+
+# Başlık adı (sadeleştirilmiş) -> alan
+STATEMENT_ALIASES = {
+    "tarih": "date", "date": "date", "islem tarihi": "date", "valor": "date", "valor tarihi": "date",
+    "tutar": "amount", "amount": "amount", "meblag": "amount", "alacak": "amount", "giren": "amount",
+    "aciklama": "description", "description": "description", "islem aciklamasi": "description",
+    "gonderen": "payer", "gonderen adi": "payer", "ad soyad": "payer", "karsi taraf": "payer",
+    "payer": "payer", "isim": "payer", "musteri": "payer",
+    "referans": "reference", "reference": "reference", "dekont no": "reference", "ref": "reference",
+}
+
+# Durumlar
+MATCHED = "matched"        # kesin eşleşme, toplu onaylanabilir
+SUGGESTED = "suggested"    # bulanık eşleşme ya da incelenmesi gereken satır
+UNMATCHED = "unmatched"
+POSTED = "posted"
+REJECTED = "rejected"
+OPEN = (MATCHED, SUGGESTED, UNMATCHED)
+
+# Benzerlik eşikleri: gönderen adı için Dice, açıklama için ad trigramlarının
+# açıklamada bulunma oranı
+NAME_THRESHOLD = 0.6
+DESCRIPTION_THRESHOLD = 0.8
+# En iyi aday ikinciden bu kadar önde değilse satır kararsız sayılır
+MARGIN = 0.1
+MAX_CANDIDATES = 3
+CHUNK_SIZE = 500
+
+_DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d", "%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%Y",
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y", "%d-%m-%Y",
+)
+
+
+class StatementLine(Base):
+    """Yüklenen hesap özeti satırı ve eşleştirme sonucu"""
+    __tablename__ = "statement_lines"
+    __table_args__ = (
+        UniqueConstraint("user_id", "fingerprint"),
+        Index("ix_statement_lines_user_status", "user_id", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column()
+    batch: Mapped[str] = mapped_column(String(20))
+    line_no: Mapped[int] = mapped_column()
+    fingerprint: Mapped[str] = mapped_column(String(40))
+    booked_at: Mapped[str] = mapped_column(String(19))
+    amount: Mapped[int] = mapped_column()  # kuruş
+    payer: Mapped[str] = mapped_column(String(200), default="")
+    description: Mapped[str] = mapped_column(String(300), default="")
+    reference: Mapped[str] = mapped_column(String(100), default="")
+    status: Mapped[str] = mapped_column(String(10))
+    method: Mapped[Optional[str]] = mapped_column(String(10), default=None)  # exact / fuzzy / amount
+    customer_id: Mapped[Optional[int]] = mapped_column(default=None)
+    score: Mapped[Optional[float]] = mapped_column(Float, default=None)
+    candidates: Mapped[str] = mapped_column(Text, default="[]")  # [[customer_id, puan], ...]
+    note: Mapped[str] = mapped_column(String(200), default="")
+    transaction_id: Mapped[Optional[int]] = mapped_column(default=None)
+
+    def to_dict(self, names: dict) -> dict:
+        return {
+            "id": self.id,
+            "line": self.line_no,
+            "date": self.booked_at,
+            "amount": lira(self.amount),
+            "payer": self.payer,
+            "description": self.description,
+            "reference": self.reference,
+            "status": self.status,
+            "method": self.method,
+            "customer": names.get(self.customer_id),
+            "customer_id": self.customer_id,
+            "score": self.score,
+            "candidates": [
+                {"customer_id": cid, "customer": names.get(cid), "score": score}
+                for cid, score in json.loads(self.candidates or "[]")
+            ],
+            "note": self.note,
+        }
+
+
+def _trigrams(normalized: str) -> set:
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _exact_keys(normalized: str) -> tuple:
+    return normalized, " ".join(sorted(normalized.split()))
+
+
+class NameIndex:
+    """Müşteri adları için kesin anahtar sözlüğü ve trigram ters indeksi"""
+
+    def __init__(self, customers):
+        """customers: (id, ad) çiftleri"""
+        self.exact = {}
+        self.postings = {}
+        self.sizes = {}
+        for customer_id, name in customers:
+            normalized = normalize_name(name)
+            for key in _exact_keys(normalized):
+                self.exact.setdefault(key, set()).add(customer_id)
+            grams = _trigrams(normalized)
+            self.sizes[customer_id] = len(grams)
+            for gram in grams:
+                self.postings.setdefault(gram, []).append(customer_id)
+
+    def match(self, text, containment: bool = False) -> tuple:
+        """(yöntem, [(müşteri id, puan)]) döndürür; puana göre azalan sırada.
+
+        containment açıkken puan, adın trigramlarının metinde bulunma
+        oranıdır (adın geçtiği uzun açıklamalar için).
+        """
+        normalized = normalize_name(text)
+        if not normalized:
+            return None, []
+        exact = set()
+        for key in _exact_keys(normalized):
+            exact |= self.exact.get(key, set())
+        if exact:
+            return "exact", [(customer_id, 1.0) for customer_id in sorted(exact)]
+
+        grams = _trigrams(normalized)
+        common = Counter()
+        for gram in grams:
+            common.update(self.postings.get(gram, ()))
+        scored = []
+        for customer_id, shared in common.items():
+            size = self.sizes[customer_id]
+            score = shared / size if containment else 2 * shared / (size + len(grams))
+            scored.append((customer_id, round(score, 3)))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return "fuzzy", scored
+
+
+def parse_statement_amount(value) -> int:
+    """'1.234,56', '1,234.56', '250' gibi tutarları kuruşa çevirir"""
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        text = str(value)
+    else:
+        text = str(value or "").strip().replace(" ", "").replace("TL", "").replace("₺", "")
+        if "," in text and "." in text:
+            # Son ayırıcı ondalık ayırıcıdır
+            if text.rfind(",") > text.rfind("."):
+                text = text.replace(".", "").replace(",", ".")
+            else:
+                text = text.replace(",", "")
+        else:
+            text = text.replace(",", ".")
+    try:
+        amount = Decimal(text).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError("Geçersiz tutar!")
+    if not amount.is_finite():
+        raise ValueError("Geçersiz tutar!")
+    return int(amount * KURUS)
+
+
+def parse_statement_date(value) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    text = str(value or "").strip()
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).strftime("%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            continue
+    raise ValueError("Geçersiz tarih!")
+
+
+def classify(index: NameIndex, balances: dict, payer: str, description: str, amount: int) -> dict:
+    """Satır için durum, yöntem, müşteri, puan ve adayları belirler"""
+    if payer:
+        method, scored = index.match(payer)
+        threshold = NAME_THRESHOLD
+    else:
+        method, scored = index.match(description, containment=True)
+        threshold = DESCRIPTION_THRESHOLD
+    result = {
+        "status": UNMATCHED, "method": None, "customer_id": None, "score": None,
+        "candidates": json.dumps(scored[:MAX_CANDIDATES]), "note": "",
+    }
+    if not scored:
+        return result
+
+    if method == "exact" and len(scored) == 1:
+        result.update(status=MATCHED, method="exact", customer_id=scored[0][0], score=1.0)
+    else:
+        best_id, best = scored[0]
+        close = [cid for cid, score in scored if score >= threshold and best - score < MARGIN]
+        if method == "exact" or len(close) > 1:
+            # Kararsız: tutarı açık bakiyeye eşit olan tek aday varsa o seçilir
+            exact_balance = [cid for cid in close or [cid for cid, _ in scored] if balances.get(cid) == amount]
+            if len(exact_balance) == 1:
+                score = dict(scored)[exact_balance[0]]
+                result.update(status=SUGGESTED, method="amount", customer_id=exact_balance[0], score=score)
+            else:
+                result["note"] = "Birden fazla müşteriye benziyor"
+        elif best >= threshold:
+            result.update(status=SUGGESTED, method="fuzzy", customer_id=best_id, score=best)
+
+    if result["customer_id"] is not None and balances.get(result["customer_id"], 0) < amount:
+        result.update(status=SUGGESTED, note="Tutar müşterinin borcundan büyük")
+    return result
+
+
+def ingest_statement(user_id, records) -> dict:
+    """Hesap özeti satırlarını eşleştirip inceleme kuyruğuna ekler; commit çağırana aittir"""
+    user_id = int(user_id)
+    customers = db.session.execute(
+        select(Customer.id, Customer.name, Customer.borc).where(Customer.user_id == user_id)
+    ).all()
+    index = NameIndex((c.id, c.name) for c in customers)
+    balances = {c.id: c.borc for c in customers}
+    batch = datetime.now().strftime("%Y%m%d%H%M%S")
+    summary = {
+        "batch": batch, "rows": 0, "new": 0, "duplicates": 0, "invalid": 0,
+        MATCHED: 0, SUGGESTED: 0, UNMATCHED: 0, "errors": [],
+    }
+    seen = Counter()
+
+    def flush(chunk):
+        existing = set(db.session.execute(select(StatementLine.fingerprint).where(
+            StatementLine.user_id == user_id,
+            StatementLine.fingerprint.in_([row["fingerprint"] for row in chunk])
+        )).scalars())
+        fresh = [row for row in chunk if row["fingerprint"] not in existing]
+        summary["duplicates"] += len(chunk) - len(fresh)
+        if fresh:
+            db.session.execute(StatementLine.__table__.insert(), fresh)
+        summary["new"] += len(fresh)
+        for row in fresh:
+            summary[row["status"]] += 1
+
+    chunk = []
+    for line, record in records:
+        summary["rows"] += 1
+        try:
+            amount = parse_statement_amount(record.get("amount"))
+            booked_at = parse_statement_date(record.get("date")) if record.get("date") not in (None, "") \
+                else datetime.now().strftime("%Y-%m-%d 00:00:00")
+        except ValueError as e:
+            summary["invalid"] += 1
+            if len(summary["errors"]) < MAX_ERRORS:
+                summary["errors"].append({"row": line, "error": str(e)})
+            continue
+        if amount <= 0:
+            # Çıkan para (ödeme değil)
+            summary["invalid"] += 1
+            if len(summary["errors"]) < MAX_ERRORS:
+                summary["errors"].append({"row": line, "error": "Sadece gelen ödemeler eşleştirilir!"})
+            continue
+        payer = str(record.get("payer") or "").strip()[:200]
+        description = str(record.get("description") or "").strip()[:300]
+        reference = str(record.get("reference") or "").strip()[:100]
+
+        key = f"{booked_at}|{amount}|{reference}|{normalize_name(payer)}|{fold(description)}"
+        # Aynı dosyada birebir aynı iki satır ayrı ödemelerdir
+        seen[key] += 1
+        fingerprint = hashlib.sha1(f"{key}|{seen[key]}".encode("utf-8")).hexdigest()
+        chunk.append({
+            "user_id": user_id, "batch": batch, "line_no": line, "fingerprint": fingerprint,
+            "booked_at": booked_at, "amount": amount, "payer": payer, "description": description,
+            "reference": reference, "transaction_id": None,
+            **classify(index, balances, payer, description, amount),
+        })
+        if len(chunk) >= CHUNK_SIZE:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    return summary
+
+
+def review_queue(user_id, statuses=OPEN, limit: int = 500) -> list:
+    lines = db.session.query(StatementLine).filter(
+        StatementLine.user_id == int(user_id), StatementLine.status.in_(statuses)
+    ).order_by(StatementLine.booked_at, StatementLine.id).limit(limit).all()
+    ids = set()
+    for line in lines:
+        ids.add(line.customer_id)
+        ids.update(cid for cid, _ in json.loads(line.candidates or "[]"))
+    ids.discard(None)
+    names = dict(db.session.execute(
+        select(Customer.id, Customer.name).where(Customer.id.in_(ids))
+    ).all()) if ids else {}
+    return [line.to_dict(names) for line in lines]
+
+
+def post_approved(user_id, approvals: dict = None, rejections=(), approve_matched: bool = False) -> dict:
+    """Onaylanan satırları tek işlemde ödeme olarak yazar; commit çağırana aittir.
+
+    approvals: satır id -> müşteri id (None ise önerilen müşteri).
+    approve_matched açıksa tüm kesin eşleşmeler de onaylanır. Bakiyeyi
+    aşan ya da müşterisi olmayan satırlar yazılmaz, notuyla kuyrukta kalır.
+    """
+    user_id = int(user_id)
+    approvals = {int(k): v for k, v in (approvals or {}).items()}
+    lines = StatementLine.__table__
+    rejected = 0
+    if rejections:
+        rejected = db.session.execute(
+            update(lines)
+            .where(lines.c.user_id == user_id, lines.c.id.in_([int(i) for i in rejections]),
+                   lines.c.status.in_(OPEN))
+            .values(status=REJECTED)
+        ).rowcount
+
+    conditions = []
+    if approvals:
+        conditions.append(lines.c.id.in_(list(approvals)))
+    if approve_matched:
+        conditions.append(lines.c.status == MATCHED)
+    claimed = db.session.execute(
+        update(lines)
+        .where(lines.c.user_id == user_id, lines.c.status.in_(OPEN), or_(*conditions))
+        .values(status=POSTED)
+        .returning(lines.c.id, lines.c.customer_id, lines.c.amount, lines.c.booked_at,
+                   lines.c.payer, lines.c.reference)
+    ).all() if conditions else []
+    claimed.sort(key=lambda row: (row.booked_at, row.id))
+
+    chosen = {row.id: approvals.get(row.id) or row.customer_id for row in claimed}
+    ids = {cid for cid in chosen.values() if cid is not None}
+    customers = {c.id: c for c in db.session.execute(
+        select(Customer.id, Customer.user_id, Customer.name, Customer.borc)
+        .where(Customer.id.in_(ids), Customer.user_id == user_id)
+    )} if ids else {}
+
+    accepted, failed = [], []
+    balances = {cid: c.borc for cid, c in customers.items()}
+    for row in claimed:
+        customer = customers.get(chosen[row.id])
+        if customer is None:
+            failed.append((row, "Müşteri seçilmedi!" if chosen[row.id] is None else "Müşteri bulunamadı!"))
+        elif balances[customer.id] < row.amount:
+            failed.append((row, "Tutar müşterinin borcundan büyük"))
+        else:
+            balances[customer.id] -= row.amount
+            accepted.append((row, customer))
+
+    transaction_ids = post_transactions_bulk([{
+        "customer_id": customer.id, "user_id": customer.user_id, "name": customer.name,
+        "amount": row.amount, "transaction_type": "odeme", "timestamp": row.booked_at,
+        "description": " ".join(filter(None, ["Banka:", row.payer, row.reference]))[:200],
+    } for row, customer in accepted])
+    if accepted:
+        db.session.execute(
+            update(lines).where(lines.c.id == bindparam("lid"))
+            .values(customer_id=bindparam("cid"), transaction_id=bindparam("tid"), note=""),
+            [{"lid": row.id, "cid": customer.id, "tid": tid}
+             for (row, customer), tid in zip(accepted, transaction_ids)]
+        )
+    if failed:
+        # Yazılamayan satırlar notuyla kuyruğa döner
+        db.session.execute(
+            update(lines).where(lines.c.id == bindparam("lid"))
+            .values(status=SUGGESTED, customer_id=bindparam("cid"), note=bindparam("msg")),
+            [{"lid": row.id, "cid": chosen[row.id], "msg": message} for row, message in failed]
+        )
+
+    return {
+        "posted": len(accepted),
+        "total": lira(sum(row.amount for row, _ in accepted)),
+        "rejected": rejected,
+        "errors": [{"line_id": row.id, "error": message} for row, message in failed],
+        "customers": sorted({customer.name for _, customer in accepted}),
+    }
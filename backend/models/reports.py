@@ -0,0 +1,128 @@
+from datetime import date
+from sqlalchemy import text
+from ..database.database import db
+from .money import lira
+
+AGING_BUCKETS = ("0-30", "31-60", "61-90", "90+")
+
+# Ödemeler FIFO ile en eski borçlara dağıtıldığında açık kalan tutar, en yeni
+# borç günlerinden geriye doğru toplanan kısımdır. Her gün için "daha yeni
+# günlerin toplamı" pencere fonksiyonuyla bulunur ve müşterinin as_of
+# günündeki borcundan kalan pay o güne yazılır. as_of'tan sonraki günler
+# hesaba katılmaz; o günkü borç, güncel borçtan sonraki günlerin net etkisi
+# çıkarılarak bulunur. Hiç işlemi olmayan açılış borcu (borç - toplam
+# borçlandırma) müşterinin oluşturulduğu günden (ilk değişiklik kaydı ya
+# da ilk işlem günü, hangisi önceyse) yaşlandırılır; ikisi de yoksa en eski
+# kovaya düşer. as_of'tan sonra oluşturulan müşteriler rapora girmez.
+AGING_SQL = text("""
+    WITH later AS (
+        SELECT customer_id, SUM(borc_total + alacak_total - odeme_total) AS net
+        FROM daily_rollup
+        WHERE user_id = :user_id AND day > :as_of
+        GROUP BY customer_id
+    ),
+    created AS (
+        SELECT c.id, c.name, c.borc,
+               (SELECT date(MIN(ch.created_at)) FROM changes ch
+                WHERE ch.customer_id = c.id AND ch.seq > COALESCE((
+                    SELECT MAX(d.seq) FROM changes d
+                    WHERE d.customer_id = c.id AND d.kind = 'customer_deleted'
+                ), 0)) AS first_change,
+               (SELECT MIN(r.day) FROM daily_rollup r WHERE r.customer_id = c.id) AS first_day
+        FROM customers c
+        WHERE c.user_id = :user_id
+    ),
+    balances AS (
+        SELECT c.id, c.name, c.borc - COALESCE(l.net, 0) AS borc,
+               MIN(COALESCE(c.first_change, c.first_day), COALESCE(c.first_day, c.first_change)) AS created_on
+        FROM created c
+        LEFT JOIN later l ON l.customer_id = c.id
+    ),
+    ranked AS (
+        SELECT r.customer_id, r.day,
+               r.borc_total + r.alacak_total AS charged,
+               SUM(r.borc_total + r.alacak_total) OVER (
+                   PARTITION BY r.customer_id ORDER BY r.day DESC
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+               ) AS newer
+        FROM daily_rollup r
+        WHERE r.user_id = :user_id AND r.day <= :as_of AND r.borc_total + r.alacak_total > 0
+    ),
+    allocated AS (
+        SELECT ranked.customer_id,
+               julianday(:as_of) - julianday(ranked.day) AS age,
+               ranked.charged,
+               MAX(0, MIN(ranked.charged, b.borc - COALESCE(ranked.newer, 0))) AS open_amount
+        FROM ranked
+        JOIN balances b ON b.id = ranked.customer_id
+    ),
+    opening AS (
+        SELECT b.id AS customer_id,
+               COALESCE(julianday(:as_of) - julianday(b.created_on), 1e9) AS age,
+               0 AS charged,
+               MAX(0, b.borc - COALESCE((SELECT SUM(charged) FROM ranked WHERE ranked.customer_id = b.id), 0)) AS open_amount
+        FROM balances b
+    ),
+    buckets AS (
+        SELECT customer_id,
+               SUM(CASE WHEN age <= 30 THEN open_amount ELSE 0 END) AS b0,
+               SUM(CASE WHEN age > 30 AND age <= 60 THEN open_amount ELSE 0 END) AS b1,
+               SUM(CASE WHEN age > 60 AND age <= 90 THEN open_amount ELSE 0 END) AS b2,
+               SUM(CASE WHEN age > 90 THEN open_amount ELSE 0 END) AS b3
+        FROM (SELECT * FROM allocated UNION ALL SELECT * FROM opening)
+        GROUP BY customer_id
+    )
+    SELECT b.id, b.name, b.borc,
+           COALESCE(k.b0, 0), COALESCE(k.b1, 0), COALESCE(k.b2, 0), COALESCE(k.b3, 0)
+    FROM balances b
+    LEFT JOIN buckets k ON k.customer_id = b.id
+    WHERE b.borc > 0 AND (b.created_on IS NULL OR b.created_on <= :as_of)
+    ORDER BY b.borc DESC
+""")
+
+TIMESERIES_SQL = text("""
+    SELECT day, SUM(borc_total), SUM(odeme_total), SUM(alacak_total), SUM(tx_count)
+    FROM daily_rollup
+    WHERE user_id = :user_id AND day >= :start AND day <= :end
+    GROUP BY day
+    ORDER BY day
+""")
+
+
+def aging_report(user_id, as_of: str = None) -> dict:
+    """Açık borçları yaşlarına göre 0-30/31-60/61-90/90+ gün kovalarına ayırır"""
+    as_of = as_of or date.today().isoformat()
+    rows = db.session.execute(AGING_SQL, {"user_id": user_id, "as_of": as_of}).all()
+
+    # Tutarlar kuruş; toplamlar tam sayı olarak biriktirilip en sonda TL'ye çevrilir
+    totals = dict.fromkeys(AGING_BUCKETS, 0)
+    customers = []
+    for customer_id, name, borc, *amounts in rows:
+        for bucket, amount in zip(AGING_BUCKETS, amounts):
+            totals[bucket] += amount
+        customers.append({
+            "id": customer_id,
+            "name": name,
+            "borc": lira(borc),
+            "buckets": {bucket: lira(amount) for bucket, amount in zip(AGING_BUCKETS, amounts)},
+        })
+
+    return {
+        "as_of": as_of,
+        "totals": {bucket: lira(amount) for bucket, amount in totals.items()},
+        "customers": customers,
+    }
+
+
+def timeseries_report(user_id, start: str = "0000-00-00", end: str = "9999-99-99") -> dict:
+    """Günlük borç, ödeme ve alacak toplamlarını döndürür"""
+    rows = db.session.execute(TIMESERIES_SQL, {"user_id": user_id, "start": start, "end": end}).all()
+    return {
+        "days": [{
+            "day": day,
+            "borc": lira(borc),
+            "odeme": lira(odeme),
+            "alacak": lira(alacak),
+            "transactions": count,
+        } for day, borc, odeme, alacak, count in rows]
+    }
@@ -0,0 +1,99 @@
+from sqlalchemy import String, Index, text
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Mapped, mapped_column
+from ..database.database import Base, db
+
+
+class DailyRollup(Base):
+    """Müşteri başına günlük borç/ödeme/alacak toplamları (kuruş).
+
+    Her işlemle birlikte artımlı olarak güncellenir; raporlar işlem
+    tablosunu taramak yerine bu tabloyu okur.
+    """
+    __tablename__ = "daily_rollup"
+    __table_args__ = (
+        Index("ix_daily_rollup_user_day", "user_id", "day"),
+    )
+
+    customer_id: Mapped[int] = mapped_column(primary_key=True)
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)  # YYYY-MM-DD
+    user_id: Mapped[int] = mapped_column()
+    borc_total: Mapped[int] = mapped_column(default=0)
+    odeme_total: Mapped[int] = mapped_column(default=0)
+    alacak_total: Mapped[int] = mapped_column(default=0)
+    tx_count: Mapped[int] = mapped_column(default=0)
+
+    @classmethod
+    def apply(cls, user_id: int, customer_id: int, timestamp: str, transaction_type: str, amount: int):
+        """Tek bir işlemi ilgili günün satırına ekler (upsert)"""
+        column = f"{transaction_type}_total"
+        totals = {"borc_total": 0, "odeme_total": 0, "alacak_total": 0, column: amount}
+        stmt = insert(cls).values(
+            customer_id=customer_id,
+            day=str(timestamp)[:10],
+            user_id=user_id,
+            tx_count=1,
+            **totals
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.customer_id, cls.day],
+            set_={
+                column: getattr(cls, column) + stmt.excluded[column],
+                "tx_count": cls.tx_count + 1,
+            }
+        )
+        db.session.execute(stmt)
+
+    @classmethod
+    def apply_totals(cls, rows: list):
+        """Önceden toplanmış gün satırlarını tek bir executemany ile ekler.
+
+        rows: customer_id, day, user_id, borc_total, odeme_total,
+        alacak_total ve tx_count anahtarlı sözlükler.
+        """
+        if not rows:
+            return
+        stmt = insert(cls)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.customer_id, cls.day],
+            set_={
+                name: getattr(cls, name) + stmt.excluded[name]
+                for name in ("borc_total", "odeme_total", "alacak_total", "tx_count")
+            }
+        )
+        db.session.execute(stmt, rows)
+
+    @classmethod
+    def delete_for_customer(cls, customer_id: int):
+        db.session.execute(cls.__table__.delete().where(cls.customer_id == customer_id))
+
+
+def rebuild_daily_rollup(session=None):
+    """Tabloyu işlemlerden baştan hesaplar (ilk kurulum veya doğrudan yazılan veri için).
+
+    Sadece ana tabloyu okur; arşive taşınmış günler yeniden hesaplanmaz.
+    """
+    session = session or db.session
+    session.execute(text("DELETE FROM daily_rollup"))
+    session.execute(text("""
+        INSERT INTO daily_rollup (customer_id, day, user_id, borc_total, odeme_total, alacak_total, tx_count)
+        SELECT t.customer_id, substr(t.timestamp, 1, 10), c.user_id,
+               SUM(CASE WHEN t.transaction_type = 'borc' THEN t.amount ELSE 0 END),
+               SUM(CASE WHEN t.transaction_type = 'odeme' THEN t.amount ELSE 0 END),
+               SUM(CASE WHEN t.transaction_type = 'alacak' THEN t.amount ELSE 0 END),
+               COUNT(*)
+        FROM transactions t
+        JOIN customers c ON c.id = t.customer_id
+        WHERE t.transaction_type != 'devir'
+        GROUP BY t.customer_id, substr(t.timestamp, 1, 10)
+    """))
+    session.commit()
+
+
+def ensure_daily_rollup(session=None):
+    """Rollup boş ama işlem varsa (eski veritabanı) tabloyu doldurur"""
+    session = session or db.session
+    has_rollup = session.execute(text("SELECT 1 FROM daily_rollup LIMIT 1")).first()
+    has_transactions = session.execute(text("SELECT 1 FROM transactions LIMIT 1")).first()
+    if has_transactions and not has_rollup:
+        rebuild_daily_rollup(session)
@@ -0,0 +1,15 @@
+"""Türkçe metinlerin karşılaştırma için sadeleştirilmesi"""
+import re
+
+_FOLD = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+_NON_WORD = re.compile(r"[^0-9a-z]+")
+
+
+def fold(text) -> str:
+    """Küçük harfe çevirip Türkçe karakterleri sadeleştirir (İ -> i, I -> ı -> i)"""
+    return str(text or "").replace("İ", "i").replace("I", "ı").lower().translate(_FOLD)
+
+
+def normalize_name(text) -> str:
+    """Noktalama ve fazla boşlukları atar: 'AYŞE  YILMAZ.' -> 'ayse yilmaz'"""
+    return " ".join(_NON_WORD.sub(" ", fold(text)).split())
@@ -1,10 +1,35 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from sqlalchemy import String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import List, Optional
 from ..database.database import Base, db
+from .change import Change
+from .money import to_kurus
 from werkzeug.security import generate_password_hash, check_password_hash
 
+# Şifre hash'leme kasıtlı olarak yavaştır; sınırlı bir havuzda çalıştırılır ki
+# yoğun giriş trafiği tüm CPU'yu tüketip defter yazmalarını bekletmesin
+HASH_WORKERS = int(os.environ.get("PAYTRACK_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+HASH_MAX_PENDING = int(os.environ.get("PAYTRACK_HASH_MAX_PENDING", "64"))
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="pw-hash")
+_hash_slots = threading.BoundedSemaphore(HASH_MAX_PENDING)
+
+
+class HashPoolBusy(RuntimeError):
+    """Hash kuyruğu dolu olduğunda fırlatılır"""
+
+
+def _run_hash(func, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HashPoolBusy("Şifre doğrulama kuyruğu dolu, lütfen tekrar deneyin!")
+    try:
+        return _hash_pool.submit(func, *args).result()
+    finally:
+        _hash_slots.release()
+
 class User(Base):
     __tablename__ = "users"
 
@@ -16,10 +41,10 @@ class User(Base):
     customers: Mapped[List["Customer"]] = relationship(back_populates="user")
 
     def set_password(self, password: str):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = _run_hash(generate_password_hash, password)
 
     def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password_hash, password)
+        return _run_hash(check_password_hash, self.password_hash, password)
 
     @classmethod
     def create_user(cls, username: str, password: str) -> "User":
@@ -30,15 +55,19 @@ class User(Base):
         return user
 
     def musteri_ekle(self, name: str, urun: str, borc: float = 0.0) -> "Customer":
+        """borc TL cinsindendir; açılış borcu işlem olarak kaydedilir"""
         from .customer import Customer
         
+        borc = to_kurus(borc)
         customer = Customer(
             name=name,
             urun=urun,
-            borc=float(borc),
+            borc=0,
             user_id=self.id
         )
         db.session.add(customer)
+        db.session.flush()
+        Change.record(customer, Change.CUSTOMER)
         db.session.commit()
         db.session.refresh(customer)
         
@@ -56,14 +85,14 @@ class User(Base):
     def borc_ekle(self, customer_name: str, miktar: float, aciklama: str = "") -> bool:
         customer = self.musteri_bul(customer_name)
         if customer:
-            customer.add_transaction('borc', miktar, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            customer.add_transaction('borc', to_kurus(miktar), datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
             return True
         return False
 
     def odeme_yap(self, customer_name: str, miktar: float, aciklama: str = "") -> bool:
         customer = self.musteri_bul(customer_name)
         if customer:
-            customer.add_transaction('odeme', miktar, datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            customer.add_transaction('odeme', to_kurus(miktar), datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
             return True
         return False
 
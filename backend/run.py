@@ -12,7 +12,7 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-from backend.app.main import app
+from backend.app.main import create_app
 
 if __name__ == "__main__":
     print("\n=== PayTrack Backend Başlatılıyor ===")
@@ -23,17 +23,21 @@ if __name__ == "__main__":
     os.makedirs(reports_dir, exist_ok=True)
     print(f"Reports dizini: {os.path.abspath(reports_dir)}")
     
-    # Reports klasörü yazma izinlerini kontrol et
-    try:
-        test_file = os.path.join(reports_dir, 'test.txt')
-        with open(test_file, 'w') as f:
-            f.write('test')
-        os.remove(test_file)
-        print("Reports dizini yazılabilir ✓")
-    except Exception as e:
-        print(f"HATA: Reports dizinine yazılamıyor! {str(e)}")
+    # Reports klasörü yazma izinlerini kontrol et (dosya yazmadan)
+    if not os.access(reports_dir, os.W_OK | os.X_OK):
+        print("HATA: Reports dizinine yazılamıyor!")
         sys.exit(1)
-    
+    print("Reports dizini yazılabilir ✓")
+
+    # Reloader açıkken bu süreç yalnızca dosyaları izler; istekleri
+    # WERKZEUG_RUN_MAIN ile başlatılan alt süreç karşılar. Zamanlayıcılar
+    # yalnızca o süreçte başlatılır.
+    use_reloader = True
+    serving = not use_reloader or os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+
+    # Şema kontrolü (değişiklik yoksa tek sorgu)
+    app = create_app(background_jobs=serving)
+
     # Flask uygulamasını başlat
     print("\nFlask uygulaması başlatılıyor...")
     print("Backend URL: http://localhost:5000")
@@ -45,5 +49,5 @@ if __name__ == "__main__":
         debug=True,
         host='0.0.0.0',
         port=5000,
-        use_reloader=True
+        use_reloader=use_reloader
     ) 
\ No newline at end of file
@@ -0,0 +1,54 @@
+// Müşteri listesini baştan çekmek yerine /changes üzerinden gelen deltaları uygular
+
+export interface CustomerRow {
+  name: string;
+  product: string;
+  debt: number;
+}
+
+interface ChangeDelta {
+  seq: number;
+  has_more: boolean;
+  customers: { name: string; urun: string; borc: number }[];
+  deleted: string[];
+}
+
+export const applyCustomerDelta = (rows: CustomerRow[], delta: ChangeDelta): CustomerRow[] => {
+  const deleted = new Set(delta.deleted);
+  const updated = new Map(
+    delta.customers.map(c => [c.name, { name: c.name, product: c.urun, debt: c.borc }])
+  );
+  const next = rows
+    .filter(row => !deleted.has(row.name))
+    .map(row => {
+      const change = updated.get(row.name);
+      if (change) {
+        updated.delete(row.name);
+        return change;
+      }
+      return row;
+    });
+  return [...next, ...updated.values()];
+};
+
+// since numarasından itibaren tüm deltaları uygular; yeni seq ve listeyi döndürür
+export const fetchChanges = async (
+  userId: string,
+  since: number,
+  rows: CustomerRow[]
+): Promise<{ seq: number; rows: CustomerRow[] }> => {
+  let seq = since;
+  let current = rows;
+  for (;;) {
+    const response = await fetch(`http://localhost:5000/changes?user_id=${userId}&since=${seq}`);
+    if (!response.ok) {
+      throw new Error('Değişiklikler alınamadı!');
+    }
+    const delta: ChangeDelta = await response.json();
+    current = applyCustomerDelta(current, delta);
+    seq = delta.seq;
+    if (!delta.has_more) {
+      return { seq, rows: current };
+    }
+  }
+};
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import {
   Box,
   Card,
@@ -35,6 +35,7 @@ import {
   Delete as DeleteIcon,
 } from '@mui/icons-material';
 import PDFViewer from './PDFViewer';
+import { fetchChanges } from '../changeFeed';
 
 interface CustomerManagementProps {
   userId: string;
@@ -69,6 +70,9 @@ const CustomerManagement = ({ userId }: CustomerManagementProps) => {
   const [deletingCustomer, setDeletingCustomer] = useState<string | null>(null);
   const theme = useTheme();
 
+  // Son uygulanan değişiklik numarası; yazmalardan sonra sadece delta çekilir
+  const changeSeq = useRef<number | null>(null);
+
   const fetchCustomers = async () => {
     setLoading(true);
     try {
@@ -82,6 +86,7 @@ const CustomerManagement = ({ userId }: CustomerManagementProps) => {
           return { name, product, debt };
         });
         setCustomers(parsedCustomers);
+        changeSeq.current = Number(response.headers.get('X-Change-Seq') ?? 0);
       } else {
         setError('Müşteri listesi alınamadı!');
       }
@@ -92,7 +97,21 @@ const CustomerManagement = ({ userId }: CustomerManagementProps) => {
     }
   };
 
+  const applyChanges = async () => {
+    if (changeSeq.current === null) {
+      return fetchCustomers();
+    }
+    try {
+      const { seq, rows } = await fetchChanges(userId, changeSeq.current, customers);
+      changeSeq.current = seq;
+      setCustomers(rows);
+    } catch (err) {
+      fetchCustomers();
+    }
+  };
+
   useEffect(() => {
+    changeSeq.current = null;
     fetchCustomers();
   }, [userId]);
 
@@ -154,7 +173,7 @@ const CustomerManagement = ({ userId }: CustomerManagementProps) => {
       if (response.ok) {
         setSuccess('Müşteri başarıyla eklendi!');
         resetForm();
-        fetchCustomers();
+        applyChanges();
       } else {
         const data = await response.json();
         setError(data.error || 'Müşteri eklenirken bir hata oluştu!');
@@ -219,7 +238,7 @@ const CustomerManagement = ({ userId }: CustomerManagementProps) => {
       if (response.ok) {
         setSuccess('Müşteri başarıyla silindi!');
         resetForm();
-        await fetchCustomers();
+        await applyChanges();
       } else {
         const data = await response.json();
         setError(data.error || 'Müşteri silinirken bir hata oluştu!');
@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import {
   Box,
   Card,
@@ -37,6 +37,7 @@ import {
   Search,
 } from '@mui/icons-material';
 
+import { fetchChanges } from '../changeFeed';
 interface TransactionManagementProps {
   userId: string;
 }
@@ -69,6 +70,9 @@ const TransactionManagement = ({ userId }: TransactionManagementProps) => {
   const [historyDialogOpen, setHistoryDialogOpen] = useState(false);
   const theme = useTheme();
 
+  // Son uygulanan değişiklik numarası; yazmalardan sonra sadece delta çekilir
+  const changeSeq = useRef<number | null>(null);
+
   const fetchCustomers = async () => {
     try {
       const response = await fetch(`http://localhost:5000/customers/?user_id=${userId}`);
@@ -82,6 +86,7 @@ const TransactionManagement = ({ userId }: TransactionManagementProps) => {
         });
         setCustomers(parsedCustomers);
         setFilteredCustomers(parsedCustomers);
+        changeSeq.current = Number(response.headers.get('X-Change-Seq') ?? 0);
       } else {
         setError('Müşteri listesi alınamadı!');
       }
@@ -92,7 +97,7 @@ const TransactionManagement = ({ userId }: TransactionManagementProps) => {
 
   const fetchTransactions = async (customerName: string) => {
     try {
-      const response = await fetch(`http://localhost:5000/customers/transactions/${customerName}`);
+      const response = await fetch(`http://localhost:5000/customers/transactions/${customerName}?user_id=${userId}`);
       const data = await response.json();
       
       if (response.ok) {
@@ -108,7 +113,21 @@ const TransactionManagement = ({ userId }: TransactionManagementProps) => {
     }
   };
 
+  const applyChanges = async () => {
+    if (changeSeq.current === null) {
+      return fetchCustomers();
+    }
+    try {
+      const { seq, rows } = await fetchChanges(userId, changeSeq.current, customers);
+      changeSeq.current = seq;
+      setCustomers(rows);
+    } catch (err) {
+      fetchCustomers();
+    }
+  };
+
   useEffect(() => {
+    changeSeq.current = null;
     fetchCustomers();
   }, [userId]);
 
@@ -174,7 +193,7 @@ const TransactionManagement = ({ userId }: TransactionManagementProps) => {
         setSelectedCustomer('');
         setAmount('');
         setDescription('');
-        fetchCustomers();
+        applyChanges();
       } else {
         const data = await response.json();
         setError(data.error || 'İşlem kaydedilirken bir hata oluştu!');
@@ -465,7 +484,7 @@ const TransactionManagement = ({ userId }: TransactionManagementProps) => {
                 {transactions.map((transaction, index) => (
                   <TableRow key={index}>
                     <TableCell>{new Date(transaction.timestamp).toLocaleString('tr-TR')}</TableCell>
-                    <TableCell>{transaction.transaction_type === 'borc' ? 'Borç' : transaction.transaction_type === 'odeme' ? 'Ödeme' : 'Alacak'}</TableCell>
+                    <TableCell>{transaction.transaction_type === 'borc' ? 'Borç' : transaction.transaction_type === 'odeme' ? 'Ödeme' : transaction.transaction_type === 'devir' ? 'Devir' : 'Alacak'}</TableCell>
                     <TableCell align="right" sx={{
                       color: transaction.transaction_type === 'borc' 
                         ? theme.palette.error.main 